@@ -12,15 +12,19 @@ from typing import Any, AsyncGenerator
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
+from src.api.dependencies import engine, session_factory
 from src.api.routes.booking_routes import router as booking_router
 from src.messaging.messaging_manager import messaging_manager
+from src.messaging.messaging_metrics import METRICS_CONTENT_TYPE
 from src.messaging.pubsub_exchanges import (
     DESK_BOOKING_CREATED,
     DESK_BOOKING_DELETED,
     DESK_BOOKING_UPDATED,
 )
 from src.messaging.pubsub_facade import PubSubFacade
+from src.services.outbox_relay import OutboxRelay
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +41,7 @@ messaging_manager.add_pubsubs(
         PubSubFacade(AMQP_URL, DESK_BOOKING_DELETED),
     ]
 )
+outbox_relay = OutboxRelay(session_factory, messaging_manager)
 
 
 @asynccontextmanager
@@ -53,10 +58,16 @@ async def lifespan(_: FastAPI) -> AsyncGenerator[None, Any]:
     logger.info("Starting up messaging manager...")
     await messaging_manager.start_all()
     logger.debug("Messaging manager started.")
+    outbox_relay.start()
+    logger.info("Outbox relay started.")
     yield
+    logger.info("Stopping outbox relay...")
+    await outbox_relay.stop()
     logger.info("Shutting down messaging manager...")
     await messaging_manager.stop_all()
     logger.info("Messaging manager shut down.")
+    await engine.dispose()
+    logger.info("Database connection pool disposed.")
 
 
 app = FastAPI(lifespan=lifespan)
@@ -75,11 +86,28 @@ def get_root() -> dict[str, str]:
 
 
 @app.get("/health")
-def get_health() -> dict[str, str]:
+def get_health() -> dict[str, object]:
     """Health check endpoint to verify service status.
 
     Returns:
-        dict: A dictionary indicating service health status.
+        dict: A dictionary indicating service health status and whether the
+            messaging facade of each exchange is connected.
 
     """
-    return {"status": "ok"}
+    return {
+        "status": "ok" if messaging_manager.is_ready else "degraded",
+        "messaging": messaging_manager.readiness(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Expose the messaging metrics to Prometheus.
+
+    Returns:
+        PlainTextResponse: Publish, consume and queue backlog metrics.
+
+    """
+    return PlainTextResponse(
+        await messaging_manager.render_metrics(), media_type=METRICS_CONTENT_TYPE
+    )
@@ -10,7 +10,9 @@ from sqlalchemy import pool
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from sqlmodel import SQLModel
+from src.models.db import booking_stats  # noqa: F401
 from src.models.db import desk_booking  # noqa: F401
+from src.models.db import outbox_message  # noqa: F401
 
 load_dotenv()
 
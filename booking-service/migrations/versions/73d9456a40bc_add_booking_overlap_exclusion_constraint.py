@@ -0,0 +1,40 @@
+"""Add booking overlap exclusion constraint
+
+Revision ID: 73d9456a40bc
+Revises: 281c2b9642d2
+Create Date: 2026-10-17 09:12:31.482190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '73d9456a40bc'
+down_revision: Union[str, Sequence[str], None] = '281c2b9642d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Existing overlapping bookings (including ones closer than the 10 minute
+    tolerance) must be resolved before this migration can be applied.
+    """
+    # btree_gist provides the GiST operator class for "desk_id WITH =".
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        "ALTER TABLE deskbooking ADD CONSTRAINT deskbooking_no_overlap "
+        "EXCLUDE USING gist ("
+        "desk_id WITH =, "
+        "tstzrange(start_time, end_time + interval '10 minutes', '[)') WITH &&"
+        ")"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('deskbooking_no_overlap', 'deskbooking')
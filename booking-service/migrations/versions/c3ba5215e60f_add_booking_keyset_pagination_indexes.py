@@ -0,0 +1,54 @@
+"""Add booking keyset pagination indexes
+
+Revision ID: c3ba5215e60f
+Revises: 73d9456a40bc
+Create Date: 2026-10-17 10:03:54.118372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3ba5215e60f'
+down_revision: Union[str, Sequence[str], None] = '73d9456a40bc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# GET /api/v1/bookings orders by (start_time, id); each filter combination
+# gets an index whose trailing columns match that order. The desk_id + user_id
+# combination is served by the user_id index.
+INDEXES = {
+    'ix_deskbooking_start_time_id': ['start_time', 'id'],
+    'ix_deskbooking_desk_id_start_time_id': ['desk_id', 'start_time', 'id'],
+    'ix_deskbooking_user_id_start_time_id': ['user_id', 'start_time', 'id'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build the indexes without locking the table against writes.
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name,
+                'deskbooking',
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(
+                name,
+                table_name='deskbooking',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
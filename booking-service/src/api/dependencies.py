@@ -2,15 +2,20 @@
 
 import logging
 import os
-from typing import Generator
+from typing import AsyncGenerator
 
 from dotenv import load_dotenv
 from fastapi.params import Depends
-from sqlmodel import Session, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.messaging.messaging_manager import MessagingManager, messaging_manager
 from src.repositories.booking_repository import DeskBookingRepository
+from src.repositories.booking_stats_repository import BookingStatsRepository
+from src.repositories.outbox_repository import OutboxRepository
+from src.services.availability_cache import AvailabilityCache, availability_cache
 from src.services.desk_booking_service import DeskBookingService
+from src.services.idempotency_store import IdempotencyStore, idempotency_store
 
 logger = logging.getLogger(__name__)
 load_dotenv()
@@ -20,22 +25,59 @@ if not DATABASE_URL:
     logger.error("DATABASE_URL is not set. Please set it in the environment variables.")
     raise ValueError("DATABASE_URL is not set.")
 
-engine = create_engine(DATABASE_URL, echo=True)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
 
 
-def get_db_session() -> Generator[Session]:
+def to_async_url(url: str) -> str:
+    """Convert a synchronous Postgres URL to its asyncpg equivalent.
+
+    Alembic keeps using the synchronous driver, so DATABASE_URL stays a plain
+    ``postgresql://`` URL and the async driver is selected here.
+
+    Args:
+        url (str): The database URL as configured in the environment.
+
+    Returns:
+        str: The same URL using the ``postgresql+asyncpg`` driver.
+
+    """
+    return (
+        make_url(url)
+        .set(drivername="postgresql+asyncpg")
+        .render_as_string(hide_password=False)
+    )
+
+
+engine = create_async_engine(
+    to_async_url(DATABASE_URL),
+    echo=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+)
+session_factory = async_sessionmaker(
+    engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
+async def get_db_session() -> AsyncGenerator[AsyncSession]:
     """Dependency injection for database session.
 
     Returns:
-        Session: Yields a SQLModel Session instance.
+        AsyncSession: Yields a SQLModel AsyncSession instance.
 
     """
-    with Session(engine) as session:
+    async with session_factory() as session:
         yield session
 
 
 def get_booking_repository(
-    session: Session = Depends(get_db_session),
+    session: AsyncSession = Depends(get_db_session),
 ) -> DeskBookingRepository:
     """Dependency injection for BookingRepository.
 
@@ -46,18 +88,52 @@ def get_booking_repository(
     return DeskBookingRepository(session)
 
 
+def get_outbox_repository(
+    session: AsyncSession = Depends(get_db_session),
+) -> OutboxRepository:
+    """Dependency injection for OutboxRepository.
+
+    FastAPI caches `get_db_session` per request, so the outbox shares the
+    session and transaction of the booking repository.
+
+    Returns:
+        OutboxRepository: An instance of OutboxRepository.
+
+    """
+    return OutboxRepository(session)
+
+
+def get_booking_stats_repository(
+    session: AsyncSession = Depends(get_db_session),
+) -> BookingStatsRepository:
+    """Dependency injection for BookingStatsRepository.
+
+    Returns:
+        BookingStatsRepository: An instance of BookingStatsRepository sharing
+            the request's session.
+
+    """
+    return BookingStatsRepository(session)
+
+
 def get_booking_service(
     repo: DeskBookingRepository = Depends(get_booking_repository),
-    messaging: MessagingManager = Depends(lambda: messaging_manager),
+    outbox: OutboxRepository = Depends(get_outbox_repository),
+    stats: BookingStatsRepository = Depends(get_booking_stats_repository),
+    availability: AvailabilityCache = Depends(lambda: availability_cache),
+    idempotency: IdempotencyStore = Depends(lambda: idempotency_store),
 ) -> DeskBookingService:
     """Dependency injection for DeskBookingService.
 
     Args:
         repo (DeskBookingRepository): The booking repository instance.
-        messaging (MessagingManager): The messaging manager instance.
+        outbox (OutboxRepository): The outbox repository instance.
+        stats (BookingStatsRepository): The booking stats repository instance.
+        availability (AvailabilityCache): The process-wide availability cache.
+        idempotency (IdempotencyStore): The process-wide idempotency key store.
 
     Returns:
         DeskBookingService: An instance of DeskBookingService.
 
     """
-    return DeskBookingService(repo, messaging)
+    return DeskBookingService(repo, outbox, stats, availability, idempotency)
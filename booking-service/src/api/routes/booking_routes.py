@@ -1,49 +1,175 @@
 """API routes for desk bookings."""
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from src.api.dependencies import get_booking_service
+from src.models.dto.booking_stats_dto import BookingStatsDTO
+from src.models.dto.desk_availability_dto import DeskAvailabilityDTO
+from src.models.dto.desk_booking_batch_create_request import (
+    DeskBookingBatchCreateRequest,
+)
+from src.models.dto.desk_booking_batch_result import DeskBookingBatchResult
 from src.models.dto.desk_booking_create_request import DeskBookingCreateRequest
 from src.models.dto.desk_booking_dto import DeskBookingDTO
+from src.models.dto.desk_booking_filter import DeskBookingFilter
 from src.models.dto.desk_booking_update_request import DeskBookingUpdateRequest
 from src.services.desk_booking_service import DeskBookingService
+from src.services.transformations.export import ExportFormat, encode_export
 
 MESSAGE = "message"
 BOOKING_NOT_FOUND_MESSAGE = "Booking not found"
 DELETED_SUCCESSFULLY = "Booking deleted successfully"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+IDEMPOTENCY_KEY_HEADER = Header(
+    alias="Idempotency-Key", min_length=1, max_length=MAX_IDEMPOTENCY_KEY_LENGTH
+)
 
 router = APIRouter(prefix="/api/v1/bookings", tags=["bookings"])
 
 
 @router.get("", status_code=status.HTTP_200_OK)
-async def list_bookings(
+async def list_bookings(  # noqa: PLR0913
     service: Annotated[DeskBookingService, Depends(get_booking_service)],
     response: Response,
     start: datetime | None = None,
     end: datetime | None = None,
+    desk_id: Annotated[list[int] | None, Query()] = None,
+    user_id: UUID | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
 ) -> list[DeskBookingDTO] | dict[str, str]:
-    """List all desk bookings. Optionally filter by start and end datetime.
+    """List desk bookings page by page, ordered by start time.
+
+    The cursor of the next page is returned in the `X-Next-Cursor` header and is
+    absent on the last page.
 
     Args:
         service (DeskBookingService): The desk booking service instance.
         response (Response): The response object to set status codes.
         start (datetime | None): Optional start datetime to filter bookings.
         end (datetime | None): Optional end datetime to filter bookings.
+        desk_id (list[int] | None): Optional desk IDs to filter bookings.
+        user_id (UUID | None): Optional user ID to filter bookings.
+        limit (int): Maximum number of bookings on the page.
+        cursor (str | None): Cursor of the page to return.
 
     Returns:
-        list[DeskBookingDTO]: A list of desk bookings within the specified range.
+        list[DeskBookingDTO]: A page of desk bookings matching the filters.
 
     """
     try:
-        bookings = await service.list_bookings(start, end)
-        return bookings
+        page = await service.list_bookings(
+            DeskBookingFilter(start=start, end=end, desk_ids=desk_id, user_id=user_id),
+            limit,
+            cursor,
+        )
     except ValueError as e:
         response.status_code = status.HTTP_400_BAD_REQUEST
         return {MESSAGE: str(e)}
+    if page.next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_bookings(  # noqa: PLR0913
+    service: Annotated[DeskBookingService, Depends(get_booking_service)],
+    start: datetime | None = None,
+    end: datetime | None = None,
+    desk_id: Annotated[list[int] | None, Query()] = None,
+    user_id: UUID | None = None,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+) -> Response:
+    """Export all matching desk bookings as NDJSON or CSV, ordered by start time.
+
+    The bookings are streamed from the database to the client in chunks, so the
+    export is never held in memory as a whole.
+
+    Args:
+        service (DeskBookingService): The desk booking service instance.
+        start (datetime | None): Optional start datetime to filter bookings.
+        end (datetime | None): Optional end datetime to filter bookings.
+        desk_id (list[int] | None): Optional desk IDs to filter bookings.
+        user_id (UUID | None): Optional user ID to filter bookings.
+        export_format (ExportFormat): The format of the export.
+
+    Returns:
+        Response: The streamed export, or a 400 response if the range is invalid.
+
+    """
+    try:
+        chunks = service.export_bookings(
+            DeskBookingFilter(start=start, end=end, desk_ids=desk_id, user_id=user_id)
+        )
+    except ValueError as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST, content={MESSAGE: str(e)}
+        )
+    return StreamingResponse(
+        encode_export(chunks, export_format),
+        media_type=export_format.media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="bookings.{export_format.value}"'
+            )
+        },
+    )
+
+
+@router.get("/stats", status_code=status.HTTP_200_OK)
+async def get_stats(  # noqa: PLR0913
+    service: Annotated[DeskBookingService, Depends(get_booking_service)],
+    response: Response,
+    start: date,
+    end: date,
+    desk_id: Annotated[list[int] | None, Query()] = None,
+    user_id: UUID | None = None,
+) -> BookingStatsDTO | dict[str, str]:
+    """Get booking counts per desk per day and per user per week.
+
+    Args:
+        service (DeskBookingService): The desk booking service instance.
+        response (Response): The response object to set status codes.
+        start (date): The first UTC day (inclusive).
+        end (date): The last UTC day (exclusive).
+        desk_id (list[int] | None): Optional desk IDs to filter the statistics.
+        user_id (UUID | None): Optional user ID to filter the statistics.
+
+    Returns:
+        BookingStatsDTO: The per desk/day and per user/week statistics.
+
+    """
+    try:
+        return await service.get_stats(start, end, desk_id, user_id)
+    except ValueError as e:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        return {MESSAGE: str(e)}
+
+
+@router.get("/availability", status_code=status.HTTP_200_OK)
+async def get_availability(
+    service: Annotated[DeskBookingService, Depends(get_booking_service)],
+    day: Annotated[date, Query(alias="date")],
+) -> DeskAvailabilityDTO:
+    """Get the booked 15-minute slots of every booked desk on a day.
+
+    Args:
+        service (DeskBookingService): The desk booking service instance.
+        day (date): The UTC day to get the availability for.
+
+    Returns:
+        DeskAvailabilityDTO: The per-desk bitsets of booked slots.
+
+    """
+    return await service.get_availability(day)
 
 
 @router.get("/{booking_id}", status_code=status.HTTP_200_OK)
@@ -74,6 +200,7 @@ async def create_booking(
     request: DeskBookingCreateRequest,
     service: Annotated[DeskBookingService, Depends(get_booking_service)],
     response: Response,
+    idempotency_key: Annotated[str | None, IDEMPOTENCY_KEY_HEADER] = None,
 ) -> DeskBookingDTO | dict[str, str]:
     """Create a new desk booking.
 
@@ -81,25 +208,52 @@ async def create_booking(
         request (DeskBookingCreateRequest): The booking creation request data.
         service (DeskBookingService): The desk booking service instance.
         response (Response): The response object to set status codes.
+        idempotency_key (str | None): Optional `Idempotency-Key` header; retries
+            with the same key return the original booking.
 
     Returns:
         DeskBookingDTO: The created booking response data.
 
     """
     try:
-        booking = await service.create_booking(request)
+        booking = await service.create_booking(request, idempotency_key)
         return booking
     except ValueError as e:
         response.status_code = status.HTTP_400_BAD_REQUEST
         return {MESSAGE: str(e)}
 
 
+@router.post("/batch", status_code=status.HTTP_201_CREATED)
+async def create_bookings_batch(
+    request: DeskBookingBatchCreateRequest,
+    service: Annotated[DeskBookingService, Depends(get_booking_service)],
+    response: Response,
+) -> DeskBookingBatchResult | dict[str, str]:
+    """Create several desk bookings from a list or a weekly recurrence rule.
+
+    Args:
+        request (DeskBookingBatchCreateRequest): The batch creation request data.
+        service (DeskBookingService): The desk booking service instance.
+        response (Response): The response object to set status codes.
+
+    Returns:
+        DeskBookingBatchResult: The created bookings and the conflicting items.
+
+    """
+    try:
+        return await service.create_bookings_batch(request)
+    except ValueError as e:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        return {MESSAGE: str(e)}
+
+
 @router.put("/{booking_id}", status_code=status.HTTP_200_OK)
 async def update_booking(
     booking_id: UUID,
     request: DeskBookingUpdateRequest,
     service: Annotated[DeskBookingService, Depends(get_booking_service)],
     response: Response,
+    idempotency_key: Annotated[str | None, IDEMPOTENCY_KEY_HEADER] = None,
 ) -> DeskBookingDTO | dict[str, str]:
     """Update an existing desk booking.
 
@@ -108,13 +262,15 @@ async def update_booking(
         request (DeskBookingUpdateRequest): The updated booking data.
         service (DeskBookingService): The desk booking service instance.
         response (Response): The response object to set status codes.
+        idempotency_key (str | None): Optional `Idempotency-Key` header; retries
+            with the same key return the original result.
 
     Returns:
         DeskBookingDTO | str: The updated booking data or a not found message.
 
     """
     try:
-        booking = await service.update_booking(booking_id, request)
+        booking = await service.update_booking(booking_id, request, idempotency_key)
         if booking is None:
             response.status_code = status.HTTP_404_NOT_FOUND
         return booking or {MESSAGE: BOOKING_NOT_FOUND_MESSAGE}
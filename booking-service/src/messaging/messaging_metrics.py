@@ -0,0 +1,276 @@
+import bisect
+import time
+from collections import defaultdict
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, TypeVar
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+EventType = TypeVar("EventType")
+
+
+class Histogram:
+    """Cumulative histogram of observed durations in seconds."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        """Initialize an empty histogram.
+
+        Args:
+            buckets (Sequence[float]): Ascending upper bounds of the buckets. An
+                implicit `+Inf` bucket counts every observation.
+
+        """
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record an observation.
+
+        Args:
+            value (float): The observed duration in seconds.
+
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.bucket_counts):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def samples(self, name: str, labels: str) -> list[str]:
+        """Render the histogram as Prometheus samples.
+
+        Args:
+            name (str): The metric name.
+            labels (str): The rendered labels of the series, without braces.
+
+        Returns:
+            list[str]: The bucket, sum and count samples.
+
+        """
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.bucket_counts, strict=True):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class MessagingMetrics:
+    """Publish, consume and backlog metrics of a service's messaging facades.
+
+    Publishes are recorded per exchange and handled messages per queue. The
+    backlog of a queue is the last depth reported for it. `render` returns
+    everything in the Prometheus text exposition format.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._published: dict[str, int] = defaultdict(int)
+        self._publish_failures: dict[str, int] = defaultdict(int)
+        self._publish_duration: dict[str, Histogram] = defaultdict(Histogram)
+        self._consumed: dict[str, int] = defaultdict(int)
+        self._consume_failures: dict[str, int] = defaultdict(int)
+        self._handler_duration: dict[str, Histogram] = defaultdict(Histogram)
+        self._queue_messages: dict[str, int] = {}
+        self._queue_consumers: dict[str, int] = {}
+
+    def record_publish(
+        self, exchange: str, seconds: float, failed: bool = False
+    ) -> None:
+        """Record a publish and the time until the broker confirmed it.
+
+        Args:
+            exchange (str): The exchange the message was published to.
+            seconds (float): Seconds from sending the message to its confirm.
+            failed (bool): Whether the publish failed.
+
+        """
+        self._published[exchange] += 1
+        if failed:
+            self._publish_failures[exchange] += 1
+        self._publish_duration[exchange].observe(seconds)
+
+    def record_consume(
+        self, queue: str, seconds: float, messages: int = 1, failed: bool = False
+    ) -> None:
+        """Record a handler call for one or a batch of messages.
+
+        Args:
+            queue (str): The queue the messages were consumed from.
+            seconds (float): Seconds the handler took.
+            messages (int): Number of messages handed to the handler.
+            failed (bool): Whether the handler raised.
+
+        """
+        self._consumed[queue] += messages
+        if failed:
+            self._consume_failures[queue] += messages
+        self._handler_duration[queue].observe(seconds)
+
+    def set_queue_depth(self, queue: str, messages: int, consumers: int) -> None:
+        """Record the current backlog of a queue.
+
+        Args:
+            queue (str): The name of the queue.
+            messages (int): Number of messages ready for delivery.
+            consumers (int): Number of consumers of the queue.
+
+        """
+        self._queue_messages[queue] = messages
+        self._queue_consumers[queue] = consumers
+
+    @contextmanager
+    def time_publish(self, exchange: str) -> Iterator[None]:
+        """Time the publish inside the block, counting it as failed if it raises.
+
+        Args:
+            exchange (str): The exchange the message is published to.
+
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record_publish(exchange, time.perf_counter() - started, failed=True)
+            raise
+        self.record_publish(exchange, time.perf_counter() - started)
+
+    def timed_handler(
+        self, queue: str, handler: Callable[[EventType], Awaitable[Any]]
+    ) -> Callable[[EventType], Awaitable[Any]]:
+        """Wrap a message or batch callback to record its calls.
+
+        Args:
+            queue (str): The queue the callback consumes.
+            handler (Callable[[EventType], Awaitable[Any]]): The callback, taking a message or a list of messages.
+
+        Returns:
+            Callable[[EventType], Awaitable[Any]]: The callback, recording every call.
+
+        """  # noqa: E501
+
+        async def timed(event: EventType) -> Any:  # noqa: ANN401
+            messages = len(event) if isinstance(event, list) else 1
+            started = time.perf_counter()
+            try:
+                result = await handler(event)
+            except Exception:
+                self.record_consume(
+                    queue, time.perf_counter() - started, messages, failed=True
+                )
+                raise
+            self.record_consume(queue, time.perf_counter() - started, messages)
+            return result
+
+        return timed
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, one sample per line.
+
+        """
+        lines: list[str] = []
+        for name, kind, help_text, label, values in [
+            (
+                "messaging_published_total",
+                "counter",
+                "Publish attempts, including failed ones.",
+                "exchange",
+                self._published,
+            ),
+            (
+                "messaging_publish_failures_total",
+                "counter",
+                "Messages that failed to publish.",
+                "exchange",
+                self._publish_failures,
+            ),
+            (
+                "messaging_publish_duration_seconds",
+                "histogram",
+                "Seconds until a published message was confirmed.",
+                "exchange",
+                self._publish_duration,
+            ),
+            (
+                "messaging_consumed_total",
+                "counter",
+                "Messages handed to a handler.",
+                "queue",
+                self._consumed,
+            ),
+            (
+                "messaging_consume_failures_total",
+                "counter",
+                "Messages whose handler raised.",
+                "queue",
+                self._consume_failures,
+            ),
+            (
+                "messaging_handler_duration_seconds",
+                "histogram",
+                "Seconds a handler took for a message or batch.",
+                "queue",
+                self._handler_duration,
+            ),
+            (
+                "messaging_queue_messages",
+                "gauge",
+                "Messages ready for delivery in a queue.",
+                "queue",
+                self._queue_messages,
+            ),
+            (
+                "messaging_queue_consumers",
+                "gauge",
+                "Consumers of a queue.",
+                "queue",
+                self._queue_consumers,
+            ),
+        ]:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(values.items()):
+                labels = f'{label}="{_escape(key)}"'
+                if isinstance(value, Histogram):
+                    lines.extend(value.samples(name, labels))
+                else:
+                    lines.append(f"{name}{{{labels}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format.
+
+    Args:
+        value (str): The raw label value.
+
+    Returns:
+        str: The escaped label value.
+
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+from uuid import UUID
+
+from sqlalchemy import BigInteger
+from sqlmodel import Field, SQLModel
+
+
+class DeskDayStats(SQLModel, table=True):
+    """Database model for the rollup of one desk's bookings starting on one day.
+
+    Attributes:
+        desk_id (int): Identifier of the desk.
+        day (date): The UTC day the bookings start on.
+        booking_count (int): Number of bookings.
+        booked_minutes (int): Total duration of the bookings in minutes.
+
+    """
+
+    desk_id: int = Field(primary_key=True, sa_type=BigInteger)
+    day: date = Field(primary_key=True)
+    booking_count: int = 0
+    booked_minutes: int = Field(default=0, sa_type=BigInteger)
+
+
+class UserWeekStats(SQLModel, table=True):
+    """Database model for the rollup of one user's bookings starting in one week.
+
+    Attributes:
+        user_id (UUID): Identifier of the user.
+        week_start (date): The Monday (UTC) of the ISO week the bookings start in.
+        booking_count (int): Number of bookings.
+        booked_minutes (int): Total duration of the bookings in minutes.
+
+    """
+
+    user_id: UUID = Field(primary_key=True)
+    week_start: date = Field(primary_key=True)
+    booking_count: int = 0
+    booked_minutes: int = Field(default=0, sa_type=BigInteger)
+
+
+def week_start(day: date) -> date:
+    """Return the Monday of the ISO week containing a day.
+
+    Args:
+        day (date): The day.
+
+    Returns:
+        date: The first day of the day's week.
+
+    """
+    return day - timedelta(days=day.weekday())
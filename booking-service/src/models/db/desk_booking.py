@@ -1,11 +1,16 @@
 from datetime import datetime
 from uuid import UUID, uuid4
 
+from sqlalchemy import Column, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlmodel import Field, SQLModel
 
 from src.models.dto.desk_booking_create_request import DeskBookingCreateRequest
 from src.models.dto.desk_booking_update_request import DeskBookingUpdateRequest
 
+TOLERANCE_IN_MINUTES = 10
+NO_OVERLAP_CONSTRAINT = "deskbooking_no_overlap"
+
 
 class DeskBooking(SQLModel, table=True):
     """Database model for a desk booking.
@@ -17,13 +22,37 @@ class DeskBooking(SQLModel, table=True):
         start_time (datetime): Start date and time of the booking.
         end_time (datetime): End date and time of the booking.
 
+    Bookings of the same desk may not overlap. The end of every booking is
+    padded by ``TOLERANCE_IN_MINUTES`` and the resulting ranges are enforced
+    disjoint by a GiST exclusion constraint (requires the ``btree_gist``
+    extension), so the check is an index probe and safe under concurrency.
+
     """
 
+    __table_args__ = (
+        ExcludeConstraint(
+            (Column("desk_id"), "="),
+            (
+                text(
+                    "tstzrange(start_time, end_time + interval "
+                    f"'{TOLERANCE_IN_MINUTES} minutes', '[)')"
+                ),
+                "&&",
+            ),
+            name=NO_OVERLAP_CONSTRAINT,
+            using="gist",
+        ),
+        # Keyset pagination indexes, one per supported filter combination.
+        Index("ix_deskbooking_start_time_id", "start_time", "id"),
+        Index("ix_deskbooking_desk_id_start_time_id", "desk_id", "start_time", "id"),
+        Index("ix_deskbooking_user_id_start_time_id", "user_id", "start_time", "id"),
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True, index=True)
     user_id: UUID
     desk_id: int
-    start_time: datetime
-    end_time: datetime
+    start_time: datetime = Field(sa_type=DateTime(timezone=True))
+    end_time: datetime = Field(sa_type=DateTime(timezone=True))
 
     @classmethod
     def from_create_dto(cls, dto: DeskBookingCreateRequest) -> "DeskBooking":
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, DateTime, LargeBinary
+from sqlmodel import Field, SQLModel
+
+
+class OutboxMessage(SQLModel, table=True):
+    """Database model for a booking event waiting to be published.
+
+    Rows are inserted in the same transaction as the booking change they
+    describe and deleted by the outbox relay once the broker confirmed them.
+
+    Attributes:
+        id (int): Auto-incrementing identifier, also the publishing order.
+        exchange (str): Name of the fanout exchange to publish to.
+        body (bytes): The serialized message.
+        created_at (datetime): When the event was recorded.
+
+    """
+
+    id: int | None = Field(default=None, primary_key=True, sa_type=BigInteger)
+    exchange: str
+    body: bytes = Field(sa_type=LargeBinary)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),
+    )
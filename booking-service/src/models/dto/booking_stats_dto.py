@@ -0,0 +1,80 @@
+from datetime import date
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from src.models.db.booking_stats import DeskDayStats, UserWeekStats
+
+
+class DeskDayStatsDTO(BaseModel):
+    """DTO for the bookings of one desk starting on one day.
+
+    Attributes:
+        desk_id (int): Identifier of the desk.
+        day (date): The UTC day the bookings start on.
+        booking_count (int): Number of bookings.
+        booked_minutes (int): Total duration of the bookings in minutes.
+
+    """
+
+    desk_id: int
+    day: date
+    booking_count: int
+    booked_minutes: int
+
+    @classmethod
+    def from_entity(cls, entity: DeskDayStats) -> "DeskDayStatsDTO":
+        """Create a DeskDayStatsDTO from a DeskDayStats entity.
+
+        Args:
+            entity (DeskDayStats): The DeskDayStats entity.
+
+        Returns:
+            DeskDayStatsDTO: The created DTO instance.
+
+        """
+        return cls.model_validate(entity, from_attributes=True)
+
+
+class UserWeekStatsDTO(BaseModel):
+    """DTO for the bookings of one user starting in one week.
+
+    Attributes:
+        user_id (UUID): Identifier of the user.
+        week_start (date): The Monday (UTC) of the week the bookings start in.
+        booking_count (int): Number of bookings.
+        booked_minutes (int): Total duration of the bookings in minutes.
+
+    """
+
+    user_id: UUID
+    week_start: date
+    booking_count: int
+    booked_minutes: int
+
+    @classmethod
+    def from_entity(cls, entity: UserWeekStats) -> "UserWeekStatsDTO":
+        """Create a UserWeekStatsDTO from a UserWeekStats entity.
+
+        Args:
+            entity (UserWeekStats): The UserWeekStats entity.
+
+        Returns:
+            UserWeekStatsDTO: The created DTO instance.
+
+        """
+        return cls.model_validate(entity, from_attributes=True)
+
+
+class BookingStatsDTO(BaseModel):
+    """DTO for the booking statistics of a range of days.
+
+    Attributes:
+        desk_days (list[DeskDayStatsDTO]): Bookings per desk per day.
+        user_weeks (list[UserWeekStatsDTO]): Bookings per user per week, for
+            every week overlapping the range.
+
+    """
+
+    desk_days: list[DeskDayStatsDTO]
+    user_weeks: list[UserWeekStatsDTO]
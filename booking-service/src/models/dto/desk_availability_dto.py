@@ -0,0 +1,46 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+from src.services.availability_cache import SLOT_MINUTES, SLOTS_PER_DAY
+
+HEX_DIGITS_PER_DAY = SLOTS_PER_DAY // 4
+
+
+class DeskAvailabilityDTO(BaseModel):
+    """DTO for the booked slots of every booked desk on one day.
+
+    Each desk maps to a fixed-width hexadecimal bitset: bit ``i`` (counting from
+    the least significant bit) is set when the slot starting ``i * slot_minutes``
+    minutes after midnight UTC is booked. Desks without bookings are omitted.
+
+    Attributes:
+        day (date): The day described, in UTC.
+        slot_minutes (int): Length of one slot in minutes.
+        desks (dict[int, str]): Hexadecimal bitset of booked slots per desk.
+
+    """
+
+    day: date
+    slot_minutes: int = SLOT_MINUTES
+    desks: dict[int, str]
+
+    @classmethod
+    def from_bitmaps(cls, day: date, bitmaps: dict[int, int]) -> "DeskAvailabilityDTO":
+        """Create a DeskAvailabilityDTO from per-desk slot bitmasks.
+
+        Args:
+            day (date): The day described.
+            bitmaps (dict[int, int]): Bitmask of booked slots per desk.
+
+        Returns:
+            DeskAvailabilityDTO: The created DTO instance.
+
+        """
+        return cls(
+            day=day,
+            desks={
+                desk_id: format(bitmap, f"0{HEX_DIGITS_PER_DAY}x")
+                for desk_id, bitmap in bitmaps.items()
+            },
+        )
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, model_validator
+
+from src.models.dto.desk_booking_create_request import DeskBookingCreateRequest
+from src.models.dto.desk_booking_recurrence import DeskBookingRecurrence
+
+
+class DeskBookingBatchCreateRequest(BaseModel):
+    """DTO for creating several desk bookings at once.
+
+    Exactly one of `bookings` and `recurrence` must be given.
+
+    Attributes:
+        bookings (list[DeskBookingCreateRequest] | None): Explicit bookings.
+        recurrence (DeskBookingRecurrence | None): A weekly recurrence rule.
+
+    """
+
+    bookings: list[DeskBookingCreateRequest] | None = None
+    recurrence: DeskBookingRecurrence | None = None
+
+    @model_validator(mode="after")
+    def _check_exactly_one_source(self) -> "DeskBookingBatchCreateRequest":
+        """Validate that either bookings or a recurrence is given, not both."""
+        if (self.bookings is None) == (self.recurrence is None):
+            raise ValueError("Provide either 'bookings' or 'recurrence'.")
+        return self
+
+    def to_create_requests(self) -> list[DeskBookingCreateRequest]:
+        """Return the individual bookings requested by this batch.
+
+        Returns:
+            list[DeskBookingCreateRequest]: One create request per booking.
+
+        """
+        if self.recurrence is not None:
+            return self.recurrence.occurrences()
+        return list(self.bookings)
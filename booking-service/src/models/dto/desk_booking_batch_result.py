@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from src.models.dto.desk_booking_dto import DeskBookingDTO
+
+
+class DeskBookingConflict(BaseModel):
+    """DTO for a batch item that could not be booked.
+
+    Attributes:
+        index (int): Position of the item in the expanded batch.
+        desk_id (int): Identifier of the desk.
+        start_time (datetime): Start date and time of the rejected booking.
+        end_time (datetime): End date and time of the rejected booking.
+
+    """
+
+    index: int
+    desk_id: int
+    start_time: datetime
+    end_time: datetime
+
+
+class DeskBookingBatchResult(BaseModel):
+    """DTO for the outcome of a batch booking request.
+
+    Attributes:
+        created (list[DeskBookingDTO]): The bookings that were created.
+        conflicts (list[DeskBookingConflict]): Items rejected due to an overlap.
+
+    """
+
+    created: list[DeskBookingDTO]
+    conflicts: list[DeskBookingConflict]
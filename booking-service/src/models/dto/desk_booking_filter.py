@@ -0,0 +1,21 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class DeskBookingFilter(BaseModel):
+    """Filter criteria for querying desk bookings.
+
+    Attributes:
+        start (datetime | None): Only bookings ending after this datetime.
+        end (datetime | None): Only bookings starting before this datetime.
+        desk_ids (list[int] | None): Only bookings of these desks.
+        user_id (UUID | None): Only bookings of this user.
+
+    """
+
+    start: datetime | None = None
+    end: datetime | None = None
+    desk_ids: list[int] | None = None
+    user_id: UUID | None = None
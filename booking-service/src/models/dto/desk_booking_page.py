@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+from src.models.dto.desk_booking_dto import DeskBookingDTO
+
+
+class DeskBookingPage(BaseModel):
+    """DTO for one page of desk bookings.
+
+    Attributes:
+        items (list[DeskBookingDTO]): The bookings on this page.
+        next_cursor (str | None): Cursor for the next page, None on the last page.
+
+    """
+
+    items: list[DeskBookingDTO]
+    next_cursor: str | None = None
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from src.models.dto.desk_booking_create_request import DeskBookingCreateRequest
+
+MAX_RECURRENCE_WEEKS = 52
+DAYS_PER_WEEK = 7
+
+
+class DeskBookingRecurrence(BaseModel):
+    """DTO describing a weekly recurring desk booking.
+
+    Attributes:
+        user_id (UUID): Identifier of the user making the bookings.
+        desk_id (int): Identifier of the desk to be booked.
+        start_time (datetime): Start date and time of the first occurrence.
+        end_time (datetime): End date and time of the first occurrence.
+        weekdays (list[int]): Weekdays to book, 0 is Monday and 6 is Sunday.
+        weeks (int): Number of weeks the recurrence spans, starting at start_time.
+
+    """
+
+    user_id: UUID
+    desk_id: int
+    start_time: datetime
+    end_time: datetime
+    weekdays: list[int] = Field(min_length=1, max_length=DAYS_PER_WEEK)
+    weeks: int = Field(ge=1, le=MAX_RECURRENCE_WEEKS)
+
+    def occurrences(self) -> list[DeskBookingCreateRequest]:
+        """Expand the recurrence into one create request per occurrence.
+
+        Weekdays are evaluated in the timezone of `start_time`.
+
+        Returns:
+            list[DeskBookingCreateRequest]: The occurrences in chronological order.
+
+        """
+        duration = self.end_time - self.start_time
+        weekdays = set(self.weekdays)
+        occurrences = []
+        for offset in range(self.weeks * DAYS_PER_WEEK):
+            start_time = self.start_time + timedelta(days=offset)
+            if start_time.weekday() in weekdays:
+                occurrences.append(
+                    DeskBookingCreateRequest(
+                        user_id=self.user_id,
+                        desk_id=self.desk_id,
+                        start_time=start_time,
+                        end_time=start_time + duration,
+                    )
+                )
+        return occurrences
@@ -1,20 +1,40 @@
-from datetime import datetime, timedelta
+from datetime import datetime
+from typing import AsyncGenerator, NoReturn
 from uuid import UUID
 
-from sqlmodel import Session, select
+from sqlalchemy import delete, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
 
 from src.models.db.desk_booking import DeskBooking
+from src.models.dto.desk_booking_filter import DeskBookingFilter
+
+EXCLUSION_VIOLATION = "23P01"
+BOOKING_OVERLAP_MESSAGE = (
+    "Selected desk is already booked for the requested time range."
+)
+
+
+class BookingOverlapError(ValueError):
+    """Raised when a booking would overlap another booking of the same desk."""
 
 
 class DeskBookingRepository:
-    """Repository for managing DeskBooking entities in the database."""
+    """Repository for managing DeskBooking entities in the database.
+
+    Write methods execute their statements but leave the transaction open, so
+    the caller can record outbox messages alongside them before `commit`.
+    """
 
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: AsyncSession) -> None:
         """Initialize the repository with a database session."""
         self._session = session
 
-    def create(self, booking: DeskBooking) -> DeskBooking:
-        """Create a new DeskBooking in the database.
+    async def create(self, booking: DeskBooking) -> DeskBooking:
+        """Insert a new DeskBooking without committing.
 
         Args:
             booking (DeskBooking): The DeskBooking entity to create.
@@ -22,20 +42,94 @@ class DeskBookingRepository:
         Returns:
             DeskBooking: The created DeskBooking entity with updated fields.
 
+        Raises:
+            BookingOverlapError: If the booking overlaps an existing booking.
+
         """
-        self._save_and_refresh(booking)
+        await self._save(booking)
         return booking
 
-    def get_all(self) -> list[DeskBooking]:
-        """Retrieve all DeskBooking entities from the database.
+    async def create_many(self, bookings: list[DeskBooking]) -> list[DeskBooking]:
+        """Insert several DeskBookings with one multi-row INSERT, skipping overlaps.
+
+        The statement uses ``ON CONFLICT DO NOTHING``, so every candidate is
+        checked against existing bookings (and earlier rows of the same batch)
+        by the exclusion constraint in the same statement that inserts it.
+
+        Args:
+            bookings (list[DeskBooking]): The DeskBooking entities to create.
 
         Returns:
-            list[DeskBooking]: A list of DeskBooking entities.
+            list[DeskBooking]: The entities that were inserted, in input order.
+
+        """
+        if not bookings:
+            return []
+        stmt = (
+            insert(DeskBooking)
+            .values([booking.model_dump() for booking in bookings])
+            .on_conflict_do_nothing()
+            .returning(DeskBooking.id)
+        )
+        inserted_ids = set((await self._session.execute(stmt)).scalars())
+        return [booking for booking in bookings if booking.id in inserted_ids]
+
+    async def get_page(
+        self,
+        filters: DeskBookingFilter,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list[DeskBooking]:
+        """Retrieve one page of DeskBooking entities ordered by (start_time, id).
+
+        Uses keyset pagination: instead of an OFFSET the query continues strictly
+        after the (start_time, id) position of the previous page, so every page
+        is an index range scan regardless of how deep the client has paged.
+
+        Args:
+            filters (DeskBookingFilter): The filter criteria to apply.
+            limit (int): The maximum number of bookings to return.
+            after (tuple[datetime, UUID] | None): Position of the last booking
+                of the previous page.
+
+        Returns:
+            list[DeskBooking]: A list of at most `limit` DeskBooking entities.
+
+        """
+        stmt = DeskBookingRepository._filtered(filters)
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(DeskBooking.start_time, DeskBooking.id) > tuple_(*after)
+            )
+        stmt = stmt.order_by(DeskBooking.start_time, DeskBooking.id).limit(limit)
+        return list(await self._session.exec(stmt))
+
+    async def stream(
+        self, filters: DeskBookingFilter, chunk_size: int
+    ) -> AsyncGenerator[list[DeskBooking]]:
+        """Stream all matching DeskBooking entities ordered by (start_time, id).
+
+        Rows are read through a server-side cursor `chunk_size` at a time, so
+        memory use does not depend on how many bookings match.
+
+        Args:
+            filters (DeskBookingFilter): The filter criteria to apply.
+            chunk_size (int): The number of rows fetched per round-trip.
+
+        Yields:
+            list[DeskBooking]: Consecutive chunks of at most `chunk_size` entities.
 
         """
-        return list(self._session.exec(select(DeskBooking)))
+        stmt = (
+            DeskBookingRepository._filtered(filters)
+            .order_by(DeskBooking.start_time, DeskBooking.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self._session.stream_scalars(stmt)
+        async for chunk in result.partitions():
+            yield list(chunk)
 
-    def get_by_id(self, booking_id: UUID) -> DeskBooking | None:
+    async def get_by_id(self, booking_id: UUID) -> DeskBooking | None:
         """Retrieve a DeskBooking by its ID.
 
         Args:
@@ -45,12 +139,12 @@ class DeskBookingRepository:
             DeskBooking | None: The DeskBooking entity if found, else None.
 
         """
-        return self._session.get(DeskBooking, booking_id)
+        return await self._session.get(DeskBooking, booking_id)
 
-    def get_bookings_in_time_range(
+    async def get_bookings_in_time_range(
         self, start: datetime, end: datetime
     ) -> list[DeskBooking]:
-        """Retrieve all DeskBooking entities from the database.
+        """Retrieve all DeskBooking entities overlapping a time range.
 
         Args:
             start (datetime): The start datetime to filter bookings.
@@ -61,7 +155,7 @@ class DeskBookingRepository:
 
         """
         return list(
-            self._session.exec(
+            await self._session.exec(
                 select(DeskBooking).where(
                     DeskBooking.start_time < end,
                     DeskBooking.end_time > start,
@@ -69,113 +163,155 @@ class DeskBookingRepository:
             )
         )
 
-    def update(self, booking: DeskBooking) -> DeskBooking | None:
+    async def update(
+        self, booking: DeskBooking
+    ) -> tuple[DeskBooking, DeskBooking] | None:
         """Update an existing DeskBooking in the database.
 
+        The row is locked, updated and returned together with its previous
+        values by a single ``UPDATE ... FROM ... RETURNING`` statement.
+
         Args:
             booking (DeskBooking): The DeskBooking entity to update.
 
         Returns:
-            DeskBooking: The updated DeskBooking entity.
+            tuple[DeskBooking, DeskBooking] | None: The DeskBooking as it was
+                before and after the update, or None if not found.
+
+        Raises:
+            BookingOverlapError: If the update would overlap another booking.
 
         """
-        update_booking = self._update_fields(booking)
-        if update_booking is None:
+        previous = (
+            select(DeskBooking)
+            .where(DeskBooking.id == booking.id)
+            .with_for_update()
+            .subquery("previous")
+        )
+        stmt = (
+            update(DeskBooking)
+            .where(DeskBooking.id == previous.c.id)
+            .values(
+                user_id=booking.user_id,
+                desk_id=booking.desk_id,
+                start_time=booking.start_time,
+                end_time=booking.end_time,
+            )
+            .returning(
+                DeskBooking,
+                previous.c.user_id,
+                previous.c.desk_id,
+                previous.c.start_time,
+                previous.c.end_time,
+            )
+        )
+        try:
+            row = (await self._session.execute(stmt)).one_or_none()
+        except IntegrityError as e:
+            await self._handle_integrity_error(e)
+        if row is None:
             return None
-        self._save_and_refresh(update_booking)
-        return booking
+        updated_booking, user_id, desk_id, start_time, end_time = row
+        previous_booking = DeskBooking(
+            id=updated_booking.id,
+            user_id=user_id,
+            desk_id=desk_id,
+            start_time=start_time,
+            end_time=end_time,
+        )
+        return previous_booking, updated_booking
 
-    def delete(self, booking_id: UUID) -> DeskBooking | None:
-        """Delete a DeskBooking by its ID.
+    async def delete(self, booking_id: UUID) -> DeskBooking | None:
+        """Delete a DeskBooking by its ID without committing.
+
+        The row is deleted and returned by a single ``DELETE ... RETURNING``
+        statement, so the returned values are the ones actually deleted even
+        if the booking was updated concurrently.
 
         Args:
             booking_id (UUID): The ID of the DeskBooking to delete.
 
         Returns:
-            DeskBooking: The deleted DeskBooking entity.
+            DeskBooking | None: The deleted DeskBooking, or None if not found.
 
         """
-        booking = self.get_by_id(booking_id)
-        if booking is None:
+        stmt = (
+            delete(DeskBooking)
+            .where(col(DeskBooking.id) == booking_id)
+            .returning(
+                col(DeskBooking.id),
+                col(DeskBooking.user_id),
+                col(DeskBooking.desk_id),
+                col(DeskBooking.start_time),
+                col(DeskBooking.end_time),
+            )
+        )
+        row = (await self._session.execute(stmt)).one_or_none()
+        if row is None:
             return None
-        booking_copy = DeskBooking.model_copy(
-            booking
-        )  # Detached copy to return after deletion
-        self._session.delete(booking)
-        self._session.commit()
-        return booking_copy
-
-    def has_overlapping_booking(
-        self,
-        desk_id: int,
-        start_time: datetime,
-        end_time: datetime,
-        tolerance: timedelta = timedelta(0),
-    ) -> bool:
-        """Return True if there is any booking for `desk_id` that overlaps the given time window.
+        deleted_id, user_id, desk_id, start_time, end_time = row
+        return DeskBooking(
+            id=deleted_id,
+            user_id=user_id,
+            desk_id=desk_id,
+            start_time=start_time,
+            end_time=end_time,
+        )
 
-        An additional `tolerance` may be provided (a timedelta). The new booking's time window
-        is expanded by the tolerance (start_time - tolerance, end_time + tolerance), so any
-        existing booking within that expanded window is considered overlapping.
+    async def commit(self) -> None:
+        """Commit the current transaction."""
+        await self._session.commit()
 
-        Overlap condition used: existing.start_time < (end_time + tolerance)
-                               and existing.end_time > (start_time - tolerance)
+    @staticmethod
+    def _filtered(filters: DeskBookingFilter) -> SelectOfScalar[DeskBooking]:
+        """Build a query for the DeskBooking entities matching the filters.
 
         Args:
-            desk_id (UUID): The ID of the desk to check for overlapping bookings.
-            start_time (datetime): The start time of the new booking.
-            end_time (datetime): The end time of the new booking.
-            tolerance (timedelta): Additional margin to treat near-touching bookings as overlapping.
+            filters (DeskBookingFilter): The filter criteria to apply.
 
         Returns:
-            bool: True if there is an overlapping booking, False otherwise.
-
-        Raises:
-            ValueError: If end_time is not after start_time or tolerance is negative.
-
-        """  # noqa: E501
-        if end_time <= start_time:
-            raise ValueError("end_time must be after start_time")
-        if tolerance < timedelta(0):
-            raise ValueError("tolerance must be non-negative")
-
-        adjusted_start = start_time - tolerance
-        adjusted_end = end_time + tolerance
-
-        stmt = select(DeskBooking).where(
-            DeskBooking.desk_id == desk_id,
-            DeskBooking.start_time < adjusted_end,
-            DeskBooking.end_time > adjusted_start,
-        )
-        result = self._session.exec(stmt).first()
-        return result is not None
+            SelectOfScalar[DeskBooking]: The unordered query.
 
-    def _save_and_refresh(self, instance: DeskBooking) -> None:
-        """Save and refresh an instance in the database.
+        """
+        stmt = select(DeskBooking)
+        if filters.start is not None:
+            stmt = stmt.where(DeskBooking.end_time > filters.start)
+        if filters.end is not None:
+            stmt = stmt.where(DeskBooking.start_time < filters.end)
+        if filters.desk_ids:
+            stmt = stmt.where(col(DeskBooking.desk_id).in_(filters.desk_ids))
+        if filters.user_id is not None:
+            stmt = stmt.where(DeskBooking.user_id == filters.user_id)
+        return stmt
+
+    async def _save(self, instance: DeskBooking) -> None:
+        """Insert an instance in a single round-trip without committing.
 
         Args:
-            instance (DeskBooking): The DeskBooking instance to save and refresh.
+            instance (DeskBooking): The DeskBooking instance to save.
+
+        Raises:
+            BookingOverlapError: If the booking overlaps an existing booking.
 
         """
         self._session.add(instance)
-        self._session.commit()
-        self._session.refresh(instance)
+        try:
+            await self._session.flush()
+        except IntegrityError as e:
+            await self._handle_integrity_error(e)
 
-    def _update_fields(self, updated_booking: DeskBooking) -> DeskBooking | None:
-        """Update fields of an existing DeskBooking.
+    async def _handle_integrity_error(self, error: IntegrityError) -> NoReturn:
+        """Roll back and translate an overlap constraint violation.
 
         Args:
-            updated_booking (DeskBooking): The DeskBooking entity with updated fields.
+            error (IntegrityError): The error raised by the database.
 
-        Returns:
-            DeskBooking | None: The updated DeskBooking entity or None if not found.
+        Raises:
+            BookingOverlapError: If the error is an exclusion constraint violation.
+            IntegrityError: For any other integrity violation.
 
         """
-        current_booking = self.get_by_id(updated_booking.id)
-        if current_booking is None:
-            return None
-        current_booking.user_id = updated_booking.user_id
-        current_booking.desk_id = updated_booking.desk_id
-        current_booking.start_time = updated_booking.start_time
-        current_booking.end_time = updated_booking.end_time
-        return current_booking
+        await self._session.rollback()
+        if getattr(error.orig, "sqlstate", None) == EXCLUSION_VIOLATION:
+            raise BookingOverlapError(BOOKING_OVERLAP_MESSAGE) from error
+        raise error
@@ -0,0 +1,163 @@
+from collections import Counter
+from collections.abc import Iterable
+from datetime import date, timezone
+from uuid import UUID
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import SQLModel, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.models.db.booking_stats import DeskDayStats, UserWeekStats, week_start
+from src.models.db.desk_booking import DeskBooking
+
+SECONDS_PER_MINUTE = 60
+
+
+class BookingStatsRepository:
+    """Repository for the per desk/day and per user/week booking rollups.
+
+    Rollups are kept up to date by applying the delta of every booking change
+    in the transaction of that change, so reading them never scans bookings.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        """Initialize the repository with a database session."""
+        self._session = session
+
+    async def apply(
+        self,
+        added: Iterable[DeskBooking] = (),
+        removed: Iterable[DeskBooking] = (),
+    ) -> None:
+        """Add bookings to and remove bookings from the rollups, without committing.
+
+        Args:
+            added (Iterable[DeskBooking]): Bookings that were created, or the new
+                state of updated bookings.
+            removed (Iterable[DeskBooking]): Bookings that were deleted, or the
+                previous state of updated bookings.
+
+        """
+        desk_counts: Counter[tuple[int, date]] = Counter()
+        desk_minutes: Counter[tuple[int, date]] = Counter()
+        user_counts: Counter[tuple[UUID, date]] = Counter()
+        user_minutes: Counter[tuple[UUID, date]] = Counter()
+        for bookings, sign in ((added, 1), (removed, -1)):
+            for booking in bookings:
+                day = booking.start_time.astimezone(timezone.utc).date()
+                minutes = int(
+                    (booking.end_time - booking.start_time).total_seconds()
+                    // SECONDS_PER_MINUTE
+                )
+                desk_key = (booking.desk_id, day)
+                user_key = (booking.user_id, week_start(day))
+                desk_counts[desk_key] += sign
+                desk_minutes[desk_key] += sign * minutes
+                user_counts[user_key] += sign
+                user_minutes[user_key] += sign * minutes
+        await self._upsert(
+            DeskDayStats,
+            ("desk_id", "day"),
+            [
+                {
+                    "desk_id": desk_id,
+                    "day": day,
+                    "booking_count": desk_counts[desk_id, day],
+                    "booked_minutes": desk_minutes[desk_id, day],
+                }
+                for desk_id, day in desk_counts
+            ],
+        )
+        await self._upsert(
+            UserWeekStats,
+            ("user_id", "week_start"),
+            [
+                {
+                    "user_id": user_id,
+                    "week_start": week,
+                    "booking_count": user_counts[user_id, week],
+                    "booked_minutes": user_minutes[user_id, week],
+                }
+                for user_id, week in user_counts
+            ],
+        )
+
+    async def get_desk_days(
+        self, start: date, end: date, desk_ids: list[int] | None = None
+    ) -> list[DeskDayStats]:
+        """Retrieve the desk rollups of the days in a range.
+
+        Args:
+            start (date): The first day (inclusive).
+            end (date): The last day (exclusive).
+            desk_ids (list[int] | None): Only rollups of these desks.
+
+        Returns:
+            list[DeskDayStats]: Non-empty rollups ordered by day and desk.
+
+        """
+        stmt = select(DeskDayStats).where(
+            DeskDayStats.day >= start,
+            DeskDayStats.day < end,
+            DeskDayStats.booking_count > 0,
+        )
+        if desk_ids:
+            stmt = stmt.where(col(DeskDayStats.desk_id).in_(desk_ids))
+        stmt = stmt.order_by(DeskDayStats.day, DeskDayStats.desk_id)
+        return list(await self._session.exec(stmt))
+
+    async def get_user_weeks(
+        self, start: date, end: date, user_id: UUID | None = None
+    ) -> list[UserWeekStats]:
+        """Retrieve the user rollups of the weeks overlapping a range of days.
+
+        Args:
+            start (date): The first day (inclusive).
+            end (date): The last day (exclusive).
+            user_id (UUID | None): Only rollups of this user.
+
+        Returns:
+            list[UserWeekStats]: Non-empty rollups ordered by week and user.
+
+        """
+        stmt = select(UserWeekStats).where(
+            UserWeekStats.week_start >= week_start(start),
+            UserWeekStats.week_start < end,
+            UserWeekStats.booking_count > 0,
+        )
+        if user_id is not None:
+            stmt = stmt.where(UserWeekStats.user_id == user_id)
+        stmt = stmt.order_by(UserWeekStats.week_start, UserWeekStats.user_id)
+        return list(await self._session.exec(stmt))
+
+    async def _upsert(
+        self, model: type[SQLModel], key: tuple[str, str], rows: list[dict]
+    ) -> None:
+        """Add the counters of the rows to the stored ones in a single statement.
+
+        Rows are sorted by key so concurrent transactions lock them in the same
+        order and cannot deadlock each other.
+
+        Args:
+            model (type[SQLModel]): The rollup model.
+            key (tuple[str, str]): The primary key columns.
+            rows (list[dict]): The deltas to apply, at most one per key.
+
+        """
+        rows = [row for row in rows if row["booking_count"] or row["booked_minutes"]]
+        if not rows:
+            return
+        rows.sort(key=lambda row: tuple(row[column] for column in key))
+        stmt = insert(model).values(rows)
+        table = model.__table__
+        await self._session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=list(key),
+                set_={
+                    "booking_count": table.c.booking_count
+                    + stmt.excluded.booking_count,
+                    "booked_minutes": table.c.booked_minutes
+                    + stmt.excluded.booked_minutes,
+                },
+            )
+        )
@@ -0,0 +1,70 @@
+from sqlalchemy import delete, func
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.models.db.outbox_message import OutboxMessage
+from src.models.msg.abstract_message import AbstractMessage
+
+# Key of the advisory lock held by the relay draining the outbox.
+OUTBOX_RELAY_LOCK_ID = 0x6F7574626F78
+
+
+class OutboxRepository:
+    """Repository for the transactional outbox of booking events."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        """Initialize the repository with a database session."""
+        self._session = session
+
+    def add(self, exchange: str, message: AbstractMessage) -> None:
+        """Stage a message in the session's current transaction.
+
+        Nothing is written until the transaction is committed, so the message
+        is recorded if and only if the accompanying booking change is.
+
+        Args:
+            exchange (str): The exchange to publish the message to.
+            message (AbstractMessage): The message to publish.
+
+        """
+        self._session.add(OutboxMessage(exchange=exchange, body=message.to_bytes()))
+
+    async def claim_batch(self, limit: int) -> list[OutboxMessage]:
+        """Take the outbox for this transaction and return the oldest messages.
+
+        A transaction-level advisory lock lets only one relay drain the outbox
+        at a time, so messages are published in order even with several
+        service instances. While another relay holds the lock, nothing is
+        claimed; the lock is released when the transaction ends.
+
+        Args:
+            limit (int): The maximum number of messages to claim.
+
+        Returns:
+            list[OutboxMessage]: The claimed messages, oldest first, or none if
+                another relay is draining the outbox.
+
+        """
+        locked = await self._session.execute(
+            select(func.pg_try_advisory_xact_lock(OUTBOX_RELAY_LOCK_ID))
+        )
+        if not locked.scalar_one():
+            return []
+        stmt = select(OutboxMessage).order_by(col(OutboxMessage.id)).limit(limit)
+        return list((await self._session.exec(stmt)).all())
+
+    async def delete(self, message_ids: list[int]) -> None:
+        """Delete published messages.
+
+        Args:
+            message_ids (list[int]): The IDs of the messages to delete.
+
+        """
+        if message_ids:
+            await self._session.execute(
+                delete(OutboxMessage).where(col(OutboxMessage.id).in_(message_ids))
+            )
+
+    async def commit(self) -> None:
+        """Commit the current transaction, releasing the outbox."""
+        await self._session.commit()
@@ -0,0 +1,221 @@
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as dt_time
+from uuid import UUID
+
+from src.models.db.desk_booking import DeskBooking
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+SLOT = timedelta(minutes=SLOT_MINUTES)
+DAY = timedelta(days=1)
+
+
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    """Return the UTC start and end of a day.
+
+    Args:
+        day (date): The day.
+
+    Returns:
+        tuple[datetime, datetime]: The start (inclusive) and end (exclusive).
+
+    """
+    start = datetime.combine(day, dt_time.min, tzinfo=timezone.utc)
+    return start, start + DAY
+
+
+def booked_slots(day: date, start_time: datetime, end_time: datetime) -> int:
+    """Return the bitmask of the day's slots touched by a booking.
+
+    Bit ``i`` stands for the slot starting ``i * SLOT_MINUTES`` after midnight
+    UTC. A slot counts as booked as soon as any part of it is booked.
+
+    Args:
+        day (date): The day to compute the slots for.
+        start_time (datetime): The start of the booking.
+        end_time (datetime): The end of the booking.
+
+    Returns:
+        int: The bitmask of booked slots, 0 if the booking misses the day.
+
+    """
+    day_start, day_end = day_bounds(day)
+    start_time, end_time = max(start_time, day_start), min(end_time, day_end)
+    if start_time >= end_time:
+        return 0
+    first_slot = (start_time - day_start) // SLOT
+    last_slot = -((day_start - end_time) // SLOT)  # ceiling division
+    return (1 << last_slot) - (1 << first_slot)
+
+
+class DayAvailability:
+    """Booked slots of every desk on one day.
+
+    The bookings touching the day are kept per desk so that removing one can
+    rebuild that desk's bitmask without going back to the database.
+    """
+
+    def __init__(self, day: date) -> None:
+        """Initialize an empty day.
+
+        Args:
+            day (date): The day this availability describes.
+
+        """
+        self.day = day
+        self.loaded_at = time.monotonic()
+        self._bookings: dict[int, dict[UUID, int]] = {}
+        self._bitmaps: dict[int, int] = {}
+
+    def add(self, booking: DeskBooking) -> None:
+        """Mark the slots of a booking as booked.
+
+        Args:
+            booking (DeskBooking): The booking to add.
+
+        """
+        slots = booked_slots(self.day, booking.start_time, booking.end_time)
+        if not slots:
+            return
+        self._bookings.setdefault(booking.desk_id, {})[booking.id] = slots
+        self._bitmaps[booking.desk_id] = self._bitmaps.get(booking.desk_id, 0) | slots
+
+    def remove(self, booking_id: UUID) -> None:
+        """Free the slots of a booking, keeping slots shared with other bookings.
+
+        Args:
+            booking_id (UUID): The ID of the booking to remove.
+
+        """
+        for desk_id, bookings in self._bookings.items():
+            if bookings.pop(booking_id, None) is None:
+                continue
+            bitmap = 0
+            for slots in bookings.values():
+                bitmap |= slots
+            if bitmap:
+                self._bitmaps[desk_id] = bitmap
+            else:
+                del self._bookings[desk_id]
+                del self._bitmaps[desk_id]
+            return
+
+    @property
+    def bitmaps(self) -> dict[int, int]:
+        """Get the bitmask of booked slots per desk with at least one booking."""
+        return dict(self._bitmaps)
+
+
+class AvailabilityCache:
+    """In-process LRU cache of per-day desk availability.
+
+    Days are loaded from the database on a miss and afterwards patched in place
+    by every booking write of this process. Entries expire after `max_age`
+    seconds so writes made by other worker processes become visible.
+    """
+
+    def __init__(self, max_days: int = 31, max_age: float = 60.0) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_days (int): Maximum number of days kept before evicting the
+                least recently used one.
+            max_age (float): Seconds after which a cached day is reloaded.
+
+        """
+        self._max_days = max_days
+        self._max_age = max_age
+        self._days: OrderedDict[date, DayAvailability] = OrderedDict()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """Get a counter that changes whenever a booking is added or removed.
+
+        Take it before loading a day from the database and pass it to `put`, so
+        a load that raced with a write is not cached.
+        """
+        return self._generation
+
+    def get(self, day: date) -> DayAvailability | None:
+        """Return the cached availability of a day, marking it recently used.
+
+        Args:
+            day (date): The day to look up.
+
+        Returns:
+            DayAvailability | None: The cached day, or None on a miss.
+
+        """
+        availability = self._days.get(day)
+        if availability is None:
+            return None
+        if time.monotonic() - availability.loaded_at > self._max_age:
+            del self._days[day]
+            return None
+        self._days.move_to_end(day)
+        return availability
+
+    def put(
+        self, day: date, bookings: list[DeskBooking], generation: int
+    ) -> DayAvailability:
+        """Build a day from its bookings and cache it unless a write intervened.
+
+        Args:
+            day (date): The day the bookings were loaded for.
+            bookings (list[DeskBooking]): All bookings touching the day.
+            generation (int): The `generation` taken before loading the bookings.
+
+        Returns:
+            DayAvailability: The availability built from the bookings.
+
+        """
+        availability = DayAvailability(day)
+        for booking in bookings:
+            availability.add(booking)
+        if generation == self._generation:
+            self._days[day] = availability
+            self._days.move_to_end(day)
+            while len(self._days) > self._max_days:
+                self._days.popitem(last=False)
+        return availability
+
+    def add_booking(self, booking: DeskBooking) -> None:
+        """Patch every cached day touched by a new booking.
+
+        Args:
+            booking (DeskBooking): The created booking.
+
+        """
+        self._generation += 1
+        day = booking.start_time.astimezone(timezone.utc).date()
+        while day_bounds(day)[0] < booking.end_time:
+            if day in self._days:
+                self._days[day].add(booking)
+            day += DAY
+
+    def remove_booking(self, booking_id: UUID) -> None:
+        """Patch every cached day that contains a removed booking.
+
+        Args:
+            booking_id (UUID): The ID of the deleted booking.
+
+        """
+        self._generation += 1
+        for availability in self._days.values():
+            availability.remove(booking_id)
+
+    def replace_booking(self, booking: DeskBooking) -> None:
+        """Patch the cache for a booking whose desk or times changed.
+
+        Args:
+            booking (DeskBooking): The booking with its new values.
+
+        """
+        self.remove_booking(booking.id)
+        self.add_booking(booking)
+
+
+availability_cache = AvailabilityCache()
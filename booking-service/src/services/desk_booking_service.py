@@ -1,23 +1,44 @@
-import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime
+from typing import AsyncGenerator
 from uuid import UUID
 
-from src.messaging.messaging_manager import MessagingManager
 from src.messaging.pubsub_exchanges import (
     DESK_BOOKING_CREATED,
     DESK_BOOKING_DELETED,
     DESK_BOOKING_UPDATED,
 )
 from src.models.db.desk_booking import DeskBooking
+from src.models.dto.booking_stats_dto import (
+    BookingStatsDTO,
+    DeskDayStatsDTO,
+    UserWeekStatsDTO,
+)
+from src.models.dto.desk_availability_dto import DeskAvailabilityDTO
+from src.models.dto.desk_booking_batch_create_request import (
+    DeskBookingBatchCreateRequest,
+)
+from src.models.dto.desk_booking_batch_result import (
+    DeskBookingBatchResult,
+    DeskBookingConflict,
+)
 from src.models.dto.desk_booking_create_request import DeskBookingCreateRequest
 from src.models.dto.desk_booking_dto import DeskBookingDTO
+from src.models.dto.desk_booking_filter import DeskBookingFilter
+from src.models.dto.desk_booking_page import DeskBookingPage
 from src.models.dto.desk_booking_update_request import DeskBookingUpdateRequest
 from src.models.msg.booking_message import BookingMessage
 from src.repositories.booking_repository import DeskBookingRepository
+from src.repositories.booking_stats_repository import BookingStatsRepository
+from src.repositories.outbox_repository import OutboxRepository
+from src.services.availability_cache import AvailabilityCache, day_bounds
+from src.services.idempotency_store import IdempotencyStore
+from src.services.transformations.cursor import decode_cursor, encode_cursor
 from src.services.transformations.date import normalize_to_utc
 
-TOLERANCE_IN_MINUTES = 10
+MAX_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 1000
+MAX_STATS_DAYS = 366
 
 logger = logging.getLogger(__name__)
 
@@ -28,69 +49,243 @@ class DeskBookingService:
     def __init__(
         self,
         repo: DeskBookingRepository,
-        messaging: MessagingManager,
+        outbox: OutboxRepository,
+        stats: BookingStatsRepository,
+        availability: AvailabilityCache | None = None,
+        idempotency: IdempotencyStore | None = None,
     ) -> None:
         """Initialize the DeskBookingService.
 
         Args:
             repo (DeskBookingRepository): The repository for desk bookings.
-            messaging (MessagingManager): The messaging manager for handling messages.
+            outbox (OutboxRepository): The outbox booking events are recorded in.
+                It must share the repository's session.
+            stats (BookingStatsRepository): The booking rollups to keep up to date.
+                It must share the repository's session.
+            availability (AvailabilityCache | None): The per-day availability cache
+                to keep up to date. A private cache is used if omitted.
+            idempotency (IdempotencyStore | None): The store of recent idempotency
+                keys. A private store is used if omitted.
 
         """
         self._repo = repo
-        self._messaging = messaging
-
-    async def create_booking(self, request: DeskBookingCreateRequest) -> DeskBookingDTO:
+        self._outbox = outbox
+        self._stats = stats
+        self._availability = availability or AvailabilityCache()
+        self._idempotency = idempotency or IdempotencyStore()
+
+    async def create_booking(
+        self, request: DeskBookingCreateRequest, idempotency_key: str | None = None
+    ) -> DeskBookingDTO:
         """Create a new desk booking.
 
         Args:
             request (DeskBookingCreateRequest): The request DTO containing booking details.
+            idempotency_key (str | None): Optional client-supplied key; a retry with
+                the same key returns the first result without creating another booking.
 
         Returns:
             DeskBookingDTO: The response DTO containing created booking details.
 
+        Raises:
+            ValueError: If the times are invalid, the desk is already booked or the
+                idempotency key was used for a different request.
+
         """  # noqa: E501
+        if idempotency_key is None:
+            return await self._create_booking(request)
+        return await self._idempotency.run(
+            idempotency_key,
+            f"create:{request.model_dump_json()}",
+            lambda: self._create_booking(request),
+        )
+
+    async def _create_booking(
+        self, request: DeskBookingCreateRequest
+    ) -> DeskBookingDTO:
+        """Create a new desk booking, see `create_booking`."""
         request.start_time, request.end_time = (
             DeskBookingService._normalize_booking_times_to_utc(
                 request.start_time, request.end_time
             )
         )
-        if self._repo.has_overlapping_booking(
-            request.desk_id,
-            request.start_time,
-            request.end_time,
-            timedelta(minutes=TOLERANCE_IN_MINUTES),
-        ):
-            raise ValueError(
-                "Selected desk is already booked for the requested time range."
-            )
-        booking = self._repo.create(DeskBooking.from_create_dto(request))
-        self._publish_message(booking, DESK_BOOKING_CREATED)
+        DeskBookingService._validate_booking_times(request.start_time, request.end_time)
+        booking = await self._repo.create(DeskBooking.from_create_dto(request))
+        await self._stats.apply(added=[booking])
+        self._record_events([booking], DESK_BOOKING_CREATED)
+        await self._repo.commit()
+        self._availability.add_booking(booking)
         return DeskBookingDTO.from_entity(booking)
 
+    async def create_bookings_batch(
+        self, request: DeskBookingBatchCreateRequest
+    ) -> DeskBookingBatchResult:
+        """Create several desk bookings in one transaction.
+
+        Items overlapping an existing booking, or an earlier item of the same
+        batch, are skipped and reported as conflicts.
+
+        Args:
+            request (DeskBookingBatchCreateRequest): The explicit bookings or
+                recurrence rule to create.
+
+        Returns:
+            DeskBookingBatchResult: The created bookings and the conflicting items.
+
+        Raises:
+            ValueError: If the batch is too large or any item has invalid times.
+
+        """
+        create_requests = request.to_create_requests()
+        if len(create_requests) > MAX_BATCH_SIZE:
+            raise ValueError(f"A batch may contain at most {MAX_BATCH_SIZE} bookings.")
+        for create_request in create_requests:
+            create_request.start_time, create_request.end_time = (
+                DeskBookingService._normalize_booking_times_to_utc(
+                    create_request.start_time, create_request.end_time
+                )
+            )
+            DeskBookingService._validate_booking_times(
+                create_request.start_time, create_request.end_time
+            )
+        candidates = [DeskBooking.from_create_dto(r) for r in create_requests]
+        created = await self._repo.create_many(candidates)
+        await self._stats.apply(added=created)
+        self._record_events(created, DESK_BOOKING_CREATED)
+        await self._repo.commit()
+        created_ids = {booking.id for booking in created}
+        for booking in created:
+            self._availability.add_booking(booking)
+        return DeskBookingBatchResult(
+            created=[DeskBookingDTO.from_entity(booking) for booking in created],
+            conflicts=[
+                DeskBookingConflict(
+                    index=index,
+                    desk_id=candidate.desk_id,
+                    start_time=candidate.start_time,
+                    end_time=candidate.end_time,
+                )
+                for index, candidate in enumerate(candidates)
+                if candidate.id not in created_ids
+            ],
+        )
+
     async def list_bookings(
-        self, start: datetime, end: datetime
-    ) -> list[DeskBookingDTO]:
-        """List all desk bookings.
+        self,
+        filters: DeskBookingFilter,
+        limit: int,
+        cursor: str | None = None,
+    ) -> DeskBookingPage:
+        """List one page of desk bookings ordered by start time.
 
         Args:
-            start (datetime): Start datetime to filter bookings.
-            end (datetime): End datetime to filter bookings.
+            filters (DeskBookingFilter): The filter criteria to apply.
+            limit (int): The maximum number of bookings on the page.
+            cursor (str | None): Cursor returned with the previous page.
 
         Returns:
-            list[DeskBookingDTO]: A list of all desk bookings.
+            DeskBookingPage: The bookings and the cursor of the next page.
+
+        Raises:
+            ValueError: If the range or the cursor is invalid.
+
+        """
+        DeskBookingService._normalize_filter(filters)
+        after = decode_cursor(cursor) if cursor is not None else None
+        bookings = await self._repo.get_page(filters, limit + 1, after)
+        next_cursor = None
+        if len(bookings) > limit:
+            bookings = bookings[:limit]
+            next_cursor = encode_cursor(bookings[-1].start_time, bookings[-1].id)
+        return DeskBookingPage(
+            items=[DeskBookingDTO.from_entity(booking) for booking in bookings],
+            next_cursor=next_cursor,
+        )
+
+    def export_bookings(
+        self, filters: DeskBookingFilter, chunk_size: int = EXPORT_CHUNK_SIZE
+    ) -> AsyncGenerator[list[DeskBookingDTO]]:
+        """Stream all desk bookings matching the filters, ordered by start time.
+
+        The filters are validated immediately; the bookings are only read from
+        the database while the returned generator is consumed.
+
+        Args:
+            filters (DeskBookingFilter): The filter criteria to apply.
+            chunk_size (int): The number of bookings read per database round-trip.
+
+        Returns:
+            AsyncGenerator[list[DeskBookingDTO]]: Chunks of matching bookings.
+
+        Raises:
+            ValueError: If the range is invalid.
+
+        """
+        DeskBookingService._normalize_filter(filters)
+        return self._stream_bookings(filters, chunk_size)
+
+    async def _stream_bookings(
+        self, filters: DeskBookingFilter, chunk_size: int
+    ) -> AsyncGenerator[list[DeskBookingDTO]]:
+        """Convert the streamed booking entities to DTOs chunk by chunk."""
+        async for chunk in self._repo.stream(filters, chunk_size):
+            yield [DeskBookingDTO.from_entity(booking) for booking in chunk]
+
+    async def get_stats(
+        self,
+        start: date,
+        end: date,
+        desk_ids: list[int] | None = None,
+        user_id: UUID | None = None,
+    ) -> BookingStatsDTO:
+        """Get booking counts per desk per day and per user per week.
+
+        Only the rollups are read, so the cost depends on the size of the
+        result rather than on the number of bookings.
+
+        Args:
+            start (date): The first UTC day (inclusive).
+            end (date): The last UTC day (exclusive).
+            desk_ids (list[int] | None): Only statistics of these desks.
+            user_id (UUID | None): Only statistics of this user.
+
+        Returns:
+            BookingStatsDTO: The per desk/day and per user/week statistics.
+
+        Raises:
+            ValueError: If the range is empty or longer than `MAX_STATS_DAYS`.
 
         """
-        if start is None and end is None:
-            bookings = self._repo.get_all()
-            return [DeskBookingDTO.from_entity(booking) for booking in bookings]
-        start = datetime.min if start is None else start
-        end = datetime.max if end is None else end
         if start >= end:
-            raise ValueError("Start datetime must be before end datetime.")
-        start, end = DeskBookingService._normalize_booking_times_to_utc(start, end)
-        bookings = self._repo.get_bookings_in_time_range(start, end)
-        return [DeskBookingDTO.from_entity(booking) for booking in bookings]
+            raise ValueError("Start date must be before end date.")
+        if (end - start).days > MAX_STATS_DAYS:
+            raise ValueError(f"The range may span at most {MAX_STATS_DAYS} days.")
+        desk_days = await self._stats.get_desk_days(start, end, desk_ids)
+        user_weeks = await self._stats.get_user_weeks(start, end, user_id)
+        return BookingStatsDTO(
+            desk_days=[DeskDayStatsDTO.from_entity(stats) for stats in desk_days],
+            user_weeks=[UserWeekStatsDTO.from_entity(stats) for stats in user_weeks],
+        )
+
+    async def get_availability(self, day: date) -> DeskAvailabilityDTO:
+        """Get the booked 15-minute slots of every booked desk on a day.
+
+        Served from the availability cache; a miss loads the day's bookings once.
+
+        Args:
+            day (date): The UTC day to get the availability for.
+
+        Returns:
+            DeskAvailabilityDTO: The per-desk bitsets of booked slots.
+
+        """
+        availability = self._availability.get(day)
+        if availability is None:
+            generation = self._availability.generation
+            start, end = day_bounds(day)
+            bookings = await self._repo.get_bookings_in_time_range(start, end)
+            availability = self._availability.put(day, bookings, generation)
+        return DeskAvailabilityDTO.from_bitmaps(day, availability.bitmaps)
 
     async def get_booking(self, booking_id: UUID) -> DeskBookingDTO | None:
         """Get a specific desk booking by its ID.
@@ -102,41 +297,59 @@ class DeskBookingService:
             DeskBookingDTO: The requested booking data.
 
         """
-        booking = self._repo.get_by_id(booking_id)
+        booking = await self._repo.get_by_id(booking_id)
         return DeskBookingDTO.from_entity(booking) if booking else None
 
     async def update_booking(
-        self, booking_id: UUID, request: DeskBookingUpdateRequest
+        self,
+        booking_id: UUID,
+        request: DeskBookingUpdateRequest,
+        idempotency_key: str | None = None,
     ) -> DeskBookingDTO | None:
         """Update an existing desk booking.
 
         Args:
             booking_id (UUID): The ID of the booking to update.
             request (DeskBookingDTO): The DTO containing updated booking details.
+            idempotency_key (str | None): Optional client-supplied key; a retry with
+                the same key returns the first result without updating again.
 
         Returns:
             DeskBookingDTO: The updated booking data.
 
+        Raises:
+            ValueError: If the times are invalid, the desk is already booked or the
+                idempotency key was used for a different request.
+
         """
-        booking = self._repo.get_by_id(booking_id)
-        if booking is None:
-            return None
-        if self._repo.has_overlapping_booking(
-            request.desk_id, request.start_time, request.end_time
-        ):
-            raise ValueError(
-                "Selected desk is already booked for the requested time range."
-            )
+        if idempotency_key is None:
+            return await self._update_booking(booking_id, request)
+        return await self._idempotency.run(
+            idempotency_key,
+            f"update:{booking_id}:{request.model_dump_json()}",
+            lambda: self._update_booking(booking_id, request),
+        )
 
+    async def _update_booking(
+        self, booking_id: UUID, request: DeskBookingUpdateRequest
+    ) -> DeskBookingDTO | None:
+        """Update an existing desk booking, see `update_booking`."""
         request.start_time, request.end_time = (
             DeskBookingService._normalize_booking_times_to_utc(
                 request.start_time, request.end_time
             )
         )
-        updated_booking = self._repo.update(
-            DeskBooking.from_update_dto(booking.id, request)
+        DeskBookingService._validate_booking_times(request.start_time, request.end_time)
+        result = await self._repo.update(
+            DeskBooking.from_update_dto(booking_id, request)
         )
-        self._publish_message(updated_booking, DESK_BOOKING_UPDATED)
+        if result is None:
+            return None
+        previous_booking, updated_booking = result
+        await self._stats.apply(added=[updated_booking], removed=[previous_booking])
+        self._record_events([updated_booking], DESK_BOOKING_UPDATED)
+        await self._repo.commit()
+        self._availability.replace_booking(updated_booking)
         return DeskBookingDTO.from_entity(updated_booking)
 
     async def delete_booking(self, booking_id: UUID) -> bool:
@@ -149,33 +362,64 @@ class DeskBookingService:
             bool: True if deletion was successful, False otherwise.
 
         """
-        booking = self._repo.delete(booking_id)
-        if booking is not None:
-            self._publish_message(booking, DESK_BOOKING_DELETED)
-        return booking is not None
+        booking = await self._repo.delete(booking_id)
+        if booking is None:
+            return False
+        await self._stats.apply(removed=[booking])
+        self._record_events([booking], DESK_BOOKING_DELETED)
+        await self._repo.commit()
+        self._availability.remove_booking(booking_id)
+        return True
+
+    def _record_events(self, bookings: list[DeskBooking], exchange: str) -> None:
+        """Record booking messages in the outbox of the current transaction.
 
-    def _publish_message(self, booking: DeskBooking, exchange: str) -> None:
-        """Publish a booking message to the specified exchange asynchronously.
+        The outbox relay publishes them once the transaction has committed.
 
         Args:
-            booking (DeskBooking): The booking entity to publish.
-            exchange (str): The exchange to publish the message to.
+            bookings (list[DeskBooking]): The booking entities to publish.
+            exchange (str): The exchange to publish the messages to.
 
         """
-        task = asyncio.create_task(
-            self._messaging.get_pubsub(exchange).publish(
-                BookingMessage.from_entity(booking)
-            )
-        )
-        task.add_done_callback(DeskBookingService._log_task_exception)
+        for booking in bookings:
+            self._outbox.add(exchange, BookingMessage.from_entity(booking))
 
     @staticmethod
-    def _log_task_exception(task: asyncio.Task) -> None:
-        """Log exceptions from an asyncio Task."""
-        try:
-            task.result()
-        except Exception as e:
-            logger.exception("Background publish failed: %s", e)
+    def _normalize_filter(filters: DeskBookingFilter) -> None:
+        """Normalize the filter range to UTC and validate it.
+
+        Args:
+            filters (DeskBookingFilter): The filter criteria to normalize in place.
+
+        Raises:
+            ValueError: If start is not before end.
+
+        """
+        if filters.start is not None:
+            filters.start = normalize_to_utc(filters.start)
+        if filters.end is not None:
+            filters.end = normalize_to_utc(filters.end)
+        if (
+            filters.start is not None
+            and filters.end is not None
+            and filters.start >= filters.end
+        ):
+            raise ValueError("Start datetime must be before end datetime.")
+
+    @staticmethod
+    def _validate_booking_times(start: datetime, end: datetime) -> None:
+        """Validate that a booking ends after it starts.
+
+        Args:
+            start (datetime): The start datetime of the booking.
+            end (datetime): The end datetime of the booking.
+
+        Raises:
+            ValueError: If end is not after start.
+
+        """
+        if end <= start:
+            raise ValueError("end_time must be after start_time")
 
     @staticmethod
     def _normalize_booking_times_to_utc(
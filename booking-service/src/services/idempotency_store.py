@@ -0,0 +1,128 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, TypeVar
+
+ResultType = TypeVar("ResultType")
+
+
+class IdempotencyKeyReuseError(ValueError):
+    """Raised when an idempotency key is reused for a different request."""
+
+
+class _Entry:
+    """Outcome of the request stored under one idempotency key."""
+
+    def __init__(self, fingerprint: str) -> None:
+        """Initialize a pending entry.
+
+        Args:
+            fingerprint (str): Identifies the request the key was first used for.
+
+        """
+        self.fingerprint = fingerprint
+        self.expires_at = math.inf
+        self.done = asyncio.Event()
+        self.result: Any = None
+
+
+class IdempotencyStore:
+    """In-process LRU store of recent idempotency keys and their results.
+
+    The first request with a key runs the operation; retries with the same key
+    get its result without running it again. A retry arriving while the first
+    request is still running waits for it. Failed operations are not stored, so
+    they can be retried. Keys expire `ttl` seconds after their operation
+    finished.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 3600.0) -> None:
+        """Initialize the store.
+
+        Args:
+            max_entries (int): Maximum number of keys kept before evicting the
+                least recently used one.
+            ttl (float): Seconds a result is kept after it was stored.
+
+        """
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        operation: Callable[[], Awaitable[ResultType]],
+    ) -> ResultType:
+        """Run an operation once per idempotency key.
+
+        Args:
+            key (str): The client-supplied idempotency key.
+            fingerprint (str): Identifies the request; a key may only be reused
+                for requests with the same fingerprint.
+            operation (Callable[[], Awaitable[ResultType]]): The operation to run.
+
+        Returns:
+            ResultType: The result of the operation, possibly a stored one.
+
+        Raises:
+            IdempotencyKeyReuseError: If the key was used for another request.
+
+        """
+        while (entry := self._get(key)) is not None:
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyKeyReuseError(
+                    "Idempotency-Key was already used for a different request."
+                )
+            if entry.done.is_set():
+                return entry.result
+            await entry.done.wait()
+
+        entry = _Entry(fingerprint)
+        self._put(key, entry)
+        try:
+            entry.result = await operation()
+        except BaseException:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            raise
+        finally:
+            entry.done.set()
+        entry.expires_at = time.monotonic() + self._ttl
+        return entry.result
+
+    def _get(self, key: str) -> _Entry | None:
+        """Return the live entry of a key, marking it recently used.
+
+        Args:
+            key (str): The idempotency key.
+
+        Returns:
+            _Entry | None: The entry, or None if unknown or expired.
+
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() > entry.expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _put(self, key: str, entry: _Entry) -> None:
+        """Store an entry, evicting the least recently used ones beyond the limit.
+
+        Args:
+            key (str): The idempotency key.
+            entry (_Entry): The entry to store.
+
+        """
+        self._entries[key] = entry
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+from contextlib import suppress
+from typing import TYPE_CHECKING
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.messaging.messaging_manager import MessagingManager
+from src.models.db.outbox_message import OutboxMessage
+from src.models.msg.booking_message import BookingMessage
+from src.repositories.outbox_repository import OutboxRepository
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """Background task publishing the booking events recorded in the outbox.
+
+    The outbox is drained in batches, in the order the events were recorded.
+    A batch is split into consecutive runs of messages for the same exchange
+    and different bookings; the messages of a run are pipelined with
+    `publish_many`, at most `max_in_flight` awaiting the broker's publisher
+    confirm, and runs are published one after the other. At the first message
+    that is not confirmed the batch stops: it and every later message stay in
+    the outbox for the next pass, so the events of a booking never overtake
+    each other. Confirmed messages after it in the same run are published
+    again then; consumers must tolerate duplicates anyway. After a failed
+    batch the relay backs off exponentially up to `max_backoff`. A slow or
+    unavailable broker therefore only delays delivery, it never grows memory.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        messaging: MessagingManager,
+        batch_size: int = 100,
+        max_in_flight: int = 20,
+        poll_interval: float = 0.5,
+        publish_timeout: float = 10.0,
+        max_backoff: float = 30.0,
+    ) -> None:
+        """Initialize the relay.
+
+        Args:
+            session_factory (async_sessionmaker[AsyncSession]): Factory for the
+                sessions used to read and delete outbox messages.
+            messaging (MessagingManager): The messaging manager to publish with.
+            batch_size (int): Maximum number of messages claimed per batch.
+            max_in_flight (int): Maximum number of unconfirmed publishes.
+            poll_interval (float): Seconds to wait when the outbox is drained,
+                and the first backoff after a failed batch.
+            publish_timeout (float): Seconds to wait for a publisher confirm
+                before the message is left for the next batch.
+            max_backoff (float): Maximum seconds to wait after failed batches.
+
+        """
+        self._session_factory = session_factory
+        self._messaging = messaging
+        self._batch_size = batch_size
+        self._max_in_flight = max_in_flight
+        self._poll_interval = poll_interval
+        self._publish_timeout = publish_timeout
+        self._max_backoff = max_backoff
+        self._failed_batches = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start relaying in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop relaying; unconfirmed messages stay in the outbox."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def relay_batch(self) -> int:
+        """Publish one batch of outbox messages in order and delete the confirmed ones.
+
+        Returns:
+            int: The number of messages published and deleted.
+
+        """  # noqa: E501
+        async with self._session_factory() as session:
+            outbox = OutboxRepository(session)
+            messages = await outbox.claim_batch(self._batch_size)
+            if not messages:
+                self._failed_batches = 0
+                return 0
+            published_ids: list[int] = []
+            failed = False
+            for exchange, run in self._runs(messages):
+                confirmed = await self._publish(exchange, run)
+                published_ids.extend(message.id for message, _ in run[:confirmed])
+                if confirmed < len(run):
+                    failed = True
+                    break
+            await outbox.delete(published_ids)
+            await outbox.commit()
+        self._failed_batches = self._failed_batches + 1 if failed else 0
+        return len(published_ids)
+
+    @staticmethod
+    def _runs(
+        messages: list[OutboxMessage],
+    ) -> list[tuple[str, list[tuple[OutboxMessage, BookingMessage]]]]:
+        """Split messages into runs that can be published concurrently.
+
+        A run holds consecutive messages for the same exchange and different
+        bookings, so publishing its messages in any order keeps the order of
+        each booking's events.
+
+        Args:
+            messages (list[OutboxMessage]): The messages, in outbox order.
+
+        Returns:
+            list[tuple[str, list[tuple[OutboxMessage, BookingMessage]]]]: The
+                exchange and the messages with their decoded bodies of each run.
+
+        """
+        runs: list[tuple[str, list[tuple[OutboxMessage, BookingMessage]]]] = []
+        booking_ids: set[UUID] = set()
+        for message in messages:
+            body = BookingMessage.from_bytes(message.body)
+            if (
+                not runs
+                or runs[-1][0] != message.exchange
+                or body.booking_id in booking_ids
+            ):
+                runs.append((message.exchange, []))
+                booking_ids.clear()
+            runs[-1][1].append((message, body))
+            booking_ids.add(body.booking_id)
+        return runs
+
+    async def _publish(
+        self, exchange: str, run: list[tuple[OutboxMessage, BookingMessage]]
+    ) -> int:
+        """Publish a run of outbox messages to one exchange.
+
+        Args:
+            exchange (str): The exchange to publish to.
+            run (list[tuple[OutboxMessage, BookingMessage]]): The messages with
+                their decoded bodies, in order.
+
+        Returns:
+            int: The number of leading messages the broker confirmed.
+
+        """
+        try:
+            failures = await self._messaging.get_pubsub(exchange).publish_many(
+                [body for _, body in run],
+                max_unconfirmed=self._max_in_flight,
+                confirm_timeout=self._publish_timeout,
+            )
+        except Exception as e:
+            logger.warning(
+                "Publishing %d outbox messages to %s failed: %s",
+                len(run),
+                exchange,
+                e,
+            )
+            return 0
+        for index, ((message, _), failure) in enumerate(
+            zip(run, failures, strict=True)
+        ):
+            if failure is not None:
+                logger.warning(
+                    "Publishing outbox message %s failed, retrying it and %d "
+                    "later messages: %s",
+                    message.id,
+                    len(run) - index - 1,
+                    failure,
+                )
+                return index
+        return len(run)
+
+    def _backoff(self) -> float:
+        """Return the seconds to wait after consecutive failed batches.
+
+        Returns:
+            float: The poll interval, doubled for every further failed batch.
+
+        """
+        return min(
+            self._max_backoff, self._poll_interval * 2 ** (self._failed_batches - 1)
+        )
+
+    async def _run(self) -> None:
+        """Relay batches until cancelled.
+
+        Pauses after a failed batch with an increasing backoff, and otherwise
+        unless a full batch went out.
+        """
+        while True:
+            try:
+                published = await self.relay_batch()
+            except Exception as e:
+                logger.exception("Outbox relay failed: %s", e)
+                self._failed_batches += 1
+                published = 0
+            if self._failed_batches:
+                await asyncio.sleep(self._backoff())
+            elif published < self._batch_size:
+                await asyncio.sleep(self._poll_interval)
@@ -0,0 +1,42 @@
+import base64
+import binascii
+from datetime import datetime
+from uuid import UUID
+
+CURSOR_SEPARATOR = "|"
+
+
+def encode_cursor(start_time: datetime, booking_id: UUID) -> str:
+    """Encode a keyset position into an opaque, URL-safe cursor.
+
+    Args:
+        start_time (datetime): The start time of the last returned booking.
+        booking_id (UUID): The ID of the last returned booking.
+
+    Returns:
+        str: The encoded cursor.
+
+    """
+    raw = f"{start_time.isoformat()}{CURSOR_SEPARATOR}{booking_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor created by `encode_cursor`.
+
+    Args:
+        cursor (str): The encoded cursor.
+
+    Returns:
+        tuple[datetime, UUID]: The start time and ID of the last returned booking.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        start_time, booking_id = raw.split(CURSOR_SEPARATOR)
+        return datetime.fromisoformat(start_time), UUID(booking_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor.") from e
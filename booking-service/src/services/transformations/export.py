@@ -0,0 +1,67 @@
+import csv
+import io
+from enum import Enum
+from typing import AsyncGenerator, AsyncIterable
+
+from src.models.dto.desk_booking_dto import DeskBookingDTO
+
+CSV_COLUMNS = list(DeskBookingDTO.model_fields)
+
+
+class ExportFormat(str, Enum):
+    """Supported file formats of a booking export."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        """Get the media type of the format."""
+        return MEDIA_TYPES[self]
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+async def encode_export(
+    chunks: AsyncIterable[list[DeskBookingDTO]], export_format: ExportFormat
+) -> AsyncGenerator[bytes]:
+    """Encode chunks of bookings, one output chunk per input chunk.
+
+    Args:
+        chunks (AsyncIterable[list[DeskBookingDTO]]): The bookings to encode.
+        export_format (ExportFormat): The format to encode the bookings in.
+
+    Yields:
+        bytes: The encoded bookings; a CSV export starts with a header row.
+
+    """
+    if export_format is ExportFormat.CSV:
+        yield _to_csv([CSV_COLUMNS])
+    async for chunk in chunks:
+        if export_format is ExportFormat.CSV:
+            yield _to_csv(
+                [booking.model_dump(mode="json").values() for booking in chunk]
+            )
+        else:
+            yield b"".join(
+                booking.model_dump_json().encode() + b"\n" for booking in chunk
+            )
+
+
+def _to_csv(rows: list) -> bytes:
+    """Encode rows as CSV.
+
+    Args:
+        rows (list): The rows, each an iterable of field values.
+
+    Returns:
+        bytes: The CSV lines.
+
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
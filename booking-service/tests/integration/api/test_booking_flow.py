@@ -1,42 +1,87 @@
-from datetime import datetime, timedelta
+import asyncio
+from datetime import datetime, timedelta, timezone
 from random import randint
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from uuid import uuid4
 
 import pytest
-from sqlmodel import Session, SQLModel, create_engine, select
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from testcontainers.postgres import PostgresContainer
 
+from src.messaging.pubsub_exchanges import DESK_BOOKING_CREATED
 from src.models.db.desk_booking import DeskBooking
+from src.models.db.outbox_message import OutboxMessage
+from src.models.dto.desk_booking_batch_create_request import (
+    DeskBookingBatchCreateRequest,
+)
 from src.models.dto.desk_booking_create_request import DeskBookingCreateRequest
+from src.models.dto.desk_booking_filter import DeskBookingFilter
+from src.models.dto.desk_booking_recurrence import (
+    DAYS_PER_WEEK,
+    DeskBookingRecurrence,
+)
 from src.models.dto.desk_booking_update_request import DeskBookingUpdateRequest
-from src.repositories.booking_repository import DeskBookingRepository
+from src.models.msg.booking_message import BookingMessage
+from src.repositories.booking_repository import (
+    BookingOverlapError,
+    DeskBookingRepository,
+)
+from src.repositories.booking_stats_repository import BookingStatsRepository
+from src.repositories.outbox_repository import OutboxRepository
 from src.services.desk_booking_service import DeskBookingService
+from src.services.outbox_relay import OutboxRelay
 
 MAX_INT = 2**31 - 1
 
 
 class DummyMessaging:
-    """Minimal stub for MessagingManager dependency used by the service."""
+    """Minimal stub for the MessagingManager used by the outbox relay."""
 
-    @staticmethod
-    def get_pubsub(exchange_name: str) -> "DummyPubSub":
-        """Return a dummy pubsub exchange."""
-        return DummyPubSub()
+    def __init__(self, fail: bool = False) -> None:
+        """Initialize the stub, optionally failing every publish."""
+        self.pubsub = DummyPubSub(fail)
+
+    def get_pubsub(self, exchange_name: str) -> "DummyPubSub":
+        """Return the dummy pubsub exchange."""
+        return self.pubsub
 
 
 class DummyPubSub:
     """Minimal stub for PubSub exchange used by the messaging manager."""
 
-    async def publish(self, message: object) -> None:
-        """Return a dummy publish method that does nothing."""
-        pass
+    def __init__(self, fail: bool) -> None:
+        """Initialize the stub, optionally failing every publish."""
+        self.fail = fail
+        self.published: list[BookingMessage] = []
+
+    async def publish(self, message: BookingMessage) -> None:
+        """Record the message, or fail like an unreachable broker."""
+        if self.fail:
+            raise ConnectionError("Broker unavailable.")
+        self.published.append(message)
+
+    async def publish_many(
+        self, messages: list[BookingMessage], **_: object
+    ) -> list[Exception | None]:
+        """Publish the messages one by one, reporting each failure."""
+        failures: list[Exception | None] = []
+        for message in messages:
+            try:
+                await self.publish(message)
+                failures.append(None)
+            except ConnectionError as e:
+                failures.append(e)
+        return failures
 
 
 @pytest.fixture(scope="module")
 def postgres_container() -> Generator[PostgresContainer, None, None]:
     """Start a Postgres testcontainer for the module and stop it at the end."""
-    container = PostgresContainer("postgres:17-alpine")
+    container = PostgresContainer("postgres:17-alpine", driver="asyncpg")
     container.start()
     try:
         yield container
@@ -44,22 +89,28 @@ def postgres_container() -> Generator[PostgresContainer, None, None]:
         container.stop()
 
 
-@pytest.fixture
-def db_session(postgres_container: PostgresContainer) -> Generator[Session, None, None]:
-    """Create SQLModel tables on the test Postgres and yield a Session."""
+@pytest_asyncio.fixture
+async def db_session(
+    postgres_container: PostgresContainer,
+) -> AsyncGenerator[AsyncSession, None]:
+    """Create SQLModel tables on the test Postgres and yield an AsyncSession."""
     db_url = postgres_container.get_connection_url()
-    engine = create_engine(db_url, echo=False)
-    SQLModel.metadata.create_all(engine)
-    with Session(engine) as session:
+    engine = create_async_engine(db_url, echo=False)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
-    engine.dispose()
+    await engine.dispose()
 
 
 @pytest.mark.asyncio
-async def test_create_booking_flow(db_session: Session) -> None:
+async def test_create_booking_flow(db_session: AsyncSession) -> None:
     """Integration test: create a booking and verify it is persisted and returned correctly."""  # noqa: E501
     repo = DeskBookingRepository(db_session)
-    service = DeskBookingService(repo, DummyMessaging())
+    service = DeskBookingService(
+        repo, OutboxRepository(db_session), BookingStatsRepository(db_session)
+    )
 
     start = datetime.now() + timedelta(hours=1)
     end = start + timedelta(hours=2)
@@ -76,8 +127,10 @@ async def test_create_booking_flow(db_session: Session) -> None:
     assert created_dto.desk_id == create_req.desk_id
 
     # Verify persisted in DB
-    persisted = db_session.exec(
-        select(DeskBooking).where(DeskBooking.id == created_dto.id)
+    persisted = (
+        await db_session.exec(
+            select(DeskBooking).where(DeskBooking.id == created_dto.id)
+        )
     ).one()
     assert persisted.id == created_dto.id
     assert persisted.user_id == create_req.user_id
@@ -85,10 +138,12 @@ async def test_create_booking_flow(db_session: Session) -> None:
 
 
 @pytest.mark.asyncio
-async def test_update_booking_flow(db_session: Session) -> None:
+async def test_update_booking_flow(db_session: AsyncSession) -> None:
     """Integration test: create then update a booking and verify changes persist."""
     repo = DeskBookingRepository(db_session)
-    service = DeskBookingService(repo, DummyMessaging())
+    service = DeskBookingService(
+        repo, OutboxRepository(db_session), BookingStatsRepository(db_session)
+    )
 
     # Create initial booking via repository (could use service as well)
     initial_start = datetime.now() + timedelta(hours=1)
@@ -99,7 +154,7 @@ async def test_update_booking_flow(db_session: Session) -> None:
         start_time=initial_start,
         end_time=initial_end,
     )
-    repo.create(booking)
+    await repo.create(booking)
 
     # Prepare update request with new times and possibly new user/desk
     new_start = initial_start + timedelta(days=1)
@@ -118,18 +173,20 @@ async def test_update_booking_flow(db_session: Session) -> None:
     assert updated_dto.desk_id == update_req.desk_id
 
     # Verify persisted changes
-    persisted = db_session.exec(
-        select(DeskBooking).where(DeskBooking.id == booking.id)
+    persisted = (
+        await db_session.exec(select(DeskBooking).where(DeskBooking.id == booking.id))
     ).one()
     assert persisted.user_id == update_req.user_id
     assert persisted.desk_id == update_req.desk_id
 
 
 @pytest.mark.asyncio
-async def test_create_booking_overlapping_rejected(db_session: Session) -> None:
+async def test_create_booking_overlapping_rejected(db_session: AsyncSession) -> None:
     """Integration test: creating a booking that overlaps an existing booking should be rejected."""  # noqa: E501
     repo = DeskBookingRepository(db_session)
-    service = DeskBookingService(repo, DummyMessaging())
+    service = DeskBookingService(
+        repo, OutboxRepository(db_session), BookingStatsRepository(db_session)
+    )
 
     desk_id = randint(0, MAX_INT)
     existing_start = datetime.now() + timedelta(hours=5)
@@ -140,7 +197,7 @@ async def test_create_booking_overlapping_rejected(db_session: Session) -> None:
         start_time=existing_start,
         end_time=existing_end,
     )
-    repo.create(existing)
+    await repo.create(existing)
 
     # new booking overlaps existing (starts during existing)
     new_start = existing_start + timedelta(minutes=30)
@@ -158,11 +215,13 @@ async def test_create_booking_overlapping_rejected(db_session: Session) -> None:
 
 @pytest.mark.asyncio
 async def test_create_booking_overlapping_rejected_with_tolerance(
-    db_session: Session,
+    db_session: AsyncSession,
 ) -> None:
     """Integration test: creating a booking that overlaps an existing booking with tolerance should be rejected."""  # noqa: E501
     repo = DeskBookingRepository(db_session)
-    service = DeskBookingService(repo, DummyMessaging())
+    service = DeskBookingService(
+        repo, OutboxRepository(db_session), BookingStatsRepository(db_session)
+    )
 
     desk_id = randint(0, MAX_INT)
     existing_start = datetime.now() + timedelta(hours=5)
@@ -173,7 +232,7 @@ async def test_create_booking_overlapping_rejected_with_tolerance(
         start_time=existing_start,
         end_time=existing_end,
     )
-    repo.create(existing)
+    await repo.create(existing)
 
     # new booking overlaps existing start time within tolerance
     new_start = existing_start - timedelta(hours=1)
@@ -203,10 +262,12 @@ async def test_create_booking_overlapping_rejected_with_tolerance(
 
 
 @pytest.mark.asyncio
-async def test_update_booking_overlapping_rejected(db_session: Session) -> None:
+async def test_update_booking_overlapping_rejected(db_session: AsyncSession) -> None:
     """Integration test: updating a booking to overlap another booking on the same desk should be rejected."""  # noqa: E501
     repo = DeskBookingRepository(db_session)
-    service = DeskBookingService(repo, DummyMessaging())
+    service = DeskBookingService(
+        repo, OutboxRepository(db_session), BookingStatsRepository(db_session)
+    )
 
     desk_id = randint(0, MAX_INT)
     # booking A occupies a time window
@@ -218,7 +279,7 @@ async def test_update_booking_overlapping_rejected(db_session: Session) -> None:
         start_time=a_start,
         end_time=a_end,
     )
-    repo.create(booking_a)
+    await repo.create(booking_a)
 
     # booking B initially non-overlapping on same desk
     b_start = a_end + timedelta(hours=1)
@@ -229,7 +290,7 @@ async def test_update_booking_overlapping_rejected(db_session: Session) -> None:
         start_time=b_start,
         end_time=b_end,
     )
-    repo.create(booking_b)
+    await repo.create(booking_b)
 
     # attempt to update booking_b to overlap booking_a
     update_start = a_start + timedelta(hours=1)
@@ -243,3 +304,349 @@ async def test_update_booking_overlapping_rejected(db_session: Session) -> None:
 
     with pytest.raises(ValueError):  # noqa: PT011
         await service.update_booking(booking_b.id, update_req)
+
+
+@pytest.mark.asyncio
+async def test_update_booking_shifting_own_time_range(db_session: AsyncSession) -> None:
+    """Integration test: a booking may be moved into a range overlapping itself."""
+    repo = DeskBookingRepository(db_session)
+    service = DeskBookingService(
+        repo, OutboxRepository(db_session), BookingStatsRepository(db_session)
+    )
+
+    desk_id = randint(0, MAX_INT)
+    start = datetime.now() + timedelta(days=3)
+    booking = DeskBooking(
+        user_id=uuid4(),
+        desk_id=desk_id,
+        start_time=start,
+        end_time=start + timedelta(hours=2),
+    )
+    await repo.create(booking)
+
+    update_req = DeskBookingUpdateRequest(
+        user_id=booking.user_id,
+        desk_id=desk_id,
+        start_time=start + timedelta(hours=1),
+        end_time=start + timedelta(hours=3),
+    )
+
+    updated_dto = await service.update_booking(booking.id, update_req)
+    assert updated_dto is not None
+    assert updated_dto.start_time == update_req.start_time
+
+
+@pytest.mark.asyncio
+async def test_concurrent_overlapping_creates_only_one_succeeds(
+    postgres_container: PostgresContainer,
+    db_session: AsyncSession,
+) -> None:
+    """Integration test: racing overlapping creates are resolved by the database."""
+    engine = create_async_engine(postgres_container.get_connection_url())
+    desk_id = randint(0, MAX_INT)
+    start = datetime.now() + timedelta(days=4)
+
+    async def create() -> None:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            service = DeskBookingService(
+                DeskBookingRepository(session),
+                OutboxRepository(session),
+                BookingStatsRepository(session),
+            )
+            await service.create_booking(
+                DeskBookingCreateRequest(
+                    user_id=uuid4(),
+                    desk_id=desk_id,
+                    start_time=start,
+                    end_time=start + timedelta(hours=1),
+                )
+            )
+
+    results = await asyncio.gather(
+        *(create() for _ in range(5)), return_exceptions=True
+    )
+    await engine.dispose()
+
+    assert sum(result is None for result in results) == 1
+    assert all(
+        isinstance(result, BookingOverlapError)
+        for result in results
+        if result is not None
+    )
+
+
+@pytest.mark.asyncio
+async def test_list_bookings_pages_through_filtered_results(
+    db_session: AsyncSession,
+) -> None:
+    """Integration test: keyset pages cover every matching booking exactly once."""
+    repo = DeskBookingRepository(db_session)
+    service = DeskBookingService(
+        repo, OutboxRepository(db_session), BookingStatsRepository(db_session)
+    )
+
+    user_id = uuid4()
+    start = datetime.now() + timedelta(days=10)
+    created = []
+    for offset in range(5):
+        booking = DeskBooking(
+            user_id=user_id,
+            desk_id=randint(0, MAX_INT),
+            start_time=start + timedelta(hours=offset),
+            end_time=start + timedelta(hours=offset, minutes=30),
+        )
+        await repo.create(booking)
+        created.append(booking.id)
+
+    filters = DeskBookingFilter(user_id=user_id)
+    first_page = await service.list_bookings(filters, limit=2)
+    second_page = await service.list_bookings(
+        filters, limit=2, cursor=first_page.next_cursor
+    )
+    last_page = await service.list_bookings(
+        filters, limit=2, cursor=second_page.next_cursor
+    )
+
+    pages = [first_page, second_page, last_page]
+    assert [len(page.items) for page in pages] == [2, 2, 1]
+    assert last_page.next_cursor is None
+    assert [item.id for page in pages for item in page.items] == created
+
+
+@pytest.mark.asyncio
+async def test_list_bookings_filters_by_desk_ids(db_session: AsyncSession) -> None:
+    """Integration test: only bookings of the requested desks are listed."""
+    repo = DeskBookingRepository(db_session)
+    service = DeskBookingService(
+        repo, OutboxRepository(db_session), BookingStatsRepository(db_session)
+    )
+
+    start = datetime.now() + timedelta(days=20)
+    desk_ids = [randint(0, MAX_INT) for _ in range(3)]
+    for desk_id in desk_ids:
+        await repo.create(
+            DeskBooking(
+                user_id=uuid4(),
+                desk_id=desk_id,
+                start_time=start,
+                end_time=start + timedelta(hours=1),
+            )
+        )
+
+    page = await service.list_bookings(
+        DeskBookingFilter(desk_ids=desk_ids[:2]), limit=10
+    )
+
+    assert sorted(item.desk_id for item in page.items) == sorted(desk_ids[:2])
+
+
+@pytest.mark.asyncio
+async def test_create_bookings_batch_reports_conflicts(
+    db_session: AsyncSession,
+) -> None:
+    """Integration test: a recurrence books free days and reports taken ones."""
+    repo = DeskBookingRepository(db_session)
+    service = DeskBookingService(
+        repo, OutboxRepository(db_session), BookingStatsRepository(db_session)
+    )
+
+    desk_id = randint(0, MAX_INT)
+    taken_index = 2
+    first_start = datetime.now(timezone.utc) + timedelta(days=30)
+    taken_start = first_start + timedelta(days=taken_index)
+    await repo.create(
+        DeskBooking(
+            user_id=uuid4(),
+            desk_id=desk_id,
+            start_time=taken_start,
+            end_time=taken_start + timedelta(hours=1),
+        )
+    )
+
+    result = await service.create_bookings_batch(
+        DeskBookingBatchCreateRequest(
+            recurrence=DeskBookingRecurrence(
+                user_id=uuid4(),
+                desk_id=desk_id,
+                start_time=first_start,
+                end_time=first_start + timedelta(hours=1),
+                weekdays=list(range(DAYS_PER_WEEK)),
+                weeks=1,
+            )
+        )
+    )
+
+    assert len(result.created) == DAYS_PER_WEEK - 1
+    assert [conflict.index for conflict in result.conflicts] == [taken_index]
+
+
+async def _outbox_messages_for(
+    session: AsyncSession, booking_id: object
+) -> list[OutboxMessage]:
+    """Return the outbox messages recorded for a booking."""
+    messages = (await session.exec(select(OutboxMessage))).all()
+    return [
+        message
+        for message in messages
+        if BookingMessage.from_bytes(message.body).booking_id == booking_id
+    ]
+
+
+@pytest.mark.asyncio
+async def test_create_booking_records_outbox_message(db_session: AsyncSession) -> None:
+    """Integration test: the booking event is committed with the booking itself."""
+    service = DeskBookingService(
+        DeskBookingRepository(db_session),
+        OutboxRepository(db_session),
+        BookingStatsRepository(db_session),
+    )
+    start = datetime.now() + timedelta(days=40)
+    create_req = DeskBookingCreateRequest(
+        user_id=uuid4(),
+        desk_id=randint(0, MAX_INT),
+        start_time=start,
+        end_time=start + timedelta(hours=1),
+    )
+
+    created_dto = await service.create_booking(create_req)
+    with pytest.raises(ValueError):  # noqa: PT011
+        await service.create_booking(create_req)
+
+    messages = await _outbox_messages_for(db_session, created_dto.id)
+    assert [message.exchange for message in messages] == [DESK_BOOKING_CREATED]
+
+
+@pytest.mark.asyncio
+async def test_outbox_relay_deletes_only_confirmed_messages(
+    postgres_container: PostgresContainer,
+    db_session: AsyncSession,
+) -> None:
+    """Integration test: failed publishes stay in the outbox, confirmed ones leave."""
+    service = DeskBookingService(
+        DeskBookingRepository(db_session),
+        OutboxRepository(db_session),
+        BookingStatsRepository(db_session),
+    )
+    start = datetime.now() + timedelta(days=41)
+    created_dto = await service.create_booking(
+        DeskBookingCreateRequest(
+            user_id=uuid4(),
+            desk_id=randint(0, MAX_INT),
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+    )
+    engine = create_async_engine(postgres_container.get_connection_url())
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    failing = DummyMessaging(fail=True)
+    assert await OutboxRelay(session_factory, failing).relay_batch() == 0
+    assert await _outbox_messages_for(db_session, created_dto.id)
+
+    messaging = DummyMessaging()
+    while await OutboxRelay(session_factory, messaging).relay_batch():
+        pass
+    await engine.dispose()
+
+    published_ids = [message.booking_id for message in messaging.pubsub.published]
+    assert created_dto.id in published_ids
+    assert not await _outbox_messages_for(db_session, created_dto.id)
+
+
+@pytest.mark.asyncio
+async def test_export_bookings_streams_every_match_in_chunks(
+    db_session: AsyncSession,
+) -> None:
+    """Integration test: the export yields all matching bookings, chunk by chunk."""
+    repo = DeskBookingRepository(db_session)
+    service = DeskBookingService(
+        repo, OutboxRepository(db_session), BookingStatsRepository(db_session)
+    )
+
+    user_id = uuid4()
+    start = datetime.now(timezone.utc) + timedelta(days=50)
+    created = []
+    for offset in range(5):
+        booking = DeskBooking(
+            user_id=user_id,
+            desk_id=randint(0, MAX_INT),
+            start_time=start + timedelta(hours=offset),
+            end_time=start + timedelta(hours=offset, minutes=30),
+        )
+        await repo.create(booking)
+        created.append(booking.id)
+    await repo.commit()
+
+    chunks = [
+        chunk
+        async for chunk in service.export_bookings(
+            DeskBookingFilter(user_id=user_id), chunk_size=2
+        )
+    ]
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [booking.id for chunk in chunks for booking in chunk] == created
+
+
+@pytest.mark.asyncio
+async def test_export_bookings_rejects_invalid_range(db_session: AsyncSession) -> None:
+    """Integration test: an invalid range fails before anything is streamed."""
+    service = DeskBookingService(
+        DeskBookingRepository(db_session),
+        OutboxRepository(db_session),
+        BookingStatsRepository(db_session),
+    )
+    start = datetime.now(timezone.utc)
+
+    with pytest.raises(ValueError):  # noqa: PT011
+        service.export_bookings(DeskBookingFilter(start=start, end=start))
+
+
+@pytest.mark.asyncio
+async def test_stats_follow_create_update_and_delete(db_session: AsyncSession) -> None:
+    """Integration test: the rollups track every booking change incrementally."""
+    service = DeskBookingService(
+        DeskBookingRepository(db_session),
+        OutboxRepository(db_session),
+        BookingStatsRepository(db_session),
+    )
+    user_id = uuid4()
+    desk_id = randint(0, MAX_INT)
+    start = datetime(2030, 1, 7, 9, 0, tzinfo=timezone.utc)  # a Monday
+    created = [
+        await service.create_booking(
+            DeskBookingCreateRequest(
+                user_id=user_id,
+                desk_id=desk_id,
+                start_time=start + timedelta(hours=offset),
+                end_time=start + timedelta(hours=offset, minutes=30),
+            )
+        )
+        for offset in range(2)
+    ]
+    await service.update_booking(
+        created[1].id,
+        DeskBookingUpdateRequest(
+            user_id=user_id,
+            desk_id=desk_id,
+            start_time=start + timedelta(days=1),
+            end_time=start + timedelta(days=1, hours=1),
+        ),
+    )
+    await service.delete_booking(created[0].id)
+
+    stats = await service.get_stats(
+        start.date(), start.date() + timedelta(days=7), desk_ids=[desk_id]
+    )
+    user_stats = await service.get_stats(
+        start.date(), start.date() + timedelta(days=7), user_id=user_id
+    )
+
+    assert [(s.day, s.booking_count, s.booked_minutes) for s in stats.desk_days] == [
+        (start.date() + timedelta(days=1), 1, 60)
+    ]
+    assert [
+        (s.week_start, s.booking_count, s.booked_minutes) for s in user_stats.user_weeks
+    ] == [(start.date(), 1, 60)]
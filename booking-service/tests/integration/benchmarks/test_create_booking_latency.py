@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Generator
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from testcontainers.postgres import PostgresContainer
+
+from src.models.db.desk_booking import DeskBooking
+from src.models.dto.desk_booking_create_request import DeskBookingCreateRequest
+from src.repositories.booking_repository import DeskBookingRepository
+from src.repositories.booking_stats_repository import BookingStatsRepository
+from src.repositories.outbox_repository import OutboxRepository
+from src.services.desk_booking_service import DeskBookingService
+
+CONCURRENT_REQUESTS = 50
+POOL_SIZE = 10
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture(scope="module")
+def postgres_container() -> Generator[PostgresContainer, None, None]:
+    """Start a Postgres testcontainer for the module and stop it at the end."""
+    container = PostgresContainer("postgres:17-alpine")
+    container.start()
+    try:
+        yield container
+    finally:
+        container.stop()
+
+
+def _create_request(desk_id: int) -> DeskBookingCreateRequest:
+    """Build a non-overlapping create request for the given desk."""
+    start = datetime.now() + timedelta(days=1)
+    return DeskBookingCreateRequest(
+        user_id=uuid4(),
+        desk_id=desk_id,
+        start_time=start,
+        end_time=start + timedelta(hours=2),
+    )
+
+
+async def _measure(
+    create: Callable[[DeskBookingCreateRequest], Awaitable[None]],
+    desk_offset: int,
+) -> tuple[list[float], float]:
+    """Fire concurrent create requests and collect per-request latencies.
+
+    Args:
+        create (Callable): Coroutine function creating a single booking.
+        desk_offset (int): Offset for desk ids so runs never overlap each other.
+
+    Returns:
+        tuple[list[float], float]: Per-request latencies and total wall time (s).
+
+    """
+
+    async def timed(desk_id: int) -> float:
+        started = time.perf_counter()
+        await create(_create_request(desk_id))
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(
+        *(timed(desk_offset + i) for i in range(CONCURRENT_REQUESTS))
+    )
+    return list(latencies), time.perf_counter() - started
+
+
+def _log_summary(label: str, latencies: list[float], wall: float) -> float:
+    """Log p50/p95 latency and wall time for a benchmark run.
+
+    Returns:
+        float: The p95 latency in seconds.
+
+    """
+    p95 = statistics.quantiles(latencies, n=20)[18]
+    logger.warning(
+        "%s: %d concurrent creates, p50=%.1fms p95=%.1fms wall=%.1fms",
+        label,
+        len(latencies),
+        statistics.median(latencies) * 1000,
+        p95 * 1000,
+        wall * 1000,
+    )
+    return p95
+
+
+@pytest.mark.asyncio
+async def test_concurrent_create_booking_latency(
+    postgres_container: PostgresContainer,
+) -> None:
+    """Benchmark concurrent create-booking latency, blocking session vs AsyncSession.
+
+    The blocking run reproduces the previous behaviour: a synchronous Session
+    used inside ``async def`` handlers, which serialises every request on the
+    event loop. The async run uses the pooled AsyncSession path.
+    """
+    sync_engine = create_engine(postgres_container.get_connection_url())
+    with sync_engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+    SQLModel.metadata.create_all(sync_engine)
+
+    async def blocking_create(request: DeskBookingCreateRequest) -> None:
+        with Session(sync_engine) as session:
+            overlap = session.exec(
+                select(DeskBooking).where(
+                    DeskBooking.desk_id == request.desk_id,
+                    DeskBooking.start_time < request.end_time,
+                    DeskBooking.end_time > request.start_time,
+                )
+            ).first()
+            assert overlap is None
+            session.add(DeskBooking.from_create_dto(request))
+            session.commit()
+
+    async_engine = create_async_engine(
+        postgres_container.get_connection_url(driver="asyncpg"),
+        pool_size=POOL_SIZE,
+    )
+    session_factory = async_sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    async def async_create(request: DeskBookingCreateRequest) -> None:
+        async with session_factory() as session:
+            service = DeskBookingService(
+                DeskBookingRepository(session),
+                OutboxRepository(session),
+                BookingStatsRepository(session),
+            )
+            await service.create_booking(request)
+
+    # Warm up both pools so connection setup is not part of the measurement.
+    await _measure(blocking_create, 0)
+    await _measure(async_create, CONCURRENT_REQUESTS)
+
+    blocking_p95 = _log_summary(
+        "blocking Session", *await _measure(blocking_create, 2 * CONCURRENT_REQUESTS)
+    )
+    async_p95 = _log_summary(
+        "AsyncSession", *await _measure(async_create, 3 * CONCURRENT_REQUESTS)
+    )
+
+    sync_engine.dispose()
+    await async_engine.dispose()
+
+    assert async_p95 < blocking_p95
@@ -0,0 +1,185 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pydantic import Field
+
+from src.messaging.partitioned_consumer import consume_partitioned
+from src.models.msg.abstract_message import AbstractMessage
+
+TIMEOUT = 2.0
+
+
+class KeyedMessage(AbstractMessage):
+    """A dummy message carrying a partition key and a sequence number."""
+
+    key: str = Field(...)
+    seq: int = Field(...)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the message to bytes."""
+        return f"{self.key}:{self.seq}".encode()
+
+    @classmethod
+    def from_bytes(cls, body: bytes, content_type: str | None = None) -> "KeyedMessage":
+        """Deserialize bytes to an instance of KeyedMessage."""
+        key, seq = body.decode().split(":")
+        return cls(key=key, seq=int(seq))
+
+
+def _incoming(body: bytes) -> MagicMock:
+    """Build an incoming message recording how it was settled."""
+    return MagicMock(body=body, ack=AsyncMock(), reject=AsyncMock())
+
+
+def _queue(bodies: list[bytes]) -> tuple[MagicMock, list[MagicMock]]:
+    """Build a queue delivering the given bodies and then waiting forever."""
+    messages = [_incoming(body) for body in bodies]
+
+    async def deliver() -> AsyncIterator[MagicMock]:
+        for message in messages:
+            yield message
+        await asyncio.Event().wait()
+
+    @asynccontextmanager
+    async def iterator() -> AsyncIterator[AsyncIterator[MagicMock]]:
+        yield deliver()
+
+    queue = MagicMock()
+    queue.iterator = iterator
+    return queue, messages
+
+
+async def _run_until(consumer: asyncio.Task, condition: asyncio.Event) -> None:
+    """Wait for a condition and stop the consumer."""
+    try:
+        await asyncio.wait_for(condition.wait(), TIMEOUT)
+    finally:
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+
+
+@pytest.mark.asyncio
+async def test_keys_are_processed_in_order_and_in_parallel() -> None:
+    """Test that equal keys keep their order while different keys overlap."""
+    bodies = [KeyedMessage(key=k, seq=i).to_bytes() for i in range(5) for k in "abc"]
+    queue, messages = _queue(bodies)
+    handled: dict[str, list[int]] = {"a": [], "b": [], "c": []}
+    running = 0
+    max_running = 0
+    done = asyncio.Event()
+
+    async def on_message(message: KeyedMessage) -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        handled[message.key].append(message.seq)
+        running -= 1
+        if sum(map(len, handled.values())) == len(bodies):
+            done.set()
+
+    consumer = asyncio.create_task(
+        consume_partitioned(
+            queue,
+            KeyedMessage,
+            on_message,
+            concurrency=8,
+            partition_key=lambda m: m.key,
+        )
+    )
+    await _run_until(consumer, done)
+
+    assert handled == {k: list(range(5)) for k in "abc"}
+    assert max_running > 1
+    for message in messages:
+        message.ack.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_without_partition_key_any_worker_takes_the_next_message() -> None:
+    """Test that messages are spread over all workers without a partition key."""
+    bodies = [KeyedMessage(key="a", seq=i).to_bytes() for i in range(4)]
+    queue, _ = _queue(bodies)
+    started: list[int] = []
+    all_started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def on_message(message: KeyedMessage) -> None:
+        started.append(message.seq)
+        if len(started) == len(bodies):
+            all_started.set()
+        await release.wait()
+
+    consumer = asyncio.create_task(
+        consume_partitioned(queue, KeyedMessage, on_message, concurrency=4)
+    )
+    await _run_until(consumer, all_started)
+
+    assert sorted(started) == list(range(4))
+
+
+@pytest.mark.asyncio
+async def test_failures_are_rejected_without_retry_topology() -> None:
+    """Test that failures are rejected and do not stop the consumer."""
+    queue, messages = _queue(
+        [b"garbage", KeyedMessage(key="a", seq=0).to_bytes(), b"a:1"]
+    )
+    handled: list[int] = []
+    done = asyncio.Event()
+
+    async def on_message(message: KeyedMessage) -> None:
+        handled.append(message.seq)
+        if message.seq == 0:
+            raise RuntimeError("boom")
+        done.set()
+
+    consumer = asyncio.create_task(
+        consume_partitioned(
+            queue,
+            KeyedMessage,
+            on_message,
+            concurrency=2,
+            partition_key=lambda m: m.key,
+        )
+    )
+    await _run_until(consumer, done)
+
+    garbage, failed, succeeded = messages
+    assert handled == [0, 1]
+    garbage.reject.assert_awaited_once()
+    failed.reject.assert_awaited_once()
+    failed.ack.assert_not_awaited()
+    succeeded.ack.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failures_are_handed_to_retry_topology() -> None:
+    """Test that failed messages are retried and undecodable ones parked."""
+    queue, messages = _queue([b"garbage", KeyedMessage(key="a", seq=0).to_bytes()])
+    retries = MagicMock(retry=AsyncMock(), park=AsyncMock())
+    done = asyncio.Event()
+
+    async def on_message(_: KeyedMessage) -> None:
+        done.set()
+        raise RuntimeError("database unavailable")
+
+    consumer = asyncio.create_task(
+        consume_partitioned(queue, KeyedMessage, on_message, retries=retries)
+    )
+    await _run_until(consumer, done)
+
+    garbage, failed = messages
+    retries.park.assert_awaited_once_with(garbage)
+    retries.retry.assert_awaited_once_with(failed)
+    failed.ack.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_must_be_positive() -> None:
+    """Test that a concurrency below 1 is rejected."""
+    with pytest.raises(ValueError, match="Concurrency"):
+        await consume_partitioned(MagicMock(), KeyedMessage, AsyncMock(), 0)
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from src.models.dto.desk_booking_batch_create_request import (
+    DeskBookingBatchCreateRequest,
+)
+from src.models.dto.desk_booking_create_request import DeskBookingCreateRequest
+from src.models.dto.desk_booking_recurrence import DeskBookingRecurrence
+
+MONDAY = datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc)
+WEEKDAYS = [0, 1, 2, 3, 4]
+
+
+def _recurrence(weekdays: list[int], weeks: int) -> DeskBookingRecurrence:
+    """Build a recurrence of two-hour bookings starting on a Monday."""
+    return DeskBookingRecurrence(
+        user_id=uuid4(),
+        desk_id=1,
+        start_time=MONDAY,
+        end_time=MONDAY + timedelta(hours=2),
+        weekdays=weekdays,
+        weeks=weeks,
+    )
+
+
+def test_weekday_recurrence_expands_to_every_working_day() -> None:
+    """Test that a weekday recurrence yields five occurrences per week."""
+    weeks = 8
+    occurrences = _recurrence(WEEKDAYS, weeks=weeks).occurrences()
+
+    assert len(occurrences) == weeks * len(WEEKDAYS)
+    assert all(o.start_time.weekday() in WEEKDAYS for o in occurrences)
+    assert all(o.end_time - o.start_time == timedelta(hours=2) for o in occurrences)
+    assert occurrences[0].start_time == MONDAY
+    assert occurrences[-1].start_time == MONDAY + timedelta(weeks=weeks - 1, days=4)
+
+
+def test_recurrence_skips_days_before_first_occurrence() -> None:
+    """Test that weekdays earlier in the first week are not booked retroactively."""
+    recurrence = _recurrence([0], weeks=1)
+    recurrence.start_time += timedelta(days=2)
+    recurrence.end_time += timedelta(days=2)
+
+    occurrences = recurrence.occurrences()
+
+    assert [o.start_time for o in occurrences] == [MONDAY + timedelta(weeks=1)]
+
+
+def test_batch_request_requires_exactly_one_source() -> None:
+    """Test that a batch needs either explicit bookings or a recurrence."""
+    booking = DeskBookingCreateRequest(
+        user_id=uuid4(),
+        desk_id=1,
+        start_time=MONDAY,
+        end_time=MONDAY + timedelta(hours=1),
+    )
+
+    with pytest.raises(ValidationError):
+        DeskBookingBatchCreateRequest()
+    with pytest.raises(ValidationError):
+        DeskBookingBatchCreateRequest(
+            bookings=[booking], recurrence=_recurrence(WEEKDAYS, weeks=1)
+        )
+    assert DeskBookingBatchCreateRequest(bookings=[booking]).to_create_requests() == [
+        booking
+    ]
@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+from uuid import uuid4
+
+from src.models.db.desk_booking import DeskBooking
+from src.services.availability_cache import (
+    SLOTS_PER_DAY,
+    AvailabilityCache,
+    booked_slots,
+    day_bounds,
+)
+
+DAY = date(2026, 1, 5)
+DESK_ID = 7
+
+
+def _booking(start_hour: float, hours: float, desk_id: int = DESK_ID) -> DeskBooking:
+    """Build a booking starting `start_hour` hours after midnight UTC on DAY."""
+    start = day_bounds(DAY)[0] + timedelta(hours=start_hour)
+    return DeskBooking(
+        user_id=uuid4(),
+        desk_id=desk_id,
+        start_time=start,
+        end_time=start + timedelta(hours=hours),
+    )
+
+
+def _slot_mask(first: int, last: int) -> int:
+    """Return a mask with slots first..last-1 set."""
+    return (1 << last) - (1 << first)
+
+
+def test_booked_slots_rounds_partial_slots_outwards() -> None:
+    """Test that a slot is booked as soon as any part of it is booked."""
+    start = day_bounds(DAY)[0] + timedelta(hours=9, minutes=5)
+
+    slots = booked_slots(DAY, start, start + timedelta(minutes=20))
+
+    assert slots == _slot_mask(36, 38)
+
+
+def test_booked_slots_clamps_to_day() -> None:
+    """Test that bookings spanning midnight only mark the day's own slots."""
+    start = day_bounds(DAY)[0] - timedelta(hours=1)
+    end = day_bounds(DAY)[1] + timedelta(hours=1)
+
+    assert booked_slots(DAY, start, end) == _slot_mask(0, SLOTS_PER_DAY)
+    assert booked_slots(DAY - timedelta(days=2), start, end) == 0
+
+
+def test_add_and_remove_patch_cached_day() -> None:
+    """Test that writes patch a cached day without reloading it."""
+    cache = AvailabilityCache()
+    first = _booking(9, 61 / 60)  # 09:00 - 10:01
+    cache.put(DAY, [first], cache.generation)
+
+    second = _booking(10 + 11 / 60, 1)  # 10:11 - 11:11, shares the 10:00 slot
+    cache.add_booking(second)
+    assert cache.get(DAY).bitmaps == {DESK_ID: _slot_mask(36, 45)}
+
+    cache.remove_booking(first.id)
+    assert cache.get(DAY).bitmaps == {DESK_ID: _slot_mask(40, 45)}
+
+    cache.remove_booking(second.id)
+    assert cache.get(DAY).bitmaps == {}
+
+
+def test_put_is_not_cached_when_a_write_raced_with_the_load() -> None:
+    """Test that a load started before a write is not cached."""
+    cache = AvailabilityCache()
+    generation = cache.generation
+    cache.add_booking(_booking(9, 1))
+
+    cache.put(DAY, [], generation)
+
+    assert cache.get(DAY) is None
+
+
+def test_least_recently_used_day_is_evicted() -> None:
+    """Test LRU eviction by day."""
+    cache = AvailabilityCache(max_days=2)
+    days = [DAY + timedelta(days=offset) for offset in range(3)]
+    cache.put(days[0], [], cache.generation)
+    cache.put(days[1], [], cache.generation)
+    cache.get(days[0])
+
+    cache.put(days[2], [], cache.generation)
+
+    assert cache.get(days[1]) is None
+    assert cache.get(days[0]) is not None
+
+
+def test_expired_day_is_reloaded() -> None:
+    """Test that entries older than max_age are treated as misses."""
+    cache = AvailabilityCache(max_age=0)
+    cache.put(DAY, [], cache.generation)
+
+    assert cache.get(DAY) is None
+
+
+def test_booking_spanning_midnight_patches_both_days() -> None:
+    """Test that a booking is added to every cached day it touches."""
+    cache = AvailabilityCache()
+    next_day = DAY + timedelta(days=1)
+    cache.put(DAY, [], cache.generation)
+    cache.put(next_day, [], cache.generation)
+
+    cache.add_booking(_booking(23, 2))
+
+    assert cache.get(DAY).bitmaps == {DESK_ID: _slot_mask(92, SLOTS_PER_DAY)}
+    assert cache.get(next_day).bitmaps == {DESK_ID: _slot_mask(0, 4)}
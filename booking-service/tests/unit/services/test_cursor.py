@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from src.services.transformations.cursor import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip() -> None:
+    """Test that a decoded cursor yields the encoded keyset position."""
+    start_time = datetime(2026, 1, 5, 9, 30, tzinfo=timezone.utc)
+    booking_id = uuid4()
+
+    assert decode_cursor(encode_cursor(start_time, booking_id)) == (
+        start_time,
+        booking_id,
+    )
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "bm9zZXBhcmF0b3I="])
+def test_decode_invalid_cursor_raises(cursor: str) -> None:
+    """Test that malformed cursors raise ValueError."""
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
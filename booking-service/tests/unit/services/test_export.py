@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from typing import AsyncGenerator
+from uuid import uuid4
+
+import pytest
+
+from src.models.dto.desk_booking_dto import DeskBookingDTO
+from src.services.transformations.export import (
+    CSV_COLUMNS,
+    ExportFormat,
+    encode_export,
+)
+
+START = datetime(2026, 3, 2, 9, 0, tzinfo=timezone.utc)
+
+
+def _booking(desk_id: int) -> DeskBookingDTO:
+    """Build a one-hour booking of the given desk."""
+    return DeskBookingDTO(
+        id=uuid4(),
+        user_id=uuid4(),
+        desk_id=desk_id,
+        start_time=START,
+        end_time=START + timedelta(hours=1),
+    )
+
+
+async def _chunks(
+    chunks: list[list[DeskBookingDTO]],
+) -> AsyncGenerator[list[DeskBookingDTO]]:
+    """Yield the given chunks like a streamed query."""
+    for chunk in chunks:
+        yield chunk
+
+
+async def _encode(
+    chunks: list[list[DeskBookingDTO]], export_format: ExportFormat
+) -> list[bytes]:
+    """Collect the encoded output chunks."""
+    return [chunk async for chunk in encode_export(_chunks(chunks), export_format)]
+
+
+@pytest.mark.asyncio
+async def test_encode_ndjson_one_line_per_booking() -> None:
+    """Test that NDJSON has one JSON document per line and one chunk per input."""
+    chunks = [[_booking(1), _booking(2)], [_booking(3)]]
+
+    output = await _encode(chunks, ExportFormat.NDJSON)
+
+    assert len(output) == len(chunks)
+    lines = b"".join(output).decode().splitlines()
+    assert [json.loads(line)["desk_id"] for line in lines] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_encode_csv_starts_with_header() -> None:
+    """Test that CSV starts with the column header followed by the bookings."""
+    booking = _booking(7)
+
+    output = await _encode([[booking]], ExportFormat.CSV)
+
+    rows = list(csv.reader(io.StringIO(b"".join(output).decode())))
+    assert rows[0] == CSV_COLUMNS
+    assert rows[1][:3] == [str(booking.id), str(booking.user_id), "7"]
+    assert datetime.fromisoformat(rows[1][3]) == START
+
+
+@pytest.mark.asyncio
+async def test_encode_empty_export() -> None:
+    """Test that an empty NDJSON export is empty and an empty CSV is the header."""
+    assert await _encode([], ExportFormat.NDJSON) == []
+    assert await _encode([], ExportFormat.CSV) == [
+        ",".join(CSV_COLUMNS).encode() + b"\r\n"
+    ]
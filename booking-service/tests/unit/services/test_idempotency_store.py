@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from src.services.idempotency_store import IdempotencyKeyReuseError, IdempotencyStore
+
+
+class Counter:
+    """Operation counting its invocations."""
+
+    def __init__(self) -> None:
+        """Initialize the counter."""
+        self.calls = 0
+
+    async def __call__(self) -> int:
+        """Count the call and return the call number."""
+        self.calls += 1
+        await asyncio.sleep(0)
+        return self.calls
+
+
+@pytest.mark.asyncio
+async def test_retry_returns_stored_result() -> None:
+    """Test that a retry with the same key does not run the operation again."""
+    store = IdempotencyStore()
+    operation = Counter()
+
+    assert await store.run("key", "request", operation) == 1
+    assert await store.run("key", "request", operation) == 1
+    assert operation.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_retry_waits_for_first_request() -> None:
+    """Test that a retry racing the first request shares its result."""
+    store = IdempotencyStore()
+    operation = Counter()
+
+    results = await asyncio.gather(
+        store.run("key", "request", operation),
+        store.run("key", "request", operation),
+    )
+
+    assert results == [1, 1]
+    assert operation.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_different_request_raises() -> None:
+    """Test that a key cannot be replayed for a different request."""
+    store = IdempotencyStore()
+    await store.run("key", "request", Counter())
+
+    with pytest.raises(IdempotencyKeyReuseError):
+        await store.run("key", "other request", Counter())
+
+
+@pytest.mark.asyncio
+async def test_failed_operation_is_not_stored() -> None:
+    """Test that a failed operation can be retried with the same key."""
+    store = IdempotencyStore()
+
+    async def fail() -> int:
+        raise ValueError("Desk already booked.")
+
+    with pytest.raises(ValueError, match="already booked"):
+        await store.run("key", "request", fail)
+
+    assert await store.run("key", "request", Counter()) == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_and_evicted_keys_run_again() -> None:
+    """Test that keys beyond the TTL or the size limit are forgotten."""
+    expiring = IdempotencyStore(ttl=0.0)
+    operation = Counter()
+    first = await expiring.run("key", "request", operation)
+    await asyncio.sleep(0.001)
+    assert [first, await expiring.run("key", "request", operation)] == [1, 2]
+
+    bounded = IdempotencyStore(max_entries=1)
+    operation = Counter()
+    results = [
+        await bounded.run(key, "request", operation)
+        for key in ("first", "second", "first")
+    ]
+    assert results == [1, 2, 3]
@@ -0,0 +1,161 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.messaging.pubsub_exchanges import (
+    DESK_BOOKING_CREATED,
+    DESK_BOOKING_DELETED,
+    DESK_BOOKING_UPDATED,
+)
+from src.models.db.outbox_message import OutboxMessage
+from src.models.msg.booking_message import BookingMessage
+from src.services import outbox_relay
+from src.services.outbox_relay import OutboxRelay
+
+
+class FakeOutbox:
+    """In-memory outbox standing in for the outbox table."""
+
+    def __init__(self) -> None:
+        """Initialize an empty outbox."""
+        self.messages: list[OutboxMessage] = []
+
+    def add(self, exchange: str, booking_id: UUID) -> None:
+        """Record an event for a booking."""
+        message = BookingMessage(
+            booking_id=booking_id, desk_id=1, start_time=datetime.now(timezone.utc)
+        )
+        self.messages.append(
+            OutboxMessage(
+                id=len(self.messages) + 1, exchange=exchange, body=message.to_bytes()
+            )
+        )
+
+    def repository(self, _: object) -> "FakeOutbox":
+        """Return the outbox as its own repository."""
+        return self
+
+    async def claim_batch(self, limit: int) -> list[OutboxMessage]:
+        """Return the oldest messages."""
+        return self.messages[:limit]
+
+    async def delete(self, message_ids: list[int]) -> None:
+        """Delete published messages."""
+        self.messages = [m for m in self.messages if m.id not in message_ids]
+
+    async def commit(self) -> None:
+        """Do nothing; the fake has no transactions."""
+
+
+class FakePubSub:
+    """Exchange recording published messages, failing chosen bookings."""
+
+    def __init__(self, exchange: str, published: list[tuple[str, UUID]]) -> None:
+        """Record into a log shared by all exchanges."""
+        self.exchange = exchange
+        self.published = published
+        self.failing: set[UUID] = set()
+
+    async def publish_many(
+        self, messages: list[BookingMessage], **_: object
+    ) -> list[Exception | None]:
+        """Publish every message, failing those of failing bookings."""
+        failures: list[Exception | None] = []
+        for message in messages:
+            if message.booking_id in self.failing:
+                failures.append(TimeoutError("No confirm"))
+            else:
+                self.published.append((self.exchange, message.booking_id))
+                failures.append(None)
+        return failures
+
+
+class FakeMessaging:
+    """Messaging manager with one fake exchange per name."""
+
+    def __init__(self) -> None:
+        """Initialize the exchanges and the shared publish log."""
+        self.published: list[tuple[str, UUID]] = []
+        self.exchanges = {
+            name: FakePubSub(name, self.published)
+            for name in (
+                DESK_BOOKING_CREATED,
+                DESK_BOOKING_UPDATED,
+                DESK_BOOKING_DELETED,
+            )
+        }
+
+    def get_pubsub(self, exchange: str) -> FakePubSub:
+        """Return the exchange with the given name."""
+        return self.exchanges[exchange]
+
+
+@asynccontextmanager
+async def fake_session() -> AsyncIterator[None]:
+    """Stand in for a database session."""
+    yield None
+
+
+@pytest.fixture
+def outbox(monkeypatch: pytest.MonkeyPatch) -> FakeOutbox:
+    """Fixture providing the outbox the relay drains."""
+    outbox = FakeOutbox()
+    monkeypatch.setattr(outbox_relay, "OutboxRepository", outbox.repository)
+    return outbox
+
+
+@pytest.mark.asyncio
+async def test_relay_publishes_in_outbox_order(outbox: FakeOutbox) -> None:
+    """Test each booking's events are published in the order they were recorded."""
+    first, second = uuid4(), uuid4()
+    outbox.add(DESK_BOOKING_CREATED, first)
+    outbox.add(DESK_BOOKING_CREATED, second)
+    outbox.add(DESK_BOOKING_UPDATED, first)
+    outbox.add(DESK_BOOKING_UPDATED, first)
+    outbox.add(DESK_BOOKING_DELETED, first)
+    messaging = FakeMessaging()
+
+    assert await OutboxRelay(fake_session, messaging).relay_batch() == 5  # noqa: PLR2004
+
+    assert messaging.published == [
+        (DESK_BOOKING_CREATED, first),
+        (DESK_BOOKING_CREATED, second),
+        (DESK_BOOKING_UPDATED, first),
+        (DESK_BOOKING_UPDATED, first),
+        (DESK_BOOKING_DELETED, first),
+    ]
+    assert not outbox.messages
+
+
+@pytest.mark.asyncio
+async def test_relay_stops_at_first_failure(outbox: FakeOutbox) -> None:
+    """Test a failed message and every later one stay in the outbox."""
+    failing, other = uuid4(), uuid4()
+    outbox.add(DESK_BOOKING_CREATED, other)
+    outbox.add(DESK_BOOKING_CREATED, failing)
+    outbox.add(DESK_BOOKING_DELETED, failing)
+    outbox.add(DESK_BOOKING_DELETED, other)
+    messaging = FakeMessaging()
+    messaging.exchanges[DESK_BOOKING_CREATED].failing.add(failing)
+    relay = OutboxRelay(fake_session, messaging, poll_interval=0.5, max_backoff=1.5)
+
+    assert await relay.relay_batch() == 1
+    assert [message.id for message in outbox.messages] == [2, 3, 4]
+    assert (DESK_BOOKING_DELETED, failing) not in messaging.published
+    assert relay._backoff() == 0.5  # noqa: PLR2004
+
+    await relay.relay_batch()
+    assert relay._backoff() == 1.0
+    await relay.relay_batch()
+    assert relay._backoff() == 1.5  # noqa: PLR2004
+
+    messaging.exchanges[DESK_BOOKING_CREATED].failing.clear()
+    assert await relay.relay_batch() == 3  # noqa: PLR2004
+    assert relay._failed_batches == 0
+    assert messaging.published[-2:] == [
+        (DESK_BOOKING_DELETED, failing),
+        (DESK_BOOKING_DELETED, other),
+    ]
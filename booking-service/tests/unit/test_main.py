@@ -5,7 +5,7 @@ import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 
-from main import app
+from main import app, outbox_relay
 from src.messaging.messaging_manager import messaging_manager
 
 
@@ -26,7 +26,19 @@ def mock_messaging_manager() -> MagicMock:
 
 
 @pytest.fixture
-def client(mock_messaging_manager: MagicMock) -> Generator[TestClient]:
+def mock_outbox_relay(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Mock the outbox relay so no database connection is attempted."""
+    mock = MagicMock()
+    mock.stop = AsyncMock()
+    monkeypatch.setattr(outbox_relay, "start", mock.start)
+    monkeypatch.setattr(outbox_relay, "stop", mock.stop)
+    return mock
+
+
+@pytest.fixture
+def client(
+    mock_messaging_manager: MagicMock, mock_outbox_relay: MagicMock
+) -> Generator[TestClient]:
     """Fixture to initialize the FastAPI TestClient, using the mocked messaging manager."""  # noqa: E501
     with TestClient(app) as client:
         yield client
@@ -39,8 +51,19 @@ def test_root(client: TestClient) -> None:
     assert response.json() == {"service": "Desk Booking Service"}
 
 
-def test_health(client: TestClient) -> None:
+def test_health(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
     """Test the health check endpoint (GET /health)."""
+    monkeypatch.setattr(messaging_manager, "readiness", lambda: {"exchange": True})
+    response = client.get("/health")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"status": "ok", "messaging": {"exchange": True}}
+
+
+def test_health_reports_disconnected_facades(client: TestClient) -> None:
+    """Test that the health check is degraded while facades are not connected."""
     response = client.get("/health")
     assert response.status_code == status.HTTP_200_OK
-    assert response.json() == {"status": "ok"}
+    data = response.json()
+    assert data["status"] == "degraded"
+    assert data["messaging"]
+    assert not any(data["messaging"].values())
@@ -4,8 +4,11 @@ from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.messaging.messaging_manager import messaging_manager
+from src.messaging.messaging_metrics import METRICS_CONTENT_TYPE
 from src.routers.desk_integration import router
 
 logger = logging.getLogger(__name__)
@@ -67,3 +70,11 @@ def get_root() -> dict[str, str]:
 def health_check() -> dict[str, str]:
     """Health check endpoint."""
     return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Expose the messaging metrics to Prometheus."""
+    return PlainTextResponse(
+        await messaging_manager.render_metrics(), media_type=METRICS_CONTENT_TYPE
+    )
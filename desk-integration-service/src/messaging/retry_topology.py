@@ -0,0 +1,220 @@
+import logging
+from contextlib import suppress
+from dataclasses import dataclass
+
+import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractExchange, AbstractIncomingMessage
+
+logger = logging.getLogger(__name__)
+
+RETRY_COUNT_HEADER = "x-retry-count"
+POISON_ROUTING_KEY = "poison"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how late a failed message is retried.
+
+    Attributes:
+        max_attempts (int): Number of times a message is handled before it is
+            moved to the poison queue.
+        initial_delay (float): Seconds before the first retry.
+        multiplier (float): Factor the delay grows by with every retry.
+
+    """
+
+    max_attempts: int = 5
+    initial_delay: float = 1.0
+    multiplier: float = 2.0
+
+    def __post_init__(self) -> None:
+        """Validate the policy.
+
+        Raises:
+            ValueError: If the attempts or delays are out of range.
+
+        """
+        if self.max_attempts < 1 or self.initial_delay <= 0 or self.multiplier < 1:
+            raise ValueError(
+                "Max attempts must be at least 1, the initial delay positive "
+                "and the multiplier at least 1."
+            )
+
+    def delay_ms(self, retry: int) -> int:
+        """Return the delay before a retry.
+
+        Args:
+            retry (int): The number of the retry, starting at 1.
+
+        Returns:
+            int: The delay in milliseconds.
+
+        """
+        return round(self.initial_delay * self.multiplier ** (retry - 1) * 1000)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+class RetryTopology:
+    """Dead-letter exchange, delay queues and poison queue of a consumer queue.
+
+    A failed message is published to the queue's dead-letter exchange, which
+    routes it to the delay queue of its retry. Delay queues have no consumers;
+    once the message's TTL expires the broker dead-letters it through the
+    default exchange straight back to the consumer queue, so a retry neither
+    blocks the consumer nor reaches other queues bound to the same exchange.
+    After `max_attempts` the message is parked in the poison queue instead.
+
+    Every delay has a queue of its own, named after the delay, so messages
+    expire in order and changing the policy declares new queues instead of
+    conflicting with existing ones.
+    """
+
+    def __init__(self, queue_name: str, policy: RetryPolicy) -> None:
+        """Initialize the topology of a consumer queue.
+
+        Args:
+            queue_name (str): The name of the consumer queue.
+            policy (RetryPolicy): How often and how late messages are retried.
+
+        """
+        self._queue_name = queue_name
+        self._policy = policy
+        self._exchange: AbstractExchange | None = None
+
+    async def declare(self, channel: AbstractChannel) -> None:
+        """Declare the dead-letter exchange, delay queues and poison queue.
+
+        Args:
+            channel (AbstractChannel): The channel failed messages are published on.
+                It should have publisher confirms enabled.
+
+        """
+        self._exchange = await channel.declare_exchange(
+            f"{self._queue_name}.dlx", aio_pika.ExchangeType.DIRECT, durable=True
+        )
+        for retry in range(1, self._policy.max_attempts):
+            routing_key = self._retry_routing_key(retry)
+            delay_queue = await channel.declare_queue(
+                f"{self._queue_name}.{routing_key}",
+                durable=True,
+                arguments={
+                    "x-message-ttl": self._policy.delay_ms(retry),
+                    "x-dead-letter-exchange": "",
+                    "x-dead-letter-routing-key": self._queue_name,
+                },
+            )
+            await delay_queue.bind(self._exchange, routing_key=routing_key)
+        poison_queue = await channel.declare_queue(self.poison_queue_name, durable=True)
+        await poison_queue.bind(self._exchange, routing_key=POISON_ROUTING_KEY)
+
+    async def retry(self, message: AbstractIncomingMessage) -> None:
+        """Schedule a failed message for its next attempt and acknowledge it.
+
+        Messages that used up their attempts are parked in the poison queue.
+
+        Args:
+            message (AbstractIncomingMessage): The message whose handling failed.
+
+        """
+        retry = int((message.headers or {}).get(RETRY_COUNT_HEADER, 0)) + 1
+        if retry >= self._policy.max_attempts:
+            await self.park(message)
+            return
+        await self._forward(message, self._retry_routing_key(retry), retry)
+        logger.warning(
+            "Retrying message from %s in %d ms (retry %d of %d)",
+            self._queue_name,
+            self._policy.delay_ms(retry),
+            retry,
+            self._policy.max_attempts - 1,
+        )
+
+    async def park(self, message: AbstractIncomingMessage) -> None:
+        """Move a message to the poison queue and acknowledge it.
+
+        Args:
+            message (AbstractIncomingMessage): The message that cannot be handled.
+
+        """
+        retries = int((message.headers or {}).get(RETRY_COUNT_HEADER, 0))
+        await self._forward(message, POISON_ROUTING_KEY, retries)
+        logger.error("Moved message to %s.%s", self._queue_name, POISON_ROUTING_KEY)
+
+    async def _forward(
+        self, message: AbstractIncomingMessage, routing_key: str, retries: int
+    ) -> None:
+        """Publish a copy of a message to the dead-letter exchange, then ack it.
+
+        The message is only acknowledged once the broker confirmed the copy, so
+        a failure on the way leaves it unacknowledged for redelivery.
+
+        Args:
+            message (AbstractIncomingMessage): The message to forward.
+            routing_key (str): The routing key of the target queue.
+            retries (int): The number of retries recorded on the copy.
+
+        Raises:
+            RuntimeError: If the topology has not been declared.
+
+        """
+        if self._exchange is None:
+            raise RuntimeError("Retry topology not declared; call 'declare' first.")
+        await self._exchange.publish(
+            aio_pika.Message(
+                body=message.body,
+                content_type=message.content_type,
+                headers={**(message.headers or {}), RETRY_COUNT_HEADER: retries},
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            ),
+            routing_key=routing_key,
+        )
+        await message.ack()
+
+    @property
+    def poison_queue_name(self) -> str:
+        """Get the name of the queue failed messages are parked in."""
+        return f"{self._queue_name}.{POISON_ROUTING_KEY}"
+
+    def _retry_routing_key(self, retry: int) -> str:
+        """Return the routing key, and queue name suffix, of a retry's delay queue.
+
+        Args:
+            retry (int): The number of the retry, starting at 1.
+
+        Returns:
+            str: The routing key.
+
+        """
+        return f"retry.{self._policy.delay_ms(retry)}ms"
+
+
+async def settle_failed(
+    message: AbstractIncomingMessage,
+    retries: RetryTopology | None,
+    retryable: bool = True,
+) -> None:
+    """Settle a message whose handling failed.
+
+    With a retry topology the message is retried, or parked right away if it
+    can never succeed. Without one it is rejected and dropped. If forwarding
+    fails, the message is requeued so it is not lost.
+
+    Args:
+        message (AbstractIncomingMessage): The message whose handling failed.
+        retries (RetryTopology | None): The retry topology of the consumer queue.
+        retryable (bool): False if retrying cannot help, e.g. an undecodable body.
+
+    """
+    try:
+        if retries is None:
+            await message.reject()
+        elif retryable:
+            await retries.retry(message)
+        else:
+            await retries.park(message)
+    except Exception as e:
+        logger.exception("Error forwarding failed message, requeueing it: %s", e)
+        with suppress(Exception):
+            await message.nack(requeue=True)
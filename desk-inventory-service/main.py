@@ -8,9 +8,11 @@ from typing import Any, AsyncGenerator
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
+from src.messaging.messaging_metrics import METRICS_CONTENT_TYPE
 from src.api.routers.desk_inventory_routes import router as inventory_router
 from src.messaging.messaging_manager import messaging_manager
 from src.messaging.pubsub_exchanges import DESK_DATA_UPDATED, DESK_INVENTORY_UPDATED
@@ -68,6 +70,17 @@ def get_root() -> dict[str, str]:
 
 
 @app.get("/health")
-def get_health() -> dict[str, str]:
-    """Health check endpoint to verify service status."""
-    return {"status": "ok"}
+def get_health() -> dict[str, object]:
+    """Health check endpoint reporting the readiness of each messaging facade."""
+    return {
+        "status": "ok" if messaging_manager.is_ready else "degraded",
+        "messaging": messaging_manager.readiness(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Expose the messaging metrics to Prometheus."""
+    return PlainTextResponse(
+        await messaging_manager.render_metrics(), media_type=METRICS_CONTENT_TYPE
+    )
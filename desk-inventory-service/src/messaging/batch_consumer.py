@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, TypeVar
+
+from aio_pika.abc import AbstractIncomingMessage, AbstractQueue
+
+from src.messaging.retry_topology import RetryTopology, settle_failed
+from src.models.msg.abstract_message import AbstractMessage
+
+MessageType = TypeVar("MessageType", bound=AbstractMessage)
+
+logger = logging.getLogger(__name__)
+
+
+async def consume_batches(  # noqa: PLR0913
+    queue: AbstractQueue,
+    message_class: type[MessageType],
+    on_batch: Callable[[list[MessageType]], Awaitable[Any]],
+    batch_size: int,
+    max_wait: float,
+    retries: RetryTopology | None = None,
+) -> None:
+    """Consume a queue in batches of up to `batch_size` messages.
+
+    A batch is handed to the callback once it is full or `max_wait` seconds after
+    its first message arrived, whichever comes first. If the callback returns,
+    every message of the batch is acknowledged. If it raises, every message is
+    handed to the retry topology, or rejected without one. Messages that cannot
+    be decoded are parked on their own.
+
+    The prefetch count of the queue's channel must be at least `batch_size`,
+    or batches never fill up.
+
+    Args:
+        queue (AbstractQueue): The queue to consume messages from.
+        message_class (Type[MessageType]): The class type of the message for deserialization.
+        on_batch (Callable[[list[MessageType]], Awaitable[Any]]): Async callback to process a batch of messages.
+        batch_size (int): Maximum number of messages in a batch.
+        max_wait (float): Seconds to wait for a batch to fill up.
+        retries (RetryTopology | None): The retry topology of the queue.
+
+    Raises:
+        ValueError: If `batch_size` is less than 1 or `max_wait` is negative.
+
+    """  # noqa: E501
+    if batch_size < 1 or max_wait < 0:
+        raise ValueError("Batch size must be at least 1 and max wait not negative.")
+    buffer: asyncio.Queue[AbstractIncomingMessage] = asyncio.Queue()
+
+    async def on_delivery(message: AbstractIncomingMessage) -> None:
+        buffer.put_nowait(message)
+
+    consumer_tag = await queue.consume(on_delivery)
+    try:
+        while True:
+            await _process_batch(
+                await _next_batch(buffer, batch_size, max_wait),
+                message_class,
+                on_batch,
+                retries,
+            )
+    finally:
+        await queue.cancel(consumer_tag)
+
+
+async def _next_batch(
+    buffer: asyncio.Queue[AbstractIncomingMessage], batch_size: int, max_wait: float
+) -> list[AbstractIncomingMessage]:
+    """Wait for the next message and collect the messages arriving shortly after.
+
+    Args:
+        buffer (asyncio.Queue): The delivered messages not yet batched.
+        batch_size (int): Maximum number of messages in a batch.
+        max_wait (float): Seconds to wait for the batch to fill up.
+
+    Returns:
+        list[AbstractIncomingMessage]: Between one and `batch_size` messages.
+
+    """
+    batch = [await buffer.get()]
+    deadline = asyncio.get_running_loop().time() + max_wait
+    while len(batch) < batch_size:
+        if buffer.empty():
+            remaining = deadline - asyncio.get_running_loop().time()
+            try:
+                batch.append(await asyncio.wait_for(buffer.get(), remaining))
+            except TimeoutError:
+                break
+        else:
+            batch.append(buffer.get_nowait())
+    return batch
+
+
+async def _process_batch(
+    batch: list[AbstractIncomingMessage],
+    message_class: type[MessageType],
+    on_batch: Callable[[list[MessageType]], Awaitable[Any]],
+    retries: RetryTopology | None,
+) -> None:
+    """Decode a batch, hand it to the callback and settle it with the broker.
+
+    Args:
+        batch (list[AbstractIncomingMessage]): The delivered messages.
+        message_class (Type[MessageType]): The class type of the message for deserialization.
+        on_batch (Callable[[list[MessageType]], Awaitable[Any]]): Async callback to process a batch of messages.
+        retries (RetryTopology | None): The retry topology of the queue.
+
+    """  # noqa: E501
+    messages: list[AbstractIncomingMessage] = []
+    events: list[MessageType] = []
+    for message in batch:
+        try:
+            events.append(message_class.from_bytes(message.body, message.content_type))
+            messages.append(message)
+        except Exception as e:
+            logger.exception("Error decoding message: %s", e)
+            await settle_failed(message, retries, retryable=False)
+    if not events:
+        return
+    logger.info("Received batch of %d messages", len(events))
+    try:
+        await on_batch(events)
+    except Exception as e:
+        logger.exception("Error processing batch of %d messages: %s", len(events), e)
+        for message in messages:
+            await settle_failed(message, retries)
+    else:
+        try:
+            for message in messages:
+                await message.ack()
+        except Exception as e:
+            logger.exception("Error acknowledging batch: %s", e)
@@ -1,59 +1,110 @@
 import asyncio
+import logging
 from asyncio import AbstractEventLoop
+from collections.abc import Hashable
 from contextlib import suppress
 from typing import Awaitable, Callable, TypeVar
 
 import aio_pika
-from aio_pika.abc import AbstractRobustQueue
-
+from aio_pika.abc import AbstractQueue
+
+from src.messaging.batch_consumer import consume_batches
+from src.messaging.messaging_metrics import MessagingMetrics
+from src.messaging.partitioned_consumer import consume_partitioned
+from src.messaging.retry_topology import (
+    DEFAULT_RETRY_POLICY,
+    RetryPolicy,
+    RetryTopology,
+)
+from src.messaging.transport import connect_robust
 from src.models.msg.abstract_message import AbstractMessage
 
 MessageType = TypeVar("MessageType", bound=AbstractMessage)
 
+logger = logging.getLogger(__name__)
+
 
 class DirectMessageFacade:
     """Facade for sending and receiving messages via a direct exchange."""
 
-    def __init__(self, amqp_url: str, exchange_name: str) -> None:
+    def __init__(
+        self, amqp_url: str, exchange_name: str, publisher_channels: int = 1
+    ) -> None:
         """Initialize the DirectMessageFacade with connection parameters.
 
         Args:
             amqp_url (str): The AMQP broker URL.
             exchange_name (str): The name of the direct exchange.
+            publisher_channels (int): Number of channels messages are published
+                on, round-robin. More than one spreads publisher confirms of
+                concurrent publishers over several channels.
 
         """
         self._amqp_url = amqp_url
         self._exchange_name = exchange_name
-        self._connection: aio_pika.RobustConnection | None = None
+        self._publisher_channels = publisher_channels
+        self._connection: aio_pika.abc.AbstractRobustConnection | None = None
+        self._owns_connection = False
         self._channel: aio_pika.RobustChannel | None = None
         self._exchange: aio_pika.Exchange | None = None
+        self._publish_channels: list[aio_pika.abc.AbstractChannel] = []
+        self._publish_exchanges: list[aio_pika.abc.AbstractExchange] = []
+        self._next_publisher = 0
         try:
             self._loop: AbstractEventLoop = asyncio.get_running_loop()
         except RuntimeError:
             self._loop: AbstractEventLoop = asyncio.new_event_loop()
         self._consumer_task: asyncio.Task | None = None
+        self._monitored_queues: list[str] = []
+        self.metrics = MessagingMetrics()
 
-    async def connect(self) -> None:
-        """Establish connection to the AMQP broker and declare a direct exchange.
+    async def connect(
+        self, connection: aio_pika.abc.AbstractRobustConnection | None = None
+    ) -> None:
+        """Open the facade's channels and declare a direct exchange.
+
+        Args:
+            connection (AbstractRobustConnection | None): A connection shared with
+                other facades and closed by its owner. If omitted, the facade
+                opens a connection of its own and closes it in `close`.
 
         Raises:
             aio_pika.exceptions.AMQPConnectionError: Connection to the broker failed.
 
         """
-        self._connection = await aio_pika.connect_robust(
+        self._owns_connection = connection is None
+        self._connection = connection or await connect_robust(
             self._amqp_url, loop=self._loop
         )
-        self._channel = await self._connection.channel()
+        self._channel = await self._connection.channel(publisher_confirms=True)
         self._exchange = await self._channel.declare_exchange(
             self._exchange_name, aio_pika.ExchangeType.DIRECT, durable=True
         )
+        self._publish_exchanges = [self._exchange]
+        for _ in range(1, self._publisher_channels):
+            channel = await self._connection.channel(publisher_confirms=True)
+            self._publish_channels.append(channel)
+            self._publish_exchanges.append(
+                await channel.declare_exchange(
+                    self._exchange_name, aio_pika.ExchangeType.DIRECT, durable=True
+                )
+            )
 
     async def close(self) -> None:
-        """Close connections and cancel running consumer task."""
+        """Close the channels, and the connection if owned, and stop consuming."""
         await self._cancel_consumer_task()
+        for channel in self._publish_channels:
+            if not channel.is_closed:
+                await channel.close()
+        self._publish_channels = []
+        self._publish_exchanges = []
         if self._channel and not self._channel.is_closed:
             await self._channel.close()
-        if self._connection and not self._connection.is_closed:
+        if (
+            self._owns_connection
+            and self._connection
+            and not self._connection.is_closed
+        ):
             await self._connection.close()
 
     async def _cancel_consumer_task(self) -> None:
@@ -79,17 +130,22 @@ class DirectMessageFacade:
             raise RuntimeError("Exchange is not initialized. Call connect() first.")
         msg = aio_pika.Message(
             body=message.to_bytes(),
-            content_type="application/json",
+            content_type=message.content_type(),
             delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
         )
-        await self._exchange.publish(msg, routing_key=routing_key)
+        with self.metrics.time_publish(self._exchange_name):
+            await self._publisher_exchange().publish(msg, routing_key=routing_key)
 
-    def receive_messages(
+    def receive_messages(  # noqa: PLR0913
         self,
         routing_key: str,
         queue_name: str,
         on_message: Callable[[MessageType], Awaitable],
         message_type: type[MessageType],
+        prefetch_count: int | None = None,
+        concurrency: int = 1,
+        partition_key: Callable[[MessageType], Hashable] | None = None,
+        retry_policy: RetryPolicy | None = DEFAULT_RETRY_POLICY,
     ) -> None:
         """Subscribe to messages from the direct exchange with a specific routing key.
 
@@ -98,65 +154,165 @@ class DirectMessageFacade:
             queue_name (str): The name of the queue to bind to the exchange.
             on_message (Callable[[MessageType], Awaitable]): Async callback to process received messages.
             message_type (Type[MessageType]): The class type of the message for deserialization.
+            prefetch_count (int | None): Maximum number of unacknowledged messages delivered to the consumer. Defaults to twice the concurrency.
+            concurrency (int): Number of messages processed at the same time.
+            partition_key (Callable[[MessageType], Hashable] | None): Returns the key whose messages are processed in order, e.g. the desk ID. Without one, messages are processed in any order.
+            retry_policy (RetryPolicy | None): How failed messages are retried through the queue's retry topology. None rejects and drops them.
 
         Raises:
             RuntimeError: If the messaging infrastructure is not properly initialized.
+            ValueError: If `concurrency` or `prefetch_count` is less than 1.
 
         """  # noqa: E501
         if not self._channel or not self._exchange:
             raise RuntimeError(
                 "Channel or exchange is not initialized. Call connect() first."
             )
+        if concurrency < 1 or (prefetch_count is not None and prefetch_count < 1):
+            raise ValueError("Concurrency and prefetch count must be at least 1.")
         if self._consumer_task is not None and not self._consumer_task.done():
             return  # Already consuming
 
         self._consumer_task = self._loop.create_task(
-            self._consume(routing_key, queue_name, on_message, message_type)
+            self._consume(
+                routing_key,
+                queue_name,
+                prefetch_count or 2 * concurrency,
+                retry_policy,
+                lambda queue, retries: consume_partitioned(
+                    queue,
+                    message_type,
+                    self.metrics.timed_handler(queue_name, on_message),
+                    concurrency,
+                    partition_key,
+                    retries,
+                ),
+            )
         )
 
-    async def _consume(
+    def receive_batches(  # noqa: PLR0913
         self,
         routing_key: str,
         queue_name: str,
-        on_message: Callable[[MessageType], Awaitable],
-        message_class: type[AbstractMessage],
+        on_batch: Callable[[list[MessageType]], Awaitable],
+        message_type: type[MessageType],
+        batch_size: int = 100,
+        max_wait: float = 0.05,
+        prefetch_count: int | None = None,
+        retry_policy: RetryPolicy | None = DEFAULT_RETRY_POLICY,
     ) -> None:
-        """Consume messages from the specified queue and process them.
+        """Subscribe to messages with a specific routing key in batches.
+
+        The callback gets up to `batch_size` messages at once, collected for at
+        most `max_wait` seconds after the first one arrived. The whole batch is
+        acknowledged if the callback returns and retried if it raises.
 
         Args:
             routing_key (str): The routing key to bind the queue to.
             queue_name (str): The name of the queue to bind to the exchange.
-            on_message (Callable[[MessageType], Awaitable]): Async callback to process received messages.
-            message_class (Type[AbstractMessage]): The class type of the message for deserialization.
+            on_batch (Callable[[list[MessageType]], Awaitable]): Async callback to process a batch of messages.
+            message_type (Type[MessageType]): The class type of the message for deserialization.
+            batch_size (int): Maximum number of messages in a batch.
+            max_wait (float): Seconds to wait for a batch to fill up.
+            prefetch_count (int | None): Maximum number of unacknowledged messages delivered to the consumer. Defaults to twice the batch size.
+            retry_policy (RetryPolicy | None): How failed messages are retried through the queue's retry topology. None rejects and drops them.
+
+        Raises:
+            RuntimeError: If the messaging infrastructure is not properly initialized.
+            ValueError: If `batch_size` or `prefetch_count` is less than 1, or `max_wait` is negative.
 
         """  # noqa: E501
-        queue = await self._channel.declare_queue(queue_name, durable=True)
-        await queue.bind(self._exchange, routing_key=routing_key)
+        if not self._channel or not self._exchange:
+            raise RuntimeError(
+                "Channel or exchange is not initialized. Call connect() first."
+            )
+        if batch_size < 1 or max_wait < 0:
+            raise ValueError("Batch size must be at least 1 and max wait not negative.")
+        if prefetch_count is not None and prefetch_count < batch_size:
+            raise ValueError("Prefetch count must be at least the batch size.")
+        if self._consumer_task is not None and not self._consumer_task.done():
+            return  # Already consuming
 
-        await self._consume_messages(message_class, on_message, queue)
+        self._consumer_task = self._loop.create_task(
+            self._consume(
+                routing_key,
+                queue_name,
+                prefetch_count or 2 * batch_size,
+                retry_policy,
+                lambda queue, retries: consume_batches(
+                    queue,
+                    message_type,
+                    self.metrics.timed_handler(queue_name, on_batch),
+                    batch_size,
+                    max_wait,
+                    retries,
+                ),
+            )
+        )
 
-    @staticmethod
-    async def _consume_messages(
-        message_class: type[AbstractMessage],
-        on_message: Callable[[MessageType], Awaitable],
-        queue: AbstractRobustQueue,
+    async def _consume(
+        self,
+        routing_key: str,
+        queue_name: str,
+        prefetch_count: int,
+        retry_policy: RetryPolicy | None,
+        consume: Callable[[AbstractQueue, RetryTopology | None], Awaitable[None]],
     ) -> None:
-        """Process messages from the queue using the provided callback.
+        """Bind the specified queue with the routing key and consume it.
 
         Args:
-            message_class (Type[AbstractMessage]): The class type of the message for deserialization.
-            on_message (Callable[[MessageType], Awaitable]): Async callback to process received messages.
-            queue (AbstractRobustQueue): The queue to consume messages from.
+            routing_key (str): The routing key to bind the queue to.
+            queue_name (str): The name of the queue to bind to the exchange.
+            prefetch_count (int): Maximum number of unacknowledged messages delivered to the consumer.
+            retry_policy (RetryPolicy | None): How failed messages are retried, if at all.
+            consume (Callable[[AbstractQueue, RetryTopology | None], Awaitable[None]]): Consumes the bound queue until cancelled.
 
         """  # noqa: E501
-        async with queue.iterator() as queue_iter:
-            async for message in queue_iter:
-                async with message.process():
-                    try:
-                        event = message_class.from_bytes(message.body)
-                        await on_message(event)
-                    except Exception as e:
-                        print(f"Error processing message: {e}")
+        await self._channel.set_qos(prefetch_count=prefetch_count)
+        queue = await self._channel.declare_queue(queue_name, durable=True)
+        await queue.bind(self._exchange, routing_key=routing_key)
+        retries = None
+        self._monitored_queues = [queue_name]
+        if retry_policy is not None:
+            retries = RetryTopology(queue_name, retry_policy)
+            await retries.declare(self._channel)
+            self._monitored_queues.append(retries.poison_queue_name)
+
+        await consume(queue, retries)
+
+    async def collect_queue_depths(self) -> None:
+        """Record the backlog of the consumed queue and its poison queue.
+
+        Each queue is declared passively on a short-lived channel, which reads
+        its depth without creating or changing it.
+        """
+        if not self._monitored_queues or not self._connection:
+            return
+        async with self._connection.channel() as channel:
+            for queue_name in self._monitored_queues:
+                queue = await channel.declare_queue(queue_name, passive=True)
+                self.metrics.set_queue_depth(
+                    queue_name,
+                    queue.declaration_result.message_count,
+                    queue.declaration_result.consumer_count,
+                )
+
+    def _publisher_exchange(self) -> aio_pika.abc.AbstractExchange:
+        """Return the exchange of the next publisher channel, round-robin.
+
+        Returns:
+            AbstractExchange: The exchange to publish the next message on.
+
+        """
+        if len(self._publish_exchanges) <= 1:
+            return self._exchange
+        self._next_publisher = (self._next_publisher + 1) % len(self._publish_exchanges)
+        return self._publish_exchanges[self._next_publisher]
+
+    @property
+    def amqp_url(self) -> str:
+        """Get the URL of the AMQP broker used by this facade."""
+        return self._amqp_url
 
     @property
     def exchange_name(self) -> str:
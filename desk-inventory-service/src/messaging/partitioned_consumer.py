@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from collections.abc import Hashable
+from typing import Any, Awaitable, Callable, TypeVar
+
+from aio_pika.abc import AbstractIncomingMessage, AbstractQueue
+
+from src.messaging.retry_topology import RetryTopology, settle_failed
+from src.models.msg.abstract_message import AbstractMessage
+
+MessageType = TypeVar("MessageType", bound=AbstractMessage)
+
+logger = logging.getLogger(__name__)
+
+
+async def consume_partitioned(  # noqa: PLR0913
+    queue: AbstractQueue,
+    message_class: type[MessageType],
+    on_message: Callable[[MessageType], Awaitable[Any]],
+    concurrency: int = 1,
+    partition_key: Callable[[MessageType], Hashable] | None = None,
+    retries: RetryTopology | None = None,
+) -> None:
+    """Consume a queue with several workers, keeping per-key order.
+
+    Every message is decoded and handed to one of `concurrency` workers. With a
+    `partition_key`, messages with equal keys always go to the same worker and
+    are therefore handled one after another in delivery order, while messages
+    with different keys are handled in parallel. Without one, any idle worker
+    takes the next message. Each message is acknowledged once its callback
+    finished. Failed messages are handed to the retry topology, or rejected
+    without one; messages that cannot be decoded are parked right away. A
+    retried message comes back after the messages of its key that followed it.
+
+    The number of messages waiting for a worker is bounded by the prefetch count
+    of the queue's channel.
+
+    Args:
+        queue (AbstractQueue): The queue to consume messages from.
+        message_class (Type[MessageType]): The class type of the message for deserialization.
+        on_message (Callable[[MessageType], Awaitable[Any]]): Async callback to process received messages.
+        concurrency (int): Number of messages processed at the same time.
+        partition_key (Callable[[MessageType], Hashable] | None): Returns the key
+            whose messages must be processed in order.
+        retries (RetryTopology | None): The retry topology of the queue.
+
+    Raises:
+        ValueError: If `concurrency` is less than 1.
+
+    """  # noqa: E501
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1.")
+    lanes: list[asyncio.Queue] = [
+        asyncio.Queue() for _ in range(concurrency if partition_key else 1)
+    ]
+    workers = [
+        asyncio.create_task(_work(lanes[i % len(lanes)], on_message, retries))
+        for i in range(concurrency)
+    ]
+    try:
+        async with queue.iterator() as queue_iter:
+            async for message in queue_iter:
+                logger.info("Received message: %s", message.body)
+                try:
+                    event = message_class.from_bytes(message.body, message.content_type)
+                    lane = (
+                        lanes[hash(partition_key(event)) % len(lanes)]
+                        if partition_key
+                        else lanes[0]
+                    )
+                except Exception as e:
+                    logger.exception("Error decoding message: %s", e)
+                    await settle_failed(message, retries, retryable=False)
+                    continue
+                lane.put_nowait((message, event))
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def _work(
+    lane: asyncio.Queue[tuple[AbstractIncomingMessage, MessageType]],
+    on_message: Callable[[MessageType], Awaitable[Any]],
+    retries: RetryTopology | None,
+) -> None:
+    """Process the messages of a lane one at a time.
+
+    Args:
+        lane (asyncio.Queue): The decoded messages assigned to this worker.
+        on_message (Callable[[MessageType], Awaitable[Any]]): Async callback to process received messages.
+        retries (RetryTopology | None): The retry topology of the queue.
+
+    """  # noqa: E501
+    while True:
+        message, event = await lane.get()
+        try:
+            await on_message(event)
+        except Exception as e:
+            logger.exception("Error processing message: %s", e)
+            await settle_failed(message, retries)
+        else:
+            try:
+                await message.ack()
+            except Exception as e:
+                logger.exception("Error acknowledging message: %s", e)
@@ -1,3 +1,7 @@
+import asyncio
+import logging
+import time
+
 import pytest
 from testcontainers.rabbitmq import RabbitMqContainer
 
@@ -11,6 +15,10 @@ from tests.integration.messaging.utils.rabbitmq_container import (
     rabbitmq_container as _rabbitmq_container,  # noqa: F401
 )
 
+RECONNECT_TIMEOUT = 60.0
+
+logger = logging.getLogger(__name__)
+
 
 def _get_list_of_pubsub_facades(amqp_url: str) -> list[PubSubFacade]:
     """Return list of PubSubFacade instances for testing."""
@@ -61,3 +69,74 @@ async def test_stop_all(
         assert not pubsub.is_connected
     for direct in direct_facades:
         assert not direct.is_connected
+
+
+def _count_connections(container: RabbitMqContainer) -> int:
+    """Return the number of client connections open on the broker."""
+    result = container.exec(["rabbitmqctl", "list_connections", "--silent", "name"])
+    return len(result.output.decode().split())
+
+
+async def _wait_for_connections(container: RabbitMqContainer, count: int) -> None:
+    """Wait until the broker reports the expected number of connections."""
+    deadline = time.monotonic() + RECONNECT_TIMEOUT
+    while _count_connections(container) != count:
+        assert time.monotonic() < deadline, "Broker connection count not reached."
+        await asyncio.sleep(0.1)
+
+
+async def _measure_reconnect(
+    container: RabbitMqContainer,
+    facades: list[PubSubFacade | DirectMessageFacade],
+) -> float:
+    """Drop every connection on the broker and time until all facades recover."""
+    started = time.monotonic()
+    container.exec(["rabbitmqctl", "close_all_connections", "reconnect test"])
+    dropped = False
+    while True:
+        connected = all(facade.is_connected for facade in facades)
+        dropped = dropped or not connected
+        if dropped and connected:
+            return time.monotonic() - started
+        assert time.monotonic() - started < RECONNECT_TIMEOUT, "Facades not recovered."
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_shared_connection_count_and_reconnect_time(
+    _rabbitmq_container: RabbitMqContainer,  # noqa: F811, PT019
+) -> None:
+    """Integration test comparing per-facade connections with a shared one."""
+    amqp_url = get_amqp_url(_rabbitmq_container)
+    await _wait_for_connections(_rabbitmq_container, 0)
+
+    standalone = [
+        *_get_list_of_pubsub_facades(amqp_url),
+        *_get_list_of_direct_facades(amqp_url),
+    ]
+    for facade in standalone:
+        await facade.connect()
+    await _wait_for_connections(_rabbitmq_container, len(standalone))
+    standalone_reconnect = await _measure_reconnect(_rabbitmq_container, standalone)
+    for facade in standalone:
+        await facade.close()
+    await _wait_for_connections(_rabbitmq_container, 0)
+
+    messaging_manager = MessagingManager()
+    pubsub_facades = _get_list_of_pubsub_facades(amqp_url)
+    direct_facades = _get_list_of_direct_facades(amqp_url)
+    messaging_manager.add_pubsubs(pubsub_facades)
+    messaging_manager.add_directs(direct_facades)
+    await messaging_manager.start_all()
+    await _wait_for_connections(_rabbitmq_container, 1)
+    shared_reconnect = await _measure_reconnect(
+        _rabbitmq_container, [*pubsub_facades, *direct_facades]
+    )
+    await messaging_manager.stop_all()
+
+    logger.warning(
+        "connections: %d per facade vs 1 shared; reconnect: %.2fs vs %.2fs",
+        len(standalone),
+        standalone_reconnect,
+        shared_reconnect,
+    )
@@ -0,0 +1,150 @@
+import asyncio
+from typing import Awaitable, Callable
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pydantic import Field
+
+from src.messaging.batch_consumer import consume_batches
+from src.models.msg.abstract_message import AbstractMessage
+
+TIMEOUT = 2.0
+
+
+class DummyMessage(AbstractMessage):
+    """A dummy message class for testing purposes."""
+
+    content: str = Field(...)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the message to bytes."""
+        return self.content.encode()
+
+    @classmethod
+    def from_bytes(cls, body: bytes, content_type: str | None = None) -> "DummyMessage":
+        """Deserialize bytes to an instance of DummyMessage."""
+        if not body:
+            raise ValueError("empty message")
+        return cls(content=body.decode())
+
+
+class FakeQueue:
+    """A queue whose deliveries are pushed by the test."""
+
+    def __init__(self) -> None:
+        """Initialize the queue without a consumer."""
+        self.on_delivery: Callable[[MagicMock], Awaitable[None]] | None = None
+        self.cancel = AsyncMock()
+        self.consuming = asyncio.Event()
+
+    async def consume(self, callback: Callable[[MagicMock], Awaitable[None]]) -> str:
+        """Register the consumer callback."""
+        self.on_delivery = callback
+        self.consuming.set()
+        return "consumer-tag"
+
+    async def deliver(self, *bodies: bytes) -> list[MagicMock]:
+        """Deliver messages with the given bodies to the consumer."""
+        await self.consuming.wait()
+        messages = [
+            MagicMock(body=body, ack=AsyncMock(), nack=AsyncMock(), reject=AsyncMock())
+            for body in bodies
+        ]
+        for message in messages:
+            await self.on_delivery(message)
+        return messages
+
+
+async def _stop(consumer: asyncio.Task) -> None:
+    """Cancel the consumer and wait for it."""
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+
+
+@pytest.mark.asyncio
+async def test_full_batches_are_handed_over_and_acknowledged() -> None:
+    """Test that a burst is handed over in full batches without waiting."""
+    queue = FakeQueue()
+    batches: list[list[str]] = []
+    done = asyncio.Event()
+
+    async def on_batch(messages: list[DummyMessage]) -> None:
+        batches.append([m.content for m in messages])
+        if len(batches) == 2:  # noqa: PLR2004
+            done.set()
+
+    consumer = asyncio.create_task(
+        consume_batches(queue, DummyMessage, on_batch, batch_size=2, max_wait=10.0)
+    )
+    messages = await queue.deliver(b"a", b"b", b"c", b"d", b"e")
+    await asyncio.wait_for(done.wait(), TIMEOUT)
+    await _stop(consumer)
+
+    assert batches == [["a", "b"], ["c", "d"]]
+    for message in messages[:4]:
+        message.ack.assert_awaited_once()
+    messages[4].ack.assert_not_awaited()
+    queue.cancel.assert_awaited_once_with("consumer-tag")
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_handed_over_after_max_wait() -> None:
+    """Test that a batch that does not fill up is handed over after max_wait."""
+    queue = FakeQueue()
+    received = asyncio.Event()
+    batches: list[list[str]] = []
+
+    async def on_batch(messages: list[DummyMessage]) -> None:
+        batches.append([m.content for m in messages])
+        received.set()
+
+    consumer = asyncio.create_task(
+        consume_batches(queue, DummyMessage, on_batch, batch_size=10, max_wait=0.01)
+    )
+    messages = await queue.deliver(b"a", b"b")
+    await asyncio.wait_for(received.wait(), TIMEOUT)
+    await _stop(consumer)
+
+    assert batches == [["a", "b"]]
+    for message in messages:
+        message.ack.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_and_undecodable_messages_parked() -> None:
+    """Test that a failing callback retries the batch and bad messages are parked."""
+    queue = FakeQueue()
+    retries = MagicMock(retry=AsyncMock(), park=AsyncMock())
+    called = asyncio.Event()
+
+    async def on_batch(_: list[DummyMessage]) -> None:
+        called.set()
+        raise RuntimeError("database unavailable")
+
+    consumer = asyncio.create_task(
+        consume_batches(
+            queue,
+            DummyMessage,
+            on_batch,
+            batch_size=3,
+            max_wait=1.0,
+            retries=retries,
+        )
+    )
+    good, bad, other = await queue.deliver(b"a", b"", b"b")
+    await asyncio.wait_for(called.wait(), TIMEOUT)
+    await asyncio.sleep(0)
+    await _stop(consumer)
+
+    retries.park.assert_awaited_once_with(bad)
+    assert [c.args[0] for c in retries.retry.await_args_list] == [good, other]
+    for message in (good, other):
+        message.ack.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_invalid_batch_size_is_rejected() -> None:
+    """Test that a batch size below 1 is rejected."""
+    with pytest.raises(ValueError, match="Batch size"):
+        await consume_batches(FakeQueue(), DummyMessage, AsyncMock(), 0, 1.0)
@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import aio_pika
@@ -18,7 +19,7 @@ class DummyMessage(AbstractMessage):
         return self.content.encode()
 
     @classmethod
-    def from_bytes(cls, body: bytes) -> "DummyMessage":
+    def from_bytes(cls, body: bytes, content_type: str | None = None) -> "DummyMessage":
         """Deserialize bytes to an instance of DummyMessage."""
         return cls(content=body.decode())
 
@@ -84,6 +85,7 @@ async def test_publish(
     mock_message_cls.assert_called_once_with(
         body=dummy_message.to_bytes(),
         content_type="application/json",
+        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
     )
 
     mock_publish.assert_awaited_once_with(mock_message_instance, routing_key="")
@@ -111,9 +113,118 @@ async def test_close_closes_channel_and_connection(facade: PubSubFacade) -> None
     facade._connection = AsyncMock()
     facade._connection.is_closed = False
     facade._connection.close = AsyncMock()
+    facade._owns_connection = True
 
     await facade.close()
 
     facade._cancel_consumer_task.assert_awaited_once()
     facade._channel.close.assert_awaited_once()
     facade._connection.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("aio_pika.connect_robust", new_callable=AsyncMock)
+async def test_connect_on_shared_connection(
+    mock_connect: AsyncMock, facade: PubSubFacade
+) -> None:
+    """Test that a shared connection is used for the channel and left open."""
+    connection = AsyncMock()
+    connection.is_closed = False
+    channel = connection.channel.return_value
+    channel.is_closed = False
+
+    await facade.connect(connection)
+    await facade.close()
+
+    mock_connect.assert_not_awaited()
+    connection.channel.assert_awaited_once_with(publisher_confirms=True)
+    channel.declare_exchange.assert_awaited_once_with(
+        facade._exchange_name, aio_pika.ExchangeType.FANOUT, durable=True
+    )
+    channel.close.assert_awaited_once()
+    connection.close.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_publisher_channels_are_used_round_robin() -> None:
+    """Test that extra publisher channels are opened and closed with the facade."""
+    facade = PubSubFacade("amqp://test", "test_exchange", publisher_channels=3)
+    connection = AsyncMock()
+    channels = [AsyncMock(is_closed=False) for _ in range(3)]
+    connection.channel.side_effect = channels
+
+    await facade.connect(connection)
+    exchanges = [facade._publisher_exchange() for _ in range(3)]
+    await facade.close()
+
+    assert len(set(map(id, exchanges))) == len(exchanges)
+    for channel in channels:
+        channel.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_publish_many_bounds_unconfirmed_messages(facade: PubSubFacade) -> None:
+    """Test that publish_many pipelines messages within the unconfirmed window."""
+    in_flight = 0
+    max_in_flight = 0
+    published: list[bytes] = []
+
+    async def publish(message: aio_pika.Message, **_: object) -> None:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        published.append(message.body)
+        in_flight -= 1
+
+    facade._exchange = MagicMock(publish=publish)
+    messages = [DummyMessage(content=str(i)) for i in range(10)]
+
+    failures = await facade.publish_many(messages, max_unconfirmed=3)
+
+    assert failures == [None] * len(messages)
+    assert sorted(published) == sorted(m.to_bytes() for m in messages)
+    assert max_in_flight == 3  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_publish_many_reports_failures_per_message(
+    facade: PubSubFacade,
+) -> None:
+    """Test that a failed message is reported without stopping the others."""
+    error = aio_pika.exceptions.DeliveryError(None, None)
+
+    async def publish(message: aio_pika.Message, **_: object) -> None:
+        if message.body == b"bad":
+            raise error
+
+    facade._exchange = MagicMock(publish=publish)
+
+    failures = await facade.publish_many(
+        [DummyMessage(content="ok"), DummyMessage(content="bad")]
+    )
+
+    assert failures == [None, error]
+
+
+@pytest.mark.asyncio
+async def test_publish_many_raises_if_no_exchange(facade: PubSubFacade) -> None:
+    """Test that publish_many raises RuntimeError if exchange is not initialized."""
+    with pytest.raises(RuntimeError):
+        await facade.publish_many([DummyMessage(content="content")])
+
+
+@pytest.mark.asyncio
+async def test_publish_many_records_metrics(facade: PubSubFacade) -> None:
+    """Test that every message of publish_many is recorded, failed or not."""
+
+    async def publish(message: aio_pika.Message, **_: object) -> None:
+        if message.body == b"bad":
+            raise aio_pika.exceptions.DeliveryError(None, None)
+
+    facade._exchange = MagicMock(publish=publish)
+
+    await facade.publish_many([DummyMessage(content="ok"), DummyMessage(content="bad")])
+
+    assert facade.metrics._published["test_exchange"] == 2  # noqa: PLR2004
+    assert facade.metrics._publish_failures["test_exchange"] == 1
@@ -3,6 +3,12 @@ import { toCamelCase, toSnakeCase } from '@/services/api/util.ts'
 import type { Booking } from '@/types/booking.ts'
 
 const BASE_URL = '/booking/api/v1/bookings'
+const NEXT_CURSOR_HEADER = 'x-next-cursor'
+const IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+
+// A fresh key per call; retries of the same request (e.g. after a token
+// refresh) resend it, so booking-service applies the change only once.
+const idempotent = () => ({ headers: { [IDEMPOTENCY_KEY_HEADER]: crypto.randomUUID() } })
 
 export const bookingService = {
   /**
@@ -12,8 +18,15 @@ export const bookingService = {
    */
   getByTimeRange: async (start: string, end: string): Promise<Booking[]> => {
     console.log(`Fetching bookings from ${start} to ${end}`)
-    const res = await apiClient.get(`${BASE_URL}?start=${start}&end=${end}`)
-    return toCamelCase(res.data)
+    const bookings: Booking[] = []
+    let cursor: string | undefined
+    // The list endpoint is paginated; follow the cursor until the last page.
+    do {
+      const res = await apiClient.get(BASE_URL, { params: { start, end, cursor } })
+      bookings.push(...toCamelCase(res.data))
+      cursor = res.headers[NEXT_CURSOR_HEADER]
+    } while (cursor)
+    return bookings
   },
   getById: (id: string) => apiClient.get(`${BASE_URL}/${id}`).then((res) => res.data),
   /**
@@ -21,7 +34,7 @@ export const bookingService = {
    * @param data Booking data with startTime and endTime as ISO strings
    */
   create: (data: { userId: string; deskId: number; startTime: string; endTime: string }) =>
-    apiClient.post(BASE_URL, toSnakeCase(data)).then((res) => res.data),
+    apiClient.post(BASE_URL, toSnakeCase(data), idempotent()).then((res) => res.data),
   update: (
     id: string,
     data: {
@@ -29,6 +42,6 @@ export const bookingService = {
       startTime?: string
       endTime?: string
     },
-  ) => apiClient.put(`${BASE_URL}/${id}`, toSnakeCase(data)).then((res) => res.data),
+  ) => apiClient.put(`${BASE_URL}/${id}`, toSnakeCase(data), idempotent()).then((res) => res.data),
   delete: (id: string) => apiClient.delete(`${BASE_URL}/${id}`).then((res) => res.data),
 }
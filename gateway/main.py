@@ -1,13 +1,26 @@
 import src.logger_config  # noqa: F401, I001 initialize logging configuration
 import logging
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from src.dependencies.auth import jwks_store
 from src.routers.booking_proxy import router
 from src.routers.desk_integration_proxy import router as desk_integration_router
 from src.routers.occupancy_proxy import router as occupancy_router
 from src.routers.scheduler_proxy import router as scheduler_router
 from src.routers.user_proxy import router as user_router
+from src.utils.admission import UpstreamUnavailable
+from src.utils.coalescer import request_coalescer
+from src.utils.http_client import (
+    METRICS_CONTENT_TYPE,
+    UpstreamSettings,
+    upstream_clients,
+)
+from src.utils.response_cache import CachePolicy, response_cache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,7 +29,71 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="API Gateway")
+upstream_clients.register("booking")
+# Waits on the desk hardware; a small pool, a short queue and a breaker that
+# opens after fewer requests keep a hanging simulator from tying up sockets
+# and workers.
+upstream_clients.register(
+    "desk-integration",
+    UpstreamSettings(
+        max_connections=20,
+        max_keepalive_connections=10,
+        pool_timeout=0.5,
+        max_concurrent_requests=20,
+        max_queued_requests=10,
+        breaker_min_requests=10,
+    ),
+)
+# Polled by every open dashboard, so keep plenty of idle connections for reuse.
+upstream_clients.register(
+    "occupancy", UpstreamSettings(max_connections=100, max_keepalive_connections=100)
+)
+upstream_clients.register(
+    "scheduler", UpstreamSettings(max_connections=20, max_concurrent_requests=20)
+)
+upstream_clients.register("user")
+
+# Exports stream large bodies that are never worth sharing.
+request_coalescer.exclude_route("booking", "/api/v1/bookings/export")
+
+# Polled every few seconds by each open tab; the data is the same for every
+# user, so one upstream request per TTL serves all of them.
+response_cache.add_route(
+    "occupancy",
+    "/api/v1/occupancy",
+    CachePolicy(ttl=2.0, stale_while_revalidate=10.0, shared=True),
+)
+response_cache.add_route(
+    "desk-integration",
+    "/api/v1/desks",
+    CachePolicy(ttl=2.0, stale_while_revalidate=10.0, shared=True),
+)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncGenerator[None, Any]:
+    """Lifespan context manager to handle startup and shutdown events.
+
+    Args:
+        _: FastAPI: The FastAPI application instance.
+
+    Returns:
+        AsyncGenerator[None, Any]: Yields an async generator for lifespan management.
+
+    """
+    logger.info("Opening upstream clients...")
+    upstream_clients.open_all()
+    logger.info("Starting JWKS refresh...")
+    jwks_store.start()
+    yield
+    logger.info("Stopping JWKS refresh...")
+    await jwks_store.stop()
+    await response_cache.close()
+    logger.info("Closing upstream clients...")
+    await upstream_clients.close_all()
+
+
+app = FastAPI(title="API Gateway", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,8 +101,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+
+@app.exception_handler(UpstreamUnavailable)
+async def upstream_unavailable_handler(
+    _: Request, exc: UpstreamUnavailable
+) -> JSONResponse:
+    """Answer requests rejected by a circuit breaker or concurrency limit with 503.
+
+    Args:
+        _: Request: The rejected request.
+        exc (UpstreamUnavailable): The rejection.
+
+    Returns:
+        JSONResponse: 503 with a Retry-After header.
+
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after))},
+    )
+
+
 app.include_router(router)
 app.include_router(desk_integration_router)
 app.include_router(occupancy_router)
@@ -43,3 +143,19 @@ def get_root() -> dict[str, str]:
 def health_check() -> dict[str, str]:
     """Health check endpoint."""
     return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    """Expose the upstream pool, response cache and coalescing metrics to Prometheus.
+
+    Returns:
+        PlainTextResponse: Pool metrics per upstream, cache and coalescing counters.
+
+    """  # noqa: E501
+    return PlainTextResponse(
+        upstream_clients.render_metrics()
+        + response_cache.render_metrics()
+        + request_coalescer.render_metrics(),
+        media_type=METRICS_CONTENT_TYPE,
+    )
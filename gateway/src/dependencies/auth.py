@@ -1,19 +1,16 @@
-import json
 import logging
 import os
-import time
 from typing import Any, Callable
 
-import requests
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt
-from requests import get
 
-logger = logging.getLogger(__name__)
+from src.utils.jwks_store import ALGORITHM, JwksStore
+from src.utils.token_cache import TokenCache
 
-REQUEST_TIMEOUT = 5
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
@@ -29,55 +26,58 @@ if JWKS_URL is None:
 if AUDIENCE is None:
     raise RuntimeError("BOOKING_SERVICE_URL environment variable is not set")
 
-JWKS_CACHE = {"keys": [], "expires_at": 0.0}
-JWKS_TTL = 600  # 10 minutes
+# Keycloak client whose roles are checked by require_role.
+CLIENT_ID = "vue-app"
 
-bearer_scheme = HTTPBearer()
+jwks_store = JwksStore(JWKS_URL)
+token_cache = TokenCache()
 
+bearer_scheme = HTTPBearer()
 
-def get_jwks() -> list:
-    """Fetch JWKS from Keycloak with caching."""
-    now = time.time()
 
-    # Refresh only when cache expired
-    if now >= JWKS_CACHE["expires_at"]:
-        logger.info("Refreshing JWKS")
-        response = requests.get(JWKS_URL, timeout=REQUEST_TIMEOUT)
+class UserClaims(dict[str, Any]):
+    """Verified token claims with the user's client roles precomputed."""
 
-        if response.status_code != status.HTTP_200_OK:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Could not fetch JWKS from Keycloak",
-            )
+    def __init__(self, claims: dict[str, Any]) -> None:
+        """Wrap verified claims.
 
-        JWKS_CACHE["keys"] = response.json().get("keys", [])
-        JWKS_CACHE["expires_at"] = now + JWKS_TTL
+        Args:
+            claims (dict[str, Any]): The claims of the verified token.
 
-    return JWKS_CACHE["keys"]
+        """
+        super().__init__(claims)
+        self.roles = frozenset(
+            claims.get("resource_access", {}).get(CLIENT_ID, {}).get("roles", [])
+        )
 
 
-def get_current_user(
+async def get_current_user(
     token: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-) -> dict[str, Any]:
-    """Return the current user."""
+) -> UserClaims:
+    """Return the claims of the verified bearer token.
+
+    Verified claims are cached until the token expires, so repeated requests
+    with the same token skip the signature verification.
+
+    Args:
+        token (HTTPAuthorizationCredentials): The bearer credentials of the request.
+
+    Returns:
+        UserClaims: The verified claims.
+
+    Raises:
+        HTTPException: 401 if the token is invalid or expired.
+
+    """
     token = token.credentials
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
 
     try:
-        unverified_header = jwt.get_unverified_header(token)
-        jwks = get_jwks()
-
-        # Find the matching public key
-        key = next((k for k in jwks if k["kid"] == unverified_header["kid"]), None)
-        logger.info("Token kid: %s", unverified_header["kid"])
-        logger.info("JWKS kids: %s", [k["kid"] for k in jwks])
-        # If no matching key found → refresh once
-        if not key:
-            logger.info("JWKS mismatch → forcing refresh")
-            JWKS_CACHE["expires_at"] = 0
-            jwks = get_jwks()
-            key = next((k for k in jwks if k["kid"] == unverified_header["kid"]), None)
-
-        if not key:
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = await jwks_store.get_key(kid)
+        if key is None:
             raise HTTPException(
                 status.HTTP_401_UNAUTHORIZED, "Public key not found in JWKS"
             )
@@ -85,35 +85,34 @@ def get_current_user(
         payload = jwt.decode(
             token,
             key,
-            algorithms=["RS256"],
+            algorithms=[ALGORITHM],
             audience=AUDIENCE,
             issuer=KEYCLOAK_ISSUER,
             options={"verify_at_hash": False},
         )
-
-        logger.info("payload: \n%s", json.dumps(payload, indent=4))
-        return payload
-
     except Exception as err:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid or expired token: {str(err)}",
         ) from err
 
+    user = UserClaims(payload)
+    logger.debug("Verified token of user '%s'", user.get("preferred_username"))
+    token_cache.put(token, user)
+    return user
+
 
-def require_role(role: str) -> Callable[[{get}], dict[str, Any]]:
+def require_role(role: str) -> Callable[[dict[str, Any]], dict[str, Any]]:
     """Check if the user has the specified role."""
 
     def role_checker(
         user: dict[str, Any] = Depends(get_current_user),
     ) -> dict[str, Any]:
-        logger.info("user: %s", user)
-        roles = user.get("resource_access", {}).get("vue-app", {}).get("roles", [])
-        logger.info("Roles of logged in user: %s", roles)
+        # Dependency overrides may provide plain claim dicts.
+        roles = user.roles if isinstance(user, UserClaims) else UserClaims(user).roles
         if role not in roles:
             logger.info("Access denied for role: %s", role)
             raise HTTPException(status_code=403, detail="Not enough permissions")
-        logger.info("Access granted for role: %s", role)
         return user
 
     return role_checker
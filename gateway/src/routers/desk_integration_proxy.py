@@ -1,14 +1,10 @@
-import logging
-
 from fastapi import APIRouter, Request, Response
 
 from src.config import DESK_INTEGRATION_SERVICE_URL
-from src.utils.http_client import client
+from src.utils.proxy import proxy_request
 
 router = APIRouter(prefix="/desk-integration")
 
-logger = logging.getLogger(__name__)
-
 
 @router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def proxy_desk_integration(request: Request, path: str) -> Response:
@@ -27,25 +23,4 @@ async def proxy_desk_integration(request: Request, path: str) -> Response:
     url = f"{DESK_INTEGRATION_SERVICE_URL}/{path}"
     if query_string:
         url = f"{url}?{query_string}"
-    logger.info(
-        "Proxying request to Desk Integration Service: \n%s %s", request.method, url
-    )
-
-    body = await request.body()
-    downstream_response = await client.request(
-        method=request.method,
-        url=url,
-        headers=request.headers.raw,
-        content=body,
-    )
-
-    logger.info(
-        "Received response from Desk Integration Service with content: \n%s",
-        downstream_response.content.decode(),
-    )
-    return Response(
-        content=downstream_response.content,
-        status_code=downstream_response.status_code,
-        headers=dict(downstream_response.headers),
-        media_type=downstream_response.headers.get("content-type"),
-    )
+    return await proxy_request(request, url, "desk-integration")
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamUnavailable(Exception):  # noqa: N818
+    """Raised when a request is not sent to an upstream to protect it or the gateway."""
+
+    def __init__(self, upstream: str, reason: str, retry_after: float = 1.0) -> None:
+        """Initialize the exception.
+
+        Args:
+            upstream (str): The upstream name.
+            reason (str): Why the request was rejected.
+            retry_after (float): Seconds after which a retry may succeed.
+
+        """
+        super().__init__(f"Upstream '{upstream}' is unavailable: {reason}")
+        self.upstream = upstream
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class BreakerState(Enum):
+    """State of a circuit breaker, with its value as exported in metrics."""
+
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitBreaker:
+    """Stops sending requests to an upstream that keeps failing or responding slowly.
+
+    Outcomes of the requests in a rolling time window are recorded. Once the
+    window holds at least `min_requests` and the share of failures or of slow
+    calls reaches its threshold, the breaker opens and requests fail fast for
+    `open_duration` seconds. It then lets a single probe through (half-open):
+    success closes the breaker, failure opens it again.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        name: str,
+        window: float = 10.0,
+        min_requests: int = 20,
+        failure_rate: float = 0.5,
+        slow_call_duration: float = 2.0,
+        slow_call_rate: float = 0.8,
+        open_duration: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize a closed breaker.
+
+        Args:
+            name (str): The upstream name, used in log messages.
+            window (float): Seconds of outcomes considered.
+            min_requests (int): Requests in the window needed before the breaker can open.
+            failure_rate (float): Share of failed requests that opens the breaker.
+            slow_call_duration (float): Seconds after which a request counts as slow.
+            slow_call_rate (float): Share of slow requests that opens the breaker.
+            open_duration (float): Seconds requests are rejected before probing.
+            clock (Callable[[], float]): Returns the current time in seconds.
+
+        """  # noqa: E501
+        self.name = name
+        self.window = window
+        self.min_requests = min_requests
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.open_duration = open_duration
+        self._clock = clock
+        self._outcomes: deque[tuple[float, bool, bool]] = deque()
+        self._failures = 0
+        self._slow_calls = 0
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._probe_started_at: float | None = None
+
+    @property
+    def state(self) -> BreakerState:
+        """Get the state, moving from open to half-open once the open period ended."""
+        if (
+            self._state is BreakerState.OPEN
+            and self._clock() - self._opened_at >= self.open_duration
+        ):
+            self._state = BreakerState.HALF_OPEN
+            self._probe_started_at = None
+        return self._state
+
+    def allow(self) -> bool:
+        """Check whether a request may be sent.
+
+        In the half-open state only one probe is let through at a time; a
+        probe without a recorded outcome is replaced after `open_duration`.
+
+        Returns:
+            bool: Whether the request may be sent.
+
+        """
+        state = self.state
+        if state is BreakerState.CLOSED:
+            return True
+        if state is BreakerState.OPEN:
+            return False
+        now = self._clock()
+        if (
+            self._probe_started_at is not None
+            and now - self._probe_started_at < self.open_duration
+        ):
+            return False
+        self._probe_started_at = now
+        return True
+
+    def retry_after(self) -> float:
+        """Return the seconds until the breaker lets a probe through.
+
+        Returns:
+            float: The seconds, at least one.
+
+        """
+        remaining = self.open_duration - (self._clock() - self._opened_at)
+        return max(1.0, math.ceil(remaining))
+
+    def record(self, failed: bool, duration: float) -> None:
+        """Record the outcome of a request.
+
+        Args:
+            failed (bool): Whether the request failed.
+            duration (float): Seconds the request took.
+
+        """
+        state = self.state
+        if state is BreakerState.HALF_OPEN:
+            if failed or duration >= self.slow_call_duration:
+                self._open()
+            else:
+                logger.info("Circuit breaker of '%s' closed", self.name)
+                self._state = BreakerState.CLOSED
+                self._reset_window()
+            return
+        if state is BreakerState.OPEN:
+            return
+
+        now = self._clock()
+        slow = duration >= self.slow_call_duration
+        self._outcomes.append((now, failed, slow))
+        self._failures += failed
+        self._slow_calls += slow
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            _, old_failed, old_slow = self._outcomes.popleft()
+            self._failures -= old_failed
+            self._slow_calls -= old_slow
+        total = len(self._outcomes)
+        if total >= self.min_requests and (
+            self._failures / total >= self.failure_rate
+            or self._slow_calls / total >= self.slow_call_rate
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        """Open the breaker and forget the recorded outcomes."""
+        logger.warning(
+            "Circuit breaker of '%s' opened for %.1f s", self.name, self.open_duration
+        )
+        self._state = BreakerState.OPEN
+        self._opened_at = self._clock()
+        self._probe_started_at = None
+        self._reset_window()
+
+    def _reset_window(self) -> None:
+        """Forget the recorded outcomes."""
+        self._outcomes.clear()
+        self._failures = 0
+        self._slow_calls = 0
+
+
+class ConcurrencyLimiter:
+    """Bounds the requests in flight to an upstream, with a short waiting queue.
+
+    Requests over the limit wait for a free slot, but only up to `max_queued`
+    of them and for at most `queue_timeout` seconds; the rest are rejected at
+    once instead of piling up behind a slow upstream.
+    """
+
+    def __init__(
+        self, name: str, max_concurrent: int, max_queued: int, queue_timeout: float
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            name (str): The upstream name, used in error messages.
+            max_concurrent (int): Maximum requests in flight.
+            max_queued (int): Maximum requests waiting for a slot.
+            queue_timeout (float): Seconds a request waits for a slot.
+
+        """
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.queued = 0
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in the queue if none is free.
+
+        Raises:
+            UpstreamUnavailable: If the queue is full or no slot became free in time.
+
+        """  # noqa: E501
+        if self._semaphore.locked():
+            if self.queued >= self.max_queued:
+                raise UpstreamUnavailable(self.name, "too many concurrent requests")
+            self.queued += 1
+            try:
+                async with asyncio.timeout(self.queue_timeout):
+                    await self._semaphore.acquire()
+            except TimeoutError:
+                raise UpstreamUnavailable(
+                    self.name, "timed out waiting for a free slot"
+                ) from None
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+        self.active += 1
+
+    def release(self) -> None:
+        """Free a slot taken with `acquire`."""
+        self.active -= 1
+        self._semaphore.release()
@@ -0,0 +1,365 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+
+from fastapi import Response
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+COALESCE_MAX_WAITERS = 100
+COALESCE_WAIT_TIMEOUT = 5.0
+COALESCE_MAX_BODY_BYTES = 1024 * 1024
+COALESCED_HEADER = b"x-coalesced"
+
+
+@dataclass(frozen=True)
+class SharedResponse:
+    """A complete upstream response that can be replayed to any number of callers."""
+
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+    def to_response(
+        self, extra_headers: list[tuple[bytes, bytes]] | None = None
+    ) -> Response:
+        """Create a response replaying this one.
+
+        Args:
+            extra_headers (list[tuple[bytes, bytes]] | None): Headers to add.
+
+        Returns:
+            Response: The response, with a Content-Length matching the body.
+
+        """
+        response = Response(self.body, status_code=self.status_code)
+        response.raw_headers = [
+            (name, value)
+            for name, value in self.headers
+            if name.lower() != b"content-length"
+        ]
+        response.raw_headers.append((b"content-length", str(len(self.body)).encode()))
+        response.raw_headers.extend(extra_headers or [])
+        return response
+
+
+@dataclass(frozen=True)
+class UpstreamStream:
+    """An upstream response whose body has not been read yet.
+
+    Attributes:
+        status_code (int): The response status code.
+        headers (list[tuple[bytes, bytes]]): The response headers to forward.
+        chunks (AsyncIterator[bytes]): The raw body chunks.
+        close (Callable[[], Awaitable[None]]): Releases the upstream response.
+        on_complete (Callable[[bytes], None] | None): Called with the body once it was read completely. Setting it makes the body be buffered while it is streamed.
+
+    """  # noqa: E501
+
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    chunks: AsyncIterator[bytes]
+    close: Callable[[], Awaitable[None]]
+    on_complete: Callable[[bytes], None] | None = None
+
+
+Fetch = Callable[[], Awaitable[UpstreamStream]]
+
+
+@dataclass(eq=False)
+class _Flight:
+    """An upstream request in flight and the callers waiting for its response."""
+
+    result: asyncio.Future[SharedResponse | None]
+    waiters: int = field(default=0)
+
+
+class RequestCoalescer:
+    """Joins identical concurrent requests onto one upstream call.
+
+    The first request for a key fetches the response and streams it back to
+    its caller. Requests with the same key arriving before its body started
+    wait for it: the body is then copied while it is streamed, and each
+    waiter gets the copy once it is complete. Without waiters nothing is
+    buffered, and requests arriving once the body is streaming start a new
+    flight. Waiters also fall back to their own request if the body is
+    larger than `max_body_bytes` or takes longer than `wait_timeout`.
+    Requests beyond `max_waiters` do not wait at all. Errors of the shared
+    request are raised to every waiter. Routes registered with
+    `exclude_route`, such as exports, are never coalesced.
+    """
+
+    def __init__(
+        self,
+        max_waiters: int = COALESCE_MAX_WAITERS,
+        wait_timeout: float = COALESCE_WAIT_TIMEOUT,
+        max_body_bytes: int = COALESCE_MAX_BODY_BYTES,
+    ) -> None:
+        """Initialize the coalescer.
+
+        Args:
+            max_waiters (int): Maximum requests waiting for one in-flight request.
+            wait_timeout (float): Seconds a waiter waits before sending its own request.
+            max_body_bytes (int): Maximum size of a response body buffered for sharing.
+
+        """  # noqa: E501
+        self.max_waiters = max_waiters
+        self.wait_timeout = wait_timeout
+        self.max_body_bytes = max_body_bytes
+        self._flights: dict[Hashable, _Flight] = {}
+        self._excluded_routes: list[tuple[str, str]] = []
+        self.leaders = 0
+        self.coalesced = 0
+        self.overflows = 0
+        self.timeouts = 0
+
+    def exclude_route(self, upstream: str, path_prefix: str) -> None:
+        """Never coalesce requests to an upstream whose path starts with a prefix.
+
+        Args:
+            upstream (str): The upstream name.
+            path_prefix (str): The prefix of the upstream URL path, e.g. `/api/v1/bookings/export`.
+
+        """  # noqa: E501
+        self._excluded_routes.append((upstream, path_prefix))
+
+    def is_excluded(self, upstream: str, path: str) -> bool:
+        """Check whether requests to a path must not be coalesced.
+
+        Args:
+            upstream (str): The upstream name.
+            path (str): The upstream URL path.
+
+        Returns:
+            bool: Whether the path matches an excluded route.
+
+        """
+        return any(
+            route_upstream == upstream and path.startswith(path_prefix)
+            for route_upstream, path_prefix in self._excluded_routes
+        )
+
+    async def run(self, key: Hashable, fetch: Fetch) -> Response:
+        """Return the response for a request, sharing an identical one in flight.
+
+        Args:
+            key (Hashable): Identifies identical requests.
+            fetch (Fetch): Sends the request upstream and returns the response
+                once its headers arrived.
+
+        Returns:
+            Response: The response.
+
+        Raises:
+            httpx.HTTPError: If the upstream request failed.
+
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            return await self._lead(key, fetch)
+        if flight.waiters >= self.max_waiters:
+            self.overflows += 1
+            return _StreamedResponse(self, await fetch())
+
+        flight.waiters += 1
+        try:
+            async with asyncio.timeout(self.wait_timeout):
+                shared = await asyncio.shield(flight.result)
+        except TimeoutError:
+            self.timeouts += 1
+            shared = None
+        finally:
+            flight.waiters -= 1
+        if shared is None:
+            return _StreamedResponse(self, await fetch())
+        self.coalesced += 1
+        return shared.to_response([(COALESCED_HEADER, b"1")])
+
+    def render_metrics(self) -> str:
+        """Render the coalescing metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, one sample per line.
+
+        """
+        lines: list[str] = []
+        for name, help_text, value in [
+            (
+                "gateway_coalesce_leaders_total",
+                "Requests sent upstream that others could join.",
+                self.leaders,
+            ),
+            (
+                "gateway_coalesce_coalesced_total",
+                "Requests answered with the response of an identical request.",
+                self.coalesced,
+            ),
+            (
+                "gateway_coalesce_overflows_total",
+                "Requests sent on their own because too many were waiting.",
+                self.overflows,
+            ),
+            (
+                "gateway_coalesce_timeouts_total",
+                "Requests sent on their own after waiting too long.",
+                self.timeouts,
+            ),
+        ]:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    async def _lead(self, key: Hashable, fetch: Fetch) -> Response:
+        """Fetch the response for a key; waiters get a copy once it is streamed.
+
+        Args:
+            key (Hashable): Identifies identical requests.
+            fetch (Fetch): Sends the request upstream.
+
+        Returns:
+            Response: The response, streamed from the upstream.
+
+        Raises:
+            httpx.HTTPError: If the upstream request failed.
+
+        """
+        flight = _Flight(asyncio.get_running_loop().create_future())
+        self._flights[key] = flight
+        self.leaders += 1
+        try:
+            stream = await fetch()
+        except asyncio.CancelledError:
+            # The leader's client went away; waiters send their own requests.
+            self._finish(key, flight, None)
+            raise
+        except Exception as e:
+            flight.result.set_exception(e)
+            # Mark the exception as retrieved when nobody is waiting for it.
+            flight.result.exception()
+            self._finish(key, flight, None)
+            raise
+        return _StreamedResponse(self, stream, key, flight)
+
+    def _finish(
+        self, key: Hashable, flight: _Flight, shared: SharedResponse | None
+    ) -> None:
+        """Hand the outcome of a flight to its waiters and forget the flight.
+
+        Args:
+            key (Hashable): The key of the flight.
+            flight (_Flight): The flight.
+            shared (SharedResponse | None): The complete response, or None if
+                waiters have to send their own requests.
+
+        """
+        if not flight.result.done():
+            flight.result.set_result(shared)
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+class _StreamedResponse(StreamingResponse):
+    """Streams an upstream response, copying the body for waiters or the cache.
+
+    The upstream response is released and the flight finished even if the
+    client disconnects, or the body is never iterated.
+    """
+
+    def __init__(
+        self,
+        coalescer: RequestCoalescer,
+        stream: UpstreamStream,
+        key: Hashable = None,
+        flight: _Flight | None = None,
+    ) -> None:
+        """Initialize the response.
+
+        Args:
+            coalescer (RequestCoalescer): The coalescer the flight belongs to.
+            stream (UpstreamStream): The upstream response.
+            key (Hashable): The key of the flight.
+            flight (_Flight | None): The flight led by this response, if any.
+
+        """
+        self._coalescer = coalescer
+        self._stream = stream
+        self._key = key
+        self._flight = flight
+        self._closed = False
+        super().__init__(self._body(), status_code=stream.status_code)
+        self.raw_headers = list(stream.headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Send the response, cleaning up however sending ends."""
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self._close()
+            self._finish(None)
+
+    async def _body(self) -> AsyncIterator[bytes]:
+        """Yield the body, buffering a copy while anyone needs it.
+
+        Whether to buffer is decided at the first chunk: only if the body is
+        to be cached or waiters joined meanwhile. Otherwise the flight ends
+        there, and later identical requests start their own.
+
+        Yields:
+            bytes: The raw body chunks.
+
+        """
+        copy: bytearray | None = bytearray()
+        started = False
+        try:
+            async for chunk in self._stream.chunks:
+                if not started:
+                    started = True
+                    if self._stream.on_complete is None and not (
+                        self._flight and self._flight.waiters
+                    ):
+                        copy = None
+                        self._finish(None)
+                if copy is not None:
+                    copy += chunk
+                    if len(copy) > self._coalescer.max_body_bytes:
+                        copy = None
+                        self._finish(None)
+                yield chunk
+            await self._close()
+            if copy is not None:
+                body = bytes(copy)
+                if self._stream.on_complete:
+                    try:
+                        self._stream.on_complete(body)
+                    except Exception:
+                        logger.exception("Handling a complete response failed")
+                self._finish(
+                    SharedResponse(self._stream.status_code, self._stream.headers, body)
+                )
+        finally:
+            await self._close()
+            self._finish(None)
+
+    async def _close(self) -> None:
+        """Release the upstream response, once."""
+        if not self._closed:
+            self._closed = True
+            await self._stream.close()
+
+    def _finish(self, shared: SharedResponse | None) -> None:
+        """Finish the flight led by this response, if any.
+
+        Args:
+            shared (SharedResponse | None): The complete response, or None if
+                waiters have to send their own requests.
+
+        """
+        if self._flight is not None:
+            self._coalescer._finish(self._key, self._flight, shared)  # noqa: SLF001
+
+
+request_coalescer = RequestCoalescer()
@@ -1,3 +1,432 @@
+import importlib.util
+import logging
+import os
+import time
+from dataclasses import dataclass, fields, replace
+from typing import Any
+
 import httpx
 
-client = httpx.AsyncClient(timeout=5.0, follow_redirects=True)
+from src.utils.admission import (
+    CircuitBreaker,
+    ConcurrencyLimiter,
+    UpstreamUnavailable,
+)
+
+logger = logging.getLogger(__name__)
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@dataclass(frozen=True)
+class UpstreamSettings:
+    """Connection pool and timeout settings of the client for one upstream.
+
+    Attributes:
+        max_connections (int): Maximum open connections to the upstream.
+        max_keepalive_connections (int): Maximum idle connections kept open for reuse.
+        keepalive_expiry (float): Seconds an idle connection is kept open.
+        connect_timeout (float): Seconds to establish a connection.
+        read_timeout (float): Seconds to wait for each chunk of the response, and to send each chunk of the request.
+        pool_timeout (float): Seconds to wait for a free connection once all are in use.
+        http2 (bool): Whether to negotiate HTTP/2. Needs the `h2` package.
+        max_concurrent_requests (int): Maximum requests in flight before further ones queue.
+        max_queued_requests (int): Maximum requests waiting for a free slot; more are rejected.
+        queue_timeout (float): Seconds a request waits for a free slot before it is rejected.
+        breaker_window (float): Seconds of request outcomes the circuit breaker considers.
+        breaker_min_requests (int): Requests in the window needed before the breaker can open.
+        breaker_failure_rate (float): Share of failed requests (errors and 5xx) that opens the breaker.
+        breaker_slow_call_duration (float): Seconds until response headers after which a request counts as slow.
+        breaker_slow_call_rate (float): Share of slow requests that opens the breaker.
+        breaker_open_duration (float): Seconds requests are rejected before the breaker probes the upstream.
+
+    """  # noqa: E501
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 50
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 2.0
+    read_timeout: float = 5.0
+    pool_timeout: float = 1.0
+    http2: bool = False
+    max_concurrent_requests: int = 100
+    max_queued_requests: int = 50
+    queue_timeout: float = 0.5
+    breaker_window: float = 10.0
+    breaker_min_requests: int = 20
+    breaker_failure_rate: float = 0.5
+    breaker_slow_call_duration: float = 2.0
+    breaker_slow_call_rate: float = 0.8
+    breaker_open_duration: float = 5.0
+
+    def with_env_overrides(self, name: str) -> "UpstreamSettings":
+        """Return a copy with fields overridden by environment variables.
+
+        The variables are named `UPSTREAM_<NAME>_<FIELD>`, e.g.
+        `UPSTREAM_DESK_INTEGRATION_READ_TIMEOUT=10`.
+
+        Args:
+            name (str): The upstream name.
+
+        Returns:
+            UpstreamSettings: The settings with the overrides applied.
+
+        Raises:
+            ValueError: If a variable is not a valid value for its field.
+
+        """
+        prefix = f"UPSTREAM_{name.upper().replace('-', '_')}_"
+        overrides: dict[str, Any] = {}
+        for field in fields(self):
+            raw = os.getenv(prefix + field.name.upper())
+            if raw is None:
+                continue
+            if field.type in (bool, "bool"):
+                overrides[field.name] = raw.strip().lower() in ("1", "true", "yes")
+            elif field.type in (int, "int"):
+                overrides[field.name] = int(raw)
+            else:
+                overrides[field.name] = float(raw)
+        return replace(self, **overrides)
+
+
+class Upstream:
+    """HTTP client for one upstream service, with its own connection pool.
+
+    Tracks requests holding a connection, from sending until the response is
+    released, so pool utilisation and connection reuse can be monitored.
+    Requests pass a circuit breaker and a concurrency limiter first, which
+    reject them with `UpstreamUnavailable` while the upstream is failing or
+    saturated.
+    """
+
+    def __init__(self, name: str, settings: UpstreamSettings) -> None:
+        """Initialize the upstream without opening its client.
+
+        Args:
+            name (str): The upstream name, used as metrics label.
+            settings (UpstreamSettings): The pool and timeout settings.
+
+        """
+        self.name = name
+        self.settings = settings
+        self.client: httpx.AsyncClient | None = None
+        self.breaker = CircuitBreaker(
+            name,
+            window=settings.breaker_window,
+            min_requests=settings.breaker_min_requests,
+            failure_rate=settings.breaker_failure_rate,
+            slow_call_duration=settings.breaker_slow_call_duration,
+            slow_call_rate=settings.breaker_slow_call_rate,
+            open_duration=settings.breaker_open_duration,
+        )
+        self.limiter: ConcurrencyLimiter | None = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.pool_timeouts = 0
+        self.connections_opened = 0
+        self.rejections = {"circuit_open": 0, "saturated": 0}
+
+    def open(self) -> None:
+        """Create the client and its connection pool."""
+        if self.client is not None:
+            return
+        self.limiter = ConcurrencyLimiter(
+            self.name,
+            self.settings.max_concurrent_requests,
+            self.settings.max_queued_requests,
+            self.settings.queue_timeout,
+        )
+        http2 = self.settings.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning(
+                "HTTP/2 requested for upstream '%s' but h2 is not installed, "
+                "using HTTP/1.1",
+                self.name,
+            )
+            http2 = False
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.settings.max_connections,
+                max_keepalive_connections=self.settings.max_keepalive_connections,
+                keepalive_expiry=self.settings.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                self.settings.read_timeout,
+                connect=self.settings.connect_timeout,
+                pool=self.settings.pool_timeout,
+            ),
+            http2=http2,
+            follow_redirects=True,
+        )
+
+    async def close(self) -> None:
+        """Close the client and all pooled connections."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def build_request(self, **kwargs: Any) -> httpx.Request:  # noqa: ANN401
+        """Build a request with the client's defaults.
+
+        Args:
+            **kwargs (Any): Passed on to `httpx.AsyncClient.build_request`.
+
+        Returns:
+            httpx.Request: The request.
+
+        Raises:
+            RuntimeError: If the client is not open.
+
+        """
+        return self._client().build_request(**kwargs)
+
+    async def send(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, streaming the response.
+
+        The connection and the concurrency slot stay in use until `release` is
+        called with the response. Errors and 5xx responses count as failures
+        for the circuit breaker.
+
+        Args:
+            request (httpx.Request): The request.
+
+        Returns:
+            httpx.Response: The response, with its body not read yet.
+
+        Raises:
+            httpx.HTTPError: If the request failed.
+            UpstreamUnavailable: If the circuit breaker is open or the
+                concurrency limit and its queue are exhausted.
+            RuntimeError: If the client is not open.
+
+        """
+        client = self._client()
+        if not self.breaker.allow():
+            self.rejections["circuit_open"] += 1
+            raise UpstreamUnavailable(
+                self.name, "circuit breaker is open", self.breaker.retry_after()
+            )
+        try:
+            await self.limiter.acquire()
+        except UpstreamUnavailable:
+            self.rejections["saturated"] += 1
+            raise
+
+        request.extensions["trace"] = self._trace
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.monotonic()
+        try:
+            response = await client.send(request, stream=True)
+        except BaseException as e:
+            if isinstance(e, httpx.PoolTimeout):
+                self.pool_timeouts += 1
+            elif isinstance(e, httpx.HTTPError):
+                self.errors += 1
+                self.breaker.record(True, time.monotonic() - started)
+            self.in_flight -= 1
+            self.limiter.release()
+            raise
+        self.breaker.record(
+            response.status_code >= httpx.codes.INTERNAL_SERVER_ERROR,
+            time.monotonic() - started,
+        )
+        return response
+
+    async def release(self, response: httpx.Response) -> None:
+        """Close a response returned by `send`, returning its connection to the pool.
+
+        Args:
+            response (httpx.Response): The response.
+
+        """  # noqa: E501
+        try:
+            await response.aclose()
+        finally:
+            self.in_flight -= 1
+            self.limiter.release()
+
+    @property
+    def utilisation(self) -> float:
+        """Get the share of the connection limit currently in use."""
+        return self.in_flight / self.settings.max_connections
+
+    def _client(self) -> httpx.AsyncClient:
+        """Return the open client.
+
+        Raises:
+            RuntimeError: If the client is not open.
+
+        """
+        if self.client is None:
+            raise RuntimeError(f"Client for upstream '{self.name}' is not open")
+        return self.client
+
+    async def _trace(self, event: str, _: dict[str, Any]) -> None:
+        """Count new connections from httpcore's trace events.
+
+        Args:
+            event (str): The trace event name.
+            _ (dict[str, Any]): The event details.
+
+        """
+        if event == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+
+class UpstreamClients:
+    """Registry of the clients of all upstream services.
+
+    Each upstream has its own connection pool, so a slow upstream exhausting
+    its connections does not delay requests to the others. The clients are
+    opened and closed with the application lifespan.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._upstreams: dict[str, Upstream] = {}
+
+    def register(self, name: str, settings: UpstreamSettings | None = None) -> Upstream:
+        """Register an upstream, applying environment overrides to its settings.
+
+        Args:
+            name (str): The upstream name.
+            settings (UpstreamSettings | None): The settings; defaults if omitted.
+
+        Returns:
+            Upstream: The registered upstream.
+
+        Raises:
+            ValueError: If the upstream is already registered.
+
+        """
+        if name in self._upstreams:
+            raise ValueError(f"Upstream '{name}' is already registered")
+        settings = (settings or UpstreamSettings()).with_env_overrides(name)
+        self._upstreams[name] = Upstream(name, settings)
+        return self._upstreams[name]
+
+    def get(self, name: str) -> Upstream:
+        """Return a registered upstream.
+
+        Args:
+            name (str): The upstream name.
+
+        Returns:
+            Upstream: The upstream.
+
+        Raises:
+            KeyError: If the upstream is not registered.
+
+        """
+        return self._upstreams[name]
+
+    def open_all(self) -> None:
+        """Open the clients of all upstreams."""
+        for upstream in self._upstreams.values():
+            upstream.open()
+            logger.info(
+                "Opened client for upstream '%s': %s", upstream.name, upstream.settings
+            )
+
+    async def close_all(self) -> None:
+        """Close the clients of all upstreams."""
+        for upstream in self._upstreams.values():
+            await upstream.close()
+
+    def render_metrics(self) -> str:
+        """Render the pool metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, one sample per line.
+
+        """
+        lines: list[str] = []
+        for name, kind, help_text, value_of in [
+            (
+                "gateway_upstream_requests_total",
+                "counter",
+                "Requests sent to the upstream.",
+                lambda u: u.requests,
+            ),
+            (
+                "gateway_upstream_errors_total",
+                "counter",
+                "Requests that failed without a response, excluding pool timeouts.",
+                lambda u: u.errors,
+            ),
+            (
+                "gateway_upstream_pool_timeouts_total",
+                "counter",
+                "Requests that timed out waiting for a free connection.",
+                lambda u: u.pool_timeouts,
+            ),
+            (
+                "gateway_upstream_connections_opened_total",
+                "counter",
+                "New connections opened; the rest of the requests reused one.",
+                lambda u: u.connections_opened,
+            ),
+            (
+                "gateway_upstream_in_flight",
+                "gauge",
+                "Requests currently holding a connection.",
+                lambda u: u.in_flight,
+            ),
+            (
+                "gateway_upstream_in_flight_peak",
+                "gauge",
+                "Most requests that held a connection at the same time.",
+                lambda u: u.peak_in_flight,
+            ),
+            (
+                "gateway_upstream_max_connections",
+                "gauge",
+                "Connection limit of the upstream's pool.",
+                lambda u: u.settings.max_connections,
+            ),
+            (
+                "gateway_upstream_pool_utilisation",
+                "gauge",
+                "Share of the connection limit currently in use.",
+                lambda u: u.utilisation,
+            ),
+            (
+                "gateway_upstream_queued",
+                "gauge",
+                "Requests waiting for a free concurrency slot.",
+                lambda u: u.limiter.queued if u.limiter else 0,
+            ),
+            (
+                "gateway_upstream_breaker_state",
+                "gauge",
+                "Circuit breaker state: 0 closed, 1 open, 2 half-open.",
+                lambda u: u.breaker.state.value,
+            ),
+            (
+                "gateway_upstream_rejected_circuit_open_total",
+                "counter",
+                "Requests rejected because the circuit breaker was open.",
+                lambda u: u.rejections["circuit_open"],
+            ),
+            (
+                "gateway_upstream_rejected_saturated_total",
+                "counter",
+                "Requests rejected because the concurrency limit and queue were full.",
+                lambda u: u.rejections["saturated"],
+            ),
+        ]:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for upstream_name, upstream in sorted(self._upstreams.items()):
+                lines.append(
+                    f'{name}{{upstream="{upstream_name}"}} {value_of(upstream)}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+upstream_clients = UpstreamClients()
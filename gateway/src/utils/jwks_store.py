@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+
+import httpx
+from jose import jwk
+from jose.backends.base import Key
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = "RS256"
+REQUEST_TIMEOUT = 5
+JWKS_TTL = 600  # 10 minutes
+# Keys are refreshed in the background this many seconds before they expire.
+JWKS_REFRESH_MARGIN = 60
+# An unknown kid triggers at most one refresh in this many seconds, so tokens
+# with made-up kids cannot flood Keycloak.
+JWKS_MIN_REFRESH_INTERVAL = 10
+# Delay before retrying a failed background refresh.
+JWKS_RETRY_INTERVAL = 5
+
+
+class JwksStore:
+    """Signing keys of Keycloak's JWKS endpoint, kept fresh without blocking requests.
+
+    Keys are parsed into jose key objects once per fetch and looked up by kid.
+    A background task refreshes them shortly before they expire. Requests only
+    wait for a fetch when no keys are loaded yet or their token's kid is unknown,
+    and concurrent requests then share a single in-flight fetch.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        jwks_url: str,
+        ttl: float = JWKS_TTL,
+        refresh_margin: float = JWKS_REFRESH_MARGIN,
+        min_refresh_interval: float = JWKS_MIN_REFRESH_INTERVAL,
+        retry_interval: float = JWKS_RETRY_INTERVAL,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        """Initialize an empty store.
+
+        Args:
+            jwks_url (str): The JWKS endpoint of the Keycloak realm.
+            ttl (float): Seconds fetched keys are used for.
+            refresh_margin (float): Seconds before expiry the background refresh runs.
+            min_refresh_interval (float): Minimum seconds between fetches caused by unknown kids.
+            retry_interval (float): Seconds before a failed background refresh is retried.
+            client (httpx.AsyncClient | None): The client keys are fetched with. If
+                omitted, the store creates its own and closes it in `stop`.
+
+        """  # noqa: E501
+        self._jwks_url = jwks_url
+        self._ttl = ttl
+        self._refresh_margin = refresh_margin
+        self._min_refresh_interval = min_refresh_interval
+        self._retry_interval = retry_interval
+        self._client = client
+        self._owns_client = client is None
+        self._keys: dict[str, Key] = {}
+        self._expires_at = 0.0
+        self._fetched_at = float("-inf")
+        self._fetch: asyncio.Task | None = None
+        self._refresher: asyncio.Task | None = None
+
+    async def get_key(self, kid: str) -> Key | None:
+        """Return the signing key with the given kid.
+
+        Fetches the keys if none are loaded or they expired; expired keys stay
+        in use if that fetch fails. An unknown kid, e.g. after Keycloak rotated
+        its keys, causes one more fetch unless the keys were fetched moments ago.
+
+        Args:
+            kid (str): The key ID from the token header.
+
+        Returns:
+            Key | None: The key, or None if Keycloak does not have it.
+
+        Raises:
+            httpx.HTTPError: If no keys were loaded and the fetch failed.
+
+        """
+        if not self._keys:
+            await self.refresh()
+        elif time.monotonic() >= self._expires_at:
+            try:
+                await self.refresh()
+            except httpx.HTTPError as e:
+                logger.warning("JWKS refresh failed, using expired keys: %s", e)
+        if kid not in self._keys and (
+            time.monotonic() - self._fetched_at >= self._min_refresh_interval
+        ):
+            logger.info("Unknown kid '%s', refreshing JWKS", kid)
+            await self.refresh()
+        return self._keys.get(kid)
+
+    async def refresh(self) -> None:
+        """Fetch the keys, joining the fetch already in flight if there is one.
+
+        Raises:
+            httpx.HTTPError: If the fetch failed.
+
+        """
+        if self._fetch is None or self._fetch.done():
+            self._fetch = asyncio.create_task(self._fetch_keys())
+        # Shielded, so a cancelled request does not cancel the shared fetch.
+        await asyncio.shield(self._fetch)
+
+    def start(self) -> None:
+        """Start refreshing the keys in the background."""
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        """Stop the background refresh and any fetch in flight.
+
+        A client created by the store is closed; the next fetch creates a new one.
+        """
+        for task in (self._refresher, self._fetch):
+            if task is not None and not task.done():
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        self._refresher = None
+        self._fetch = None
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _fetch_keys(self) -> None:
+        """Fetch the JWKS and replace the keys with the parsed signing keys.
+
+        Raises:
+            httpx.HTTPError: If the request failed.
+
+        """
+        logger.info("Refreshing JWKS")
+        self._fetched_at = time.monotonic()
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT)
+        response = await self._client.get(self._jwks_url)
+        response.raise_for_status()
+        keys: dict[str, Key] = {}
+        for key_data in response.json().get("keys", []):
+            if key_data.get("use", "sig") != "sig" or "kid" not in key_data:
+                continue
+            try:
+                keys[key_data["kid"]] = jwk.construct(
+                    key_data, algorithm=key_data.get("alg", ALGORITHM)
+                )
+            except Exception as e:
+                logger.warning("Skipping JWKS key '%s': %s", key_data["kid"], e)
+        self._keys = keys
+        self._expires_at = time.monotonic() + self._ttl
+
+    async def _refresh_periodically(self) -> None:
+        """Refresh the keys shortly before they expire, retrying failures."""
+        while True:
+            delay = self._expires_at - self._refresh_margin - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("Background JWKS refresh failed: %s", e)
+                await asyncio.sleep(self._retry_interval)
+
+    @property
+    def kids(self) -> list[str]:
+        """Get the kids of the loaded keys."""
+        return list(self._keys)
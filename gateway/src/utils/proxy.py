@@ -0,0 +1,452 @@
+import logging
+from functools import partial
+from typing import Any, AsyncIterator, Callable
+
+import httpx
+from fastapi import Request, Response, status
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from src.utils.coalescer import SharedResponse, UpstreamStream, request_coalescer
+from src.utils.http_client import Upstream, upstream_clients
+from src.utils.response_cache import (
+    CACHE_HEADER,
+    CachedResponse,
+    CacheKey,
+    CachePolicy,
+    CacheState,
+    response_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+# Headers describing a single connection, which must not be forwarded (RFC 9110).
+HOP_BY_HOP_HEADERS = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "proxy-connection",
+        "te",
+        "trailer",
+        "transfer-encoding",
+        "upgrade",
+    }
+)
+# Headers making a response depend on the caller's validators (RFC 9110).
+CONDITIONAL_HEADERS = frozenset(
+    {
+        "if-match",
+        "if-none-match",
+        "if-modified-since",
+        "if-unmodified-since",
+        "if-range",
+    }
+)
+# Bytes of each request and response body logged at DEBUG level.
+DEBUG_BODY_LIMIT = 1024
+
+
+def forwarded_headers(headers: list[tuple[bytes, bytes]]) -> list[tuple[bytes, bytes]]:
+    """Remove hop-by-hop headers, including those listed in `Connection`.
+
+    Args:
+        headers (list[tuple[bytes, bytes]]): Raw header pairs.
+
+    Returns:
+        list[tuple[bytes, bytes]]: The header pairs to forward, in their original order.
+
+    """  # noqa: E501
+    excluded = set(HOP_BY_HOP_HEADERS)
+    for name, value in headers:
+        if name.lower() == b"connection":
+            excluded.update(
+                token.strip().lower() for token in value.decode("latin-1").split(",")
+            )
+    return [
+        (name, value)
+        for name, value in headers
+        if name.decode("latin-1").lower() not in excluded
+    ]
+
+
+async def sample_body(
+    chunks: AsyncIterator[bytes], description: str
+) -> AsyncIterator[bytes]:
+    """Pass body chunks through, logging the start of the body at DEBUG level.
+
+    At most `DEBUG_BODY_LIMIT` bytes are kept for logging, and none unless DEBUG
+    logging is enabled, so large bodies are never held in memory.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The body chunks.
+        description (str): Describes the body in the log message.
+
+    Yields:
+        bytes: The unchanged chunks.
+
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        async for chunk in chunks:
+            yield chunk
+        return
+    sample = bytearray()
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if len(sample) < DEBUG_BODY_LIMIT:
+            sample += chunk[: DEBUG_BODY_LIMIT - len(sample)]
+        yield chunk
+    logger.debug(
+        "%s (%d bytes): %r%s",
+        description,
+        size,
+        bytes(sample),
+        "..." if size > len(sample) else "",
+    )
+
+
+class UpstreamResponse(StreamingResponse):
+    """Streams the raw body of an upstream response back to the client.
+
+    The upstream response is released once sending ends, however it ends: also
+    if the client disconnects before the body was iterated at all. That
+    returns the connection to the pool and the upstream's concurrency slot.
+    """
+
+    def __init__(self, upstream: Upstream, upstream_response: httpx.Response) -> None:
+        """Initialize the response.
+
+        Args:
+            upstream (Upstream): The upstream the response came from.
+            upstream_response (httpx.Response): The streamed upstream response.
+
+        """
+        self._upstream = upstream
+        self._upstream_response = upstream_response
+        self._released = False
+        super().__init__(self._body(), status_code=upstream_response.status_code)
+        self.raw_headers = forwarded_headers(upstream_response.headers.raw)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Send the response, releasing the upstream response afterwards."""
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self._release()
+
+    async def _body(self) -> AsyncIterator[bytes]:
+        """Yield the body and release the upstream response once it was read.
+
+        Yields:
+            bytes: The body chunks, still content-encoded.
+
+        """
+        chunks = sample_body(
+            self._upstream_response.aiter_raw(),
+            f"Response body from {self._upstream.name}",
+        )
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await self._release()
+
+    async def _release(self) -> None:
+        """Release the upstream response, once."""
+        if not self._released:
+            self._released = True
+            await self._upstream.release(self._upstream_response)
+
+
+def is_conditional(request: Request) -> bool:
+    """Check whether a request carries conditional headers.
+
+    Such requests are not coalesced, as the response, e.g. a 304, is only
+    valid for the caller's own validators.
+
+    Args:
+        request (Request): The incoming FastAPI request.
+
+    Returns:
+        bool: Whether any conditional header is present.
+
+    """
+    return any(name in request.headers for name in CONDITIONAL_HEADERS)
+
+
+def is_cacheable(response: httpx.Response, policy: CachePolicy) -> bool:
+    """Check whether an upstream response may be stored in the cache.
+
+    Args:
+        response (httpx.Response): The upstream response.
+        policy (CachePolicy): The policy of the route.
+
+    Returns:
+        bool: True for successful responses the upstream did not mark as
+            uncacheable and that set no cookies.
+
+    """
+    if response.status_code != status.HTTP_200_OK:
+        return False
+    if "set-cookie" in response.headers or response.headers.get("vary") == "*":
+        return False
+    directives = {
+        directive.strip().split("=")[0].lower()
+        for directive in response.headers.get("cache-control", "").split(",")
+    }
+    if directives & {"no-store", "no-cache"}:
+        return False
+    return not (policy.shared and "private" in directives)
+
+
+def cache_scope(request: Request, user: dict[str, Any] | None) -> str:
+    """Identify who may be served a response cached for a request.
+
+    Args:
+        request (Request): The incoming FastAPI request.
+        user (dict[str, Any] | None): The claims of the authenticated user.
+
+    Returns:
+        str: The user's subject, or the Authorization header on routes without
+            authentication.
+
+    """
+    if user and user.get("sub"):
+        return f"sub:{user['sub']}"
+    return f"authorization:{request.headers.get('authorization', '')}"
+
+
+def cached_response(entry: CachedResponse, state: CacheState) -> Response:
+    """Replay a cached response.
+
+    Args:
+        entry (CachedResponse): The cached response.
+        state (CacheState): How the response is served, for the X-Cache header.
+
+    Returns:
+        Response: The response.
+
+    """
+    return SharedResponse(entry.status_code, entry.headers, entry.body).to_response(
+        [
+            (b"age", str(response_cache.age(entry)).encode()),
+            (CACHE_HEADER, state.value.encode()),
+        ]
+    )
+
+
+async def forward(
+    upstream: Upstream,
+    request: Request,
+    url: str,
+) -> UpstreamResponse:
+    """Send a request upstream and stream the response back.
+
+    Args:
+        upstream (Upstream): The upstream.
+        request (Request): The incoming FastAPI request.
+        url (str): The upstream URL, including the query string.
+
+    Returns:
+        UpstreamResponse: The upstream response.
+
+    Raises:
+        httpx.HTTPError: If the upstream request failed.
+
+    """
+    has_body = (
+        "content-length" in request.headers or "transfer-encoding" in request.headers
+    )
+    upstream_request = upstream.build_request(
+        method=request.method,
+        url=url,
+        headers=forwarded_headers(request.headers.raw),
+        content=sample_body(request.stream(), f"Request body to {upstream.name}")
+        if has_body
+        else None,
+    )
+    upstream_response = await upstream.send(upstream_request)
+    logger.info(
+        "Received response from %s: %d", upstream.name, upstream_response.status_code
+    )
+
+    return UpstreamResponse(upstream, upstream_response)
+
+
+async def open_get(
+    upstream: Upstream,
+    url: str,
+    headers: list[tuple[bytes, bytes]],
+    on_complete: Callable[[httpx.Response, bytes], None] | None = None,
+) -> UpstreamStream:
+    """Send a GET request upstream and return the response once its headers arrived.
+
+    Args:
+        upstream (Upstream): The upstream.
+        url (str): The upstream URL, including the query string.
+        headers (list[tuple[bytes, bytes]]): The headers to send.
+        on_complete (Callable[[httpx.Response, bytes], None] | None): Called with
+            the upstream response and its body once it was read completely.
+
+    Returns:
+        UpstreamStream: The response, with its body still to be streamed.
+
+    Raises:
+        httpx.HTTPError: If the upstream request failed.
+
+    """  # noqa: E501
+    upstream_response = await upstream.send(
+        upstream.build_request(method="GET", url=url, headers=headers)
+    )
+    logger.info(
+        "Received response from %s: %d", upstream.name, upstream_response.status_code
+    )
+    return UpstreamStream(
+        upstream_response.status_code,
+        forwarded_headers(upstream_response.headers.raw),
+        sample_body(
+            upstream_response.aiter_raw(), f"Response body from {upstream.name}"
+        ),
+        partial(upstream.release, upstream_response),
+        partial(on_complete, upstream_response) if on_complete else None,
+    )
+
+
+async def refresh_cached(
+    upstream: Upstream,
+    url: str,
+    headers: list[tuple[bytes, bytes]],
+    key: CacheKey,
+    policy: CachePolicy,
+) -> None:
+    """Fetch a GET response again and replace its cache entry.
+
+    Args:
+        upstream (Upstream): The upstream.
+        url (str): The upstream URL, including the query string.
+        headers (list[tuple[bytes, bytes]]): The headers of the original request.
+        key (CacheKey): The cache key of the response.
+        policy (CachePolicy): The policy of the route.
+
+    Raises:
+        httpx.HTTPError: If the upstream request failed.
+
+    """
+    generation = response_cache.generation(upstream.name)
+    upstream_response = await upstream.send(
+        upstream.build_request(method="GET", url=url, headers=headers)
+    )
+    body = bytearray()
+    try:
+        async for chunk in upstream_response.aiter_raw():
+            body += chunk
+            if len(body) > response_cache.max_entry_bytes:
+                return
+    finally:
+        await upstream.release(upstream_response)
+    store_response(key, policy, generation, upstream_response, bytes(body))
+
+
+def store_response(
+    key: CacheKey,
+    policy: CachePolicy,
+    generation: int,
+    upstream_response: httpx.Response,
+    body: bytes,
+) -> None:
+    """Store an upstream response in the cache if it is cacheable.
+
+    Args:
+        key (CacheKey): The cache key.
+        policy (CachePolicy): The policy of the route.
+        generation (int): The upstream's cache generation when the fetch started.
+        upstream_response (httpx.Response): The upstream response.
+        body (bytes): Its complete raw body.
+
+    """
+    if is_cacheable(upstream_response, policy):
+        response_cache.put(
+            key,
+            upstream_response.status_code,
+            forwarded_headers(upstream_response.headers.raw),
+            body,
+            generation,
+        )
+
+
+async def proxy_request(
+    request: Request,
+    url: str,
+    upstream_name: str,
+    user: dict[str, Any] | None = None,
+) -> Response:
+    """Forward a request to an upstream service, streaming both bodies.
+
+    The request body is sent upstream as it arrives and the response body is
+    passed back to the client chunk by chunk, still content-encoded, so neither
+    is buffered in the gateway. GET requests to routes configured in
+    `response_cache` are answered from the cache while the cached response is
+    fresh; stale responses are served while they are refreshed in the
+    background. Cacheable responses carry an X-Cache header. Other methods
+    drop the cached responses of the upstream. Identical concurrent GET
+    requests share one upstream request through `request_coalescer`, except
+    on routes it excludes, such as exports, and for conditional requests.
+
+    Args:
+        request (Request): The incoming FastAPI request.
+        url (str): The upstream URL, including the query string.
+        upstream_name (str): The name of the upstream in `upstream_clients`.
+        user (dict[str, Any] | None): The claims of the authenticated user, which
+            scope cached and shared responses.
+
+    Returns:
+        Response: The upstream response.
+
+    Raises:
+        httpx.HTTPError: If the upstream request failed.
+
+    """
+    upstream = upstream_clients.get(upstream_name)
+    logger.info("Proxying request to %s: %s %s", upstream.name, request.method, url)
+    if request.method != "GET":
+        response_cache.invalidate(upstream.name)
+        return await forward(upstream, request, url)
+    if "content-length" in request.headers or "transfer-encoding" in request.headers:
+        return await forward(upstream, request, url)
+
+    path = httpx.URL(url).path
+    if request_coalescer.is_excluded(upstream.name, path):
+        return await forward(upstream, request, url)
+
+    policy = response_cache.policy_for(upstream.name, path)
+    key = response_cache.key(
+        upstream.name,
+        url,
+        "" if policy and policy.shared else cache_scope(request, user),
+        request.headers.get("accept-encoding", ""),
+    )
+    headers = forwarded_headers(request.headers.raw)
+    on_complete = None
+    if policy is not None:
+        entry, state = response_cache.get(key, policy)
+        if entry is not None:
+            if state is CacheState.STALE:
+                response_cache.revalidate(
+                    key, partial(refresh_cached, upstream, url, headers, key, policy)
+                )
+            return cached_response(entry, state)
+        on_complete = partial(
+            store_response, key, policy, response_cache.generation(upstream.name)
+        )
+
+    if is_conditional(request):
+        response = await forward(upstream, request, url)
+    else:
+        response = await request_coalescer.run(
+            key, partial(open_get, upstream, url, headers, on_complete)
+        )
+    if policy is not None:
+        response.raw_headers.append((CACHE_HEADER, CacheState.MISS.value.encode()))
+    return response
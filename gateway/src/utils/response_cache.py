@@ -0,0 +1,356 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MAX_ENTRY_BYTES = 1024 * 1024
+CACHE_HEADER = b"x-cache"
+
+CacheKey = tuple[str, str, str, str]
+
+
+class CacheState(Enum):
+    """How a request was served with respect to the cache."""
+
+    HIT = "HIT"
+    STALE = "STALE"
+    MISS = "MISS"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Caching rules of a route.
+
+    Attributes:
+        ttl (float): Seconds a response is served from the cache as fresh.
+        stale_while_revalidate (float): Seconds after the TTL a response is still served while it is refreshed in the background.
+        shared (bool): Whether all callers allowed on the route share entries. Otherwise each user has their own.
+
+    """  # noqa: E501
+
+    ttl: float
+    stale_while_revalidate: float = 0.0
+    shared: bool = False
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A complete upstream response held in the cache."""
+
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    stored_at: float
+
+    @property
+    def size(self) -> int:
+        """Get the approximate memory used by the response in bytes."""
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers)
+
+
+class ResponseCache:
+    """In-memory cache of GET responses, configured per route.
+
+    Responses are keyed by upstream, URL, the caller's scope and the accepted
+    content encodings, so a cached body is only served to callers who could
+    have received it themselves. The least recently used responses are
+    evicted once their total size exceeds `max_bytes`. Each upstream has an
+    invalidation generation; responses fetched before an invalidation are
+    not stored after it.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = CACHE_MAX_BYTES,
+        max_entry_bytes: int = CACHE_MAX_ENTRY_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize an empty cache without routes.
+
+        Args:
+            max_bytes (int): Maximum total size of the cached responses.
+            max_entry_bytes (int): Maximum size of a single cached response.
+            clock (Callable[[], float]): Returns the current time in seconds.
+
+        Raises:
+            ValueError: If a size limit is not positive.
+
+        """
+        if max_bytes <= 0 or max_entry_bytes <= 0:
+            raise ValueError("Cache size limits must be positive")
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self._clock = clock
+        self._routes: list[tuple[str, str, CachePolicy]] = []
+        self._entries: OrderedDict[CacheKey, CachedResponse] = OrderedDict()
+        self._revalidations: dict[CacheKey, asyncio.Task] = {}
+        self._generations: dict[str, int] = {}
+        self.size = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def add_route(self, upstream: str, path_prefix: str, policy: CachePolicy) -> None:
+        """Cache GET responses of an upstream whose path starts with a prefix.
+
+        Routes are matched in the order they were added.
+
+        Args:
+            upstream (str): The upstream name.
+            path_prefix (str): The prefix of the upstream URL path, e.g. `/api/v1/occupancy`.
+            policy (CachePolicy): The caching rules of the route.
+
+        """  # noqa: E501
+        self._routes.append((upstream, path_prefix, policy))
+
+    def policy_for(self, upstream: str, path: str) -> CachePolicy | None:
+        """Return the policy of the first route matching a request.
+
+        Args:
+            upstream (str): The upstream name.
+            path (str): The upstream URL path.
+
+        Returns:
+            CachePolicy | None: The policy, or None if the request is not cached.
+
+        """
+        for route_upstream, path_prefix, policy in self._routes:
+            if route_upstream == upstream and path.startswith(path_prefix):
+                return policy
+        return None
+
+    @staticmethod
+    def key(upstream: str, url: str, scope: str, accept_encoding: str = "") -> CacheKey:
+        """Build the cache key of a request.
+
+        Args:
+            upstream (str): The upstream name.
+            url (str): The upstream URL, including the query string.
+            scope (str): Identifies who may be served the response; empty if shared.
+            accept_encoding (str): The request's Accept-Encoding header.
+
+        Returns:
+            CacheKey: The key.
+
+        """
+        scope_digest = hashlib.sha256(scope.encode()).hexdigest() if scope else ""
+        return (upstream, url, scope_digest, accept_encoding)
+
+    def get(
+        self, key: CacheKey, policy: CachePolicy
+    ) -> tuple[CachedResponse | None, CacheState]:
+        """Look a response up and count the outcome.
+
+        Args:
+            key (CacheKey): The cache key.
+            policy (CachePolicy): The policy of the route.
+
+        Returns:
+            tuple[CachedResponse | None, CacheState]: The cached response, if it
+                is fresh or may be served stale, and how it may be served.
+
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = self._clock() - entry.stored_at
+            if age < policy.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry, CacheState.HIT
+            if age < policy.ttl + policy.stale_while_revalidate:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                return entry, CacheState.STALE
+            self._remove(key)
+        self.misses += 1
+        return None, CacheState.MISS
+
+    def put(
+        self,
+        key: CacheKey,
+        status_code: int,
+        headers: list[tuple[bytes, bytes]],
+        body: bytes,
+        generation: int | None = None,
+    ) -> bool:
+        """Store a response, evicting the least recently used ones to make room.
+
+        Args:
+            key (CacheKey): The cache key.
+            status_code (int): The response status code.
+            headers (list[tuple[bytes, bytes]]): The response headers to replay.
+            body (bytes): The complete response body.
+            generation (int | None): The upstream's generation when the fetch of
+                the response started, if known.
+
+        Returns:
+            bool: Whether the response was stored; it is not if it is too large
+                or the upstream was invalidated since the fetch started.
+
+        """
+        if generation is not None and generation != self.generation(key[0]):
+            return False
+        entry = CachedResponse(status_code, headers, body, self._clock())
+        if entry.size > self.max_entry_bytes:
+            return False
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self.size += entry.size
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return True
+
+    def generation(self, upstream: str) -> int:
+        """Return the invalidation generation of an upstream.
+
+        Capture it before fetching a response and pass it to `put`, so a
+        response fetched before a write is not stored after it.
+
+        Args:
+            upstream (str): The upstream name.
+
+        Returns:
+            int: The number of invalidations of the upstream so far.
+
+        """
+        return self._generations.get(upstream, 0)
+
+    def invalidate(self, upstream: str) -> None:
+        """Drop all cached responses of an upstream, e.g. after it was written to.
+
+        Responses of the upstream still being fetched are not stored either.
+
+        Args:
+            upstream (str): The upstream name.
+
+        """
+        self._generations[upstream] = self.generation(upstream) + 1
+        for key in [key for key in self._entries if key[0] == upstream]:
+            self._remove(key)
+
+    def age(self, entry: CachedResponse) -> int:
+        """Return the age of a cached response in whole seconds.
+
+        Args:
+            entry (CachedResponse): The cached response.
+
+        Returns:
+            int: The age, for the `Age` header.
+
+        """
+        return int(self._clock() - entry.stored_at)
+
+    def revalidate(self, key: CacheKey, fetch: Callable[[], Awaitable[None]]) -> None:
+        """Refresh a stale response in the background, once per key at a time.
+
+        Args:
+            key (CacheKey): The key of the stale response.
+            fetch (Callable[[], Awaitable[None]]): Fetches the response and stores it.
+
+        """  # noqa: E501
+        if key in self._revalidations:
+            return
+        task = asyncio.create_task(self._run_revalidation(key, fetch))
+        self._revalidations[key] = task
+
+    async def close(self) -> None:
+        """Cancel running revalidations and drop all entries."""
+        tasks = list(self._revalidations.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._revalidations.clear()
+        self._entries.clear()
+        self.size = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached responses."""
+        return len(self._entries)
+
+    def render_metrics(self) -> str:
+        """Render the cache metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, one sample per line.
+
+        """
+        lines: list[str] = []
+        for name, kind, help_text, value in [
+            (
+                "gateway_cache_requests_total",
+                "counter",
+                "Cacheable requests by how they were served.",
+                None,
+            ),
+            (
+                "gateway_cache_evictions_total",
+                "counter",
+                "Responses evicted to stay within the size limit.",
+                self.evictions,
+            ),
+            (
+                "gateway_cache_entries",
+                "gauge",
+                "Responses in the cache.",
+                len(self._entries),
+            ),
+            (
+                "gateway_cache_bytes",
+                "gauge",
+                "Approximate size of the cached responses.",
+                self.size,
+            ),
+        ]:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if value is None:
+                for state, count in [
+                    (CacheState.HIT, self.hits),
+                    (CacheState.STALE, self.stale_hits),
+                    (CacheState.MISS, self.misses),
+                ]:
+                    lines.append(f'{name}{{result="{state.value.lower()}"}} {count}')
+            else:
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    async def _run_revalidation(
+        self, key: CacheKey, fetch: Callable[[], Awaitable[None]]
+    ) -> None:
+        """Run a revalidation, logging failures; the stale entry then stays.
+
+        Args:
+            key (CacheKey): The key being revalidated.
+            fetch (Callable[[], Awaitable[None]]): Fetches the response and stores it.
+
+        """  # noqa: E501
+        try:
+            await fetch()
+        except Exception as e:
+            logger.warning("Revalidating cached %s failed: %s", key[1], e)
+        finally:
+            self._revalidations.pop(key, None)
+
+    def _remove(self, key: CacheKey) -> None:
+        """Remove an entry and release its size.
+
+        Args:
+            key (CacheKey): The key of the entry.
+
+        """
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+
+
+response_cache = ResponseCache()
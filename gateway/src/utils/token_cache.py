@@ -0,0 +1,88 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+TOKEN_CACHE_SIZE = 10_000
+
+
+class TokenCache:
+    """Bounded LRU of verified token claims, each kept until the token expires.
+
+    Entries are keyed by the SHA-256 digest of the token, so the cache holds no
+    usable credentials and keys have a fixed size however long tokens get.
+    """
+
+    def __init__(
+        self,
+        max_size: int = TOKEN_CACHE_SIZE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_size (int): Maximum number of tokens kept; the least recently used are evicted first.
+            clock (Callable[[], float]): Returns the current Unix time, compared against `exp`.
+
+        Raises:
+            ValueError: If max_size is not positive.
+
+        """  # noqa: E501
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self._max_size = max_size
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        """Return the claims of a verified token that has not expired yet.
+
+        Args:
+            token (str): The encoded token.
+
+        Returns:
+            dict[str, Any] | None: The cached claims, or None on a miss.
+
+        """
+        key = self._digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, claims = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return claims
+
+    def put(self, token: str, claims: dict[str, Any]) -> None:
+        """Cache the claims of a verified token until its `exp`.
+
+        Tokens without a numeric `exp` claim are not cached.
+
+        Args:
+            token (str): The encoded token.
+            claims (dict[str, Any]): The verified claims of the token.
+
+        """
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, int | float):
+            return
+        key = self._digest(token)
+        self._entries[key] = (float(expires_at), claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return the number of cached tokens, including expired ones not yet evicted."""  # noqa: E501
+        return len(self._entries)
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        """Return the cache key of a token."""
+        return hashlib.sha256(token.encode()).digest()
@@ -0,0 +1,72 @@
+import logging
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from jose import jwk, jwt
+from jose.backends.base import Key
+
+from src.dependencies.auth import (
+    AUDIENCE,
+    KEYCLOAK_ISSUER,
+    get_current_user,
+    jwks_store,
+    require_role,
+    token_cache,
+)
+from src.utils.jwks_store import ALGORITHM
+from tests.unit.test_jwks_store import make_jwk
+
+ROUNDS = 2_000
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.asyncio
+async def test_auth_overhead_per_request() -> None:
+    """Measure token verification and role check time with and without the cache."""  # noqa: E501
+    key_data, private_pem = make_jwk("bench-kid")
+    key = jwk.construct(key_data, ALGORITHM)
+    token = jwt.encode(
+        {
+            "sub": "alice",
+            "preferred_username": "alice",
+            "aud": AUDIENCE,
+            "iss": KEYCLOAK_ISSUER,
+            "exp": int(time.time()) + 3600,
+            "resource_access": {"vue-app": {"roles": ["user"]}},
+        },
+        private_pem,
+        ALGORITHM,
+        headers={"kid": "bench-kid"},
+    )
+    credentials = MagicMock(credentials=token)
+    role_checker = require_role("user")
+
+    async def get_key(_: str) -> Key:
+        return key
+
+    async def authenticate() -> None:
+        role_checker(await get_current_user(token=credentials))
+
+    with patch.object(jwks_store, "get_key", get_key):
+        token_cache.clear()
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            token_cache.clear()
+            await authenticate()
+        uncached = (time.perf_counter() - start) / ROUNDS
+
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            await authenticate()
+        cached = (time.perf_counter() - start) / ROUNDS
+        token_cache.clear()
+
+    logger.info(
+        "Auth per request: verified %.1f us, cached %.1f us (%.0fx)",
+        uncached * 1e6,
+        cached * 1e6,
+        uncached / cached,
+    )
+    assert cached < uncached
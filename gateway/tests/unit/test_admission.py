@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from src.utils.admission import (
+    BreakerState,
+    CircuitBreaker,
+    ConcurrencyLimiter,
+    UpstreamUnavailable,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic time."""
+
+    def __init__(self) -> None:
+        """Start at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Fixture providing a manually advanced clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock: FakeClock) -> CircuitBreaker:
+    """Fixture providing a breaker that opens after 4 requests."""
+    return CircuitBreaker(
+        "booking",
+        window=10.0,
+        min_requests=4,
+        failure_rate=0.5,
+        slow_call_duration=1.0,
+        slow_call_rate=0.75,
+        open_duration=5.0,
+        clock=clock,
+    )
+
+
+def test_breaker_opens_on_failure_rate(breaker: CircuitBreaker) -> None:
+    """Test the breaker opens once half of the requests in the window failed."""
+    for failed in (False, True, False):
+        breaker.record(failed, 0.1)
+    assert breaker.state is BreakerState.CLOSED
+
+    breaker.record(True, 0.1)
+
+    assert breaker.state is BreakerState.OPEN
+    assert not breaker.allow()
+    assert breaker.retry_after() == 5.0  # noqa: PLR2004
+
+
+def test_breaker_opens_on_slow_call_rate(breaker: CircuitBreaker) -> None:
+    """Test the breaker opens when most requests are slow, even if they succeed."""
+    for duration in (0.1, 2.0, 2.0, 2.0):
+        breaker.record(False, duration)
+
+    assert breaker.state is BreakerState.OPEN
+
+
+def test_breaker_needs_min_requests(breaker: CircuitBreaker) -> None:
+    """Test a few failures alone do not open the breaker."""
+    for _ in range(3):
+        breaker.record(True, 0.1)
+
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_forgets_outcomes_outside_window(
+    breaker: CircuitBreaker, clock: FakeClock
+) -> None:
+    """Test failures older than the window no longer count."""
+    for _ in range(3):
+        breaker.record(True, 0.1)
+    clock.now = 11.0
+
+    breaker.record(True, 0.1)
+
+    assert breaker.state is BreakerState.CLOSED
+
+
+def test_breaker_half_open_probe_closes(
+    breaker: CircuitBreaker, clock: FakeClock
+) -> None:
+    """Test one probe is let through after the open period and success closes."""
+    for _ in range(4):
+        breaker.record(True, 0.1)
+    clock.now = 5.0
+
+    assert breaker.state is BreakerState.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(False, 0.1)
+
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_half_open_probe_failure_reopens(
+    breaker: CircuitBreaker, clock: FakeClock
+) -> None:
+    """Test a failed probe opens the breaker for another open period."""
+    for _ in range(4):
+        breaker.record(True, 0.1)
+    clock.now = 5.0
+    assert breaker.allow()
+
+    breaker.record(True, 0.1)
+
+    assert breaker.state is BreakerState.OPEN
+    clock.now = 9.0
+    assert not breaker.allow()
+    clock.now = 10.0
+    assert breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_limiter_queues_then_rejects() -> None:
+    """Test requests over the limit queue, and those beyond the queue are rejected."""
+    limiter = ConcurrencyLimiter(
+        "booking", max_concurrent=1, max_queued=1, queue_timeout=1.0
+    )
+    await limiter.acquire()
+    queued = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(UpstreamUnavailable, match="too many concurrent requests"):
+        await limiter.acquire()
+
+    assert limiter.queued == 1
+    limiter.release()
+    await queued
+    assert limiter.active == 1
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_queue_timeout() -> None:
+    """Test queued requests are rejected when no slot frees up in time."""
+    limiter = ConcurrencyLimiter(
+        "booking", max_concurrent=1, max_queued=5, queue_timeout=0.01
+    )
+    await limiter.acquire()
+
+    with pytest.raises(UpstreamUnavailable, match="timed out") as exc:
+        await limiter.acquire()
+
+    assert exc.value.upstream == "booking"
+    assert limiter.queued == 0
+    assert limiter.active == 1
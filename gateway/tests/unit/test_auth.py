@@ -1,15 +1,19 @@
-from typing import Annotated, Any, Generator
-from unittest.mock import MagicMock, patch
+import time
+from typing import Annotated, Generator
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 from fastapi import Depends, FastAPI, status
 from fastapi.testclient import TestClient
 from starlette.exceptions import HTTPException
 
 from src.dependencies.auth import (
-    JWKS_CACHE,
+    UserClaims,
     get_current_user,
+    jwks_store,
     require_role,
+    token_cache,
 )
 
 app = FastAPI()
@@ -24,108 +28,163 @@ def protected_route(user: Annotated[dict, Depends(get_current_user)]) -> dict:
 client = TestClient(app)
 
 
-@pytest.fixture
-def fake_jwks_key() -> dict:
-    """Return fixture to provide a fake JWKS key for testing."""
-    return {
-        "kid": "test-kid",
-        "kty": "RSA",
-        "alg": "RS256",
-        "use": "sig",
-        "n": "abc123",
-        "e": "AQAB",
-    }
-
-
-@pytest.fixture
-def reset_jwks_cache() -> Generator[Any, None, None]:
-    """Return fixture to reset JWKS cache before and after each test."""
-    JWKS_CACHE["keys"] = []
-    JWKS_CACHE["expires_at"] = 0
+@pytest.fixture(autouse=True)
+def clear_token_cache() -> Generator[None, None, None]:
+    """Fixture to start and end each test with an empty token cache."""
+    token_cache.clear()
     yield
-    JWKS_CACHE["keys"] = []
-    JWKS_CACHE["expires_at"] = 0
+    token_cache.clear()
 
 
-def test_get_current_user_success(
-    fake_jwks_key: dict, reset_jwks_cache: Generator[Any, None, None]
-) -> None:
+@pytest.mark.asyncio
+async def test_get_current_user_success() -> None:
     """Test successful retrieval of current user from token."""
     token = "dummy.jwt.value"  # noqa: S105
+    key = MagicMock()
 
-    with patch("src.dependencies.auth.jwt.get_unverified_header") as hdr_mock:
+    with (
+        patch("src.dependencies.auth.jwt.get_unverified_header") as hdr_mock,
+        patch("src.dependencies.auth.jwt.decode") as decode_mock,
+        patch.object(jwks_store, "get_key", AsyncMock(return_value=key)) as key_mock,
+    ):
         hdr_mock.return_value = {"kid": "test-kid"}
+        decode_mock.return_value = {
+            "preferred_username": "alice",
+            "resource_access": {"vue-app": {"roles": ["admin"]}},
+        }
+
+        # Simulate FastAPI dependency
+        user = await get_current_user(token=MagicMock(credentials=token))
+
+        assert user["preferred_username"] == "alice"
+        assert user["resource_access"]["vue-app"]["roles"] == ["admin"]
+        key_mock.assert_awaited_once_with("test-kid")
+        decode_mock.assert_called_once()
+        assert decode_mock.call_args.args[1] is key
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_caches_verified_claims() -> None:
+    """Test a token is verified once and served from the cache afterwards."""
+    token = "dummy.jwt.value"  # noqa: S105
+
+    with (
+        patch("src.dependencies.auth.jwt.get_unverified_header") as hdr_mock,
+        patch("src.dependencies.auth.jwt.decode") as decode_mock,
+        patch.object(jwks_store, "get_key", AsyncMock(return_value=MagicMock())),
+    ):
+        hdr_mock.return_value = {"kid": "test-kid"}
+        decode_mock.return_value = {
+            "preferred_username": "alice",
+            "exp": time.time() + 60,
+            "resource_access": {"vue-app": {"roles": ["admin", "user"]}},
+        }
+
+        first = await get_current_user(token=MagicMock(credentials=token))
+        second = await get_current_user(token=MagicMock(credentials=token))
+
+        assert second is first
+        assert first.roles == {"admin", "user"}
+        decode_mock.assert_called_once()
+
 
-        with patch("src.dependencies.auth.jwt.decode") as decode_mock:
-            decode_mock.return_value = {
-                "preferred_username": "alice",
-                "resource_access": {"vue-app": {"roles": ["admin"]}},
-            }
+@pytest.mark.asyncio
+async def test_get_current_user_does_not_cache_expired_claims() -> None:
+    """Test claims of a token that expired are verified again."""
+    token = "dummy.jwt.value"  # noqa: S105
+
+    with (
+        patch("src.dependencies.auth.jwt.get_unverified_header") as hdr_mock,
+        patch("src.dependencies.auth.jwt.decode") as decode_mock,
+        patch.object(jwks_store, "get_key", AsyncMock(return_value=MagicMock())),
+    ):
+        hdr_mock.return_value = {"kid": "test-kid"}
+        decode_mock.return_value = {"preferred_username": "alice", "exp": 0}
+
+        await get_current_user(token=MagicMock(credentials=token))
+        await get_current_user(token=MagicMock(credentials=token))
 
-            with patch("src.dependencies.auth.requests.get") as req_mock:
-                mock_resp = MagicMock()
-                mock_resp.status_code = status.HTTP_200_OK
-                mock_resp.json.return_value = {"keys": [fake_jwks_key]}
-                req_mock.return_value = mock_resp
+        assert decode_mock.call_count == 2  # noqa: PLR2004
 
-                # Simulate FastAPI dependency
-                user = get_current_user(token=MagicMock(credentials=token))
 
-                assert user["preferred_username"] == "alice"
-                assert user["resource_access"]["vue-app"]["roles"] == ["admin"]
-                decode_mock.assert_called_once()
+def test_user_claims_roles() -> None:
+    """Test roles of the Keycloak client are precomputed as a set."""
+    user = UserClaims(
+        {
+            "preferred_username": "alice",
+            "resource_access": {
+                "vue-app": {"roles": ["user"]},
+                "account": {"roles": ["manage-account"]},
+            },
+        }
+    )
 
+    assert user.roles == frozenset({"user"})
+    assert user["preferred_username"] == "alice"
+    assert UserClaims({}).roles == frozenset()
 
-def test_get_current_user_jwks_key_missing(
-    reset_jwks_cache: Generator[Any, None, None],
-) -> None:
+
+@pytest.mark.asyncio
+async def test_get_current_user_jwks_key_missing() -> None:
     """Test behavior when JWKS key is missing."""
     token = "dummy.jwt.value"  # noqa: S105
 
-    with patch("src.dependencies.auth.jwt.get_unverified_header") as hdr_mock:
+    with (
+        patch("src.dependencies.auth.jwt.get_unverified_header") as hdr_mock,
+        patch.object(jwks_store, "get_key", AsyncMock(return_value=None)),
+    ):
         hdr_mock.return_value = {"kid": "nonexistent"}
 
-        with patch("src.dependencies.auth.requests.get") as req_mock:
-            mock_resp = MagicMock()
-            mock_resp.status_code = status.HTTP_200_OK
-            mock_resp.json.return_value = {"keys": []}
-            req_mock.return_value = mock_resp
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user(token=MagicMock(credentials=token))
 
-            with pytest.raises(HTTPException) as exc:
-                get_current_user(token=MagicMock(credentials=token))
+        assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+        assert "Public key not found" in exc.value.detail
 
-            assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
-            assert "Public key not found" in exc.value.detail
 
+@pytest.mark.asyncio
+async def test_get_current_user_jwks_unavailable() -> None:
+    """Test behavior when the JWKS cannot be fetched."""
+    token = "dummy.jwt.value"  # noqa: S105
 
-def test_get_current_user_invalid_token(
-    fake_jwks_key: dict, reset_jwks_cache: Generator[Any, None, None]
-) -> None:
+    with (
+        patch("src.dependencies.auth.jwt.get_unverified_header") as hdr_mock,
+        patch.object(
+            jwks_store,
+            "get_key",
+            AsyncMock(side_effect=httpx.ConnectError("Keycloak is down")),
+        ),
+    ):
+        hdr_mock.return_value = {"kid": "test-kid"}
+
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user(token=MagicMock(credentials=token))
+
+        assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+        assert "Keycloak is down" in exc.value.detail
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_invalid_token() -> None:
     """Test behavior with an invalid token."""
     token = "invalid.jwt"  # noqa: S105
 
-    with patch("src.dependencies.auth.jwt.get_unverified_header") as hdr_mock:
+    with (
+        patch("src.dependencies.auth.jwt.get_unverified_header") as hdr_mock,
+        patch("src.dependencies.auth.jwt.decode") as decode_mock,
+        patch.object(jwks_store, "get_key", AsyncMock(return_value=MagicMock())),
+    ):
         hdr_mock.return_value = {"kid": "test-kid"}
+        decode_mock.side_effect = Exception("broken token")
 
-        with patch("src.dependencies.auth.jwt.decode") as decode_mock:
-            decode_mock.side_effect = Exception("broken token")
-
-            with patch("src.dependencies.auth.requests.get") as req_mock:
-                mock_resp = MagicMock()
-                mock_resp.status_code = status.HTTP_200_OK
-                mock_resp.json.return_value = {"keys": [fake_jwks_key]}
-                req_mock.return_value = mock_resp
-
-                with pytest.raises(HTTPException) as exc:
-                    get_current_user(token=MagicMock(credentials=token))
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user(token=MagicMock(credentials=token))
 
-                assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
-                assert "Invalid or expired token" in exc.value.detail
+        assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+        assert "Invalid or expired token" in exc.value.detail
 
 
-def test_require_role_allows_access(
-    reset_jwks_cache: Generator[Any, None, None], fake_jwks_key: dict
-) -> None:
+def test_require_role_allows_access() -> None:
     """Test /protected has require_role("admin") — should allow access."""
 
     def fake_get_current_user() -> dict:
@@ -147,9 +206,7 @@ def test_require_role_allows_access(
         app.dependency_overrides.pop(get_current_user, None)
 
 
-def test_require_role_denies_access(
-    reset_jwks_cache: Generator[Any, None, None], fake_jwks_key: dict
-) -> None:
+def test_require_role_denies_access() -> None:
     """Test user lacks admin → should be 403."""
 
     def fake_get_current_user() -> dict:
@@ -1,12 +1,25 @@
-from typing import Generator
+import asyncio
+import gzip
+import logging
+from typing import AsyncIterator, Generator
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
-from fastapi import status
+from fastapi import Request, status
 from fastapi.testclient import TestClient
 
 from main import app
 from src.dependencies.auth import get_current_user
+from src.utils.admission import CircuitBreaker
+from src.utils.coalescer import request_coalescer
+from src.utils.http_client import upstream_clients
+from src.utils.proxy import (
+    DEBUG_BODY_LIMIT,
+    forward,
+    forwarded_headers,
+    proxy_request,
+)
 
 
 def fake_get_current_user() -> dict:
@@ -27,15 +40,55 @@ def client() -> Generator[TestClient, None, None]:
         yield client
 
 
+@pytest.fixture
+def mock_send(client: TestClient) -> Generator[AsyncMock, None, None]:
+    """Fixture to mock sending requests with the Booking Service client."""
+    with patch.object(upstream_clients.get("booking").client, "send") as mock_send:
+        yield mock_send
+
+
+def upstream_response(
+    status_code: int, content: bytes = b"", headers: list | None = None
+) -> httpx.Response:
+    """Create a streamed upstream response.
+
+    Args:
+        status_code (int): The status code.
+        content (bytes): The raw body.
+        headers (list | None): The response headers.
+
+    Returns:
+        httpx.Response: The response, with its body not read yet.
+
+    """
+
+    async def chunks() -> AsyncIterator[bytes]:
+        yield content
+
+    return httpx.Response(status_code, headers=headers or [], content=chunks())
+
+
+async def read_body(request: httpx.Request) -> bytes:
+    """Read the streamed body of a request sent upstream.
+
+    Args:
+        request (httpx.Request): The upstream request.
+
+    Returns:
+        bytes: The body.
+
+    """
+    return b"".join([chunk async for chunk in request.stream])
+
+
 @pytest.mark.asyncio
-@patch("src.utils.http_client.client.request")
-async def test_proxy_get_request(mock_request: AsyncMock, client: TestClient) -> None:
+async def test_proxy_get_request(mock_send: AsyncMock, client: TestClient) -> None:
     """Test GET request proxy to the Booking Service."""
-    mock_response = AsyncMock()
-    mock_response.status_code = status.HTTP_200_OK
-    mock_response.content = b'{"message": "Success"}'
-    mock_response.headers = {"content-type": "application/json"}
-    mock_request.return_value = mock_response
+    mock_send.return_value = upstream_response(
+        status.HTTP_200_OK,
+        b'{"message": "Success"}',
+        [("content-type", "application/json")],
+    )
 
     response = client.get(
         "/booking/some/path?param=value",
@@ -45,80 +98,296 @@ async def test_proxy_get_request(mock_request: AsyncMock, client: TestClient) ->
     assert response.status_code == status.HTTP_200_OK
     assert response.json() == {"message": "Success"}
 
-    mock_request.assert_called_once_with(
-        method="GET",
-        url="http://booking-service:8000/some/path?param=value",
-        headers=mock_request.call_args[1]["headers"],
-        content=b"",
+    mock_send.assert_called_once()
+    upstream_request: httpx.Request = mock_send.call_args.args[0]
+    assert upstream_request.method == "GET"
+    assert str(upstream_request.url) == (
+        "http://booking-service:8000/some/path?param=value"
     )
+    assert upstream_request.headers["accept"] == "application/json"
+    assert mock_send.call_args.kwargs == {"stream": True}
 
 
 @pytest.mark.asyncio
-@patch("src.utils.http_client.client.request")
-async def test_proxy_post_request(mock_request: AsyncMock, client: TestClient) -> None:
+async def test_proxy_post_request(mock_send: AsyncMock, client: TestClient) -> None:
     """Test POST request proxy to the Booking Service."""
-    mock_response = AsyncMock()
-    mock_response.status_code = status.HTTP_201_CREATED
-    mock_response.content = b'{"message": "Created"}'
-    mock_response.headers = {"content-type": "application/json"}
+    bodies = []
+
+    async def send(request: httpx.Request, stream: bool) -> httpx.Response:
+        bodies.append(await read_body(request))
+        return upstream_response(
+            status.HTTP_201_CREATED,
+            b'{"message": "Created"}',
+            [("content-type", "application/json")],
+        )
 
-    mock_request.return_value = mock_response
+    mock_send.side_effect = send
 
     response = client.post("/booking/some/path", json={"key": "value"})
 
     assert response.status_code == status.HTTP_201_CREATED
     assert response.json() == {"message": "Created"}
-    mock_request.assert_called_once_with(
-        method="POST",
-        url="http://booking-service:8000/some/path",
-        headers=mock_request.call_args[1]["headers"],
-        content=b'{"key":"value"}',
-    )
+    upstream_request: httpx.Request = mock_send.call_args.args[0]
+    assert upstream_request.method == "POST"
+    assert str(upstream_request.url) == "http://booking-service:8000/some/path"
+    assert bodies == [b'{"key":"value"}']
 
 
 @pytest.mark.asyncio
-@patch("src.utils.http_client.client.request")
-async def test_proxy_put_request(mock_request: AsyncMock, client: TestClient) -> None:
+async def test_proxy_put_request(mock_send: AsyncMock, client: TestClient) -> None:
     """Test PUT request proxy to the Booking Service."""
-    mock_response = AsyncMock()
-    mock_response.status_code = status.HTTP_200_OK
-    mock_response.content = b'{"message": "Updated"}'
-    mock_response.headers = {"content-type": "application/json"}
+    bodies = []
 
-    mock_request.return_value = mock_response
+    async def send(request: httpx.Request, stream: bool) -> httpx.Response:
+        bodies.append(await read_body(request))
+        return upstream_response(
+            status.HTTP_200_OK,
+            b'{"message": "Updated"}',
+            [("content-type", "application/json")],
+        )
+
+    mock_send.side_effect = send
 
     response = client.put("/booking/some/path", json={"key": "value"})
 
     assert response.status_code == status.HTTP_200_OK
     assert response.json() == {"message": "Updated"}
-    mock_request.assert_called_once_with(
-        method="PUT",
-        url="http://booking-service:8000/some/path",
-        headers=mock_request.call_args[1]["headers"],
-        content=b'{"key":"value"}',
-    )
+    assert mock_send.call_args.args[0].method == "PUT"
+    assert bodies == [b'{"key":"value"}']
 
 
 @pytest.mark.asyncio
-@patch("src.utils.http_client.client.request")
-async def test_proxy_delete_request(
-    mock_request: AsyncMock, client: TestClient
-) -> None:
+async def test_proxy_delete_request(mock_send: AsyncMock, client: TestClient) -> None:
     """Test DELETE request proxy to the Booking Service."""
-    mock_response = AsyncMock()
-    mock_response.status_code = status.HTTP_204_NO_CONTENT
-    mock_response.content = b""
-    mock_response.headers = {}
-
-    mock_request.return_value = mock_response
+    mock_send.return_value = upstream_response(status.HTTP_204_NO_CONTENT)
 
     response = client.delete("/booking/some/path")
 
     assert response.status_code == status.HTTP_204_NO_CONTENT
     assert response.content == b""
-    mock_request.assert_called_once_with(
-        method="DELETE",
-        url="http://booking-service:8000/some/path",
-        headers=mock_request.call_args[1]["headers"],
-        content=b"",
+    upstream_request: httpx.Request = mock_send.call_args.args[0]
+    assert upstream_request.method == "DELETE"
+    assert str(upstream_request.url) == "http://booking-service:8000/some/path"
+
+
+@pytest.mark.asyncio
+async def test_proxy_passes_encoded_body_and_headers(
+    mock_send: AsyncMock, client: TestClient
+) -> None:
+    """Test compressed bodies pass through unchanged, keeping repeated headers."""
+    compressed = gzip.compress(b'{"message": "Success"}')
+    mock_send.return_value = upstream_response(
+        status.HTTP_200_OK,
+        compressed,
+        [
+            ("content-type", "application/json"),
+            ("content-encoding", "gzip"),
+            ("content-length", str(len(compressed))),
+            ("set-cookie", "a=1"),
+            ("set-cookie", "b=2"),
+            ("connection", "keep-alive, x-upstream-hop"),
+            ("x-upstream-hop", "1"),
+        ],
     )
+
+    response = client.get("/booking/some/path")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"message": "Success"}
+    assert response.headers.get_list("set-cookie") == ["a=1", "b=2"]
+    assert "x-upstream-hop" not in response.headers
+    assert "keep-alive" not in response.headers
+
+
+def test_forwarded_headers_removes_hop_by_hop_headers() -> None:
+    """Test hop-by-hop headers and those named in Connection are removed."""
+    headers = [
+        (b"Host", b"gateway"),
+        (b"Connection", b"close, X-Trace"),
+        (b"X-Trace", b"1"),
+        (b"Transfer-Encoding", b"chunked"),
+        (b"Authorization", b"Bearer x"),
+    ]
+
+    assert forwarded_headers(headers) == [
+        (b"Host", b"gateway"),
+        (b"Authorization", b"Bearer x"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_proxy_logs_capped_body_sample(
+    mock_send: AsyncMock, client: TestClient, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test only the start of a response body is logged, at DEBUG level."""
+    content = b"x" * (DEBUG_BODY_LIMIT * 4)
+    mock_send.return_value = upstream_response(status.HTTP_200_OK, content)
+
+    with caplog.at_level(logging.DEBUG, logger="src.utils.proxy"):
+        response = client.get("/booking/export")
+
+    assert response.content == content
+    samples = [r.getMessage() for r in caplog.records if "Response body" in r.message]
+    assert len(samples) == 1
+    assert f"({len(content)} bytes)" in samples[0]
+    assert len(samples[0]) < DEBUG_BODY_LIMIT * 2
+
+
+@pytest.mark.asyncio
+async def test_proxy_streams_large_get_responses(
+    mock_send: AsyncMock, client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test GET responses too large to share are streamed back completely."""
+    monkeypatch.setattr(request_coalescer, "max_body_bytes", 8)
+
+    async def chunks() -> AsyncIterator[bytes]:
+        for _ in range(4):
+            yield b"0123456789"
+
+    mock_send.return_value = httpx.Response(status.HTTP_200_OK, content=chunks())
+
+    response = client.get("/booking/export")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == b"0123456789" * 4
+    assert upstream_clients.get("booking").in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_proxy_rejects_with_503_while_breaker_is_open(
+    mock_send: AsyncMock, client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test failing upstreams open the breaker and further requests fail fast."""
+    upstream = upstream_clients.get("booking")
+    monkeypatch.setattr(upstream, "breaker", CircuitBreaker("booking", min_requests=3))
+    mock_send.side_effect = httpx.ConnectError("booking-service is down")
+    for _ in range(3):
+        with pytest.raises(httpx.ConnectError):
+            client.post("/booking/bookings", json={})
+    mock_send.reset_mock()
+
+    response = client.get("/booking/bookings")
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert "circuit breaker is open" in response.json()["detail"]
+    assert int(response.headers["retry-after"]) >= 1
+    mock_send.assert_not_called()
+    assert upstream.rejections["circuit_open"] >= 1
+    assert upstream.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_proxy_rejects_with_503_when_saturated(
+    mock_send: AsyncMock, client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test requests beyond the concurrency limit and its queue fail fast."""
+    upstream = upstream_clients.get("booking")
+    monkeypatch.setattr(upstream.limiter, "max_queued", 0)
+    for _ in range(upstream.limiter.max_concurrent):
+        await upstream.limiter.acquire()
+    try:
+        response = client.get("/booking/bookings")
+    finally:
+        for _ in range(upstream.limiter.max_concurrent):
+            upstream.limiter.release()
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert "too many concurrent requests" in response.json()["detail"]
+    mock_send.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_export_is_not_coalesced(
+    mock_send: AsyncMock, client: TestClient
+) -> None:
+    """Test exports are streamed straight through, never shared."""
+    leaders = request_coalescer.leaders
+    mock_send.return_value = upstream_response(status.HTTP_200_OK, b'{"id": 1}\n')
+
+    response = client.get("/booking/api/v1/bookings/export?format=ndjson")
+
+    assert response.content == b'{"id": 1}\n'
+    assert request_coalescer.leaders == leaders
+    assert upstream_clients.get("booking").in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_forward_releases_upstream_when_client_disconnects_early(
+    mock_send: AsyncMock, client: TestClient
+) -> None:
+    """Test the upstream is released even if the body is never iterated."""
+    upstream = upstream_clients.get("booking")
+    response_from_upstream = upstream_response(status.HTTP_200_OK, b"[]")
+    mock_send.return_value = response_from_upstream
+    scope = {
+        "type": "http",
+        "asgi": {"spec_version": "2.3"},
+        "method": "DELETE",
+        "path": "/booking/bookings/1",
+        "query_string": b"",
+        "headers": [],
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.disconnect"}
+
+    async def send(_: dict) -> None:
+        await asyncio.sleep(0.01)
+
+    response = await forward(upstream, Request(scope), "http://booking/bookings/1")
+    await response(scope, receive, send)
+
+    assert response_from_upstream.is_closed
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method", ["DELETE", "GET"])
+async def test_disconnect_before_body_returns_concurrency_slot(
+    mock_send: AsyncMock, client: TestClient, method: str
+) -> None:
+    """Test early disconnects give back the upstream's concurrency slot."""
+    upstream = upstream_clients.get("booking")
+    active = upstream.limiter.active
+    response_from_upstream = upstream_response(status.HTTP_200_OK, b"[]")
+    mock_send.return_value = response_from_upstream
+    scope = {
+        "type": "http",
+        "asgi": {"spec_version": "2.3"},
+        "method": method,
+        "path": "/booking/bookings",
+        "query_string": b"",
+        "headers": [],
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.disconnect"}
+
+    async def send(_: dict) -> None:
+        await asyncio.sleep(0.01)
+
+    response = await proxy_request(Request(scope), "http://booking/bookings", "booking")
+    assert upstream.limiter.active == active + 1
+    await response(scope, receive, send)
+
+    assert response_from_upstream.is_closed
+    assert upstream.limiter.active == active
+    assert upstream.in_flight == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "header", [("If-None-Match", '"v1"'), ("If-Modified-Since", "Fri, 16 Oct 2026")]
+)
+async def test_conditional_get_is_not_coalesced(
+    mock_send: AsyncMock, client: TestClient, header: tuple[str, str]
+) -> None:
+    """Test validators reach the upstream and 304s are not shared."""
+    leaders = request_coalescer.leaders
+    mock_send.return_value = upstream_response(status.HTTP_304_NOT_MODIFIED)
+
+    response = client.get("/booking/bookings", headers=dict([header]))
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert request_coalescer.leaders == leaders
+    sent_request = mock_send.call_args.args[0]
+    assert sent_request.headers[header[0]] == header[1]
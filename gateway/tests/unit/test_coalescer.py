@@ -0,0 +1,297 @@
+import asyncio
+from typing import AsyncIterator
+
+import httpx
+import pytest
+from fastapi import Response, status
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from src.utils.coalescer import RequestCoalescer, UpstreamStream
+
+HEADERS = [(b"content-type", b"application/json")]
+
+
+class FakeUpstream:
+    """Counts fetches, each answered once `release` is set."""
+
+    def __init__(self, chunks: tuple[bytes, ...] = (b"[", b"]")) -> None:
+        """Answer with the given body.
+
+        Args:
+            chunks (tuple[bytes, ...]): The body chunks of every response.
+
+        """
+        self.chunks = chunks
+        self.calls = 0
+        self.closed = 0
+        self.completed: list[bytes] = []
+        self.cache = False
+        self.release = asyncio.Event()
+        self.error: Exception | None = None
+
+    async def fetch(self) -> UpstreamStream:
+        """Fetch the response after `release` was set.
+
+        Returns:
+            UpstreamStream: The response.
+
+        Raises:
+            Exception: The configured error.
+
+        """
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return UpstreamStream(
+            status.HTTP_200_OK,
+            HEADERS,
+            self.body(),
+            self.close,
+            self.completed.append if self.cache else None,
+        )
+
+    async def body(self) -> AsyncIterator[bytes]:
+        """Yield the body chunks.
+
+        Yields:
+            bytes: The chunks.
+
+        """
+        for chunk in self.chunks:
+            await asyncio.sleep(0)
+            yield chunk
+
+    async def close(self) -> None:
+        """Count the release of a response."""
+        self.closed += 1
+
+
+async def read(response: Response) -> bytes:
+    """Read the body of a response, streamed or not.
+
+    Args:
+        response (Response): The response.
+
+    Returns:
+        bytes: The body.
+
+    """
+    if isinstance(response, StreamingResponse):
+        return b"".join([chunk async for chunk in response.body_iterator])
+    return response.body
+
+
+async def run_and_read(
+    coalescer: RequestCoalescer, upstream: FakeUpstream, key: str = "key"
+) -> tuple[Response, bytes]:
+    """Run a request and read its body, as the server would.
+
+    Args:
+        coalescer (RequestCoalescer): The coalescer.
+        upstream (FakeUpstream): The upstream.
+        key (str): The request key.
+
+    Returns:
+        tuple[Response, bytes]: The response and its body.
+
+    """
+    response = await coalescer.run(key, upstream.fetch)
+    return response, await read(response)
+
+
+async def run_concurrently(
+    coalescer: RequestCoalescer, upstream: FakeUpstream, count: int
+) -> list[tuple[Response, bytes]]:
+    """Run identical requests concurrently and release the upstream.
+
+    Args:
+        coalescer (RequestCoalescer): The coalescer.
+        upstream (FakeUpstream): The upstream.
+        count (int): The number of requests.
+
+    Returns:
+        list[tuple[Response, bytes]]: The responses and bodies, in request order.
+
+    """
+    tasks = [
+        asyncio.create_task(run_and_read(coalescer, upstream)) for _ in range(count)
+    ]
+    await asyncio.sleep(0.01)
+    upstream.release.set()
+    return await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_fetch() -> None:
+    """Test concurrent requests with the same key cause one upstream call."""
+    coalescer = RequestCoalescer()
+    upstream = FakeUpstream()
+
+    results = await run_concurrently(coalescer, upstream, 10)
+
+    assert upstream.calls == 1
+    assert upstream.closed == 1
+    assert [body for _, body in results] == [b"[]"] * 10
+    responses = [response for response, _ in results]
+    assert "x-coalesced" not in responses[0].headers
+    assert all(r.headers["x-coalesced"] == "1" for r in responses[1:])
+    assert all(r.headers["content-length"] == "2" for r in responses[1:])
+    assert (coalescer.leaders, coalescer.coalesced) == (1, 9)
+
+
+@pytest.mark.asyncio
+async def test_response_without_waiters_is_streamed_unbuffered() -> None:
+    """Test a lone request ends its flight at the first chunk, buffering nothing."""
+    coalescer = RequestCoalescer()
+    upstream = FakeUpstream()
+    upstream.release.set()
+
+    response = await coalescer.run("key", upstream.fetch)
+    chunks = response.body_iterator
+    assert await anext(chunks) == b"["
+
+    assert not coalescer._flights
+    _, body = await run_and_read(coalescer, upstream)
+    assert body == b"[]"
+    assert b"".join([chunk async for chunk in chunks]) == b"]"
+    assert (coalescer.leaders, coalescer.coalesced) == (2, 0)
+    assert upstream.closed == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_complete_body_is_passed_to_on_complete() -> None:
+    """Test responses to be cached are buffered even without waiters."""
+    coalescer = RequestCoalescer()
+    upstream = FakeUpstream()
+    upstream.cache = True
+    upstream.release.set()
+
+    _, body = await run_and_read(coalescer, upstream)
+
+    assert body == b"[]"
+    assert upstream.completed == [b"[]"]
+
+
+@pytest.mark.asyncio
+async def test_unsent_response_releases_upstream() -> None:
+    """Test the flight ends and the upstream is released if sending fails."""
+    coalescer = RequestCoalescer()
+    upstream = FakeUpstream()
+    upstream.release.set()
+    response = await coalescer.run("key", upstream.fetch)
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_: dict) -> None:
+        raise OSError("client went away")
+
+    with pytest.raises(ClientDisconnect):
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+
+    assert upstream.closed == 1
+    assert not coalescer._flights
+
+
+@pytest.mark.asyncio
+async def test_different_keys_are_not_coalesced() -> None:
+    """Test requests with different keys each reach the upstream."""
+    coalescer = RequestCoalescer()
+    upstream = FakeUpstream()
+    upstream.release.set()
+
+    await asyncio.gather(
+        run_and_read(coalescer, upstream, "a"), run_and_read(coalescer, upstream, "b")
+    )
+
+    assert upstream.calls == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_waiters_beyond_limit_send_own_requests() -> None:
+    """Test requests beyond max_waiters do not wait for the shared one."""
+    coalescer = RequestCoalescer(max_waiters=2)
+    upstream = FakeUpstream()
+
+    await run_concurrently(coalescer, upstream, 5)
+
+    assert upstream.calls == 3  # noqa: PLR2004
+    assert coalescer.coalesced == 2  # noqa: PLR2004
+    assert coalescer.overflows == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_waiters_time_out_and_send_own_requests() -> None:
+    """Test waiters stop waiting after wait_timeout."""
+    coalescer = RequestCoalescer(wait_timeout=0.01)
+    upstream = FakeUpstream()
+
+    tasks = [asyncio.create_task(run_and_read(coalescer, upstream)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    upstream.release.set()
+    await asyncio.gather(*tasks)
+
+    assert upstream.calls == 3  # noqa: PLR2004
+    assert coalescer.timeouts == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_large_response_makes_waiters_send_own_requests() -> None:
+    """Test waiters fetch themselves when the body is too large to share."""
+    coalescer = RequestCoalescer(max_body_bytes=4)
+    upstream = FakeUpstream(chunks=(b"012", b"345", b"678"))
+
+    results = await run_concurrently(coalescer, upstream, 3)
+
+    assert [body for _, body in results] == [b"012345678"] * 3
+    assert upstream.calls == 3  # noqa: PLR2004
+    assert coalescer.coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_raised_to_all_waiters() -> None:
+    """Test a failed shared request fails its waiters without more upstream calls."""
+    coalescer = RequestCoalescer()
+    upstream = FakeUpstream()
+    upstream.error = httpx.ConnectError("upstream down")
+
+    tasks = [
+        asyncio.create_task(coalescer.run("key", upstream.fetch)) for _ in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    upstream.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert upstream.calls == 1
+    assert all(isinstance(result, httpx.ConnectError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_lets_waiters_send_own_requests() -> None:
+    """Test waiters are not cancelled along with the request they joined."""
+    coalescer = RequestCoalescer()
+    upstream = FakeUpstream()
+    leader = asyncio.create_task(coalescer.run("key", upstream.fetch))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(run_and_read(coalescer, upstream))
+    await asyncio.sleep(0.01)
+
+    leader.cancel()
+    await asyncio.sleep(0.01)
+    upstream.release.set()
+    response, body = await waiter
+
+    assert response.status_code == status.HTTP_200_OK
+    assert body == b"[]"
+    assert upstream.calls == 2  # noqa: PLR2004
+    assert leader.cancelled()
+
+
+def test_render_metrics() -> None:
+    """Test the metrics contain the coalescing counters."""
+    metrics = RequestCoalescer().render_metrics()
+
+    assert "# TYPE gateway_coalesce_coalesced_total counter" in metrics
+    assert "gateway_coalesce_leaders_total 0" in metrics
@@ -0,0 +1,161 @@
+import asyncio
+from typing import AsyncIterator
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import status
+
+from src.utils.http_client import Upstream, UpstreamClients, UpstreamSettings
+
+KEEP_ALIVE_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: keep-alive\r\n\r\nok"
+)
+
+
+@pytest_asyncio.fixture
+async def http_server() -> AsyncIterator[str]:
+    """Fixture running a keep-alive HTTP server on localhost, yielding its URL."""
+
+    async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while await reader.readuntil(b"\r\n\r\n"):
+            writer.write(KEEP_ALIVE_RESPONSE)
+            await writer.drain()
+
+    async def handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            await serve(reader, writer)
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        yield f"http://127.0.0.1:{port}"
+
+
+def test_settings_env_overrides(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test settings are overridden by UPSTREAM_<NAME>_<FIELD> variables."""
+    monkeypatch.setenv("UPSTREAM_DESK_INTEGRATION_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("UPSTREAM_DESK_INTEGRATION_READ_TIMEOUT", "2.5")
+    monkeypatch.setenv("UPSTREAM_DESK_INTEGRATION_HTTP2", "true")
+    monkeypatch.setenv("UPSTREAM_BOOKING_MAX_CONNECTIONS", "99")
+
+    settings = UpstreamSettings(pool_timeout=0.5).with_env_overrides("desk-integration")
+
+    assert settings == UpstreamSettings(
+        max_connections=7, read_timeout=2.5, pool_timeout=0.5, http2=True
+    )
+
+
+def test_register_twice() -> None:
+    """Test an upstream name can only be registered once."""
+    clients = UpstreamClients()
+    clients.register("booking")
+
+    with pytest.raises(ValueError, match="already registered"):
+        clients.register("booking")
+
+
+@pytest.mark.asyncio
+async def test_open_applies_settings() -> None:
+    """Test the client is created with the upstream's limits and timeouts."""
+    upstream = Upstream(
+        "booking",
+        UpstreamSettings(max_connections=3, read_timeout=4.0, pool_timeout=0.5),
+    )
+
+    upstream.open()
+    try:
+        assert upstream.client is not None
+        assert upstream.client.timeout == httpx.Timeout(4.0, connect=2.0, pool=0.5)
+        request = upstream.build_request(method="GET", url="http://booking/")
+        assert request.url == "http://booking/"
+    finally:
+        await upstream.close()
+    assert upstream.client is None
+
+
+@pytest.mark.asyncio
+async def test_send_before_open() -> None:
+    """Test sending without an open client is rejected."""
+    upstream = Upstream("booking", UpstreamSettings())
+
+    with pytest.raises(RuntimeError, match="not open"):
+        await upstream.send(httpx.Request("GET", "http://booking/"))
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused(http_server: str) -> None:
+    """Test sequential requests share one kept-alive connection."""
+    upstream = Upstream("booking", UpstreamSettings())
+    upstream.open()
+    try:
+        for _ in range(5):
+            response = await upstream.send(
+                upstream.build_request(method="GET", url=http_server)
+            )
+            assert upstream.in_flight == 1
+            await response.aread()
+            await upstream.release(response)
+    finally:
+        await upstream.close()
+
+    assert upstream.requests == 5  # noqa: PLR2004
+    assert upstream.connections_opened == 1
+    assert upstream.in_flight == 0
+    assert upstream.peak_in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_timeout_is_counted(http_server: str) -> None:
+    """Test requests waiting too long for a connection fail and are counted."""
+    upstream = Upstream(
+        "booking", UpstreamSettings(max_connections=1, pool_timeout=0.05)
+    )
+    upstream.open()
+    try:
+        held = await upstream.send(
+            upstream.build_request(method="GET", url=http_server)
+        )
+        assert upstream.utilisation == 1.0
+
+        with pytest.raises(httpx.PoolTimeout):
+            await upstream.send(upstream.build_request(method="GET", url=http_server))
+
+        await upstream.release(held)
+    finally:
+        await upstream.close()
+
+    assert upstream.pool_timeouts == 1
+    assert upstream.errors == 0
+    assert upstream.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_render_metrics() -> None:
+    """Test the metrics contain a series per upstream."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status.HTTP_200_OK, request=request)
+
+    clients = UpstreamClients()
+    booking = clients.register("booking", UpstreamSettings(max_connections=4))
+    clients.register("user")
+    booking.open()
+    await booking.client.aclose()
+    booking.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    response = await booking.send(booking.build_request(method="GET", url="http://b/"))
+
+    metrics = clients.render_metrics()
+
+    assert "# TYPE gateway_upstream_requests_total counter" in metrics
+    assert 'gateway_upstream_requests_total{upstream="booking"} 1' in metrics
+    assert 'gateway_upstream_requests_total{upstream="user"} 0' in metrics
+    assert 'gateway_upstream_pool_utilisation{upstream="booking"} 0.25' in metrics
+    await booking.release(response)
+    await clients.close_all()
@@ -0,0 +1,234 @@
+import asyncio
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import status
+from jose import jwk, jwt
+from jose.backends.base import Key
+
+from src.utils.jwks_store import ALGORITHM, JwksStore
+
+JWKS_URL = "http://keycloak/realms/test/protocol/openid-connect/certs"
+
+
+def make_jwk(kid: str, use: str = "sig") -> tuple[dict, bytes]:
+    """Generate an RSA key pair.
+
+    Args:
+        kid (str): The key ID.
+        use (str): The intended use of the key.
+
+    Returns:
+        tuple[dict, bytes]: The public key as JWK and the private key as PEM.
+
+    """
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    key_data = jwk.construct(public_pem, ALGORITHM).to_dict()
+    return {**key_data, "kid": kid, "use": use}, private_pem
+
+
+class FakeKeycloak:
+    """JWKS endpoint serving a configurable key set and counting requests."""
+
+    def __init__(self, keys: list[dict]) -> None:
+        """Serve the given keys.
+
+        Args:
+            keys (list[dict]): The JWKs to serve.
+
+        """
+        self.keys = keys
+        self.calls = 0
+        self.fail = False
+        self.latency = 0.0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Handle a JWKS request.
+
+        Args:
+            request (httpx.Request): The incoming request.
+
+        Returns:
+            httpx.Response: The key set, or a 503 while failing.
+
+        """
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            return httpx.Response(status.HTTP_503_SERVICE_UNAVAILABLE, request=request)
+        return httpx.Response(
+            status.HTTP_200_OK, json={"keys": self.keys}, request=request
+        )
+
+    def store(self, **kwargs: float) -> JwksStore:
+        """Create a store fetching from this endpoint.
+
+        Args:
+            **kwargs (float): Timing options passed on to the store.
+
+        Returns:
+            JwksStore: The store.
+
+        """
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+        return JwksStore(JWKS_URL, client=client, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def signing_key() -> tuple[dict, bytes]:
+    """Fixture providing an RSA signing key."""
+    return make_jwk("kid-1")
+
+
+@pytest.mark.asyncio
+async def test_get_key_parses_signing_keys_once(
+    signing_key: tuple[dict, bytes],
+) -> None:
+    """Test keys are parsed into key objects on fetch and reused afterwards."""
+    key_data, private_pem = signing_key
+    encryption_key, _ = make_jwk("kid-enc", use="enc")
+    keycloak = FakeKeycloak([key_data, encryption_key])
+    store = keycloak.store()
+
+    key = await store.get_key("kid-1")
+    again = await store.get_key("kid-1")
+
+    assert isinstance(key, Key)
+    assert again is key
+    assert store.kids == ["kid-1"]
+    assert keycloak.calls == 1
+    token = jwt.encode(
+        {"sub": "alice"}, private_pem, ALGORITHM, headers={"kid": "kid-1"}
+    )
+    assert jwt.decode(token, key, algorithms=[ALGORITHM]) == {"sub": "alice"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_get_key_shares_one_fetch(
+    signing_key: tuple[dict, bytes],
+) -> None:
+    """Test concurrent lookups on an empty store wait for a single fetch."""
+    keycloak = FakeKeycloak([signing_key[0]])
+    keycloak.latency = 0.05
+    store = keycloak.store()
+
+    keys = await asyncio.gather(*(store.get_key("kid-1") for _ in range(20)))
+
+    assert keycloak.calls == 1
+    assert all(key is keys[0] for key in keys)
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refreshes_after_key_rotation(
+    signing_key: tuple[dict, bytes],
+) -> None:
+    """Test an unknown kid triggers a refresh that picks up rotated keys."""
+    keycloak = FakeKeycloak([signing_key[0]])
+    store = keycloak.store(min_refresh_interval=0)
+    await store.get_key("kid-1")
+    rotated_key, _ = make_jwk("kid-2")
+    keycloak.keys = [rotated_key]
+
+    key = await store.get_key("kid-2")
+
+    assert key is not None
+    assert store.kids == ["kid-2"]
+    assert keycloak.calls == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refreshes_are_rate_limited(
+    signing_key: tuple[dict, bytes],
+) -> None:
+    """Test unknown kids do not cause a fetch right after the previous one."""
+    keycloak = FakeKeycloak([signing_key[0]])
+    store = keycloak.store(min_refresh_interval=60)
+    await store.get_key("kid-1")
+
+    for _ in range(5):
+        assert await store.get_key("made-up") is None
+
+    assert keycloak.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_get_key_raises_when_first_fetch_fails() -> None:
+    """Test fetch errors propagate while no keys are loaded."""
+    keycloak = FakeKeycloak([])
+    keycloak.fail = True
+    store = keycloak.store()
+
+    with pytest.raises(httpx.HTTPStatusError, match="503"):
+        await store.get_key("kid-1")
+
+
+@pytest.mark.asyncio
+async def test_get_key_keeps_expired_keys_when_refresh_fails(
+    signing_key: tuple[dict, bytes],
+) -> None:
+    """Test expired keys stay in use while Keycloak is unreachable."""
+    keycloak = FakeKeycloak([signing_key[0]])
+    store = keycloak.store(ttl=0)
+    key = await store.get_key("kid-1")
+    keycloak.fail = True
+
+    assert await store.get_key("kid-1") is key
+    assert keycloak.calls == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_runs_before_expiry(
+    signing_key: tuple[dict, bytes],
+) -> None:
+    """Test the background task refreshes the keys ahead of their expiry."""
+    keycloak = FakeKeycloak([signing_key[0]])
+    store = keycloak.store(ttl=0.2, refresh_margin=0.15)
+    store.start()
+    try:
+        async with asyncio.timeout(1.0):
+            while keycloak.calls < 3:  # noqa: PLR2004, ASYNC110
+                await asyncio.sleep(0.01)
+    finally:
+        await store.stop()
+
+    assert await store.get_key("kid-1") is not None
+
+
+@pytest.mark.asyncio
+async def test_stop_closes_owned_client_only(
+    signing_key: tuple[dict, bytes], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the store closes the client it created, but not one passed in."""
+    keycloak = FakeKeycloak([signing_key[0]])
+    store = keycloak.store()
+    await store.stop()
+    assert not store._client.is_closed
+
+    async_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        httpx,
+        "AsyncClient",
+        lambda **kwargs: async_client(
+            transport=httpx.MockTransport(keycloak.handle), **kwargs
+        ),
+    )
+    owning_store = JwksStore(JWKS_URL)
+    assert await owning_store.get_key("kid-1") is not None
+    owned_client = owning_store._client
+    await owning_store.stop()
+
+    assert owned_client.is_closed
+    await owning_store.refresh()
+    assert not owning_store._client.is_closed
+    await owning_store.stop()
@@ -26,3 +26,14 @@ def test_health(client: TestClient) -> None:
     response = client.get("/health")
     assert response.status_code == status.HTTP_200_OK
     assert response.json() == {"status": "ok"}
+
+
+def test_metrics(client: TestClient) -> None:
+    """Test the metrics endpoint (GET /metrics) reports every upstream pool."""
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    for upstream in ("booking", "desk-integration", "occupancy", "scheduler", "user"):
+        assert f'gateway_upstream_max_connections{{upstream="{upstream}"}}' in (
+            response.text
+        )
@@ -0,0 +1,180 @@
+import time
+from typing import AsyncIterator, Generator
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from main import app
+from src.dependencies.auth import get_current_user
+from src.utils.http_client import upstream_clients
+from src.utils.proxy import is_cacheable
+from src.utils.response_cache import CachePolicy, response_cache
+
+
+def fake_get_current_user() -> dict:
+    """Fake current user for testing purposes."""
+    return {
+        "sub": "user-1",
+        "preferred_username": "test-user",
+        "resource_access": {"vue-app": {"roles": ["user"]}},
+    }
+
+
+def upstream_response(
+    status_code: int, content: bytes, headers: dict | None = None
+) -> httpx.Response:
+    """Create a streamed upstream response.
+
+    Args:
+        status_code (int): The status code.
+        content (bytes): The raw body.
+        headers (dict | None): The response headers.
+
+    Returns:
+        httpx.Response: The response, with its body not read yet.
+
+    """
+
+    async def chunks() -> AsyncIterator[bytes]:
+        yield content
+
+    return httpx.Response(status_code, headers=headers, content=chunks())
+
+
+class FakeClock:
+    """Monotonic time that can be moved forward."""
+
+    def __init__(self) -> None:
+        """Start at the current monotonic time."""
+        self.now = time.monotonic()
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def client() -> Generator[TestClient, None, None]:
+    """Fixture to initialize the FastAPI TestClient with a faked user."""
+    app.dependency_overrides[get_current_user] = fake_get_current_user
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    """Fixture replacing the clock of the response cache."""
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache, "_clock", clock)
+    return clock
+
+
+@pytest.fixture
+def upstream_bodies(client: TestClient) -> Generator[list[bytes], None, None]:
+    """Fixture serving the listed bodies from the Occupancy Service in turn."""
+    bodies: list[bytes] = []
+
+    async def send(request: httpx.Request, stream: bool) -> httpx.Response:
+        return upstream_response(
+            status.HTTP_200_OK, bodies.pop(0), {"content-type": "application/json"}
+        )
+
+    upstream = upstream_clients.get("occupancy")
+    with patch.object(upstream.client, "send", side_effect=send):
+        yield bodies
+
+
+def test_repeated_get_is_served_from_cache(
+    client: TestClient, upstream_bodies: list[bytes]
+) -> None:
+    """Test polling the occupancy reaches the upstream once per TTL."""
+    upstream_bodies.extend([b'[{"desk_id": 1}]'])
+
+    first = client.get("/occupancy/api/v1/occupancy/")
+    second = client.get("/occupancy/api/v1/occupancy/")
+
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json() == first.json() == [{"desk_id": 1}]
+    assert second.headers["content-length"] == str(len(b'[{"desk_id": 1}]'))
+    assert upstream_bodies == []
+
+
+def test_query_string_is_part_of_key(
+    client: TestClient, upstream_bodies: list[bytes]
+) -> None:
+    """Test different query strings are cached separately."""
+    upstream_bodies.extend([b"[1]", b"[2]"])
+
+    first = client.get("/occupancy/api/v1/occupancy/1/history?limit=1")
+    second = client.get("/occupancy/api/v1/occupancy/1/history?limit=2")
+
+    assert first.json() == [1]
+    assert second.json() == [2]
+    assert second.headers["x-cache"] == "MISS"
+
+
+def test_stale_response_is_served_while_revalidating(
+    client: TestClient, upstream_bodies: list[bytes], clock: FakeClock
+) -> None:
+    """Test a stale response is returned at once and refreshed in the background."""
+    upstream_bodies.extend([b'"old"', b'"new"'])
+    client.get("/occupancy/api/v1/occupancy/")
+    clock.now += 5
+
+    stale = client.get("/occupancy/api/v1/occupancy/")
+    for _ in range(100):
+        fresh = client.get("/occupancy/api/v1/occupancy/")
+        if fresh.json() == "new":
+            break
+
+    assert stale.headers["x-cache"] == "STALE"
+    assert stale.json() == "old"
+    assert int(stale.headers["age"]) == 5  # noqa: PLR2004
+    assert fresh.headers["x-cache"] == "HIT"
+    assert fresh.json() == "new"
+
+
+def test_uncacheable_responses_are_not_stored(client: TestClient) -> None:
+    """Test errors and responses marked no-store reach the upstream every time."""
+    upstream = upstream_clients.get("occupancy")
+    responses = [
+        upstream_response(status.HTTP_503_SERVICE_UNAVAILABLE, b"down"),
+        upstream_response(status.HTTP_503_SERVICE_UNAVAILABLE, b"down"),
+        upstream_response(status.HTTP_200_OK, b"[]", {"cache-control": "no-store"}),
+        upstream_response(status.HTTP_200_OK, b"[]", {"cache-control": "no-store"}),
+    ]
+    with patch.object(
+        upstream.client, "send", AsyncMock(side_effect=responses)
+    ) as mock_send:
+        for _ in range(2):
+            response = client.get("/occupancy/api/v1/occupancy/7")
+            assert response.headers["x-cache"] == "MISS"
+        for _ in range(2):
+            response = client.get("/occupancy/api/v1/occupancy/8")
+            assert response.headers["x-cache"] == "MISS"
+
+    assert mock_send.await_count == 4  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ("headers", "shared", "expected"),
+    [
+        ({}, True, True),
+        ({"cache-control": "max-age=5"}, True, True),
+        ({"cache-control": "private"}, False, True),
+        ({"cache-control": "private"}, True, False),
+        ({"cache-control": "no-cache"}, False, False),
+        ({"set-cookie": "session=1"}, False, False),
+        ({"vary": "*"}, False, False),
+    ],
+)
+def test_is_cacheable(headers: dict, shared: bool, expected: bool) -> None:
+    """Test which successful upstream responses may be stored."""
+    response = httpx.Response(status.HTTP_200_OK, headers=headers)
+
+    assert is_cacheable(response, CachePolicy(ttl=1.0, shared=shared)) is expected
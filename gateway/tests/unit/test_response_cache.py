@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+from fastapi import status
+
+from src.utils.response_cache import CachePolicy, CacheState, ResponseCache
+
+POLICY = CachePolicy(ttl=2.0, stale_while_revalidate=10.0, shared=True)
+HEADERS = [(b"content-type", b"application/json")]
+
+
+class FakeClock:
+    """Manually advanced monotonic time."""
+
+    def __init__(self) -> None:
+        """Start at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Fixture providing a manually advanced clock."""
+    return FakeClock()
+
+
+def test_get_fresh_stale_and_expired(clock: FakeClock) -> None:
+    """Test entries are fresh within the TTL and stale until the grace period ends."""
+    cache = ResponseCache(clock=clock)
+    key = cache.key("occupancy", "http://occupancy/api/v1/occupancy/", "")
+    cache.put(key, status.HTTP_200_OK, HEADERS, b"[]")
+
+    clock.now = 1.0
+    assert cache.get(key, POLICY) == (cache._entries[key], CacheState.HIT)
+    clock.now = 5.0
+    entry, state = cache.get(key, POLICY)
+    assert entry is not None
+    assert entry.body == b"[]"
+    assert state is CacheState.STALE
+    clock.now = 12.0
+    assert cache.get(key, POLICY) == (None, CacheState.MISS)
+
+    assert (cache.hits, cache.stale_hits, cache.misses) == (1, 1, 1)
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_put_evicts_least_recently_used_by_size(clock: FakeClock) -> None:
+    """Test the least recently used entries are evicted to fit the byte limit."""
+    cache = ResponseCache(max_bytes=250, clock=clock)
+    keys = [cache.key("occupancy", f"http://o/{i}", "") for i in range(3)]
+    cache.put(keys[0], status.HTTP_200_OK, [], b"a" * 100)
+    cache.put(keys[1], status.HTTP_200_OK, [], b"b" * 100)
+    cache.get(keys[0], POLICY)
+
+    cache.put(keys[2], status.HTTP_200_OK, [], b"c" * 100)
+
+    assert cache.get(keys[0], POLICY)[1] is CacheState.HIT
+    assert cache.get(keys[1], POLICY)[1] is CacheState.MISS
+    assert cache.get(keys[2], POLICY)[1] is CacheState.HIT
+    assert cache.size == 200  # noqa: PLR2004
+    assert cache.evictions == 1
+
+
+def test_put_rejects_large_entries() -> None:
+    """Test responses larger than the entry limit are not stored."""
+    cache = ResponseCache(max_entry_bytes=10)
+    key = cache.key("occupancy", "http://o/", "")
+
+    assert not cache.put(key, status.HTTP_200_OK, [], b"x" * 11)
+    assert len(cache) == 0
+
+
+def test_key_separates_scopes_and_encodings() -> None:
+    """Test users and accepted encodings get their own entries."""
+    url = "http://booking/bookings"
+
+    assert ResponseCache.key("booking", url, "sub:alice") != ResponseCache.key(
+        "booking", url, "sub:bob"
+    )
+    assert ResponseCache.key("booking", url, "", "gzip") != ResponseCache.key(
+        "booking", url, ""
+    )
+    assert "alice" not in str(ResponseCache.key("booking", url, "sub:alice"))
+
+
+def test_policy_for_matches_upstream_and_prefix() -> None:
+    """Test requests are matched against the configured routes."""
+    cache = ResponseCache()
+    cache.add_route("occupancy", "/api/v1/occupancy", POLICY)
+
+    assert cache.policy_for("occupancy", "/api/v1/occupancy/") is POLICY
+    assert cache.policy_for("occupancy", "/api/v1/occupancy/3/history") is POLICY
+    assert cache.policy_for("occupancy", "/health") is None
+    assert cache.policy_for("booking", "/api/v1/occupancy/") is None
+
+
+def test_invalidate_drops_entries_of_upstream() -> None:
+    """Test invalidating an upstream keeps the entries of other upstreams."""
+    cache = ResponseCache()
+    occupancy = cache.key("occupancy", "http://o/", "")
+    desks = cache.key("desk-integration", "http://d/", "")
+    cache.put(occupancy, status.HTTP_200_OK, [], b"[]")
+    cache.put(desks, status.HTTP_200_OK, [], b"[]")
+
+    cache.invalidate("desk-integration")
+
+    assert len(cache) == 1
+    assert cache.get(occupancy, POLICY)[1] is CacheState.HIT
+
+
+def test_put_skips_responses_fetched_before_invalidation() -> None:
+    """Test a response fetched before a write is not stored after it."""
+    cache = ResponseCache()
+    key = cache.key("occupancy", "http://o/", "")
+    generation = cache.generation("occupancy")
+
+    cache.invalidate("occupancy")
+
+    assert not cache.put(key, status.HTTP_200_OK, [], b"[]", generation)
+    assert cache.put(key, status.HTTP_200_OK, [], b"[]", cache.generation("occupancy"))
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_revalidate_runs_once_per_key() -> None:
+    """Test concurrent revalidations of the same key share one fetch."""
+    cache = ResponseCache()
+    key = cache.key("occupancy", "http://o/", "")
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch() -> None:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+
+    cache.revalidate(key, fetch)
+    cache.revalidate(key, fetch)
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.sleep(0.01)
+    cache.revalidate(key, fetch)
+    await asyncio.sleep(0.01)
+    await cache.close()
+
+    assert calls == 2  # noqa: PLR2004
+
+
+def test_render_metrics() -> None:
+    """Test the metrics report requests by result and the cache size."""
+    cache = ResponseCache()
+    key = cache.key("occupancy", "http://o/", "")
+    cache.get(key, POLICY)
+    cache.put(key, status.HTTP_200_OK, [], b"[]")
+    cache.get(key, POLICY)
+
+    metrics = cache.render_metrics()
+
+    assert 'gateway_cache_requests_total{result="hit"} 1' in metrics
+    assert 'gateway_cache_requests_total{result="miss"} 1' in metrics
+    assert "gateway_cache_entries 1" in metrics
+    assert "gateway_cache_bytes 2" in metrics
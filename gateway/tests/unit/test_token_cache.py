@@ -0,0 +1,73 @@
+import pytest
+
+from src.utils.token_cache import TokenCache
+
+
+class FakeClock:
+    """Manually advanced Unix time."""
+
+    def __init__(self) -> None:
+        """Start at a fixed time."""
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Fixture providing a manually advanced clock."""
+    return FakeClock()
+
+
+def test_get_returns_cached_claims(clock: FakeClock) -> None:
+    """Test claims put into the cache are returned for the same token."""
+    cache = TokenCache(clock=clock)
+    claims = {"sub": "alice", "exp": 1_060}
+
+    cache.put("token-a", claims)
+
+    assert cache.get("token-a") is claims
+    assert cache.get("token-b") is None
+
+
+def test_get_drops_expired_tokens(clock: FakeClock) -> None:
+    """Test claims are not returned once the token's exp has passed."""
+    cache = TokenCache(clock=clock)
+    cache.put("token-a", {"sub": "alice", "exp": 1_060})
+
+    clock.now = 1_060
+
+    assert cache.get("token-a") is None
+    assert len(cache) == 0
+
+
+def test_put_skips_tokens_without_exp(clock: FakeClock) -> None:
+    """Test tokens without a numeric exp claim are never cached."""
+    cache = TokenCache(clock=clock)
+
+    cache.put("token-a", {"sub": "alice"})
+    cache.put("token-b", {"sub": "bob", "exp": "soon"})
+
+    assert len(cache) == 0
+
+
+def test_put_evicts_least_recently_used(clock: FakeClock) -> None:
+    """Test the least recently used token is evicted when the cache is full."""
+    cache = TokenCache(max_size=2, clock=clock)
+    cache.put("token-a", {"sub": "alice", "exp": 2_000})
+    cache.put("token-b", {"sub": "bob", "exp": 2_000})
+    cache.get("token-a")
+
+    cache.put("token-c", {"sub": "carol", "exp": 2_000})
+
+    assert cache.get("token-a") is not None
+    assert cache.get("token-b") is None
+    assert cache.get("token-c") is not None
+
+
+def test_invalid_max_size() -> None:
+    """Test a non-positive size is rejected."""
+    with pytest.raises(ValueError, match="max_size must be positive"):
+        TokenCache(max_size=0)
@@ -14,11 +14,13 @@ from typing import Any, AsyncGenerator
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from sqlmodel import Session
 
 from src.api.dependencies import engine, get_occupancy_repository
 from src.api.routes.occupancy_routes import router as occupancy_router
 from src.messaging.messaging_manager import messaging_manager
+from src.messaging.messaging_metrics import METRICS_CONTENT_TYPE
 from src.messaging.pubsub_exchanges import DESK_OCCUPANCY_UPDATED
 from src.messaging.pubsub_facade import PubSubFacade
 from src.services.mqtt_service import mqtt_service
@@ -130,7 +132,21 @@ def get_health() -> dict:
 
     """
     return {
-        "status": "ok",
+        "status": "ok" if messaging_manager.is_ready else "degraded",
         "mqtt_connected": mqtt_service.is_connected,
         "mqtt_topic": MQTT_TOPIC,
+        "messaging": messaging_manager.readiness(),
     }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Expose the messaging metrics to Prometheus.
+
+    Returns:
+        PlainTextResponse: Publish, consume and queue backlog metrics.
+
+    """
+    return PlainTextResponse(
+        await messaging_manager.render_metrics(), media_type=METRICS_CONTENT_TYPE
+    )
@@ -0,0 +1,651 @@
+import asyncio
+import itertools
+import logging
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any, Awaitable, Callable, Generator
+from urllib.parse import urlsplit
+
+import aio_pika
+from aio_pika.exceptions import ChannelInvalidStateError, ChannelNotFoundEntity
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXCHANGE = ""
+
+
+class MemoryBroker:
+    """In-process stand-in for a RabbitMQ broker.
+
+    Implements the part of the AMQP model the messaging facades use: fanout and
+    direct exchanges, the default exchange, durable queues with prefetch,
+    acknowledgements, requeueing, message TTLs and dead-lettering. Nothing is
+    persisted and there is no network hop, so handler cost can be measured
+    without broker overhead and services can be wired end to end in one
+    process.
+    """
+
+    _brokers: dict[str, "MemoryBroker"] = {}
+
+    def __init__(self) -> None:
+        """Initialize a broker with only the default exchange."""
+        self._exchanges: dict[str, _ExchangeState] = {
+            DEFAULT_EXCHANGE: _ExchangeState(
+                DEFAULT_EXCHANGE, aio_pika.ExchangeType.DIRECT
+            )
+        }
+        self._queues: dict[str, _QueueState] = {}
+
+    @classmethod
+    def for_url(cls, url: str) -> "MemoryBroker":
+        """Get the broker of a `memory://` URL, creating it on first use.
+
+        URLs with the same host share a broker, e.g. `memory://` or
+        `memory://bench`.
+
+        Args:
+            url (str): The broker URL.
+
+        Returns:
+            MemoryBroker: The broker for the URL's host.
+
+        """
+        return cls._brokers.setdefault(urlsplit(url).netloc, cls())
+
+    def connect(self) -> "MemoryConnection":
+        """Open a connection to the broker.
+
+        Returns:
+            MemoryConnection: The new connection.
+
+        """
+        return MemoryConnection(self)
+
+    def route(
+        self, exchange_name: str, message: aio_pika.Message, routing_key: str
+    ) -> None:
+        """Deliver a message to every queue its exchange routes it to.
+
+        Unroutable messages are dropped.
+
+        Args:
+            exchange_name (str): The exchange the message is published to.
+            message (aio_pika.Message): The published message.
+            routing_key (str): The routing key of the message.
+
+        Raises:
+            ChannelNotFoundEntity: If the exchange was not declared.
+
+        """
+        if exchange_name not in self._exchanges:
+            raise ChannelNotFoundEntity(f"NOT_FOUND - no exchange '{exchange_name}'")
+        if exchange_name == DEFAULT_EXCHANGE:
+            targets = [self._queues[routing_key]] if routing_key in self._queues else []
+        else:
+            targets = self._exchanges[exchange_name].targets(routing_key)
+        for queue in targets:
+            queue.put(message, exchange_name, routing_key)
+
+    def _declare_exchange(
+        self, name: str, exchange_type: aio_pika.ExchangeType
+    ) -> "_ExchangeState":
+        """Return the exchange with the name, declaring it if needed."""
+        return self._exchanges.setdefault(name, _ExchangeState(name, exchange_type))
+
+    def _declare_queue(
+        self, name: str, arguments: dict[str, Any] | None, passive: bool
+    ) -> "_QueueState":
+        """Return the queue with the name, declaring it if needed.
+
+        Raises:
+            ChannelNotFoundEntity: If a passively declared queue does not exist.
+
+        """
+        if name not in self._queues:
+            if passive:
+                raise ChannelNotFoundEntity(f"NOT_FOUND - no queue '{name}'")
+            self._queues[name] = _QueueState(self, name, arguments or {})
+        return self._queues[name]
+
+
+class MemoryConnection:
+    """Connection to a `MemoryBroker`, mirroring `aio_pika.RobustConnection`."""
+
+    def __init__(self, broker: MemoryBroker) -> None:
+        """Initialize an open connection.
+
+        Args:
+            broker (MemoryBroker): The broker connected to.
+
+        """
+        self._broker = broker
+        self._channels: list[MemoryChannel] = []
+        self.is_closed = False
+
+    def channel(self, **_: Any) -> "MemoryChannel":  # noqa: ANN401
+        """Open a channel. Like aio-pika, the result is awaited or entered.
+
+        Returns:
+            MemoryChannel: The new channel.
+
+        Raises:
+            ChannelInvalidStateError: If the connection is closed.
+
+        """
+        if self.is_closed:
+            raise ChannelInvalidStateError("Connection is closed.")
+        channel = MemoryChannel(self._broker)
+        self._channels.append(channel)
+        return channel
+
+    async def close(self) -> None:
+        """Close the connection and all of its channels."""
+        for channel in self._channels:
+            await channel.close()
+        self._channels = []
+        self.is_closed = True
+
+    async def __aenter__(self) -> "MemoryConnection":
+        """Use the connection as an async context manager."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the connection when leaving the context."""
+        await self.close()
+
+
+class MemoryChannel:
+    """Channel of a `MemoryConnection`, mirroring `aio_pika.RobustChannel`."""
+
+    def __init__(self, broker: MemoryBroker) -> None:
+        """Initialize an open channel without a prefetch limit.
+
+        Args:
+            broker (MemoryBroker): The broker of the channel's connection.
+
+        """
+        self._broker = broker
+        self._consumers: list[_Consumer] = []
+        self.prefetch_count = 0
+        self.is_closed = False
+
+    def __await__(self) -> Generator[Any, None, "MemoryChannel"]:
+        """Return the open channel when awaited."""
+        return self._opened().__await__()
+
+    async def _opened(self) -> "MemoryChannel":
+        """Return the channel."""
+        return self
+
+    async def __aenter__(self) -> "MemoryChannel":
+        """Use the channel as an async context manager."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the channel when leaving the context."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the channel, cancelling its consumers.
+
+        Messages delivered to its consumers but not yet settled are requeued.
+        """
+        for consumer in list(self._consumers):
+            consumer.queue.cancel(consumer, requeue=True)
+        self._consumers = []
+        self.is_closed = True
+
+    async def set_qos(self, prefetch_count: int = 0, **_: Any) -> None:  # noqa: ANN401
+        """Limit the unacknowledged messages of each consumer started afterwards.
+
+        Args:
+            prefetch_count (int): Maximum number of unacknowledged messages per
+                consumer, 0 for no limit.
+
+        """
+        self._check_open()
+        self.prefetch_count = prefetch_count
+
+    async def declare_exchange(
+        self,
+        name: str,
+        type: aio_pika.ExchangeType = aio_pika.ExchangeType.DIRECT,  # noqa: A002
+        **_: Any,  # noqa: ANN401
+    ) -> "MemoryExchange":
+        """Declare an exchange.
+
+        Args:
+            name (str): The name of the exchange.
+            type (aio_pika.ExchangeType): Fanout or direct.
+
+        Returns:
+            MemoryExchange: The exchange.
+
+        Raises:
+            ValueError: If the exchange type is not supported.
+
+        """
+        self._check_open()
+        if type not in (aio_pika.ExchangeType.FANOUT, aio_pika.ExchangeType.DIRECT):
+            raise ValueError(f"Unsupported exchange type '{type}'.")
+        return MemoryExchange(self, self._broker._declare_exchange(name, type))
+
+    async def declare_queue(
+        self,
+        name: str | None = None,
+        arguments: dict[str, Any] | None = None,
+        passive: bool = False,
+        **_: Any,  # noqa: ANN401
+    ) -> "MemoryQueue":
+        """Declare a queue, with a generated name if none is given.
+
+        Args:
+            name (str | None): The name of the queue.
+            arguments (dict[str, Any] | None): Queue arguments. `x-message-ttl`,
+                `x-dead-letter-exchange` and `x-dead-letter-routing-key` are honoured.
+            passive (bool): Only look the queue up, failing if it does not exist.
+
+        Returns:
+            MemoryQueue: The queue.
+
+        Raises:
+            ChannelNotFoundEntity: If a passively declared queue does not exist.
+
+        """  # noqa: E501
+        self._check_open()
+        try:
+            state = self._broker._declare_queue(
+                name or f"amq.gen-{uuid.uuid4()}", arguments, passive
+            )
+        except ChannelNotFoundEntity:
+            self.is_closed = True  # the broker closes the channel, like RabbitMQ
+            raise
+        return MemoryQueue(self, state)
+
+    def _check_open(self) -> None:
+        """Raise if the channel is closed.
+
+        Raises:
+            ChannelInvalidStateError: If the channel is closed.
+
+        """
+        if self.is_closed:
+            raise ChannelInvalidStateError("Channel is closed.")
+
+
+class MemoryExchange:
+    """Exchange declared on a `MemoryChannel`."""
+
+    def __init__(self, channel: MemoryChannel, state: "_ExchangeState") -> None:
+        """Initialize the exchange.
+
+        Args:
+            channel (MemoryChannel): The channel the exchange was declared on.
+            state (_ExchangeState): The exchange in the broker.
+
+        """
+        self._channel = channel
+        self._state = state
+        self.name = state.name
+
+    async def publish(
+        self,
+        message: aio_pika.Message,
+        routing_key: str,
+        **_: Any,  # noqa: ANN401
+    ) -> None:
+        """Publish a message. It is confirmed as soon as it is routed.
+
+        Args:
+            message (aio_pika.Message): The message to publish.
+            routing_key (str): The routing key of the message.
+
+        """
+        self._channel._check_open()
+        self._channel._broker.route(self.name, message, routing_key)
+
+
+class MemoryQueue:
+    """Queue declared on a `MemoryChannel`."""
+
+    def __init__(self, channel: MemoryChannel, state: "_QueueState") -> None:
+        """Initialize the queue.
+
+        Args:
+            channel (MemoryChannel): The channel the queue was declared on.
+            state (_QueueState): The queue in the broker.
+
+        """
+        self._channel = channel
+        self._state = state
+        self.name = state.name
+
+    @property
+    def declaration_result(self) -> "_DeclarationResult":
+        """Get the current depth of the queue, like a fresh declare would."""
+        return _DeclarationResult(
+            message_count=len(self._state.ready),
+            consumer_count=len(self._state.consumers),
+        )
+
+    async def bind(
+        self,
+        exchange: MemoryExchange | str,
+        routing_key: str | None = None,
+        **_: Any,  # noqa: ANN401
+    ) -> None:
+        """Bind the queue to an exchange.
+
+        Args:
+            exchange (MemoryExchange | str): The exchange or its name.
+            routing_key (str | None): The binding key. Defaults to the queue name.
+
+        Raises:
+            ChannelNotFoundEntity: If the exchange was not declared.
+
+        """
+        self._channel._check_open()
+        name = exchange if isinstance(exchange, str) else exchange.name
+        if name not in self._channel._broker._exchanges:
+            raise ChannelNotFoundEntity(f"NOT_FOUND - no exchange '{name}'")
+        self._channel._broker._exchanges[name].bind(
+            self._state, self.name if routing_key is None else routing_key
+        )
+
+    async def consume(
+        self,
+        callback: Callable[["MemoryIncomingMessage"], Awaitable[Any]],
+        **_: Any,  # noqa: ANN401
+    ) -> str:
+        """Start delivering messages to a callback.
+
+        Args:
+            callback (Callable[[MemoryIncomingMessage], Awaitable[Any]]): Called
+                with every delivered message.
+
+        Returns:
+            str: The consumer tag.
+
+        """
+        self._channel._check_open()
+        consumer = _Consumer(
+            tag=f"ctag-{uuid.uuid4()}",
+            queue=self._state,
+            callback=callback,
+            prefetch_count=self._channel.prefetch_count,
+        )
+        self._channel._consumers.append(consumer)
+        self._state.consumers.append(consumer)
+        self._state.dispatch()
+        return consumer.tag
+
+    async def cancel(self, consumer_tag: str, **_: Any) -> None:  # noqa: ANN401
+        """Stop a consumer. Its unacknowledged messages stay with it.
+
+        Args:
+            consumer_tag (str): The tag returned by `consume`.
+
+        """
+        for consumer in list(self._state.consumers):
+            if consumer.tag == consumer_tag:
+                self._state.cancel(consumer, requeue=False)
+
+    def iterator(self) -> "_QueueIterator":
+        """Iterate over delivered messages inside an `async with` block.
+
+        Returns:
+            _QueueIterator: The iterator.
+
+        """
+        return _QueueIterator(self)
+
+
+class MemoryIncomingMessage:
+    """Message delivered to a consumer, mirroring `aio_pika.IncomingMessage`."""
+
+    def __init__(
+        self, message: aio_pika.Message, exchange: str, routing_key: str
+    ) -> None:
+        """Initialize a delivery of a published message.
+
+        Args:
+            message (aio_pika.Message): The published message.
+            exchange (str): The exchange it was published to.
+            routing_key (str): The routing key it was published with.
+
+        """
+        self.body = message.body
+        self.content_type = message.content_type
+        self.headers = dict(message.headers or {})
+        self.delivery_mode = message.delivery_mode
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.redelivered = False
+        self._consumer: _Consumer | None = None
+
+    def to_message(self) -> aio_pika.Message:
+        """Build a message with the same body and properties for republishing.
+
+        Returns:
+            aio_pika.Message: The message.
+
+        """
+        return aio_pika.Message(
+            body=self.body,
+            content_type=self.content_type,
+            headers=self.headers,
+            delivery_mode=self.delivery_mode,
+        )
+
+    async def ack(self, **_: Any) -> None:  # noqa: ANN401
+        """Acknowledge the message."""
+        self._settled().dispatch()
+
+    async def nack(self, requeue: bool = True, **_: Any) -> None:  # noqa: ANN401
+        """Negatively acknowledge the message.
+
+        Args:
+            requeue (bool): Put the message back at the head of the queue
+                instead of dead-lettering it.
+
+        """
+        queue = self._settled()
+        if requeue:
+            self.redelivered = True
+            queue.ready.appendleft(self)
+        else:
+            queue.dead_letter(self)
+        queue.dispatch()
+
+    async def reject(self, requeue: bool = False, **_: Any) -> None:  # noqa: ANN401
+        """Reject the message, dead-lettering it unless requeued.
+
+        Args:
+            requeue (bool): Put the message back at the head of the queue.
+
+        """
+        await self.nack(requeue=requeue)
+
+    def _settled(self) -> "_QueueState":
+        """Release the message from its consumer's unacknowledged messages.
+
+        Returns:
+            _QueueState: The queue the message was delivered from.
+
+        Raises:
+            ChannelInvalidStateError: If the message was already settled.
+
+        """
+        consumer = self._consumer
+        if consumer is None or self not in consumer.unacked:
+            raise ChannelInvalidStateError("Message was already settled.")
+        consumer.unacked.remove(self)
+        self._consumer = None
+        return consumer.queue
+
+
+@dataclass(frozen=True)
+class _DeclarationResult:
+    """Queue depth as reported by a queue declare."""
+
+    message_count: int
+    consumer_count: int
+
+
+@dataclass(eq=False)
+class _Consumer:
+    """A consumer of a queue and its unacknowledged deliveries."""
+
+    tag: str
+    queue: "_QueueState"
+    callback: Callable[[MemoryIncomingMessage], Awaitable[Any]]
+    prefetch_count: int
+    unacked: list[MemoryIncomingMessage] = field(default_factory=list)
+
+    @property
+    def has_capacity(self) -> bool:
+        """Check whether the prefetch limit allows another delivery."""
+        return not self.prefetch_count or len(self.unacked) < self.prefetch_count
+
+
+class _ExchangeState:
+    """An exchange in the broker and its bindings."""
+
+    def __init__(self, name: str, exchange_type: aio_pika.ExchangeType) -> None:
+        self.name = name
+        self.type = exchange_type
+        self.bindings: dict[tuple[str, str], _QueueState] = {}
+
+    def bind(self, queue: "_QueueState", routing_key: str) -> None:
+        """Route messages with the binding key to the queue."""
+        self.bindings[(queue.name, routing_key)] = queue
+
+    def targets(self, routing_key: str) -> list["_QueueState"]:
+        """Return the queues a message with the routing key goes to."""
+        queues = {
+            queue.name: queue
+            for (_, binding_key), queue in self.bindings.items()
+            if self.type == aio_pika.ExchangeType.FANOUT or binding_key == routing_key
+        }
+        return list(queues.values())
+
+
+class _QueueState:
+    """A queue in the broker: its ready messages and consumers."""
+
+    def __init__(
+        self, broker: MemoryBroker, name: str, arguments: dict[str, Any]
+    ) -> None:
+        self.broker = broker
+        self.name = name
+        self.arguments = arguments
+        self.ready: deque[MemoryIncomingMessage] = deque()
+        self.consumers: list[_Consumer] = []
+        self._next_consumer = itertools.count()
+        self._callbacks: set[asyncio.Task] = set()
+
+    def put(self, message: aio_pika.Message, exchange: str, routing_key: str) -> None:
+        """Enqueue a routed message, expiring it after the queue's TTL."""
+        incoming = MemoryIncomingMessage(message, exchange, routing_key)
+        self.ready.append(incoming)
+        ttl = self.arguments.get("x-message-ttl")
+        if ttl is not None:
+            asyncio.get_running_loop().call_later(ttl / 1000, self._expire, incoming)
+        self.dispatch()
+
+    def dead_letter(self, message: MemoryIncomingMessage) -> None:
+        """Republish a rejected or expired message to the dead-letter exchange."""
+        exchange = self.arguments.get("x-dead-letter-exchange")
+        if exchange is None:
+            logger.debug("Dropped message from queue '%s'", self.name)
+            return
+        self.broker.route(
+            exchange,
+            message.to_message(),
+            self.arguments.get("x-dead-letter-routing-key", message.routing_key),
+        )
+
+    def cancel(self, consumer: _Consumer, requeue: bool) -> None:
+        """Remove a consumer, optionally requeueing its unacknowledged messages."""
+        if consumer in self.consumers:
+            self.consumers.remove(consumer)
+        if requeue:
+            for message in reversed(consumer.unacked):
+                message._consumer = None
+                message.redelivered = True
+                self.ready.appendleft(message)
+            consumer.unacked.clear()
+        self.dispatch()
+
+    def dispatch(self) -> None:
+        """Deliver ready messages to consumers with capacity, round-robin."""
+        while self.ready and self.consumers:
+            start = next(self._next_consumer)
+            candidates = [
+                self.consumers[(start + i) % len(self.consumers)]
+                for i in range(len(self.consumers))
+            ]
+            consumer = next((c for c in candidates if c.has_capacity), None)
+            if consumer is None:
+                return
+            message = self.ready.popleft()
+            message._consumer = consumer
+            consumer.unacked.append(message)
+            task = asyncio.get_running_loop().create_task(consumer.callback(message))
+            self._callbacks.add(task)
+            task.add_done_callback(self._callbacks.discard)
+
+    def _expire(self, message: MemoryIncomingMessage) -> None:
+        """Dead-letter a message whose TTL ran out while it was still ready."""
+        if message in self.ready:
+            self.ready.remove(message)
+            self.dead_letter(message)
+
+
+class _QueueIterator:
+    """Async iterator over the messages delivered from a queue."""
+
+    def __init__(self, queue: MemoryQueue) -> None:
+        self._queue = queue
+        self._messages: asyncio.Queue[MemoryIncomingMessage] = asyncio.Queue()
+        self._consumer_tag: str | None = None
+
+    async def __aenter__(self) -> AsyncIterator[MemoryIncomingMessage]:
+        """Start consuming the queue."""
+        self._consumer_tag = await self._queue.consume(self._deliver)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop consuming the queue."""
+        if self._consumer_tag is not None:
+            await self._queue.cancel(self._consumer_tag)
+
+    def __aiter__(self) -> "_QueueIterator":
+        """Return the iterator itself."""
+        return self
+
+    async def __anext__(self) -> MemoryIncomingMessage:
+        """Wait for the next delivered message."""
+        return await self._messages.get()
+
+    async def _deliver(self, message: MemoryIncomingMessage) -> None:
+        """Buffer a delivered message for the iteration."""
+        self._messages.put_nowait(message)
@@ -1,10 +1,18 @@
 from datetime import datetime
+from typing import ClassVar
 
 from src.models.msg.abstract_message import AbstractMessage
+from src.models.msg.codecs import ORJSON_CODEC, MessageCodec
 
 
 class OccupancyUpdatedMessage(AbstractMessage):
-    """Message published when desk occupancy is updated."""
+    """Message published when desk occupancy is updated.
+
+    Sent for every MQTT reading, so it is encoded with orjson. The body stays
+    plain JSON and is read by consumers of any version.
+    """
+
+    codec: ClassVar[MessageCodec] = ORJSON_CODEC
 
     desk_id: str
     occupied: bool
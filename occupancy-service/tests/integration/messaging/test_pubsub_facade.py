@@ -2,9 +2,11 @@ import asyncio
 from asyncio import AbstractEventLoop
 from typing import Any, Awaitable, Callable, Generator
 
+import aio_pika
 import pytest
 
 from src.messaging.pubsub_facade import MessageType, PubSubFacade
+from src.messaging.retry_topology import RetryPolicy
 from tests.integration.messaging.utils.rabbitmq_container import (
     EXCHANGE_NAME,
     QUEUE_NAME,
@@ -102,3 +104,130 @@ async def _subscribe_to_exchange(
     await facade.connect()
     facade.subscribe(QUEUE_NAME, on_message_callback, DummyMessage)
     return facade
+
+
+@pytest.mark.asyncio
+async def test_integration_subscribe_batch(
+    _rabbitmq_container: RabbitMqContainer,  # noqa:  F811, PT019
+) -> None:
+    """Integration test for receiving a burst of messages as one batch."""
+    amqp_url = get_amqp_url(_rabbitmq_container)
+    batches: list[list[DummyMessage]] = []
+    batch_received_event = asyncio.Event()
+
+    async def on_batch(messages: list[DummyMessage]) -> None:
+        batches.append(messages)
+        batch_received_event.set()
+
+    subscriber_facade = PubSubFacade(amqp_url, EXCHANGE_NAME)
+    await subscriber_facade.connect()
+    subscriber_facade.subscribe_batch(
+        "test_batch_queue", on_batch, DummyMessage, batch_size=5, max_wait=2.0
+    )
+    await asyncio.sleep(1)
+
+    publisher_facade = PubSubFacade(amqp_url, EXCHANGE_NAME)
+    await publisher_facade.connect()
+    for i in range(5):
+        await publisher_facade.publish(DummyMessage(content=str(i)))
+
+    try:
+        await asyncio.wait_for(batch_received_event.wait(), timeout=5.0)
+    except asyncio.TimeoutError:
+        pytest.fail("Did not receive batch within timeout period.")
+
+    assert [m.content for m in batches[0]] == ["0", "1", "2", "3", "4"]
+
+    await publisher_facade.close()
+    await subscriber_facade.close()
+
+
+@pytest.mark.asyncio
+async def test_integration_publish_many(
+    _rabbitmq_container: RabbitMqContainer,  # noqa:  F811, PT019
+) -> None:
+    """Integration test for pipelining many confirmed messages at once."""
+    amqp_url = get_amqp_url(_rabbitmq_container)
+    message_count = 1000
+    received: list[str] = []
+    all_received_event = asyncio.Event()
+
+    async def on_message(message: DummyMessage) -> None:
+        received.append(message.content)
+        if len(received) == message_count:
+            all_received_event.set()
+
+    subscriber_facade = PubSubFacade(amqp_url, EXCHANGE_NAME)
+    await subscriber_facade.connect()
+    subscriber_facade.subscribe("test_publish_many_queue", on_message, DummyMessage)
+    await asyncio.sleep(1)
+
+    publisher_facade = PubSubFacade(amqp_url, EXCHANGE_NAME)
+    await publisher_facade.connect()
+    failures = await publisher_facade.publish_many(
+        [DummyMessage(content=str(i)) for i in range(message_count)],
+        max_unconfirmed=100,
+    )
+
+    try:
+        await asyncio.wait_for(all_received_event.wait(), timeout=10.0)
+    except asyncio.TimeoutError:
+        pytest.fail("Did not receive all messages within timeout period.")
+
+    assert failures == [None] * message_count
+    assert received == [str(i) for i in range(message_count)]
+
+    await publisher_facade.close()
+    await subscriber_facade.close()
+
+
+@pytest.mark.asyncio
+async def test_integration_failed_messages_are_retried_then_parked(
+    _rabbitmq_container: RabbitMqContainer,  # noqa:  F811, PT019
+) -> None:
+    """Integration test for delayed retries and the poison queue."""
+    amqp_url = get_amqp_url(_rabbitmq_container)
+    queue_name = "test_retry_queue"
+    attempts: dict[str, int] = {}
+    recovered_event = asyncio.Event()
+
+    async def on_message(message: DummyMessage) -> None:
+        attempts[message.content] = attempts.get(message.content, 0) + 1
+        if message.content == "transient" and attempts["transient"] == 3:  # noqa: PLR2004
+            recovered_event.set()
+            return
+        raise RuntimeError("handler failed")
+
+    subscriber_facade = PubSubFacade(amqp_url, EXCHANGE_NAME)
+    await subscriber_facade.connect()
+    subscriber_facade.subscribe(
+        queue_name,
+        on_message,
+        DummyMessage,
+        retry_policy=RetryPolicy(max_attempts=3, initial_delay=0.1),
+    )
+    await asyncio.sleep(1)
+
+    publisher_facade = PubSubFacade(amqp_url, EXCHANGE_NAME)
+    await publisher_facade.connect()
+    await publisher_facade.publish(DummyMessage(content="transient"))
+    await publisher_facade.publish(DummyMessage(content="poison"))
+
+    try:
+        await asyncio.wait_for(recovered_event.wait(), timeout=5.0)
+    except asyncio.TimeoutError:
+        pytest.fail("Message was not retried within timeout period.")
+    await asyncio.sleep(0.5)
+
+    connection = await aio_pika.connect_robust(amqp_url)
+    async with connection:
+        channel = await connection.channel()
+        poison_queue = await channel.declare_queue(f"{queue_name}.poison", durable=True)
+        parked = await poison_queue.get(timeout=5.0)
+        await parked.ack()
+
+    assert attempts == {"transient": 3, "poison": 3}
+    assert parked.body == b"poison"
+
+    await publisher_facade.close()
+    await subscriber_facade.close()
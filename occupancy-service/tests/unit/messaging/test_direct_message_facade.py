@@ -20,7 +20,7 @@ class DummyMessage(AbstractMessage):
         return self.content.encode()
 
     @classmethod
-    def from_bytes(cls, body: bytes) -> "DummyMessage":
+    def from_bytes(cls, body: bytes, content_type: str | None = None) -> "DummyMessage":
         """Deserialize bytes to an instance of DummyMessage."""
         return cls(content=body.decode())
 
@@ -117,9 +117,50 @@ async def test_close_closes_channel_and_connection(facade: DirectMessageFacade)
     facade._connection = AsyncMock()
     facade._connection.is_closed = False
     facade._connection.close = AsyncMock()
+    facade._owns_connection = True
 
     await facade.close()
 
     facade._cancel_consumer_task.assert_awaited_once()
     facade._channel.close.assert_awaited_once()
     facade._connection.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("aio_pika.connect_robust", new_callable=AsyncMock)
+async def test_connect_on_shared_connection(
+    mock_connect: AsyncMock, facade: DirectMessageFacade
+) -> None:
+    """Test that a shared connection is used for the channel and left open."""
+    connection = AsyncMock()
+    connection.is_closed = False
+    channel = connection.channel.return_value
+    channel.is_closed = False
+
+    await facade.connect(connection)
+    await facade.close()
+
+    mock_connect.assert_not_awaited()
+    connection.channel.assert_awaited_once_with(publisher_confirms=True)
+    channel.declare_exchange.assert_awaited_once_with(
+        facade._exchange_name, aio_pika.ExchangeType.DIRECT, durable=True
+    )
+    channel.close.assert_awaited_once()
+    connection.close.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_publisher_channels_are_used_round_robin() -> None:
+    """Test that extra publisher channels are opened and closed with the facade."""
+    facade = DirectMessageFacade("amqp://test", "test_exchange", publisher_channels=3)
+    connection = AsyncMock()
+    channels = [AsyncMock(is_closed=False) for _ in range(3)]
+    connection.channel.side_effect = channels
+
+    await facade.connect(connection)
+    exchanges = [facade._publisher_exchange() for _ in range(3)]
+    await facade.close()
+
+    assert len(set(map(id, exchanges))) == len(exchanges)
+    for channel in channels:
+        channel.close.assert_awaited_once()
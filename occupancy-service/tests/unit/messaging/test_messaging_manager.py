@@ -1,3 +1,6 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
 
 from src.messaging.direct_message_facade import DirectMessageFacade
@@ -74,3 +77,110 @@ def test_get_direct_not_found() -> None:
     manager = MessagingManager()
     with pytest.raises(ValueError):  # noqa: PT011
         manager.get_direct("non_existent_exchange")
+
+
+@pytest.mark.asyncio
+@patch("aio_pika.connect_robust", new_callable=AsyncMock)
+async def test_start_all_shares_one_connection(mock_connect: AsyncMock) -> None:
+    """Test that all facades of a broker are started on one shared connection."""
+    manager = MessagingManager()
+    facades = [
+        PubSubFacade(AMQP_URL, EXCHANGE_NAME + "_1"),
+        PubSubFacade(AMQP_URL, EXCHANGE_NAME + "_2"),
+        DirectMessageFacade(AMQP_URL, EXCHANGE_NAME),
+    ]
+    manager.add_pubsubs(facades[:2])
+    manager.add_direct(facades[2])
+    connection = mock_connect.return_value
+    connection.is_closed = False
+
+    await manager.start_all()
+    await manager.stop_all()
+
+    mock_connect.assert_awaited_once_with(AMQP_URL)
+    assert connection.channel.await_count == len(facades)
+    connection.close.assert_awaited_once()
+
+
+def test_facades_record_in_manager_metrics() -> None:
+    """Test that added facades share the manager's metrics."""
+    manager = MessagingManager()
+    pubsub = PubSubFacade(AMQP_URL, EXCHANGE_NAME)
+    direct = DirectMessageFacade(AMQP_URL, EXCHANGE_NAME)
+    manager.add_pubsub(pubsub)
+    manager.add_direct(direct)
+
+    assert pubsub.metrics is manager.metrics
+    assert direct.metrics is manager.metrics
+
+
+@pytest.mark.asyncio
+async def test_render_metrics_reads_queue_depths() -> None:
+    """Test that rendering declares the consumed queues passively for their depth."""
+    manager = MessagingManager()
+    facade = PubSubFacade(AMQP_URL, EXCHANGE_NAME)
+    manager.add_pubsub(facade)
+    channel = AsyncMock()
+    channel.declare_queue.return_value.declaration_result = MagicMock(
+        message_count=7, consumer_count=1
+    )
+    facade._connection = MagicMock()
+    facade._connection.channel.return_value.__aenter__.return_value = channel
+    facade._monitored_queues = ["test_queue"]
+
+    rendered = await manager.render_metrics()
+
+    channel.declare_queue.assert_awaited_once_with("test_queue", passive=True)
+    assert 'messaging_queue_messages{queue="test_queue"} 7' in rendered
+    assert 'messaging_queue_consumers{queue="test_queue"} 1' in rendered
+
+
+class SlowPubSubFacade(PubSubFacade):
+    """A facade whose connect takes a fixed time."""
+
+    def __init__(self, exchange_name: str, delay: float) -> None:
+        super().__init__(AMQP_URL, exchange_name)
+        self.delay = delay
+        self.connected = False
+
+    async def connect(self, connection: object = None) -> None:
+        """Pretend to open the channel."""
+        await asyncio.sleep(self.delay)
+        self.connected = True
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if connect has completed."""
+        return self.connected
+
+
+@pytest.mark.asyncio
+@patch("aio_pika.connect_robust", new_callable=AsyncMock)
+async def test_start_all_connects_facades_concurrently(
+    mock_connect: AsyncMock,
+) -> None:
+    """Test that startup takes about as long as the slowest facade."""
+    manager = MessagingManager()
+    manager.add_pubsubs([SlowPubSubFacade(f"exchange_{i}", 0.05) for i in range(4)])
+
+    started = asyncio.get_running_loop().time()
+    await manager.start_all()
+
+    assert asyncio.get_running_loop().time() - started < 0.15  # noqa: PLR2004
+    assert manager.is_ready
+
+
+@pytest.mark.asyncio
+@patch("aio_pika.connect_robust", new_callable=AsyncMock)
+async def test_start_all_respects_startup_timeout(mock_connect: AsyncMock) -> None:
+    """Test that a facade not starting in time fails the startup."""
+    manager = MessagingManager()
+    manager.add_pubsubs(
+        [SlowPubSubFacade("fast", 0.0), SlowPubSubFacade("stuck", 10.0)]
+    )
+
+    with pytest.raises(TimeoutError):
+        await manager.start_all(startup_timeout=0.05)
+
+    assert manager.readiness() == {"fast": True, "stuck": False}
+    assert not manager.is_ready
@@ -0,0 +1,79 @@
+import pytest
+
+from src.messaging.messaging_metrics import Histogram, MessagingMetrics
+
+EXCHANGE_NAME = "test_exchange"
+QUEUE_NAME = "test_queue"
+
+
+def test_histogram_counts_cumulatively() -> None:
+    """Test that every bucket counts the observations up to its bound."""
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.samples("latency", 'queue="q"') == [
+        'latency_bucket{queue="q",le="0.1"} 2',
+        'latency_bucket{queue="q",le="1.0"} 3',
+        'latency_bucket{queue="q",le="+Inf"} 4',
+        'latency_sum{queue="q"} 2.65',
+        'latency_count{queue="q"} 4',
+    ]
+
+
+def test_render_counts_publishes_per_exchange() -> None:
+    """Test that publishes and their failures are rendered per exchange."""
+    metrics = MessagingMetrics()
+    metrics.record_publish(EXCHANGE_NAME, 0.01)
+    metrics.record_publish(EXCHANGE_NAME, 0.02, failed=True)
+
+    rendered = metrics.render()
+
+    assert "# TYPE messaging_published_total counter" in rendered
+    assert f'messaging_published_total{{exchange="{EXCHANGE_NAME}"}} 2' in rendered
+    assert (
+        f'messaging_publish_failures_total{{exchange="{EXCHANGE_NAME}"}} 1' in rendered
+    )
+    assert (
+        f'messaging_publish_duration_seconds_count{{exchange="{EXCHANGE_NAME}"}} 2'
+        in rendered
+    )
+
+
+def test_render_escapes_label_values() -> None:
+    """Test that quotes in queue names do not break the exposition format."""
+    metrics = MessagingMetrics()
+    metrics.set_queue_depth('odd"queue', 3, 1)
+
+    assert 'messaging_queue_messages{queue="odd\\"queue"} 3' in metrics.render()
+
+
+def test_time_publish_records_failure() -> None:
+    """Test that a publish raising inside the block is counted as failed."""
+    metrics = MessagingMetrics()
+
+    with (
+        pytest.raises(ConnectionError, match="closed"),
+        metrics.time_publish(EXCHANGE_NAME),
+    ):
+        raise ConnectionError("closed")
+
+    assert metrics._published[EXCHANGE_NAME] == 1
+    assert metrics._publish_failures[EXCHANGE_NAME] == 1
+
+
+@pytest.mark.asyncio
+async def test_timed_handler_counts_batch_messages() -> None:
+    """Test that a batch handler counts every message of the batch."""
+    metrics = MessagingMetrics()
+
+    async def fail(_: list[str]) -> None:
+        raise ValueError("bad batch")
+
+    handler = metrics.timed_handler(QUEUE_NAME, fail)
+    with pytest.raises(ValueError, match="bad batch"):
+        await handler(["a", "b", "c"])
+
+    assert metrics._consumed[QUEUE_NAME] == 3  # noqa: PLR2004
+    assert metrics._consume_failures[QUEUE_NAME] == 3  # noqa: PLR2004
+    assert metrics._handler_duration[QUEUE_NAME].count == 1
@@ -0,0 +1,81 @@
+from datetime import UTC, datetime
+from typing import ClassVar
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.models.msg.abstract_message import AbstractMessage
+from src.models.msg.codecs import (
+    JSON_CODEC,
+    MSGPACK_CODEC,
+    MSGPACK_CONTENT_TYPE,
+    ORJSON_CODEC,
+    MessageCodec,
+)
+
+
+class SampleMessage(AbstractMessage):
+    """A message with the field types used by the services' messages."""
+
+    event_id: UUID
+    desk_id: int
+    occupied: bool
+    timestamp: datetime
+
+
+class MsgpackMessage(SampleMessage):
+    """The sample message, sent as MessagePack."""
+
+    codec: ClassVar[MessageCodec] = MSGPACK_CODEC
+
+
+def _sample() -> SampleMessage:
+    """Build a sample message."""
+    return SampleMessage(
+        event_id=uuid4(), desk_id=7, occupied=True, timestamp=datetime.now(UTC)
+    )
+
+
+@pytest.mark.parametrize("codec", [JSON_CODEC, ORJSON_CODEC, MSGPACK_CODEC])
+def test_codec_round_trip(codec: MessageCodec) -> None:
+    """Test that every codec decodes what it encoded."""
+    message = _sample()
+
+    assert codec.decode(SampleMessage, codec.encode(message)) == message
+
+
+def test_orjson_output_is_read_by_json_consumers() -> None:
+    """Test that orjson bodies are plain JSON under the same content type."""
+    message = _sample()
+
+    body = ORJSON_CODEC.encode(message)
+
+    assert ORJSON_CODEC.content_type == JSON_CODEC.content_type
+    assert SampleMessage.from_bytes(body, JSON_CODEC.content_type) == message
+
+
+def test_from_bytes_dispatches_on_content_type() -> None:
+    """Test that a JSON message decodes a MessagePack body by its header."""
+    message = _sample()
+
+    body = MsgpackMessage(**message.model_dump()).to_bytes()
+
+    assert MsgpackMessage.content_type() == MSGPACK_CONTENT_TYPE
+    assert SampleMessage.from_bytes(body, MSGPACK_CONTENT_TYPE) == message
+    assert (
+        SampleMessage.from_bytes(message.to_bytes(), "application/json; charset=utf-8")
+        == message
+    )
+
+
+def test_from_bytes_without_content_type_uses_class_codec() -> None:
+    """Test that bodies without a content type are decoded with the class codec."""
+    message = MsgpackMessage(**_sample().model_dump())
+
+    assert MsgpackMessage.from_bytes(message.to_bytes()) == message
+
+
+def test_unsupported_content_type_is_rejected() -> None:
+    """Test that an unknown content type raises instead of guessing."""
+    with pytest.raises(ValueError, match="Unsupported content type"):
+        SampleMessage.from_bytes(b"<xml/>", "application/xml")
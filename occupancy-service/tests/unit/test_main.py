@@ -71,14 +71,16 @@ def test_root(client: TestClient) -> None:
     assert response.json() == {"service": "Occupancy Service"}
 
 
-def test_health(client: TestClient) -> None:
+def test_health(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
     """Test the health check endpoint (GET /health)."""
+    monkeypatch.setattr(messaging_manager, "readiness", lambda: {"exchange": True})
     response = client.get("/health")
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert data["status"] == "ok"
     assert "mqtt_connected" in data
     assert "mqtt_topic" in data
+    assert data["messaging"] == {"exchange": True}
 
 
 @patch.dict("os.environ", {"AMQP_URL": "", "MQTT_HOST": "test", "MQTT_PORT": "1883"})
@@ -6,9 +6,12 @@ from typing import AsyncIterator
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from sqlmodel import Session
 
 import src.logger_config  # noqa: F401, I001 initialize logging configuration
 from src.api.dependencies import (
+    engine,
     get_db_session,
     get_monitoring_repository,
 )
@@ -16,6 +19,7 @@ from src.messaging.booking_message_handler import BookingMessageHandler
 from src.messaging.direct_exchanges import DESK_MONITORING
 from src.messaging.direct_message_facade import DirectMessageFacade
 from src.messaging.messaging_manager import MessagingManager
+from src.messaging.messaging_metrics import METRICS_CONTENT_TYPE
 from src.messaging.pubsub_exchanges import (
     DESK_BOOKING_CREATED,
     DESK_BOOKING_DELETED,
@@ -59,6 +63,7 @@ booking_message_handler = BookingMessageHandler(
     repo=get_monitoring_repository(next(get_db_session())),
     manager=MonitoringSchedulerManager.get_instance(),
     messaging=messaging_manager,
+    session_factory=lambda: Session(engine),
 )
 
 
@@ -193,6 +198,14 @@ def get_root() -> dict[str, str]:
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Expose the messaging metrics to Prometheus."""
+    return PlainTextResponse(
+        await messaging_manager.render_metrics(), media_type=METRICS_CONTENT_TYPE
+    )
+
+
 @app.get("/debug/setup")
 def debug_setup() -> dict[str, object]:
     """Manually trigger default schedule setup."""
@@ -1,5 +1,10 @@
+import asyncio
 import logging
 from datetime import datetime
+from typing import Callable, TypeVar
+from uuid import UUID
+
+from sqlmodel import Session
 
 from src.messaging.messaging_manager import MessagingManager
 from src.messaging.pubsub_exchanges import (
@@ -20,9 +25,18 @@ from src.services.monitoring.utils.create_cron_trigger_from_datetime import (
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 SCHEDULER_DESK_BOOKING_CREATED_QUEUE = "scheduler.desk.booking.created.queue"
 SCHEDULER_DESK_BOOKING_UPDATED_QUEUE = "scheduler.desk.booking.updated.queue"
 SCHEDULER_DESK_BOOKING_DELETED_QUEUE = "scheduler.desk.booking.deleted.queue"
+# Three queues with this many workers each stay within the engine's default
+# connection pool of 5 connections plus 10 overflow.
+BOOKING_CONSUMER_CONCURRENCY = 4
+# Created bookings are inserted in batches of up to this many messages,
+# collected for at most this many seconds.
+BOOKING_CREATE_BATCH_SIZE = 100
+BOOKING_CREATE_BATCH_WAIT = 0.05
 
 
 class BookingMessageHandler:
@@ -33,6 +47,8 @@ class BookingMessageHandler:
         repo: MonitoringJobRepository,
         manager: MonitoringSchedulerManager,
         messaging: MessagingManager,
+        session_factory: Callable[[], Session],
+        concurrency: int = BOOKING_CONSUMER_CONCURRENCY,
     ) -> None:
         """Initialize the BookingMessageHandler.
 
@@ -40,9 +56,13 @@ class BookingMessageHandler:
             repo (MonitoringJobRepository): The repository for monitoring jobs.
             manager (MonitoringSchedulerManager): The scheduler manager for scheduling jobs.
             messaging (MessagingManager): The messaging manager for pub/sub communication.
+            session_factory (Callable[[], Session]): Creates the database session each booking message is handled in.
+            concurrency (int): Number of update and delete messages of each queue handled at the same time. Messages of the same booking are always handled in order. Creations are handled in batches.
 
         """  # noqa: E501
         self._repository = repo
+        self._session_factory = session_factory
+        self._concurrency = concurrency
         self._scheduler_manager = manager
         self._messaging = messaging
         self._job_executor = MonitoringJobExecutor(self._repository, self._messaging)
@@ -53,26 +73,44 @@ class BookingMessageHandler:
 
     def _initialize_subscription(self) -> None:
         """Initialize subscriptions to booking-related pub/sub topics."""
-        self._messaging.get_pubsub(DESK_BOOKING_CREATED).subscribe(
-            SCHEDULER_DESK_BOOKING_CREATED_QUEUE, self._handle_create, BookingMessage
+        self._messaging.get_pubsub(DESK_BOOKING_CREATED).subscribe_batch(
+            SCHEDULER_DESK_BOOKING_CREATED_QUEUE,
+            self._handle_create,
+            BookingMessage,
+            batch_size=BOOKING_CREATE_BATCH_SIZE,
+            max_wait=BOOKING_CREATE_BATCH_WAIT,
         )
         self._messaging.get_pubsub(DESK_BOOKING_UPDATED).subscribe(
-            SCHEDULER_DESK_BOOKING_UPDATED_QUEUE, self._handle_update, BookingMessage
+            SCHEDULER_DESK_BOOKING_UPDATED_QUEUE,
+            self._handle_update,
+            BookingMessage,
+            concurrency=self._concurrency,
+            partition_key=self._partition_key,
         )
         self._messaging.get_pubsub(DESK_BOOKING_DELETED).subscribe(
-            SCHEDULER_DESK_BOOKING_DELETED_QUEUE, self._handle_delete, BookingMessage
+            SCHEDULER_DESK_BOOKING_DELETED_QUEUE,
+            self._handle_delete,
+            BookingMessage,
+            concurrency=self._concurrency,
+            partition_key=self._partition_key,
         )
 
-    async def _handle_create(self, message: BookingMessage) -> None:
-        """Handle booking creation messages.
+    async def _handle_create(self, messages: list[BookingMessage]) -> None:
+        """Handle a batch of booking creation messages.
 
         Args:
-            message (BookingMessage): The booking message containing booking details.
+            messages (list[BookingMessage]): The booking messages containing booking details.
 
-        """
-        job = self._repository.create(MonitoringJob.from_dto(message))
-        if self._is_today(job.scheduled_time):
-            self._schedule_job(job, message)
+        """  # noqa: E501
+        jobs = await asyncio.to_thread(
+            self._in_session,
+            lambda repo: repo.create_many(
+                [MonitoringJob.from_dto(message) for message in messages]
+            ),
+        )
+        for job, message in zip(jobs, messages, strict=True):
+            if self._is_today(job.scheduled_time):
+                self._schedule_job(job, message)
 
     async def _handle_update(self, message: BookingMessage) -> None:
         """Handle booking update messages.
@@ -81,8 +119,10 @@ class BookingMessageHandler:
             message (BookingMessage): The booking message containing updated booking details.
 
         """  # noqa: E501
-        job = self._repository.update(message)
-        if self._is_today(job.scheduled_time):
+        job = await asyncio.to_thread(
+            self._in_session, lambda repo: repo.update(message)
+        )
+        if job and self._is_today(job.scheduled_time):
             self._schedule_job(job, message)
 
     async def _handle_delete(self, message: BookingMessage) -> None:
@@ -92,7 +132,10 @@ class BookingMessageHandler:
             message (BookingMessage): The booking message containing booking details.
 
         """
-        job = self._repository.delete_by_booking_id(message.booking_id)
+        job = await asyncio.to_thread(
+            self._in_session,
+            lambda repo: repo.delete_by_booking_id(message.booking_id),
+        )
         if job and self._is_today(job.scheduled_time):
             self._scheduler_manager.remove_job(str(job.job_id))
             logger.info(
@@ -101,6 +144,35 @@ class BookingMessageHandler:
                 message.booking_id,
             )
 
+    def _in_session(self, operation: Callable[[MonitoringJobRepository], T]) -> T:
+        """Run a blocking repository operation in a session of its own.
+
+        Messages are handled concurrently in worker threads, so they must not
+        share the session of the handler's repository.
+
+        Args:
+            operation (Callable[[MonitoringJobRepository], T]): The operation to run.
+
+        Returns:
+            T: The result of the operation.
+
+        """  # noqa: E501
+        with self._session_factory() as session:
+            return operation(MonitoringJobRepository(session))
+
+    @staticmethod
+    def _partition_key(message: BookingMessage) -> UUID:
+        """Return the key whose messages are handled in order, the booking ID.
+
+        Args:
+            message (BookingMessage): The booking message.
+
+        Returns:
+            UUID: The ID of the booking.
+
+        """
+        return message.booking_id
+
     def _schedule_job(self, job: MonitoringJob, message: BookingMessage) -> None:
         """Schedule a monitoring job for execution.
 
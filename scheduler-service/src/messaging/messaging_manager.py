@@ -1,46 +1,143 @@
+import asyncio
 import logging
 from functools import lru_cache
+from typing import TYPE_CHECKING
 
 from .direct_message_facade import DirectMessageFacade
+from .messaging_metrics import MessagingMetrics
 from .pubsub_facade import PubSubFacade
+from .transport import connect_robust
+
+if TYPE_CHECKING:
+    import aio_pika
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_STARTUP_TIMEOUT = 30.0
+
 
 class MessagingManager:
-    """Manager for handling multiple messaging facades (PubSub and DirectMessage)."""
+    """Manager for handling multiple messaging facades (PubSub and DirectMessage).
+
+    The manager opens one robust connection per broker URL and hands it to
+    every facade, which multiplexes its own channel over it. A service thus
+    keeps a single AMQP connection however many exchanges it uses.
+
+    The facades added to the manager record their publishes and handled
+    messages in the manager's `metrics`, which `render_metrics` exposes
+    together with the current depth of the consumed queues.
+
+    Facades are registered by exchange name. They are connected and closed
+    concurrently, so startup takes about one broker round trip rather than
+    one per exchange.
+    """
 
     def __init__(self) -> None:
-        """Initialize the MessagingManager with empty lists for facades."""
-        self._pubsubs: list[PubSubFacade] = []
-        self._directs: list[DirectMessageFacade] = []
-
-    async def start_all(self) -> None:
-        """Start all messaging facades by establishing their connections."""
-        for facade in self._pubsubs:
-            logger.info(
-                "Connecting PubSubFacade for exchange '%s'", facade.exchange_name
-            )
-            await facade.connect()
-        for facade in self._directs:
-            logger.info(
-                "Connecting DirectMessageFacade for exchange '%s'", facade.exchange_name
+        """Initialize the MessagingManager with empty registries for facades."""
+        self._pubsubs: dict[str, PubSubFacade] = {}
+        self._directs: dict[str, DirectMessageFacade] = {}
+        self._connections: dict[str, aio_pika.abc.AbstractRobustConnection] = {}
+        self.metrics = MessagingMetrics()
+
+    async def start_all(self, startup_timeout: float = DEFAULT_STARTUP_TIMEOUT) -> None:
+        """Open the shared connections and start all messaging facades on them.
+
+        Connections, and then the facades' channels, are opened concurrently.
+
+        Args:
+            startup_timeout (float): Seconds the whole startup may take.
+
+        Raises:
+            TimeoutError: If the facades did not start within `startup_timeout`.
+            aio_pika.exceptions.AMQPConnectionError: Connection to a broker failed.
+
+        """
+        facades = self._facades()
+        async with asyncio.timeout(startup_timeout):
+            amqp_urls = [
+                amqp_url
+                for amqp_url in dict.fromkeys(facade.amqp_url for facade in facades)
+                if amqp_url not in self._connections
+            ]
+            connections = await asyncio.gather(
+                *(connect_robust(amqp_url) for amqp_url in amqp_urls)
             )
-            await facade.connect()
+            self._connections.update(zip(amqp_urls, connections, strict=True))
+            async with asyncio.TaskGroup() as tasks:
+                for facade in facades:
+                    logger.info(
+                        "Connecting %s for exchange '%s'",
+                        type(facade).__name__,
+                        facade.exchange_name,
+                    )
+                    tasks.create_task(
+                        facade.connect(self._connections[facade.amqp_url])
+                    )
         logger.info("All messaging facades started.")
 
     async def stop_all(self) -> None:
-        """Stop all messaging facades by closing their connections."""
-        for facade in self._pubsubs:
-            logger.info("Closing PubSubFacade for exchange '%s'", facade.exchange_name)
-            await facade.close()
-        for facade in self._directs:
-            logger.info(
-                "Closing DirectMessageFacade for exchange '%s'", facade.exchange_name
-            )
-            await facade.close()
+        """Stop all messaging facades and close the shared connections.
+
+        Facades are closed concurrently; one failing to close does not keep the
+        others or the connections open.
+        """
+        facades = self._facades()
+        results = await asyncio.gather(
+            *(facade.close() for facade in facades), return_exceptions=True
+        )
+        for facade, result in zip(facades, results, strict=True):
+            if isinstance(result, Exception):
+                logger.error(
+                    "Error closing %s for exchange '%s': %s",
+                    type(facade).__name__,
+                    facade.exchange_name,
+                    result,
+                )
+        await asyncio.gather(
+            *(
+                connection.close()
+                for connection in self._connections.values()
+                if not connection.is_closed
+            ),
+            return_exceptions=True,
+        )
+        self._connections = {}
         logger.info("All messaging facades stopped.")
 
+    def readiness(self) -> dict[str, bool]:
+        """Report which facades are connected.
+
+        Returns:
+            dict[str, bool]: Whether the facade of each exchange is connected, by exchange name.
+
+        """  # noqa: E501
+        return {facade.exchange_name: facade.is_connected for facade in self._facades()}
+
+    @property
+    def is_ready(self) -> bool:
+        """Check if all facades are connected."""
+        return all(self.readiness().values())
+
+    async def render_metrics(self) -> str:
+        """Refresh the queue depths and render all messaging metrics.
+
+        A queue whose depth cannot be read keeps its last known depth.
+
+        Returns:
+            str: The metrics in the Prometheus text exposition format.
+
+        """
+        for facade in self._facades():
+            try:
+                await facade.collect_queue_depths()
+            except Exception as e:
+                logger.warning(
+                    "Could not read queue depths of exchange '%s': %s",
+                    facade.exchange_name,
+                    e,
+                )
+        return self.metrics.render()
+
     def add_pubsub(self, facade: PubSubFacade) -> None:
         """Add a PubSubFacade to the manager.
 
@@ -51,11 +148,12 @@ class MessagingManager:
             ValueError: If a PubSubFacade with the same exchange already exists.
 
         """
-        if facade.exchange_name in [pubsub.exchange_name for pubsub in self._pubsubs]:
+        if facade.exchange_name in self._pubsubs:
             raise ValueError(
                 f"PubSubFacade with exchange '{facade.exchange_name}' already exists."
             )
-        self._pubsubs.append(facade)
+        facade.metrics = self.metrics
+        self._pubsubs[facade.exchange_name] = facade
 
     def add_pubsubs(self, facades: list[PubSubFacade]) -> None:
         """Add multiple PubSubFacade instances to the manager.
@@ -80,11 +178,12 @@ class MessagingManager:
             ValueError: If a DirectMessageFacade with the same exchange already exists.
 
         """
-        if facade.exchange_name in [direct.exchange_name for direct in self._directs]:
+        if facade.exchange_name in self._directs:
             raise ValueError(
                 f"DirectMessageFacade with exchange '{facade.exchange_name}' already exists."  # noqa: E501
             )
-        self._directs.append(facade)
+        facade.metrics = self.metrics
+        self._directs[facade.exchange_name] = facade
 
     def add_directs(self, facades: list[DirectMessageFacade]) -> None:
         """Add multiple DirectMessageFacade instances to the manager.
@@ -112,11 +211,12 @@ class MessagingManager:
             ValueError: If no PubSubFacade with the given exchange exists.
 
         """
-        if exchange not in [pubsub.exchange_name for pubsub in self._pubsubs]:
-            raise ValueError(f"No PubSubFacade found with exchange '{exchange}'.")
-        return next(
-            pubsub for pubsub in self._pubsubs if pubsub.exchange_name == exchange
-        )
+        try:
+            return self._pubsubs[exchange]
+        except KeyError:
+            raise ValueError(
+                f"No PubSubFacade found with exchange '{exchange}'."
+            ) from None
 
     def get_direct(self, exchange: str) -> DirectMessageFacade:
         """Retrieve a DirectMessageFacade by its name.
@@ -131,13 +231,21 @@ class MessagingManager:
             ValueError: If no DirectMessageFacade with the given exchange exists.
 
         """
-        if exchange not in [direct.exchange_name for direct in self._directs]:
+        try:
+            return self._directs[exchange]
+        except KeyError:
             raise ValueError(
                 f"No DirectMessageFacade found with exchange '{exchange}'."
-            )
-        return next(
-            direct for direct in self._directs if direct.exchange_name == exchange
-        )
+            ) from None
+
+    def _facades(self) -> list[PubSubFacade | DirectMessageFacade]:
+        """Return all registered facades.
+
+        Returns:
+            list[PubSubFacade | DirectMessageFacade]: The pub-sub facades, then the direct ones.
+
+        """  # noqa: E501
+        return [*self._pubsubs.values(), *self._directs.values()]
 
     @staticmethod
     @lru_cache(maxsize=1)
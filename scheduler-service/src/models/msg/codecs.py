@@ -0,0 +1,118 @@
+from typing import TYPE_CHECKING, Protocol, TypeVar
+
+import msgpack
+import orjson
+from pydantic_core import to_jsonable_python
+
+if TYPE_CHECKING:
+    from src.models.msg.abstract_message import AbstractMessage
+
+MessageType = TypeVar("MessageType", bound="AbstractMessage")
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+
+class MessageCodec(Protocol):
+    """Encodes messages to and decodes them from the body of an AMQP message."""
+
+    content_type: str
+
+    def encode(self, message: "AbstractMessage") -> bytes:
+        """Serialize a message.
+
+        Args:
+            message (AbstractMessage): The message to serialize.
+
+        Returns:
+            bytes: The message body.
+
+        """
+        ...
+
+    def decode(self, message_class: type[MessageType], body: bytes) -> MessageType:
+        """Deserialize and validate a message.
+
+        Args:
+            message_class (type[MessageType]): The class of the message.
+            body (bytes): The message body.
+
+        Returns:
+            MessageType: The validated message.
+
+        """
+        ...
+
+
+class JsonCodec:
+    """JSON serialized by pydantic."""
+
+    content_type = JSON_CONTENT_TYPE
+
+    def encode(self, message: "AbstractMessage") -> bytes:
+        """Serialize a message with pydantic's JSON serializer."""
+        return message.model_dump_json().encode()
+
+    def decode(self, message_class: type[MessageType], body: bytes) -> MessageType:
+        """Parse and validate a message in one pass with pydantic."""
+        return message_class.model_validate_json(body)
+
+
+class OrjsonCodec(JsonCodec):
+    """JSON serialized by orjson.
+
+    The output is plain JSON under the same content type, so consumers that
+    only know `JsonCodec` read it unchanged. Decoding is inherited, because
+    pydantic's one-pass `model_validate_json` is faster than `orjson.loads`
+    followed by validation.
+    """
+
+    def encode(self, message: "AbstractMessage") -> bytes:
+        """Serialize a message with orjson."""
+        return orjson.dumps(message.model_dump(), default=to_jsonable_python)
+
+
+class MsgpackCodec:
+    """MessagePack, smaller than JSON on the wire."""
+
+    content_type = MSGPACK_CONTENT_TYPE
+
+    def encode(self, message: "AbstractMessage") -> bytes:
+        """Serialize a message to MessagePack."""
+        return msgpack.packb(message.model_dump(mode="json"))
+
+    def decode(self, message_class: type[MessageType], body: bytes) -> MessageType:
+        """Unpack and validate a MessagePack message."""
+        return message_class.model_validate(msgpack.unpackb(body))
+
+
+JSON_CODEC = JsonCodec()
+ORJSON_CODEC = OrjsonCodec()
+MSGPACK_CODEC = MsgpackCodec()
+
+_DECODERS: dict[str, MessageCodec] = {
+    JSON_CONTENT_TYPE: JSON_CODEC,
+    MSGPACK_CONTENT_TYPE: MSGPACK_CODEC,
+    "application/x-msgpack": MSGPACK_CODEC,
+}
+
+
+def codec_for(content_type: str) -> MessageCodec:
+    """Return the codec decoding bodies of a content type.
+
+    Parameters such as `charset` are ignored.
+
+    Args:
+        content_type (str): The content type of the AMQP message.
+
+    Returns:
+        MessageCodec: The codec for the content type.
+
+    Raises:
+        ValueError: If no codec decodes the content type.
+
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type not in _DECODERS:
+        raise ValueError(f"Unsupported content type '{content_type}'.")
+    return _DECODERS[media_type]
@@ -63,3 +63,4 @@ class HealthResponse(BaseModel):
     status: str
     scheduler_running: bool
     jobs_count: int
+    messaging: dict[str, bool] = {}
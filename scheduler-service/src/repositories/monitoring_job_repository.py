@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
 from uuid import UUID
 
+from sqlalchemy import insert
 from sqlmodel import Session, select
 
 from src.models.db.monitoring_job import JobStatus, MonitoringJob
@@ -28,6 +29,26 @@ class MonitoringJobRepository:
         self._save_and_refresh(job)
         return job
 
+    def create_many(self, jobs: list[MonitoringJob]) -> list[MonitoringJob]:
+        """Create several MonitoringJobs with a single multi-row INSERT.
+
+        All columns are generated client-side, so the jobs are not refreshed and
+        stay usable after the session is closed.
+
+        Args:
+            jobs (list[MonitoringJob]): The MonitoringJob entities to create.
+
+        Returns:
+            list[MonitoringJob]: The created MonitoringJob entities.
+
+        """
+        if jobs:
+            self._session.exec(
+                insert(MonitoringJob).values([job.model_dump() for job in jobs])
+            )
+            self._session.commit()
+        return jobs
+
     def update(self, update: BookingMessage) -> MonitoringJob | None:
         """Update an existing MonitoringJob in the database.
 
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session
 
 from src.api.dependencies import get_db_session
+from src.messaging.messaging_manager import MessagingManager
 from src.models.scheduler import (
     DeskActionResult,
     DeskPositionRequest,
@@ -23,16 +24,25 @@ router = APIRouter(prefix="/scheduler/api/v1", tags=["scheduler"])
 
 @router.get("/health")
 def health_check() -> HealthResponse:
-    """Health check endpoint."""
+    """Health check endpoint, including the readiness of each messaging facade."""
+    messaging = MessagingManager.get_instance()
     try:
         running = scheduler_service.is_running()
         jobs_count = scheduler_service.get_jobs_count()
     except Exception as e:
         logger.exception("Health check failure: %s", e)
-        return HealthResponse(status="degraded", scheduler_running=False, jobs_count=0)
+        return HealthResponse(
+            status="degraded",
+            scheduler_running=False,
+            jobs_count=0,
+            messaging=messaging.readiness(),
+        )
 
     return HealthResponse(
-        status="healthy", scheduler_running=running, jobs_count=jobs_count
+        status="healthy" if messaging.is_ready else "degraded",
+        scheduler_running=running,
+        jobs_count=jobs_count,
+        messaging=messaging.readiness(),
     )
 
 
@@ -0,0 +1,47 @@
+import logging
+import timeit
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from src.models.msg.abstract_message import AbstractMessage
+from src.models.msg.booking_message import BookingMessage
+from src.models.msg.codecs import (
+    JSON_CODEC,
+    MSGPACK_CODEC,
+    ORJSON_CODEC,
+    MessageCodec,
+)
+from src.models.msg.monitoring_requested_message import MonitoringRequestedMessage
+
+ROUNDS = 20_000
+
+MESSAGES = [
+    BookingMessage(booking_id=uuid4(), desk_id=42, start_time=datetime.now()),
+    MonitoringRequestedMessage(desk_id=42),
+]
+CODECS = {"json": JSON_CODEC, "orjson": ORJSON_CODEC, "msgpack": MSGPACK_CODEC}
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.parametrize("message", MESSAGES, ids=lambda m: type(m).__name__)
+@pytest.mark.parametrize("codec", CODECS.values(), ids=CODECS.keys())
+def test_codec_speed(message: AbstractMessage, codec: MessageCodec) -> None:
+    """Measure encoding and decoding time and body size of a message class."""
+    body = codec.encode(message)
+    encode = timeit.timeit(lambda: codec.encode(message), number=ROUNDS) / ROUNDS
+    decode = (
+        timeit.timeit(lambda: codec.decode(type(message), body), number=ROUNDS) / ROUNDS
+    )
+
+    logger.info(
+        "%s via %s: encode %.2f us, decode %.2f us, %d bytes",
+        type(message).__name__,
+        type(codec).__name__,
+        encode * 1e6,
+        decode * 1e6,
+        len(body),
+    )
+    assert codec.decode(type(message), body) == message
@@ -38,6 +38,6 @@ class DummyMessage(AbstractMessage):
         return self.content.encode()
 
     @classmethod
-    def from_bytes(cls, body: bytes) -> "DummyMessage":
+    def from_bytes(cls, body: bytes, content_type: str | None = None) -> "DummyMessage":
         """Deserialize bytes to an instance of DummyMessage."""
         return cls(content=body.decode())
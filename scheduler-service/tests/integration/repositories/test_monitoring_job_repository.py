@@ -127,6 +127,34 @@ class TestMonitoringJobRepositoryCreate:
         assert created_job1.job_id != created_job2.job_id
         assert created_job1.booking_id != created_job2.booking_id
 
+    def test_create_many_persists_all_jobs(
+        self, repository: MonitoringJobRepository
+    ) -> None:
+        """Test creating a batch of jobs with one statement."""
+        jobs = [
+            MonitoringJob(
+                booking_id=uuid4(),
+                desk_id=200 + i,
+                scheduled_time=datetime.now(timezone.utc) + timedelta(hours=i),
+            )
+            for i in range(3)
+        ]
+
+        created_jobs = repository.create_many(jobs)
+
+        assert created_jobs == jobs
+        for job in jobs:
+            retrieved_job = repository.get_by_id(job.job_id)
+            assert retrieved_job is not None
+            assert retrieved_job.booking_id == job.booking_id
+            assert retrieved_job.status == JobStatus.PENDING
+
+    def test_create_many_without_jobs(
+        self, repository: MonitoringJobRepository
+    ) -> None:
+        """Test that creating an empty batch is a no-op."""
+        assert repository.create_many([]) == []
+
 
 class TestMonitoringJobRepositoryUpdate:
     """Tests for the update operation."""
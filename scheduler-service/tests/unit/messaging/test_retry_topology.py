@@ -0,0 +1,145 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import aio_pika
+import pytest
+import pytest_asyncio
+
+from src.messaging.retry_topology import (
+    RETRY_COUNT_HEADER,
+    RetryPolicy,
+    RetryTopology,
+    settle_failed,
+)
+
+QUEUE_NAME = "test_queue"
+
+
+def _incoming(retries: int | None = None) -> MagicMock:
+    """Build an incoming message that has been retried the given number of times."""
+    headers = {} if retries is None else {RETRY_COUNT_HEADER: retries}
+    return MagicMock(
+        body=b"body",
+        content_type="application/json",
+        headers=headers,
+        ack=AsyncMock(),
+        nack=AsyncMock(),
+        reject=AsyncMock(),
+    )
+
+
+@pytest_asyncio.fixture
+async def topology() -> tuple[RetryTopology, AsyncMock, AsyncMock]:
+    """Declare a topology with three attempts on a mocked channel."""
+    channel = AsyncMock()
+    exchange = channel.declare_exchange.return_value
+    retry_topology = RetryTopology(
+        QUEUE_NAME, RetryPolicy(max_attempts=3, initial_delay=0.5, multiplier=3.0)
+    )
+    await retry_topology.declare(channel)
+    return retry_topology, channel, exchange
+
+
+def test_delay_grows_exponentially() -> None:
+    """Test that every retry waits multiplier times longer than the previous one."""
+    policy = RetryPolicy(initial_delay=1.0, multiplier=2.0)
+    assert [policy.delay_ms(retry) for retry in range(1, 5)] == [
+        1000,
+        2000,
+        4000,
+        8000,
+    ]
+
+
+def test_invalid_policy_is_rejected() -> None:
+    """Test that a policy without attempts is rejected."""
+    with pytest.raises(ValueError, match="Max attempts"):
+        RetryPolicy(max_attempts=0)
+
+
+@pytest.mark.asyncio
+async def test_declare_creates_delay_and_poison_queues(
+    topology: tuple[RetryTopology, AsyncMock, AsyncMock],
+) -> None:
+    """Test that each retry gets a delay queue dead-lettering to the queue."""
+    _, channel, exchange = topology
+
+    channel.declare_exchange.assert_awaited_once_with(
+        f"{QUEUE_NAME}.dlx", aio_pika.ExchangeType.DIRECT, durable=True
+    )
+    declared = [c.args[0] for c in channel.declare_queue.await_args_list]
+    assert declared == [
+        f"{QUEUE_NAME}.retry.500ms",
+        f"{QUEUE_NAME}.retry.1500ms",
+        f"{QUEUE_NAME}.poison",
+    ]
+    first_delay = channel.declare_queue.await_args_list[0].kwargs["arguments"]
+    assert first_delay == {
+        "x-message-ttl": 500,
+        "x-dead-letter-exchange": "",
+        "x-dead-letter-routing-key": QUEUE_NAME,
+    }
+    bound = channel.declare_queue.return_value.bind.await_args_list
+    assert [c.kwargs["routing_key"] for c in bound] == [
+        "retry.500ms",
+        "retry.1500ms",
+        "poison",
+    ]
+    assert all(c.args[0] is exchange for c in bound)
+
+
+@pytest.mark.asyncio
+async def test_retry_forwards_to_next_delay_queue(
+    topology: tuple[RetryTopology, AsyncMock, AsyncMock],
+) -> None:
+    """Test that a failed message goes to the delay queue of its next retry."""
+    retry_topology, _, exchange = topology
+    message = _incoming(retries=1)
+
+    await retry_topology.retry(message)
+
+    (published,) = exchange.publish.await_args_list
+    assert published.kwargs["routing_key"] == "retry.1500ms"
+    assert published.args[0].body == message.body
+    assert published.args[0].headers[RETRY_COUNT_HEADER] == 2  # noqa: PLR2004
+    assert published.args[0].delivery_mode == aio_pika.DeliveryMode.PERSISTENT
+    message.ack.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_retry_parks_message_after_last_attempt(
+    topology: tuple[RetryTopology, AsyncMock, AsyncMock],
+) -> None:
+    """Test that a message that used up its attempts goes to the poison queue."""
+    retry_topology, _, exchange = topology
+    message = _incoming(retries=2)
+
+    await retry_topology.retry(message)
+
+    exchange.publish.assert_awaited_once()
+    assert exchange.publish.await_args.kwargs["routing_key"] == "poison"
+    message.ack.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_settle_failed_requeues_when_forwarding_fails(
+    topology: tuple[RetryTopology, AsyncMock, AsyncMock],
+) -> None:
+    """Test that a message is requeued rather than lost if it cannot be forwarded."""
+    retry_topology, _, exchange = topology
+    exchange.publish.side_effect = ConnectionError("channel closed")
+    message = _incoming()
+
+    await settle_failed(message, retry_topology)
+
+    message.ack.assert_not_awaited()
+    message.nack.assert_awaited_once_with(requeue=True)
+
+
+@pytest.mark.asyncio
+async def test_settle_failed_without_topology_rejects() -> None:
+    """Test that failed messages are rejected when retrying is disabled."""
+    message = _incoming()
+
+    await settle_failed(message, None)
+
+    message.reject.assert_awaited_once()
@@ -9,8 +9,11 @@ import os
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
 from src.api.routes.user_routes import router as user_router
+from src.messaging.messaging_manager import messaging_manager
+from src.messaging.messaging_metrics import METRICS_CONTENT_TYPE
 
 logging.basicConfig(
     level=logging.INFO,
@@ -50,3 +53,16 @@ def get_health() -> dict[str, str]:
 
     """
     return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Expose the messaging metrics to Prometheus.
+
+    Returns:
+        PlainTextResponse: Publish, consume and queue backlog metrics.
+
+    """
+    return PlainTextResponse(
+        await messaging_manager.render_metrics(), media_type=METRICS_CONTENT_TYPE
+    )
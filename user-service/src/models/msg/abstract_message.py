@@ -1,30 +1,60 @@
+from typing import ClassVar
+
 from pydantic import BaseModel
 
+from src.models.msg.codecs import JSON_CODEC, MessageCodec, codec_for
+
 
 class AbstractMessage(BaseModel):
-    """Abstract base class for messages to be sent and received via messaging system."""
+    """Abstract base class for messages to be sent and received via messaging system.
+
+    Messages are encoded with the class's `codec`, JSON by default. Subclasses
+    sending at a high rate can switch to a faster codec; consumers decode by the
+    content type of the incoming message, so they read every codec whatever
+    their own class uses.
+    """
+
+    codec: ClassVar[MessageCodec] = JSON_CODEC
 
     def to_bytes(self) -> bytes:
-        """Serialize the message to bytes using JSON encoding.
+        """Serialize the message to bytes using the class's codec.
 
         Returns:
             bytes: The serialized message in bytes.
 
         """
-        return self.model_dump_json().encode()
+        return self.codec.encode(self)
 
     @classmethod
-    def from_bytes(cls, body: bytes) -> "AbstractMessage":
+    def content_type(cls) -> str:
+        """Get the content type of messages encoded by `to_bytes`.
+
+        Returns:
+            str: The AMQP content type.
+
+        """
+        return cls.codec.content_type
+
+    @classmethod
+    def from_bytes(
+        cls, body: bytes, content_type: str | None = None
+    ) -> "AbstractMessage":
         """Deserialize bytes to an instance of the message class.
 
         Args:
             body (bytes): The byte representation of the message.
+            content_type (str | None): The content type of the AMQP message. If
+                omitted, the body is decoded with the class's own codec.
 
         Returns:
             An instance of the message class.
 
+        Raises:
+            ValueError: If the content type is not supported.
+
         """
-        return cls.model_validate_json(body)
+        codec = codec_for(content_type) if content_type else cls.codec
+        return codec.decode(cls, body)
 
     def __str__(self) -> str:
         """Return string representation of the message."""
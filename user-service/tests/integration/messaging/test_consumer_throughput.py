@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from asyncio import AbstractEventLoop
+from typing import Generator
+
+import pytest
+
+from src.messaging.pubsub_facade import PubSubFacade
+from src.messaging.transport import connect_robust
+from tests.integration.messaging.utils.rabbitmq_container import (
+    DummyMessage,
+    RabbitMqContainer,
+    get_amqp_url,
+)
+from tests.integration.messaging.utils.rabbitmq_container import (
+    rabbitmq_container as _rabbitmq_container,  # noqa: F401
+)
+
+THROUGHPUT_EXCHANGE = "throughput_exchange"
+MESSAGES = 400
+KEYS = 40
+HANDLER_LATENCY = 0.01
+CONCURRENCY_LEVELS = (1, 4, 16)
+MIN_SPEEDUP = 4
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture(scope="module")
+def event_loop() -> Generator[AbstractEventLoop]:
+    """Create an instance of the event loop for the module scope."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+async def _fill_queue(amqp_url: str, queue_name: str) -> None:
+    """Bind a fresh queue to the exchange and publish the benchmark messages."""
+    publisher = PubSubFacade(amqp_url, THROUGHPUT_EXCHANGE)
+    await publisher.connect()
+    connection = await connect_robust(amqp_url)
+    async with connection:
+        channel = await connection.channel()
+        queue = await channel.declare_queue(queue_name, durable=True)
+        await queue.bind(THROUGHPUT_EXCHANGE)
+        for i in range(MESSAGES):
+            await publisher.publish(DummyMessage(content=f"{i % KEYS}:{i}"))
+    await publisher.close()
+
+
+async def _drain(
+    amqp_url: str,
+    queue_name: str,
+    concurrency: int,
+    handler_latency: float = HANDLER_LATENCY,
+) -> float:
+    """Consume the filled queue and return the messages handled per second.
+
+    The handler sleeps to stand in for a slow database commit and records the
+    order in which the messages of each key were handled.
+    """
+    handled: dict[str, list[int]] = {}
+    done = asyncio.Event()
+
+    async def on_message(message: DummyMessage) -> None:
+        key, seq = message.content.split(":")
+        await asyncio.sleep(handler_latency)
+        handled.setdefault(key, []).append(int(seq))
+        if sum(map(len, handled.values())) == MESSAGES:
+            done.set()
+
+    subscriber = PubSubFacade(amqp_url, THROUGHPUT_EXCHANGE)
+    await subscriber.connect()
+    started = time.perf_counter()
+    subscriber.subscribe(
+        queue_name,
+        on_message,
+        DummyMessage,
+        concurrency=concurrency,
+        partition_key=lambda m: m.content.split(":")[0],
+    )
+    await asyncio.wait_for(done.wait(), timeout=60.0)
+    elapsed = time.perf_counter() - started
+    await subscriber.close()
+
+    for seqs in handled.values():
+        assert seqs == sorted(seqs)
+    return MESSAGES / elapsed
+
+
+@pytest.mark.asyncio
+async def test_consumer_throughput_scales_with_concurrency(
+    _rabbitmq_container: RabbitMqContainer,  # noqa: F811, PT019
+) -> None:
+    """Benchmark consumer throughput for several worker concurrencies.
+
+    Every run consumes the same pre-filled queue of messages spread over
+    `KEYS` partition keys and checks that each key was handled in order.
+    """
+    amqp_url = get_amqp_url(_rabbitmq_container)
+    throughput: dict[int, float] = {}
+    for concurrency in CONCURRENCY_LEVELS:
+        queue_name = f"throughput.queue.{concurrency}"
+        await _fill_queue(amqp_url, queue_name)
+        throughput[concurrency] = await _drain(amqp_url, queue_name, concurrency)
+        logger.warning(
+            "concurrency=%d: %d messages, %.0f msg/s",
+            concurrency,
+            MESSAGES,
+            throughput[concurrency],
+        )
+
+    assert throughput[CONCURRENCY_LEVELS[-1]] > MIN_SPEEDUP * throughput[1]
+
+
+@pytest.mark.asyncio
+async def test_memory_transport_separates_broker_overhead() -> None:
+    """Benchmark the consumer on the in-memory broker, without a RabbitMQ hop.
+
+    A handler that returns at once measures the consumer's own overhead; the
+    sleeping handler adds the handler cost on top of it.
+    """
+    amqp_url = "memory://throughput"
+    throughput: dict[tuple[int, float], float] = {}
+    for concurrency in CONCURRENCY_LEVELS:
+        for handler_latency in (0.0, HANDLER_LATENCY):
+            queue_name = f"memory.queue.{concurrency}.{handler_latency}"
+            await _fill_queue(amqp_url, queue_name)
+            rate = await _drain(amqp_url, queue_name, concurrency, handler_latency)
+            throughput[concurrency, handler_latency] = rate
+            logger.warning(
+                "memory concurrency=%d handler=%.3fs: %d messages, %.0f msg/s",
+                concurrency,
+                handler_latency,
+                MESSAGES,
+                rate,
+            )
+
+    slowest = throughput[CONCURRENCY_LEVELS[-1], HANDLER_LATENCY]
+    assert slowest > MIN_SPEEDUP * throughput[1, HANDLER_LATENCY]
@@ -0,0 +1,161 @@
+import asyncio
+from collections.abc import Callable
+
+import aio_pika
+import pytest
+from aio_pika.exceptions import ChannelNotFoundEntity
+from pydantic import Field
+
+from src.messaging.direct_message_facade import DirectMessageFacade
+from src.messaging.memory_broker import MemoryBroker
+from src.messaging.messaging_manager import MessagingManager
+from src.messaging.pubsub_facade import PubSubFacade
+from src.messaging.retry_topology import RetryPolicy
+from src.models.msg.abstract_message import AbstractMessage
+
+EXCHANGE_NAME = "test_exchange"
+QUEUE_NAME = "test_queue"
+
+
+class DummyMessage(AbstractMessage):
+    """A dummy message class for testing purposes."""
+
+    content: str = Field(...)
+
+
+async def _wait_for(condition: Callable[[], object]) -> None:
+    """Poll until the condition holds, failing after a second."""
+    async with asyncio.timeout(1.0):
+        while not condition():  # noqa: ASYNC110
+            await asyncio.sleep(0.001)
+
+
+@pytest.mark.asyncio
+async def test_fanout_reaches_every_bound_queue() -> None:
+    """Test that a pub-sub message is delivered to each subscriber's queue."""
+    url = "memory://fanout"
+    publisher = PubSubFacade(url, EXCHANGE_NAME)
+    subscribers = [PubSubFacade(url, EXCHANGE_NAME) for _ in range(2)]
+    received: list[list[str]] = [[], []]
+    for facade in [publisher, *subscribers]:
+        await facade.connect()
+    for i, subscriber in enumerate(subscribers):
+        subscriber.subscribe(
+            f"{QUEUE_NAME}_{i}",
+            lambda m, i=i: asyncio.sleep(0, received[i].append(m.content)),
+            DummyMessage,
+        )
+    await _wait_for(lambda: all(s._monitored_queues for s in subscribers))
+
+    await publisher.publish(DummyMessage(content="hello"))
+
+    await _wait_for(lambda: received == [["hello"], ["hello"]])
+    for facade in [publisher, *subscribers]:
+        await facade.close()
+
+
+@pytest.mark.asyncio
+async def test_direct_routes_by_routing_key() -> None:
+    """Test that direct messages only reach queues bound with their routing key."""
+    url = "memory://direct"
+    facade = DirectMessageFacade(url, EXCHANGE_NAME)
+    await facade.connect()
+    received: list[str] = []
+    facade.receive_messages(
+        "desk.1",
+        QUEUE_NAME,
+        lambda m: asyncio.sleep(0, received.append(m.content)),
+        DummyMessage,
+    )
+    await _wait_for(lambda: facade._monitored_queues)
+
+    await facade.send_message(DummyMessage(content="other"), "desk.2")
+    await facade.send_message(DummyMessage(content="mine"), "desk.1")
+
+    await _wait_for(lambda: received == ["mine"])
+    await facade.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_messages_are_retried_and_parked() -> None:
+    """Test that the retry topology works on the in-memory broker."""
+    url = "memory://retry"
+    facade = PubSubFacade(url, EXCHANGE_NAME)
+    await facade.connect()
+    attempts: list[str] = []
+
+    async def fail(message: DummyMessage) -> None:
+        attempts.append(message.content)
+        raise RuntimeError("handler failed")
+
+    facade.subscribe(
+        QUEUE_NAME,
+        fail,
+        DummyMessage,
+        retry_policy=RetryPolicy(max_attempts=3, initial_delay=0.01),
+    )
+    await _wait_for(lambda: facade._monitored_queues)
+
+    await facade.publish(DummyMessage(content="poison"))
+
+    await _wait_for(lambda: len(attempts) == 3)  # noqa: PLR2004
+    await facade.collect_queue_depths()
+    await _wait_for(
+        lambda: facade.metrics._queue_messages.get(f"{QUEUE_NAME}.poison") == 1
+    )
+    await facade.close()
+
+
+@pytest.mark.asyncio
+async def test_prefetch_limits_unacknowledged_messages() -> None:
+    """Test that a consumer gets no more than its prefetch count at once."""
+    connection = MemoryBroker.for_url("memory://prefetch").connect()
+    channel = await connection.channel()
+    await channel.set_qos(prefetch_count=2)
+    queue = await channel.declare_queue(QUEUE_NAME)
+    exchange = await channel.declare_exchange("", aio_pika.ExchangeType.DIRECT)
+    delivered: list[aio_pika.abc.AbstractIncomingMessage] = []
+
+    async def hold(message: aio_pika.abc.AbstractIncomingMessage) -> None:
+        delivered.append(message)
+
+    for i in range(5):
+        await exchange.publish(aio_pika.Message(body=str(i).encode()), QUEUE_NAME)
+    await queue.consume(hold)
+    await asyncio.sleep(0.01)
+    assert [m.body for m in delivered] == [b"0", b"1"]
+
+    await delivered[0].ack()
+    await delivered[1].nack(requeue=True)
+    await asyncio.sleep(0.01)
+
+    assert [m.body for m in delivered[2:]] == [b"2", b"1"]
+    assert delivered[3].redelivered
+    assert queue.declaration_result.message_count == 2  # noqa: PLR2004
+    await connection.close()
+
+
+@pytest.mark.asyncio
+async def test_passive_declare_of_missing_queue_fails() -> None:
+    """Test that a passive declare does not create the queue."""
+    connection = MemoryBroker.for_url("memory://passive").connect()
+
+    async with connection.channel() as channel:
+        with pytest.raises(ChannelNotFoundEntity, match="no queue"):
+            await channel.declare_queue("missing", passive=True)
+        assert channel.is_closed
+
+
+@pytest.mark.asyncio
+async def test_manager_runs_on_memory_url() -> None:
+    """Test that the manager starts and stops facades on the in-memory broker."""
+    manager = MessagingManager()
+    manager.add_pubsub(PubSubFacade("memory://manager", EXCHANGE_NAME))
+    manager.add_direct(DirectMessageFacade("memory://manager", EXCHANGE_NAME))
+
+    await manager.start_all()
+    await manager.get_pubsub(EXCHANGE_NAME).publish(DummyMessage(content="x"))
+    rendered = await manager.render_metrics()
+    await manager.stop_all()
+
+    assert f'messaging_published_total{{exchange="{EXCHANGE_NAME}"}} 1' in rendered